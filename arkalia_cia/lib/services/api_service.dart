@@ -103,7 +103,8 @@ class ApiService {
         }
       }
 
-      if (response.statusCode == 200) {
+      // 202 : document reçu, traitement en arrière-plan (job_id, status_url)
+      if (response.statusCode == 200 || response.statusCode == 202) {
         return json.decode(responseBody);
       } else {
         return {
@@ -4,7 +4,6 @@ Récupère données douleurs et patterns depuis ARIA
 """
 
 import logging
-import sqlite3
 import time
 from typing import Any
 
@@ -183,8 +182,7 @@ class ARIAIntegration:
     def _get_local_pain_records(self, limit: int = 10) -> list[dict[str, Any]]:
         """Fallback local CIA: lit les entrées douleur stockées localement."""
         try:
-            with sqlite3.connect(self._db.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._db.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     """
@@ -7,6 +7,8 @@ import logging
 import os  # nosec B404
 import re
 import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -18,11 +20,12 @@ from fastapi import (
     File,
     Form,
     HTTPException,
+    Response,
     UploadFile,
 )
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field, field_validator
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
@@ -32,6 +35,7 @@ from starlette.requests import Request
 from arkalia_cia_python_backend.ai.conversational_ai import ConversationalAI
 from arkalia_cia_python_backend.ai.pattern_analyzer import AdvancedPatternAnalyzer
 from arkalia_cia_python_backend.aria_integration.api import router as aria_router
+from arkalia_cia_python_backend.async_database import AsyncCIADatabase
 from arkalia_cia_python_backend.auth import (
     ALGORITHM,
     SECRET_KEY,
@@ -43,22 +47,46 @@ from arkalia_cia_python_backend.auth import (
     create_access_token,
     create_refresh_token,
     get_current_active_user,
-    get_password_hash,
-    verify_password,
+    password_hasher,
+    token_cache,
     verify_token,
 )
 from arkalia_cia_python_backend.config import get_settings
 from arkalia_cia_python_backend.database import CIADatabase
 from arkalia_cia_python_backend.dependencies import (
+    flush_database,
+    get_async_database,
     get_conversational_ai,
+    get_cpu_pool,
     get_database,
     get_document_service,
+    get_extraction_cache,
+    get_ingestion_pipeline,
+    get_job_worker,
     get_medical_report_service,
     get_pattern_analyzer,
+    run_cpu_bound,
+    start_job_worker,
+    stop_job_worker,
+    stop_page_pool,
+)
+from arkalia_cia_python_backend.metrics import (
+    CONTENT_TYPE,
+    format_family,
+    format_query_metrics,
+    format_stats,
+    rate_limit_rejections_total,
+    registry,
+    upload_bytes_total,
+)
+from arkalia_cia_python_backend.middleware.prometheus import (
+    PrometheusMiddleware,
+    route_template,
 )
 from arkalia_cia_python_backend.middleware.request_size_validator import (
     RequestSizeValidatorMiddleware,
 )
+from arkalia_cia_python_backend.query_metrics import query_metrics
 from arkalia_cia_python_backend.security.ssrf_validator import get_ssrf_validator
 from arkalia_cia_python_backend.security_utils import (
     sanitize_html,
@@ -66,9 +94,22 @@ from arkalia_cia_python_backend.security_utils import (
     validate_phone_number,
 )
 from arkalia_cia_python_backend.services.document_service import DocumentService
+from arkalia_cia_python_backend.services.job_worker import (
+    DOCUMENT_UPLOAD,
+    DocumentJobWorker,
+)
 from arkalia_cia_python_backend.services.medical_report_service import (
     MedicalReportService,
 )
+from arkalia_cia_python_backend.utils.pagination import (
+    NEXT_CURSOR_HEADER,
+    InvalidCursorError,
+    next_cursor,
+)
+from arkalia_cia_python_backend.utils.upload_stream import (
+    UploadTooLargeError,
+    discard,
+)
 
 # Patterns XSS compilés une fois pour performance
 _XSS_PATTERNS = [
@@ -310,6 +351,20 @@ class HealthPortalResponse(BaseModel):
     created_at: str
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Cycle de vie : démarre les workers de jobs (reprise de la file) puis,
+    à l'arrêt, les arrête (avec le pool d'extraction des pages) et écrit
+    les logs d'audit en attente
+    """
+    start_job_worker()
+    yield
+    stop_job_worker()
+    stop_page_pool()
+    flush_database()
+
+
 # Application FastAPI avec configuration de sécurité
 app = FastAPI(
     title="Arkalia CIA API",
@@ -319,12 +374,27 @@ app = FastAPI(
     redoc_url=("/redoc" if _ENVIRONMENT != "production" else None),
     # Désactiver OpenAPI schema en production pour réduire la surface d'attaque
     openapi_url=("/openapi.json" if _ENVIRONMENT != "production" else None),
+    lifespan=lifespan,
 )
 
 # Versioning API
 API_VERSION = "v1"
 API_PREFIX = f"/api/{API_VERSION}"
 
+
+def _set_next_cursor(
+    response: Response,
+    rows: list[dict[str, Any]],
+    limit: int,
+    timestamp_key: str = "created_at",
+) -> str | None:
+    """Expose le curseur de la page suivante dans l'en-tête X-Next-Cursor"""
+    cursor = next_cursor(rows, limit, timestamp_key)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return cursor
+
+
 # Ajouter le rate limiter
 app.state.limiter = limiter
 app.state.start_time = time.time()
@@ -333,6 +403,7 @@ app.state.start_time = time.time()
 def rate_limit_handler(request: Request, exc: Exception) -> JSONResponse:
     """Handler personnalisé pour RateLimitExceeded"""
     if isinstance(exc, RateLimitExceeded):
+        rate_limit_rejections_total.inc(labels=(route_template(request.scope),))
         return JSONResponse(
             status_code=429,
             content={"detail": "Trop de requêtes. Veuillez réessayer plus tard."},
@@ -388,7 +459,12 @@ async def add_security_headers(request: Request, call_next):
         if content_length:
             try:
                 size = int(content_length)
-                if size > settings.max_request_size_bytes:
+                max_size = (
+                    settings.max_upload_request_bytes
+                    if "multipart/form-data" in content_type
+                    else settings.max_request_size_bytes
+                )
+                if size > max_size:
                     host = request.client.host if request.client else "unknown"
                     msg = (
                         f"Requête trop volumineuse rejetée (header): "
@@ -467,7 +543,7 @@ if _ENVIRONMENT != "production":
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         allow_headers=["Content-Type", "Authorization", "Accept"],
-        expose_headers=["Content-Type"],
+        expose_headers=["Content-Type", NEXT_CURSOR_HEADER],
         max_age=3600,  # Cache CORS preflight pour 1 heure
     )
 else:
@@ -477,10 +553,13 @@ else:
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         allow_headers=["Content-Type", "Authorization", "Accept"],
-        expose_headers=["Content-Type"],
+        expose_headers=["Content-Type", NEXT_CURSOR_HEADER],
         max_age=3600,  # Cache CORS preflight pour 1 heure
     )
 
+# Métriques HTTP : ajouté en dernier, donc middleware le plus externe
+app.add_middleware(PrometheusMiddleware)
+
 # Montage du router ARIA
 app.include_router(aria_router, prefix="/api/aria", tags=["ARIA Integration"])
 
@@ -492,7 +571,7 @@ async def root():
 
 
 @app.get("/health")
-async def health_check(db: CIADatabase = Depends(get_database)):
+async def health_check(db: AsyncCIADatabase = Depends(get_async_database)):
     """
     Vérification de santé complète de l'API
     Vérifie: API, base de données, storage
@@ -505,15 +584,10 @@ async def health_check(db: CIADatabase = Depends(get_database)):
     }
 
     # Vérifier base de données
-    # OPTIMISATION: Utiliser une méthode qui existe dans CIADatabase
     try:
-        import sqlite3
-
-        # Vérifier la connexion à la base de données
-        with sqlite3.connect(db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
+        # Vérifier la connexion à la base de données (hors event loop)
+        if not await db.ping():
+            raise RuntimeError("SELECT 1 sans résultat")
         checks = health_status["checks"]
         if isinstance(checks, dict):
             checks["database"] = "ok"
@@ -555,22 +629,50 @@ async def health_check(db: CIADatabase = Depends(get_database)):
     return health_status
 
 
-@app.get("/metrics")
-async def metrics():
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(db: CIADatabase = Depends(get_database)):
     """
     Endpoint pour métriques d'observabilité
-    Format simple compatible avec Prometheus
+    Exposition texte Prometheus (HTTP, rate limiter, uploads, OCR, base)
     """
-    metrics_data = {
-        "timestamp": datetime.now().isoformat(),
-        "uptime_seconds": int(
-            time.time() - app.state.start_time
-            if hasattr(app.state, "start_time")
-            else 0
+    uptime = time.time() - app.state.start_time if hasattr(app.state, "start_time") else 0
+    parts = [
+        format_family(
+            "cia_build_info", "gauge", "Version de l'API", [({"version": "1.3.1"}, 1)]
         ),
-        "version": "1.3.1",
-    }
-    return metrics_data
+        format_family(
+            "cia_uptime_seconds", "gauge", "Durée depuis le démarrage", [({}, uptime)]
+        ),
+        registry.render(),
+        format_stats("cia_db_pool", "Pool SQLite principal", db.pool.stats()),
+        format_query_metrics(query_metrics.snapshot()),
+        format_stats("cia_token_cache", "Cache des JWT validés", token_cache.stats()),
+        format_stats("cia_password_hasher", "Pool bcrypt", password_hasher.stats()),
+        format_stats(
+            "cia_cpu_pool", "Pool du travail CPU des endpoints", get_cpu_pool().stats()
+        ),
+    ]
+    if db.shards is not None:
+        parts.append(
+            format_stats("cia_db_shards", "Bases par utilisateur", db.shards.stats())
+        )
+    if get_extraction_cache.cache_info().currsize:
+        parts.append(
+            format_stats(
+                "cia_extraction_cache",
+                "Cache des extractions PDF",
+                get_extraction_cache().stats(),
+            )
+        )
+    if get_job_worker.cache_info().currsize:
+        parts.append(
+            format_stats(
+                "cia_document_jobs",
+                "Workers des jobs de documents",
+                get_job_worker().stats(),
+            )
+        )
+    return PlainTextResponse("".join(parts), media_type=CONTENT_TYPE)
 
 
 # === AUTHENTIFICATION ===
@@ -587,12 +689,12 @@ class RefreshTokenRequest(BaseModel):
 async def register(
     request: Request,
     user_data: UserCreate,
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Enregistre un nouvel utilisateur"""
     try:
         # Vérifier si l'utilisateur existe déjà
-        existing_user = db.get_user_by_username(user_data.username)
+        existing_user = await db.get_user_by_username(user_data.username)
         if existing_user:
             raise HTTPException(
                 status_code=400,
@@ -600,8 +702,8 @@ async def register(
             )
 
         # Créer l'utilisateur
-        password_hash = get_password_hash(user_data.password)
-        user_id = db.create_user(
+        password_hash = await password_hasher.hash(user_data.password)
+        user_id = await db.create_user(
             username=user_data.username,
             password_hash=password_hash,
             email=user_data.email,
@@ -615,7 +717,7 @@ async def register(
             )
 
         # Récupérer l'utilisateur créé
-        user = db.get_user_by_id(user_id)
+        user = await db.get_user_by_id(user_id)
         if not user:
             raise HTTPException(
                 status_code=500,
@@ -623,7 +725,7 @@ async def register(
             )
 
         # Audit log
-        db.add_audit_log(
+        await db.queue_audit_log(
             user_id=user_id,
             action="register",
             resource_type="auth",
@@ -654,12 +756,12 @@ async def register(
 async def login(
     request: Request,
     credentials: UserLogin,
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Authentifie un utilisateur et retourne un token JWT"""
     try:
         # Récupérer l'utilisateur
-        user = db.get_user_by_username(credentials.username)
+        user = await db.get_user_by_username(credentials.username)
         if not user:
             # Ne pas révéler si l'utilisateur existe ou non (sécurité)
             raise HTTPException(
@@ -668,7 +770,9 @@ async def login(
             )
 
         # Vérifier le mot de passe
-        if not verify_password(credentials.password, user["password_hash"]):
+        if not await password_hasher.verify(
+            credentials.password, user["password_hash"]
+        ):
             raise HTTPException(
                 status_code=401,
                 detail="Nom d'utilisateur ou mot de passe incorrect",
@@ -691,7 +795,7 @@ async def login(
         refresh_token = create_refresh_token(token_data)
 
         # Audit log
-        db.add_audit_log(
+        await db.queue_audit_log(
             user_id=user["id"],
             action="login",
             resource_type="auth",
@@ -720,13 +824,13 @@ async def login(
 async def refresh_token_endpoint(
     request: Request,
     token_request: RefreshTokenRequest,
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Rafraîchit un token d'accès avec un refresh token (rotation automatique)"""
     try:
         # Vérifier le refresh token avec blacklist
-        token_data = verify_token(
-            token_request.refresh_token, token_type="refresh", db=db
+        token_data = await db.run(
+            verify_token, token_request.refresh_token, "refresh", db.sync
         )  # nosec B106
 
         # Extraire le JTI de l'ancien refresh token pour le blacklister
@@ -743,7 +847,7 @@ async def refresh_token_endpoint(
         # Blacklister l'ancien refresh token (rotation)
         if old_jti and old_exp and token_data.user_id:
             expires_at = datetime.fromtimestamp(old_exp)
-            db.add_token_to_blacklist(
+            await db.add_token_to_blacklist(
                 token_jti=old_jti,
                 user_id=int(token_data.user_id),
                 token_type="refresh",
@@ -764,7 +868,7 @@ async def refresh_token_endpoint(
 
         # Audit log
         if token_data.user_id:
-            db.add_audit_log(
+            await db.queue_audit_log(
                 user_id=int(token_data.user_id),
                 action="token_refresh",
                 resource_type="auth",
@@ -793,7 +897,7 @@ async def refresh_token_endpoint(
 async def logout(
     request: Request,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Déconnecte un utilisateur et révoque ses tokens"""
     try:
@@ -813,7 +917,7 @@ async def logout(
                 if jti and exp:
                     expires_at = datetime.fromtimestamp(exp)
                     if current_user.user_id:
-                        db.add_token_to_blacklist(
+                        await db.add_token_to_blacklist(
                             token_jti=jti,
                             user_id=int(current_user.user_id),
                             token_type="access",
@@ -826,7 +930,7 @@ async def logout(
 
         # Audit log
         if current_user.user_id:
-            db.add_audit_log(
+            await db.queue_audit_log(
                 user_id=int(current_user.user_id),
                 action="logout",
                 resource_type="auth",
@@ -847,39 +951,52 @@ async def logout(
 # === DOCUMENTS ===
 
 
-@app.post(f"{API_PREFIX}/documents/upload")
+@app.post(f"{API_PREFIX}/documents/upload", status_code=202)
 @limiter.limit("10/minute")  # Limite de 10 uploads par minute par IP
 async def upload_document(
     request: Request,
     file: UploadFile = File(...),
     current_user: TokenData = Depends(get_current_active_user),
+    db: AsyncCIADatabase = Depends(get_async_database),
     document_service: DocumentService = Depends(get_document_service),
+    job_worker: DocumentJobWorker = Depends(get_job_worker),
 ):
-    """Upload un document PDF avec validation de sécurité"""
+    """
+    Upload un document PDF avec validation de sécurité
+
+    Le fichier est reçu puis traité en arrière-plan (validation PDF,
+    métadonnées, enregistrement) : suivre le job via ``status_url``.
+    """
     user_id = require_authenticated_user_id(current_user)
 
     try:
-        # Lire le fichier en mémoire (limité à 50 MB)
-        file_content = await file.read()
-
-        # Traiter le fichier via le service (synchrone maintenant)
-        result = document_service.process_uploaded_file(
-            file_content, file.filename or "document.pdf"
+        # Réception par morceaux dans le dossier d'upload
+        stored, safe_filename = await document_service.receive_upload(
+            file, file.filename or "document.pdf"
         )
-
-        # Extraire métadonnées
-        metadata = document_service.extract_metadata(result["file_path"])
-
-        # Sauvegarder en base avec métadonnées
-        doc_id = document_service.save_document_with_metadata(result, user_id, metadata)
+        upload_bytes_total.inc(stored.size)
+        try:
+            job_id = await db.enqueue_job(
+                user_id,
+                DOCUMENT_UPLOAD,
+                {
+                    "path": stored.path,
+                    "filename": safe_filename,
+                    "size": stored.size,
+                    "sha256": stored.sha256,
+                },
+            )
+        except Exception:
+            discard(stored.path)
+            raise
+        job_worker.notify()
 
         # Audit log
-        db_instance = get_database()
-        db_instance.add_audit_log(
+        await db.queue_audit_log(
             user_id=user_id,
             action="document_upload",
-            resource_type="document",
-            resource_id=str(doc_id),
+            resource_type="document_job",
+            resource_id=str(job_id),
             ip_address=get_remote_address(request),
             user_agent=request.headers.get("user-agent"),
             success=True,
@@ -887,10 +1004,17 @@ async def upload_document(
 
         return {
             "success": True,
-            "document_id": doc_id,
-            "message": "Document uploadé avec succès",
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"{API_PREFIX}/jobs/{job_id}",
+            "message": "Document reçu, traitement en cours",
         }
 
+    except UploadTooLargeError:
+        max_mb = settings.max_file_size_mb
+        raise HTTPException(
+            status_code=413, detail=f"Fichier trop volumineux (max {max_mb} MB)"
+        ) from None
     except ValueError as e:
         logger.warning(
             "Validation upload document échouée: %s",
@@ -910,27 +1034,65 @@ async def upload_document(
         ) from None
 
 
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    progress: float
+    result: dict | None = None
+    error: str | None = None
+    created_at: str | None = None
+    started_at: str | None = None
+    finished_at: str | None = None
+
+
+@app.get(f"{API_PREFIX}/jobs/{{job_id}}", response_model=JobResponse)
+@limiter.limit("120/minute")
+async def get_job(
+    request: Request,
+    job_id: int,
+    current_user: TokenData = Depends(get_current_active_user),
+    db: AsyncCIADatabase = Depends(get_async_database),
+):
+    """État d'un job de l'utilisateur (queued, running, done ou failed)"""
+    user_id = require_authenticated_user_id(current_user)
+    job = await db.get_job(job_id, user_id=user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job non trouvé")
+    return JobResponse(**job)
+
+
 @app.get(f"{API_PREFIX}/health-portals/documents")
 @limiter.limit("30/minute")
 async def get_health_portal_documents(
     request: Request,
+    response: Response,
+    limit: int = 1000,
+    cursor: str | None = None,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """
-    Récupérer tous les documents importés depuis les portails santé
+    Récupérer les documents importés depuis les portails santé
+    (pagination par curseur via ``next_cursor``)
     """
     try:
         user_id = require_authenticated_user_id(current_user)
+        limit = min(max(limit, 1), 1000)
 
-        # Récupérer tous les documents de l'utilisateur via la base de données
-        documents = db.get_user_documents(user_id, skip=0, limit=1000)
+        # Récupérer les documents de l'utilisateur via la base de données
+        documents = await db.get_user_documents(
+            user_id, limit=limit, page_cursor=cursor
+        )
 
         return {
             "success": True,
             "documents": documents,
             "count": len(documents),
+            "next_cursor": _set_next_cursor(response, documents, limit),
         }
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Curseur invalide") from None
     except HTTPException:
         raise
     except Exception as e:
@@ -949,7 +1111,7 @@ async def delete_health_portal_document(
     request: Request,
     doc_id: int,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """
     Supprimer un document importé (RGPD)
@@ -958,14 +1120,11 @@ async def delete_health_portal_document(
         user_id = require_authenticated_user_id(current_user)
 
         # Vérifier que le document appartient à l'utilisateur
-        user_docs = db.get_user_documents(user_id, skip=0, limit=1000)
-        doc_exists = any(doc.get("id") == doc_id for doc in user_docs)
-
-        if not doc_exists:
+        if not await db.user_owns_document(user_id, doc_id):
             raise HTTPException(status_code=404, detail="Document non trouvé")
 
         # Supprimer le document via la base de données
-        db.delete_document(doc_id)
+        await db.delete_document(doc_id)
 
         return {
             "success": True,
@@ -987,24 +1146,36 @@ async def delete_health_portal_document(
 @limiter.limit("60/minute")  # Limite de 60 requêtes par minute
 async def get_documents(
     request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
+    cursor: str | None = None,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
-    """Récupère les documents de l'utilisateur avec pagination"""
+    """
+    Récupère les documents de l'utilisateur avec pagination
+
+    ``cursor`` (en-tête X-Next-Cursor de la page précédente) remplace ``skip``
+    """
     if limit > 100:  # Limiter à 100 max par requête
         limit = 100
+    if limit < 1:
+        limit = 1
     if skip < 0:
         skip = 0
     # Récupérer uniquement les documents de l'utilisateur authentifié
     if current_user.user_id:
-        documents = db.get_user_documents(
-            int(current_user.user_id), skip=skip, limit=limit
-        )
+        try:
+            documents = await db.get_user_documents(
+                int(current_user.user_id), skip=skip, limit=limit, page_cursor=cursor
+            )
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Curseur invalide") from None
+        _set_next_cursor(response, documents, limit)
         # Audit log
         if current_user.user_id:
-            db.add_audit_log(
+            await db.queue_audit_log(
                 user_id=int(current_user.user_id),
                 action="documents_list",
                 resource_type="document",
@@ -1017,30 +1188,77 @@ async def get_documents(
     return [DocumentResponse(**doc) for doc in documents]
 
 
+@app.get(f"{API_PREFIX}/documents/search")
+@limiter.limit("60/minute")
+async def search_documents(
+    request: Request,
+    q: str,
+    document_type: str | None = None,
+    exam_type: str | None = None,
+    doctor_specialty: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    limit: int = 20,
+    current_user: TokenData = Depends(get_current_active_user),
+    db: AsyncCIADatabase = Depends(get_async_database),
+):
+    """
+    Recherche plein texte dans les documents de l'utilisateur
+    Résultats classés par pertinence, avec extraits surlignés (<mark>)
+    """
+    user_id = require_authenticated_user_id(current_user)
+    if len(q) > 200:
+        raise HTTPException(status_code=400, detail="Requête trop longue")
+    limit = min(max(limit, 1), 50)
+    candidate_filters = {
+        "document_type": document_type,
+        "exam_type": exam_type,
+        "doctor_specialty": doctor_specialty,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+    filters = {k: v for k, v in candidate_filters.items() if v is not None}
+    try:
+        results = await db.search_documents(user_id, q, filters, limit=limit)
+    except Exception as e:
+        logger.error(f"Erreur recherche documents: {sanitize_log_message(str(e))}")
+        raise HTTPException(
+            status_code=500, detail="Erreur lors de la recherche"
+        ) from None
+
+    await db.queue_audit_log(
+        user_id=user_id,
+        action="documents_search",
+        resource_type="document",
+        ip_address=get_remote_address(request),
+        user_agent=request.headers.get("user-agent"),
+        success=True,
+    )
+    return {"query": q, "results": results, "count": len(results)}
+
+
 @app.get(f"{API_PREFIX}/documents/{{doc_id}}", response_model=DocumentResponse)
 @limiter.limit("60/minute")  # Limite de 60 requêtes par minute
 async def get_document(
     request: Request,
     doc_id: int,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Récupère un document par ID (uniquement si appartient à l'utilisateur)"""
     # Vérifier que le document appartient à l'utilisateur
-    # OPTIMISATION: Utiliser un set pour recherche O(1) au lieu de O(n)
     if current_user.user_id:
-        user_docs = db.get_user_documents(int(current_user.user_id))
-        user_doc_ids = {doc["id"] for doc in user_docs}
-        if doc_id not in user_doc_ids:
+        user_id = int(current_user.user_id)
+        if not await db.user_owns_document(user_id, doc_id):
             raise HTTPException(status_code=404, detail="Document non trouvé")
 
-    document = db.get_document(doc_id)
+    document = await db.get_document(doc_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document non trouvé")
 
     # Audit log
     if current_user.user_id:
-        db.add_audit_log(
+        await db.queue_audit_log(
             user_id=int(current_user.user_id),
             action="document_get",
             resource_type="document",
@@ -1058,21 +1276,31 @@ async def delete_document(
     request: Request,
     doc_id: int,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
+    document_service: DocumentService = Depends(get_document_service),
 ):
     """Supprime un document"""
     user_id = require_authenticated_user_id(current_user)
-    user_docs = db.get_user_documents(user_id, skip=0, limit=1000)
-    if doc_id not in {doc["id"] for doc in user_docs}:
+    if not await db.user_owns_document(user_id, doc_id):
         raise HTTPException(status_code=404, detail="Document non trouvé")
 
-    document = db.get_document(doc_id)
+    document = await db.get_document(doc_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document non trouvé")
 
-    # Supprimer le fichier physique avec validation du chemin
+    # Supprimer de la base de données
+    success = await db.delete_document(doc_id)
+    if not success:
+        raise HTTPException(status_code=500, detail="Erreur lors de la suppression")
+
+    # Fichier stocké par contenu : supprimé s'il n'est plus référencé
+    content_sha256 = document.get("content_sha256")
+    if content_sha256:
+        await db.run(document_service.release_content, [content_sha256])
+
+    # Ancien stockage : supprimer le fichier physique avec validation du chemin
     file_path = document.get("file_path", "")
-    if file_path:
+    if file_path and not content_sha256:
         # Valider que le chemin est dans le répertoire uploads (sécurité)
         uploads_dir = Path("uploads").resolve()
         file_path_obj = Path(file_path).resolve()
@@ -1100,13 +1328,8 @@ async def delete_document(
                 )
             )
 
-    # Supprimer de la base de données
-    success = db.delete_document(doc_id)
-    if not success:
-        raise HTTPException(status_code=500, detail="Erreur lors de la suppression")
-
     # Audit log
-    db.add_audit_log(
+    await db.queue_audit_log(
         user_id=user_id,
         action="document_delete",
         resource_type="document",
@@ -1128,13 +1351,13 @@ async def create_reminder(
     request: Request,
     reminder: ReminderRequest,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Crée un rappel"""
     if not current_user.user_id:
         raise HTTPException(status_code=401, detail="Utilisateur non authentifié")
 
-    reminder_id = db.add_reminder(
+    reminder_id = await db.add_reminder(
         title=reminder.title,
         description=reminder.description or "",
         reminder_date=reminder.reminder_date,
@@ -1142,7 +1365,7 @@ async def create_reminder(
 
     # Audit log
     if current_user.user_id:
-        db.add_audit_log(
+        await db.queue_audit_log(
             user_id=int(current_user.user_id),
             action="reminder_create",
             resource_type="reminder",
@@ -1153,7 +1376,7 @@ async def create_reminder(
         )
 
     # Récupérer le rappel créé (limite configurable)
-    reminders = db.get_reminders(skip=0, limit=settings.max_reminders_list)
+    reminders = await db.get_reminders(skip=0, limit=settings.max_reminders_list)
     created_reminder = next((r for r in reminders if r["id"] == reminder_id), None)
 
     if not created_reminder:
@@ -1171,14 +1394,14 @@ async def get_reminders(
     skip: int = 0,
     limit: int = 50,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Récupère les rappels avec pagination"""
     if limit > 100:  # Limiter à 100 max par requête
         limit = 100
     if skip < 0:
         skip = 0
-    reminders = db.get_reminders(skip=skip, limit=limit)
+    reminders = await db.get_reminders(skip=skip, limit=limit)
     return [ReminderResponse(**reminder) for reminder in reminders]
 
 
@@ -1191,10 +1414,10 @@ async def create_emergency_contact(
     request: Request,
     contact: EmergencyContactRequest,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Crée un contact d'urgence"""
-    contact_id = db.add_emergency_contact(
+    contact_id = await db.add_emergency_contact(
         name=contact.name,
         phone=contact.phone,
         relationship=contact.relationship or "",
@@ -1203,7 +1426,7 @@ async def create_emergency_contact(
 
     # Audit log
     if current_user.user_id:
-        db.add_audit_log(
+        await db.queue_audit_log(
             user_id=int(current_user.user_id),
             action="emergency_contact_create",
             resource_type="emergency_contact",
@@ -1214,7 +1437,7 @@ async def create_emergency_contact(
         )
 
     # Récupérer le contact créé (seulement les 10 derniers pour économiser la mémoire)
-    contacts = db.get_emergency_contacts(skip=0, limit=10)
+    contacts = await db.get_emergency_contacts(skip=0, limit=10)
     created_contact = next((c for c in contacts if c["id"] == contact_id), None)
 
     if not created_contact:
@@ -1234,14 +1457,14 @@ async def get_emergency_contacts(
     skip: int = 0,
     limit: int = 50,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Récupère les contacts d'urgence avec pagination"""
     if limit > 100:  # Limiter à 100 max par requête
         limit = 100
     if skip < 0:
         skip = 0
-    contacts = db.get_emergency_contacts(skip=skip, limit=limit)
+    contacts = await db.get_emergency_contacts(skip=skip, limit=limit)
     return [EmergencyContactResponse(**contact) for contact in contacts]
 
 
@@ -1254,10 +1477,10 @@ async def create_health_portal(
     request: Request,
     portal: HealthPortalRequest,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Crée un portail santé"""
-    portal_id = db.add_health_portal(
+    portal_id = await db.add_health_portal(
         name=portal.name,
         url=portal.url,
         description=portal.description or "",
@@ -1266,7 +1489,7 @@ async def create_health_portal(
 
     # Audit log
     if current_user.user_id:
-        db.add_audit_log(
+        await db.queue_audit_log(
             user_id=int(current_user.user_id),
             action="health_portal_create",
             resource_type="health_portal",
@@ -1277,7 +1500,7 @@ async def create_health_portal(
         )
 
     # Récupérer le portail créé (limite configurable)
-    portals = db.get_health_portals(skip=0, limit=settings.max_reminders_list)
+    portals = await db.get_health_portals(skip=0, limit=settings.max_reminders_list)
     created_portal = next((p for p in portals if p["id"] == portal_id), None)
 
     if not created_portal:
@@ -1295,14 +1518,14 @@ async def get_health_portals(
     skip: int = 0,
     limit: int = 50,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Récupère les portails santé avec pagination"""
     if limit > 100:  # Limiter à 100 max par requête
         limit = 100
     if skip < 0:
         skip = 0
-    portals = db.get_health_portals(skip=skip, limit=limit)
+    portals = await db.get_health_portals(skip=skip, limit=limit)
     return [HealthPortalResponse(**portal) for portal in portals]
 
 
@@ -1328,7 +1551,7 @@ async def import_health_portal_manual(
     file: UploadFile = File(...),
     portal: str = Form(...),  # Portail: 'andaman7' ou 'masante'
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """
     Importe un PDF depuis un portail santé (Andaman 7 ou MaSanté)
@@ -1347,108 +1570,67 @@ async def import_health_portal_manual(
         if file.content_type != "application/pdf":
             raise HTTPException(status_code=400, detail="Fichier PDF obligatoire")
 
-        # Limite taille (50 MB)
-        MAX_SIZE = 50 * 1024 * 1024
-        file_content = await file.read()
-        if len(file_content) > MAX_SIZE:
-            raise HTTPException(
-                status_code=413, detail="Fichier trop volumineux (max 50MB)"
-            )
-
-        # Sauvegarder temporairement
-        import tempfile
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(file_content)
-            tmp_path = tmp.name
+        # Validation user_id
+        if not current_user.user_id:
+            raise HTTPException(status_code=401, detail="Utilisateur non authentifié")
 
+        # Réception par morceaux (limite de taille appliquée à la lecture),
+        # puis ingestion en une passe hors event loop
+        doc_service = get_document_service()
         try:
-            # Parser le PDF selon le portail
-            from arkalia_cia_python_backend.services.health_portal_parsers import (
-                get_health_portal_parser,
+            stored, safe_filename = await doc_service.receive_upload(
+                file, file.filename or "document_importe.pdf"
             )
+        except UploadTooLargeError:
+            max_mb = settings.max_file_size_mb
+            raise HTTPException(
+                status_code=413, detail=f"Fichier trop volumineux (max {max_mb}MB)"
+            ) from None
+        upload_bytes_total.inc(stored.size)
 
-            parser = get_health_portal_parser()
-            result = parser.parse_portal_pdf(tmp_path, portal_lower)
-
-            # Sauvegarder les documents dans la base
-            imported_count = 0
-
-            # Validation user_id
-            if not current_user.user_id:
-                raise HTTPException(
-                    status_code=401, detail="Utilisateur non authentifié"
-                )
-
-            # Sauvegarder le fichier PDF via document_service
-            doc_service = get_document_service()
-
-            # Traiter le fichier uploadé
-            process_result = doc_service.process_uploaded_file(
-                file_content, file.filename or "document_importe.pdf"
+        # Validation, stockage et parsing portail : PDF analysé une fois
+        # (référence au contenu rendue par le pipeline en cas d'échec)
+        try:
+            process_result, document_metadata, result = await run_cpu_bound(
+                get_ingestion_pipeline().run,
+                stored,
+                safe_filename,
+                portal=portal_lower,
             )
+        except HTTPException:
+            # Pool saturé (503) : le fichier reçu n'a pas été traité
+            discard(stored.path)
+            raise
+        result = result or {}
 
-            # Convertir métadonnées parsées en format DocumentMetadataDict
-            parsed_metadata = result.get("metadata", {})
-            from arkalia_cia_python_backend.app_types import DocumentMetadataDict
-
-            # Extraire métadonnées structurées
-            document_metadata: DocumentMetadataDict = {
-                "doctor_name": parsed_metadata.get("doctor_name"),
-                "doctor_specialty": parsed_metadata.get("doctor_specialty"),
-                "document_date": (
-                    parsed_metadata["date"].isoformat()
-                    if isinstance(parsed_metadata.get("date"), datetime)
-                    else parsed_metadata.get("date")
-                ),
-                "exam_type": parsed_metadata.get("exam_type"),
-                "document_type": parsed_metadata.get("document_type"),
-                "keywords": parsed_metadata.get("keywords", []),
-                "extracted_text": (
-                    str(result.get("documents", [{}])[0].get("description", ""))[:500]
-                    if result.get("documents")
-                    else ""
-                ),
-            }
-
-            # Sauvegarder document principal avec métadonnées parsées
-            if not current_user.user_id:
-                raise HTTPException(
-                    status_code=401, detail="Utilisateur non authentifié"
-                )
-            doc_id = doc_service.save_document_with_metadata(
+        # Sauvegarder document principal avec métadonnées parsées
+        try:
+            doc_id = await db.run(
+                doc_service.save_document_with_metadata,
                 process_result,
                 int(current_user.user_id),
                 document_metadata,
             )
+        except BaseException:
+            # Document non enregistré : référence au contenu rendue
+            await db.run(doc_service.release_upload, stored.sha256)
+            raise
 
-            imported_count = 1  # Un fichier PDF = 1 document principal
-
-            # Note: Les documents individuels parsés (ordonnances, consultations, etc.)
-            # sont dans result["documents"] et peuvent être utilisés pour créer
-            # des entrées séparées si nécessaire. Pour l'instant, on sauvegarde
-            # le PDF principal avec toutes les métadonnées extraites.
-
-            return {
-                "success": True,
-                "imported_count": imported_count,
-                "document_id": doc_id,
-                "portal": portal_lower,
-                "total_documents_found": result.get("total_documents", 0),
-                "message": f"{imported_count} document(s) importé(s) depuis {portal_lower}",
-            }
+        imported_count = 1  # Un fichier PDF = 1 document principal
 
-        finally:
-            # Nettoyer fichier temporaire
-            import os
+        # Note: Les documents individuels parsés (ordonnances, consultations, etc.)
+        # sont dans result["documents"] et peuvent être utilisés pour créer
+        # des entrées séparées si nécessaire. Pour l'instant, on sauvegarde
+        # le PDF principal avec toutes les métadonnées extraites.
 
-            try:
-                os.unlink(tmp_path)
-            except OSError as cleanup_error:
-                logger.debug(
-                    "Nettoyage fichier portail temporaire échoué: %s",
-                    sanitize_log_message(str(cleanup_error)),
-                )
+        return {
+            "success": True,
+            "imported_count": imported_count,
+            "document_id": doc_id,
+            "portal": portal_lower,
+            "total_documents_found": result.get("total_documents", 0),
+            "message": f"{imported_count} document(s) importé(s) depuis {portal_lower}",
+        }
 
     except HTTPException:
         raise
@@ -1469,7 +1651,7 @@ async def import_health_portal_data(
     request: Request,
     import_request: HealthPortalImportRequest,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """
     Importe les données depuis un portail santé externe (OBSOLÈTE)
@@ -1511,6 +1693,37 @@ async def import_health_portal_data(
         ) from None
 
 
+# === STATISTIQUES UTILISATEUR ===
+
+
+class UserStatsResponse(BaseModel):
+    document_count: int
+    last_upload_at: str | None
+    conversation_count: int
+    share_count: int
+    family_member_count: int
+
+
+@app.get(f"{API_PREFIX}/users/me/stats", response_model=UserStatsResponse)
+@limiter.limit("60/minute")
+async def get_my_stats(
+    request: Request,
+    current_user: TokenData = Depends(get_current_active_user),
+    db: AsyncCIADatabase = Depends(get_async_database),
+):
+    """Compteurs de l'utilisateur connecté (lecture d'une ligne user_stats)"""
+    if not current_user.user_id:
+        raise HTTPException(status_code=401, detail="Utilisateur non authentifié")
+    try:
+        stats = await db.get_user_stats(int(current_user.user_id))
+        return UserStatsResponse(**stats)
+    except Exception as e:
+        logger.error(f"Erreur statistiques utilisateur: {sanitize_log_message(str(e))}")
+        raise HTTPException(
+            status_code=500, detail="Erreur lors de la récupération des statistiques"
+        ) from None
+
+
 # === IA CONVERSATIONNELLE ===
 
 
@@ -1533,7 +1746,7 @@ async def chat_with_ai(
     request: Request,
     chat_request: ChatRequest,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
     conversational_ai: ConversationalAI = Depends(get_conversational_ai),
 ):
     """Chat avec l'IA conversationnelle"""
@@ -1552,16 +1765,17 @@ async def chat_with_ai(
         )
 
         # Sauvegarder conversation
-        db.add_ai_conversation(
+        await db.add_ai_conversation(
             question=chat_request.question,
             answer=result.get("answer", ""),
             question_type=result.get("question_type", "general"),
             related_documents=",".join(result.get("related_documents", [])),
+            user_id=int(current_user.user_id) if current_user.user_id else None,
         )
 
         # Audit log
         if current_user.user_id:
-            db.add_audit_log(
+            await db.queue_audit_log(
                 user_id=int(current_user.user_id),
                 action="ai_chat",
                 resource_type="ai_conversation",
@@ -1594,19 +1808,24 @@ class PrepareAppointmentRequest(BaseModel):
 @limiter.limit("60/minute")
 async def get_ai_conversations(
     request: Request,
+    response: Response,
     limit: int = 50,
+    cursor: str | None = None,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
-    """Récupère l'historique des conversations IA"""
+    """Récupère l'historique des conversations IA (curseur via X-Next-Cursor)"""
     try:
         if limit > 100:
             limit = 100
         if limit < 1:
             limit = 10
 
-        conversations = db.get_ai_conversations(limit=limit)
+        conversations = await db.get_ai_conversations(limit=limit, page_cursor=cursor)
+        _set_next_cursor(response, conversations, limit)
         return conversations
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Curseur invalide") from None
     except Exception as e:
         logger.error(
             f"Erreur récupération conversations: {sanitize_log_message(str(e))}"
@@ -1646,7 +1865,7 @@ async def generate_medical_report(
     request: Request,
     report_request: MedicalReportRequest,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
     report_service: MedicalReportService = Depends(get_medical_report_service),
 ):
     """
@@ -1673,8 +1892,9 @@ async def generate_medical_report(
         if not current_user.user_id:
             raise HTTPException(status_code=401, detail="Utilisateur non authentifié")
 
-        # Générer le rapport
-        report = report_service.generate_pre_consultation_report(
+        # Générer le rapport (requêtes, appels ARIA et agrégation hors event loop)
+        report = await run_cpu_bound(
+            report_service.generate_pre_consultation_report,
             user_id=str(current_user.user_id),
             consultation_date=consultation_date,
             days_range=report_request.days_range,
@@ -1683,7 +1903,7 @@ async def generate_medical_report(
 
         # Audit log
         if current_user.user_id:
-            db.add_audit_log(
+            await db.queue_audit_log(
                 user_id=int(current_user.user_id),
                 action="medical_report_generate",
                 resource_type="medical_report",
@@ -1701,6 +1921,8 @@ async def generate_medical_report(
             formatted_text=report["formatted_text"],
             success=True,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             f"Erreur génération rapport médical: {sanitize_log_message(str(e))}"
@@ -1726,7 +1948,7 @@ async def export_medical_report_pdf(
     report_request: MedicalReportRequest,
     background_tasks: BackgroundTasks,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
     report_service: MedicalReportService = Depends(get_medical_report_service),
 ):
     """
@@ -1751,8 +1973,9 @@ async def export_medical_report_pdf(
         if not current_user.user_id:
             raise HTTPException(status_code=401, detail="Utilisateur non authentifié")
 
-        # Générer le rapport
-        report = report_service.generate_pre_consultation_report(
+        # Générer le rapport (requêtes, appels ARIA et agrégation hors event loop)
+        report = await run_cpu_bound(
+            report_service.generate_pre_consultation_report,
             user_id=str(current_user.user_id),
             consultation_date=consultation_date,
             days_range=report_request.days_range,
@@ -1767,7 +1990,9 @@ async def export_medical_report_pdf(
 
         try:
             # Exporter en PDF
-            pdf_path = report_service.export_report_to_pdf(report, pdf_path)
+            pdf_path = await run_cpu_bound(
+                report_service.export_report_to_pdf, report, pdf_path
+            )
 
             # Générer le nom de fichier
             if consultation_date:
@@ -1778,7 +2003,7 @@ async def export_medical_report_pdf(
 
             # Audit log
             if current_user.user_id:
-                db.add_audit_log(
+                await db.queue_audit_log(
                     user_id=int(current_user.user_id),
                     action="medical_report_export_pdf",
                     resource_type="medical_report",
@@ -1962,7 +2187,7 @@ async def create_family_member(
     request: Request,
     member_data: FamilyMemberCreate,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Ajoute un membre famille"""
     try:
@@ -1983,7 +2208,7 @@ async def create_family_member(
             is_valid, normalized_phone = validate_phone_number(member_data.phone)
             sanitized_phone = normalized_phone if is_valid else None
 
-        member_id = db.add_family_member(
+        member_id = await db.add_family_member(
             user_id=user_id,
             name=sanitized_name,
             email=sanitized_email,
@@ -1998,12 +2223,12 @@ async def create_family_member(
             )
 
         # Récupérer le membre créé
-        member = db.get_family_member(user_id, member_id)
+        member = await db.get_family_member(user_id, member_id)
         if not member:
             raise HTTPException(status_code=404, detail="Membre famille non trouvé")
 
         # Audit log
-        db.add_audit_log(
+        await db.queue_audit_log(
             user_id=user_id,
             action="family_member_added",
             resource_type="family_member",
@@ -2040,7 +2265,7 @@ async def get_family_members(
     skip: int = 0,
     limit: int = 100,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Récupère les membres famille"""
     try:
@@ -2048,7 +2273,7 @@ async def get_family_members(
             raise HTTPException(status_code=401, detail="Utilisateur non authentifié")
 
         user_id = int(current_user.user_id)
-        members = db.get_family_members(user_id, skip=skip, limit=limit)
+        members = await db.get_family_members(user_id, skip=skip, limit=limit)
 
         return [
             FamilyMemberResponse(
@@ -2080,7 +2305,7 @@ async def update_family_member(
     member_id: int,
     member_data: FamilyMemberUpdate,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Met à jour un membre famille"""
     try:
@@ -2090,7 +2315,7 @@ async def update_family_member(
         user_id = int(current_user.user_id)
 
         # Vérifier que le membre existe et appartient à l'utilisateur
-        existing_member = db.get_family_member(user_id, member_id)
+        existing_member = await db.get_family_member(user_id, member_id)
         if not existing_member:
             raise HTTPException(status_code=404, detail="Membre famille non trouvé")
 
@@ -2126,7 +2351,7 @@ async def update_family_member(
             )
 
         # Mettre à jour
-        success = db.update_family_member(
+        success = await db.update_family_member(
             user_id=user_id,
             member_id=member_id,
             **update_data,
@@ -2138,12 +2363,12 @@ async def update_family_member(
             )
 
         # Récupérer le membre mis à jour
-        updated_member = db.get_family_member(user_id, member_id)
+        updated_member = await db.get_family_member(user_id, member_id)
         if not updated_member:
             raise HTTPException(status_code=404, detail="Membre famille non trouvé")
 
         # Audit log
-        db.add_audit_log(
+        await db.queue_audit_log(
             user_id=user_id,
             action="family_member_updated",
             resource_type="family_member",
@@ -2179,7 +2404,7 @@ async def delete_family_member(
     request: Request,
     member_id: int,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Supprime un membre famille"""
     try:
@@ -2189,18 +2414,18 @@ async def delete_family_member(
         user_id = int(current_user.user_id)
 
         # Vérifier que le membre existe
-        existing_member = db.get_family_member(user_id, member_id)
+        existing_member = await db.get_family_member(user_id, member_id)
         if not existing_member:
             raise HTTPException(status_code=404, detail="Membre famille non trouvé")
 
-        success = db.delete_family_member(user_id, member_id)
+        success = await db.delete_family_member(user_id, member_id)
         if not success:
             raise HTTPException(
                 status_code=500, detail="Erreur lors de la suppression du membre"
             )
 
         # Audit log
-        db.add_audit_log(
+        await db.queue_audit_log(
             user_id=user_id,
             action="family_member_deleted",
             resource_type="family_member",
@@ -2228,7 +2453,7 @@ async def share_document(
     request: Request,
     share_request: ShareDocumentRequest,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """Partage un document avec des membres famille"""
     try:
@@ -2246,7 +2471,7 @@ async def share_document(
             )
 
         # Vérifier que les membres existent et appartiennent à l'utilisateur
-        user_members = db.get_family_members(user_id)
+        user_members = await db.get_family_members(user_id)
         user_member_emails = {m["email"].lower() for m in user_members if m.get("is_active")}
 
         valid_emails = [
@@ -2264,7 +2489,7 @@ async def share_document(
         # Partager avec chaque membre
         shared_ids = []
         for email in valid_emails:
-            share_id = db.share_document_with_member(
+            share_id = await db.share_document_with_member(
                 user_id=user_id,
                 document_id=share_request.document_id,
                 member_email=email,
@@ -2280,7 +2505,7 @@ async def share_document(
             )
 
         # Audit log
-        db.add_audit_log(
+        await db.queue_audit_log(
             user_id=user_id,
             action="document_shared",
             resource_type="document",
@@ -2310,18 +2535,23 @@ async def share_document(
 @limiter.limit("30/minute")
 async def get_shared_documents(
     request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
-    """Récupère les documents partagés par l'utilisateur"""
+    """Récupère les documents partagés par l'utilisateur (curseur via X-Next-Cursor)"""
     try:
         if not current_user.user_id:
             raise HTTPException(status_code=401, detail="Utilisateur non authentifié")
 
         user_id = int(current_user.user_id)
-        shared_docs = db.get_shared_documents(user_id, skip=skip, limit=limit)
+        shared_docs = await db.get_shared_documents(
+            user_id, skip=skip, limit=limit, page_cursor=cursor
+        )
+        _set_next_cursor(response, shared_docs, limit, timestamp_key="shared_at")
 
         return [
             SharedDocumentResponse(
@@ -2334,6 +2564,8 @@ async def get_shared_documents(
             )
             for sd in shared_docs
         ]
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Curseur invalide") from None
     except HTTPException:
         raise
     except Exception as e:
@@ -2352,7 +2584,7 @@ async def unshare_document(
     document_id: str,
     member_email: str | None = None,
     current_user: TokenData = Depends(get_current_active_user),
-    db: CIADatabase = Depends(get_database),
+    db: AsyncCIADatabase = Depends(get_async_database),
 ):
     """
     Retire le partage d'un document.
@@ -2365,7 +2597,7 @@ async def unshare_document(
 
         user_id = int(current_user.user_id)
 
-        success = db.unshare_document(
+        success = await db.unshare_document(
             user_id=user_id,
             document_id=document_id,
             member_email=member_email.lower().strip() if member_email else None,
@@ -2377,7 +2609,7 @@ async def unshare_document(
             )
 
         # Audit log
-        db.add_audit_log(
+        await db.queue_audit_log(
             user_id=user_id,
             action="document_unshared",
             resource_type="document",
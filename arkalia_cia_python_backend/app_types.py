@@ -17,9 +17,7 @@ class DocumentMetadataDict(TypedDict, total=False):
     extracted_text: str
 
 
-class DocumentResultDict(TypedDict):
-    """Result structure from PDF processing"""
-
+class _DocumentResultBase(TypedDict):
     filename: str
     original_name: str
     file_path: str
@@ -27,6 +25,13 @@ class DocumentResultDict(TypedDict):
     text_content: str
 
 
+class DocumentResultDict(_DocumentResultBase, total=False):
+    """Result structure from PDF processing"""
+
+    sha256: str  # Content digest (streamed uploads only)
+    deduplicated: bool  # Content already stored: earlier results reused
+
+
 class PatternDict(TypedDict, total=False):
     """Pattern detection result structure"""
 
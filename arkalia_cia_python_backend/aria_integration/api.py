@@ -3,7 +3,6 @@ ARIA Integration API - Pont vers ARIA depuis CIA
 Interface optimisée pour accéder aux fonctionnalités ARIA depuis CIA
 """
 
-import sqlite3
 from csv import DictWriter
 from datetime import datetime
 from io import StringIO
@@ -14,7 +13,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
 from arkalia_cia_python_backend.config import get_settings
-from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.dependencies import get_database
 from arkalia_cia_python_backend.utils.retry import retry_with_backoff
 
 router = APIRouter()
@@ -24,7 +23,6 @@ _settings = get_settings()
 ARIA_ENABLED = _settings.aria_enabled
 ARIA_BASE_URL = _settings.aria_base_url
 ARIA_TIMEOUT = _settings.aria_timeout
-_db = CIADatabase()
 
 
 def _safe_upstream_error_message(status_code: int) -> str:
@@ -36,35 +34,6 @@ def _safe_upstream_error_message(status_code: int) -> str:
     return "Erreur de communication avec ARIA."
 
 
-def _ensure_local_pain_table() -> None:
-    """Crée la table locale CIA pour les entrées douleur si nécessaire."""
-    with sqlite3.connect(_db.db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS pain_entries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                intensity INTEGER NOT NULL,
-                physical_trigger TEXT,
-                mental_trigger TEXT,
-                activity TEXT,
-                location TEXT,
-                action_taken TEXT,
-                effectiveness INTEGER,
-                notes TEXT,
-                who_present TEXT,
-                interactions TEXT,
-                emotions TEXT,
-                thoughts TEXT,
-                physical_symptoms TEXT,
-                timestamp TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.commit()
-
-
 def _normalize_entry_payload(payload: dict[str, Any]) -> dict[str, Any]:
     now_iso = datetime.now().isoformat()
     timestamp = str(payload.get("timestamp") or now_iso)
@@ -88,9 +57,13 @@ def _normalize_entry_payload(payload: dict[str, Any]) -> dict[str, Any]:
 
 
 def _save_local_pain_entry(payload: dict[str, Any]) -> dict[str, Any]:
-    _ensure_local_pain_table()
     normalized = _normalize_entry_payload(payload)
-    with sqlite3.connect(_db.db_path) as conn:
+    # Limite : les routes ARIA ne sont pas authentifiées, aucun utilisateur
+    # courant n'est fixé. user_connection() retombe donc sur la base
+    # principale, même en mode par utilisateur (pain_entries n'a pas de
+    # user_id : les entrées douleur restent partagées, usage local/mono-
+    # utilisateur d'ARIA).
+    with get_database().user_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -122,20 +95,18 @@ def _save_local_pain_entry(payload: dict[str, Any]) -> dict[str, Any]:
         if raw_entry_id is None:
             raise RuntimeError("Insertion locale douleur échouée (id absent).")
         entry_id = int(raw_entry_id)
-        conn.commit()
     return {"id": entry_id, **normalized}
 
 
 def _fetch_local_pain_entries(limit: int | None = None) -> list[dict[str, Any]]:
-    _ensure_local_pain_table()
     query = "SELECT * FROM pain_entries ORDER BY timestamp DESC"
     params: tuple[Any, ...] = ()
     if limit is not None:
         query += " LIMIT ?"
         params = (limit,)
 
-    with sqlite3.connect(_db.db_path) as conn:
-        conn.row_factory = sqlite3.Row
+    # Base principale : routes non authentifiées (voir _save_local_pain_entry)
+    with get_database().user_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(query, params)
         return [dict(row) for row in cursor.fetchall()]
@@ -271,7 +242,8 @@ async def aria_integration_status() -> dict[str, Any]:
     aria_connected = _check_aria_connection()
     local_pain_available = True
     try:
-        _ensure_local_pain_table()
+        # La table pain_entries est créée par les migrations (migrations.py)
+        local_pain_available = get_database().ping()
     except Exception:
         local_pain_available = False
 
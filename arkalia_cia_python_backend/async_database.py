@@ -0,0 +1,92 @@
+"""
+Façade asynchrone de CIADatabase
+Exécute les appels SQLite sur un executor borné pour ne pas bloquer l'event loop
+"""
+
+import asyncio
+import contextvars
+import functools
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from arkalia_cia_python_backend.config import get_settings
+from arkalia_cia_python_backend.database import CIADatabase
+
+T = TypeVar("T")
+
+# Méthodes qui n'ont pas de sens hors du thread appelant
+# (itérateurs : à consommer via run(), dans un seul thread)
+_SYNC_ONLY_METHODS = {"connection", "iter_user_documents"}
+# Méthodes non bloquantes : appelées directement, sans passer par l'executor
+_INLINE_METHODS = {"queue_audit_log"}
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """
+    Retourne l'executor partagé pour les appels base de données (singleton)
+
+    Borné par db_pool_size : jamais plus de threads que de connexions du pool.
+    """
+    global _executor
+    if _executor is None:
+        settings = get_settings()
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.db_pool_size, thread_name_prefix="cia-db"
+        )
+    return _executor
+
+
+class AsyncCIADatabase:
+    """
+    Façade asynchrone exposant les mêmes méthodes que CIADatabase
+
+    Exemple : ``docs = await db.get_user_documents(user_id, limit=50)``
+    """
+
+    def __init__(self, db: CIADatabase, executor: Executor | None = None):
+        self.sync = db
+        self._executor = executor or get_db_executor()
+
+    @property
+    def db_path(self) -> str:
+        """Chemin de la base sous-jacente"""
+        return self.sync.db_path
+
+    async def run(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """
+        Exécute un appel synchrone arbitraire sur l'executor base de données
+
+        Le contexte (utilisateur courant) est propagé au thread de l'executor.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(context.run, func, *args, **kwargs),
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_") or name in _SYNC_ONLY_METHODS:
+            raise AttributeError(name)
+        attr = getattr(self.sync, name)
+        if not callable(attr):
+            return attr
+
+        if name in _INLINE_METHODS:
+
+            @functools.wraps(attr)
+            async def method(*args: Any, **kwargs: Any) -> Any:
+                return attr(*args, **kwargs)
+
+        else:
+
+            @functools.wraps(attr)
+            async def method(*args: Any, **kwargs: Any) -> Any:
+                return await self.run(attr, *args, **kwargs)
+
+        # Mémoriser le wrapper pour éviter de repasser par __getattr__
+        self.__dict__[name] = method
+        return method
@@ -0,0 +1,191 @@
+"""
+Écriture groupée des logs d'audit (group commit)
+Les entrées sont mises en file puis insérées par lots dans une seule transaction
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+from typing import Any
+
+from arkalia_cia_python_backend.db_pool import SQLiteConnectionPool
+
+logger = logging.getLogger(__name__)
+
+_INSERT_AUDIT_LOG = """
+    INSERT INTO audit_logs (
+        user_id, action, resource_type, resource_id,
+        ip_address, user_agent, success, error_message
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+AuditRow = tuple[
+    int | None, str, str, str | None, str | None, str | None, bool, str | None
+]
+
+
+class AuditLogSink:
+    """
+    File d'attente des logs d'audit vidée par un thread d'arrière-plan
+
+    Un lot est écrit (executemany + un seul commit) toutes les
+    ``flush_interval_ms`` millisecondes ou dès que ``batch_size`` lignes
+    sont en attente. Si la file est pleine, l'entrée est abandonnée
+    (compteur ``dropped``) : l'audit ne doit jamais bloquer une requête.
+    """
+
+    def __init__(
+        self,
+        pool: SQLiteConnectionPool,
+        flush_interval_ms: int = 200,
+        batch_size: int = 200,
+        max_queue_size: int = 10000,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size doit être >= 1")
+        self.pool = pool
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_size = batch_size
+        self._queue: queue.Queue[AuditRow] = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        # Sérialise les vidages (thread de fond, flush() explicite, close())
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+        # Statistiques (lues par stats())
+        self._queued = 0
+        self._dropped = 0
+        self._flushed = 0
+        self._failed = 0
+        self._batches = 0
+
+    def _ensure_started(self) -> None:
+        """Démarre le thread d'écriture au premier usage"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="cia-audit-sink", daemon=True
+                )
+                self._thread.start()
+
+    def submit(
+        self,
+        user_id: int | None,
+        action: str,
+        resource_type: str,
+        resource_id: str | None = None,
+        ip_address: str | None = None,
+        user_agent: str | None = None,
+        success: bool = True,
+        error_message: str | None = None,
+    ) -> bool:
+        """
+        Met une entrée d'audit en file (non bloquant)
+
+        Returns:
+            True si l'entrée est en file, False si elle a été abandonnée
+        """
+        row: AuditRow = (
+            user_id,
+            action,
+            resource_type,
+            resource_id,
+            ip_address,
+            user_agent,
+            success,
+            error_message,
+        )
+        if self._closed:
+            with self._lock:
+                self._dropped += 1
+            return False
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+
+        with self._lock:
+            self._queued += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        self._ensure_started()
+        return True
+
+    def _drain(self, limit: int) -> list[AuditRow]:
+        """Retire jusqu'à ``limit`` entrées de la file"""
+        rows: list[AuditRow] = []
+        while len(rows) < limit:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _write_batch(self, rows: list[AuditRow]) -> None:
+        """Écrit un lot dans une seule transaction"""
+        try:
+            with self.pool.connection() as conn:
+                conn.executemany(_INSERT_AUDIT_LOG, rows)
+        except sqlite3.Error as e:
+            # En cas d'erreur, on ne bloque pas l'application
+            logger.warning(f"Écriture du lot d'audit échouée ({len(rows)} lignes): {e}")
+            with self._lock:
+                self._failed += len(rows)
+            return
+        with self._lock:
+            self._flushed += len(rows)
+            self._batches += 1
+
+    def flush(self) -> int:
+        """
+        Écrit immédiatement toutes les entrées en attente
+
+        Returns:
+            Nombre d'entrées retirées de la file
+        """
+        total = 0
+        with self._flush_lock:
+            while True:
+                rows = self._drain(self.batch_size)
+                if not rows:
+                    return total
+                self._write_batch(rows)
+                total += len(rows)
+
+    def _run(self) -> None:
+        """Boucle du thread d'écriture"""
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self) -> None:
+        """Arrête le thread d'écriture après un dernier vidage"""
+        self._closed = True
+        self._stop.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        """Retourne les compteurs de la file d'audit"""
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "queued": self._queued,
+                "dropped": self._dropped,
+                "flushed": self._flushed,
+                "failed": self._failed,
+                "batches": self._batches,
+            }
@@ -3,10 +3,16 @@ Module d'authentification et d'authorization pour Arkalia CIA
 Gestion des JWT tokens et permissions avec RBAC
 """
 
+import asyncio
+import hashlib
 import logging
 import os
 import secrets
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any
 
@@ -16,8 +22,13 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from passlib.context import CryptContext
 from pydantic import BaseModel, Field
 
+from arkalia_cia_python_backend.config import get_settings
+from arkalia_cia_python_backend.sharding import current_user_id
+
 logger = logging.getLogger(__name__)
 
+_settings = get_settings()
+
 # Configuration de sécurité
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", secrets.token_urlsafe(32))
 ALGORITHM = "HS256"
@@ -83,6 +94,88 @@ class UserResponse(BaseModel):
     created_at: str
 
 
+class VerifiedTokenCache:
+    """
+    LRU borné des tokens déjà validés (clé : SHA-256 du token)
+
+    Une entrée est servie jusqu'à l'``exp`` du token, sans jwt.decode ni
+    vérification HMAC. La révocation reste vérifiée à chaque appel par
+    verify_token (cache mémoire de la blacklist). ``max_size=0`` désactive.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[float, str, str | None, TokenData]]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str, token_type: str) -> tuple[TokenData, str | None] | None:
+        """Retourne (TokenData, jti) si le token est en cache et non expiré"""
+        if self.max_size <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_ts, cached_type, jti, token_data = entry
+            if expires_ts <= time.time() or cached_type != token_type:
+                # Expiré ou mauvais type : le décodage complet lèvera l'erreur
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return token_data, jti
+
+    def put(
+        self,
+        token: str,
+        token_type: str,
+        exp: Any,
+        jti: str | None,
+        token_data: TokenData,
+    ) -> None:
+        """Mémorise un token validé jusqu'à son expiration"""
+        if self.max_size <= 0 or not isinstance(exp, int | float):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (float(exp), token_type, jti, token_data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Compteurs hits/misses et taille du cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+# Cache des tokens validés (partagé par tout le processus)
+token_cache = VerifiedTokenCache(_settings.token_cache_max_size)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Vérifie un mot de passe contre son hash"""
     result: bool = pwd_context.verify(plain_password, hashed_password)
@@ -95,6 +188,93 @@ def get_password_hash(password: str) -> str:
     return result
 
 
+class PasswordHasherPool:
+    """
+    Pool borné pour bcrypt (hash et vérification hors de l'event loop)
+
+    bcrypt libère le GIL : ``max_workers`` threads suffisent à plafonner la
+    concurrence CPU. Au-delà de ``max_queue`` appels en attente, la requête est
+    refusée (503) plutôt que d'allonger la file indéfiniment.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 64):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="cia-bcrypt"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_time_total = 0.0
+
+    def _timed(self, func: Any, enqueued_at: float, *args: Any) -> Any:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_time_total += time.perf_counter() - enqueued_at
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    async def _submit(self, func: Any, *args: Any) -> Any:
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Serveur occupé, réessayez plus tard",
+                )
+            self._queued += 1
+        future = self._executor.submit(self._timed, func, time.perf_counter(), *args)
+        # Appelant annulé (client parti, timeout) avant le démarrage : l'appel
+        # ne passe jamais par _timed, il quitte la file ici
+        future.add_done_callback(self._dequeue_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _dequeue_cancelled(self, future: "Future[Any]") -> None:
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash un mot de passe sur le pool"""
+        result: str = await self._submit(get_password_hash, password)
+        return result
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Vérifie un mot de passe sur le pool"""
+        result: bool = await self._submit(
+            verify_password, plain_password, hashed_password
+        )
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """Compteurs de file et d'exécution"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_time_total_seconds": round(self._wait_time_total, 6),
+            }
+
+
+# Pool bcrypt partagé par tout le processus
+password_hasher = PasswordHasherPool(
+    max_workers=_settings.password_hash_workers,
+    max_queue=_settings.password_hash_max_queue,
+)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Crée un token JWT d'accès avec JTI (JWT ID) pour rotation"""
     to_encode = data.copy()
@@ -124,6 +304,16 @@ def verify_token(
     token: str, token_type: str = "access", db: Any = None
 ) -> TokenData:  # nosec B107
     """Vérifie et décode un token JWT avec vérification blacklist"""
+    cached = token_cache.get(token, token_type)
+    if cached is not None:
+        token_data, cached_jti = cached
+        if db is not None and cached_jti and db.is_token_blacklisted(cached_jti):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token révoqué",
+            )
+        return token_data
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
@@ -155,7 +345,11 @@ def verify_token(
             )
 
         uname = username if isinstance(username, str) else None
-        return TokenData(user_id=user_id, username=uname, role=role)
+        token_data = TokenData(user_id=user_id, username=uname, role=role)
+        token_cache.put(
+            token, token_type, payload.get("exp"), payload.get("jti"), token_data
+        )
+        return token_data
     except HTTPException:
         raise
     except jwt.ExpiredSignatureError:
@@ -170,12 +364,19 @@ def verify_token(
         ) from None
 
 
+def _bind_current_user(token_data: TokenData) -> None:
+    """Routage des accès base vers la partition de l'utilisateur authentifié"""
+    if token_data.user_id and token_data.user_id.isdigit():
+        current_user_id.set(int(token_data.user_id))
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> TokenData:
     """Dépendance FastAPI pour obtenir l'utilisateur actuel (sans DB pour compatibilité)"""
     token = credentials.credentials
     token_data = verify_token(token, token_type="access")  # nosec B106
+    _bind_current_user(token_data)
     return token_data
 
 
@@ -187,6 +388,7 @@ async def get_current_user_with_db(
     token = credentials.credentials
     # Vérifier blacklist si DB disponible
     token_data = verify_token(token, token_type="access", db=db)  # nosec B106
+    _bind_current_user(token_data)
     return token_data
 
 
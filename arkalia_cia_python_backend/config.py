@@ -36,6 +36,60 @@ class Settings(BaseSettings):
     # Health checks
     health_check_timeout_seconds: int = 5
 
+    # Base de données SQLite (pool de connexions)
+    db_pool_size: int = 8
+    db_pool_timeout_seconds: float = 10.0
+    db_journal_mode: str = "WAL"
+    db_synchronous: str = "NORMAL"
+    db_cache_size_kb: int = 8192
+    db_mmap_size_mb: int = 64
+    db_busy_timeout_ms: int = 5000
+    # Mode optionnel : une base par utilisateur sous ce répertoire
+    # (users, blacklist et audit restent dans la base principale)
+    db_shard_dir: str | None = None
+    db_shard_pool_size: int = 2
+    db_shard_max_open: int = 128
+    # Mesures par méthode de CIADatabase (/metrics) et journal des requêtes lentes
+    db_metrics_enabled: bool = True
+    db_slow_query_ms: float = 200.0
+
+    # Logs d'audit (écriture groupée en arrière-plan)
+    audit_flush_interval_ms: int = 200
+    audit_batch_size: int = 200
+    audit_queue_max_size: int = 10000
+
+    # Traitement des documents uploadés en arrière-plan (file de jobs)
+    document_job_workers: int = 2
+    document_job_poll_seconds: float = 2.0
+    document_job_lease_seconds: int = 60
+
+    # Cache mémoire de la blacklist des tokens
+    token_blacklist_refresh_seconds: float = 1.0
+    token_blacklist_bloom_enabled: bool = False
+
+    # Cache des JWT déjà validés (0 = désactivé)
+    token_cache_max_size: int = 4096
+
+    # Hachage bcrypt (pool dédié hors event loop)
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 64
+
+    # Pool du travail CPU des endpoints (PDF, rapports) hors event loop
+    cpu_pool_workers: int = 2
+    cpu_pool_max_queue: int = 32
+
+    # Cache persistant des extractions PDF (texte, OCR, métadonnées)
+    extraction_cache_max_mb: int = 256
+
+    # Extraction parallèle des pages des gros PDF (0 : désactivée)
+    pdf_page_workers: int = 4
+    pdf_parallel_min_pages: int = 64
+
+    # OCR en flux des PDF scannés (pages en cours, passe rapide puis 300 DPI)
+    ocr_pages_in_flight: int = 4
+    ocr_fast_dpi: int = 150
+    ocr_min_confidence: float = 70.0
+
     # ARIA Integration
     aria_enabled: bool = False  # Désactivé par défaut: CIA fonctionne en autonome
     aria_base_url: str = "http://127.0.0.1:8001"  # URL du serveur ARIA (optionnel via ARIA_BASE_URL)
@@ -63,6 +117,16 @@ class Settings(BaseSettings):
         """Retourne la taille max de requête en bytes"""
         return self.max_request_size_mb * 1024 * 1024
 
+    @property
+    def max_upload_request_bytes(self) -> int:
+        """Taille max d'une requête multipart (fichier + marge d'un chunk)"""
+        return self.max_file_size_bytes + self.chunk_size_bytes
+
+    @property
+    def db_mmap_size_bytes(self) -> int:
+        """Retourne la taille mmap SQLite en bytes"""
+        return self.db_mmap_size_mb * 1024 * 1024
+
 
 # Instance globale de configuration (singleton)
 _settings: Settings | None = None
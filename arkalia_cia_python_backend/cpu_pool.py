@@ -0,0 +1,117 @@
+"""
+Pool borné pour le travail CPU des endpoints (PDF, rapports)
+Exécute les appels longs hors de l'event loop et mesure sa saturation
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from fastapi import HTTPException, status
+
+T = TypeVar("T")
+
+
+class CPUBoundPool:
+    """
+    Pool de ``max_workers`` threads partagé par les endpoints
+
+    Threads plutôt que processus : les appels délégués sont des méthodes de
+    services liées à la base et à l'OCR (non sérialisables). L'event loop
+    reste libre pendant le traitement. Au-delà de ``max_queue`` appels en
+    attente, la requête est refusée (503) plutôt que d'allonger la file.
+    """
+
+    def __init__(self, name: str = "cpu", max_workers: int = 2, max_queue: int = 32):
+        if max_workers < 1:
+            raise ValueError("max_workers doit être >= 1")
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"cia-{name}"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._max_queued = 0
+        self._wait_time_total = 0.0
+        self._run_time_total = 0.0
+
+    def _timed(self, func: Callable[[], T], enqueued_at: float) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_time_total += started - enqueued_at
+        failed = True
+        try:
+            result = func()
+            failed = False
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._failed += failed
+                self._run_time_total += time.perf_counter() - started
+
+    async def run(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """
+        Exécute ``func(*args, **kwargs)`` sur le pool
+
+        Le contexte (utilisateur courant) est propagé au thread du pool.
+
+        Raises:
+            HTTPException: 503 si la file d'attente est pleine
+        """
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Serveur occupé, réessayez plus tard",
+                )
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        future = self._executor.submit(self._timed, call, time.perf_counter())
+        # Appelant annulé (client parti, timeout) avant le démarrage : l'appel
+        # ne passe jamais par _timed, il quitte la file ici
+        future.add_done_callback(self._dequeue_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _dequeue_cancelled(self, future: "Future[Any]") -> None:
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def shutdown(self) -> None:
+        """Arrête le pool après les appels en cours"""
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Compteurs de file, d'exécution et taux d'occupation"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "max_queued": self._max_queued,
+                "running": self._running,
+                "utilization": round(self._running / self.max_workers, 3),
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "wait_time_total_seconds": round(self._wait_time_total, 6),
+                "run_time_total_seconds": round(self._run_time_total, 6),
+            }
@@ -3,316 +3,339 @@ Database Manager pour Arkalia CIA
 Adapté du storage.py d'Arkalia-Luna-Pro
 """
 
+import html
+import json
+import re
 import sqlite3
 import tempfile
+import weakref
+from collections import Counter
+from collections.abc import Generator, Iterable, Iterator, Mapping
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-
+from arkalia_cia_python_backend.audit_sink import AuditLogSink
+from arkalia_cia_python_backend.config import get_settings
+from arkalia_cia_python_backend.db_pool import SQLiteConnectionPool
+from arkalia_cia_python_backend.doctor_search import DEFAULT_THRESHOLD
+from arkalia_cia_python_backend.migrations import migrate
+from arkalia_cia_python_backend.query_metrics import (
+    InstrumentedConnection,
+    instrument_methods,
+    query_metrics,
+)
+from arkalia_cia_python_backend.records import DocumentRecord, iter_records
+from arkalia_cia_python_backend.sharding import (
+    Shard,
+    ShardManager,
+    current_user_id,
+)
+from arkalia_cia_python_backend.token_blacklist import TokenBlacklistCache
+from arkalia_cia_python_backend.utils.pagination import decode_cursor
+
+# Filtres acceptés par search_documents (clé -> condition SQL)
+_SEARCH_FILTERS = {
+    "document_type": "dm.document_type = ?",
+    "exam_type": "dm.exam_type = ?",
+    "doctor_specialty": "dm.doctor_specialty = ?",
+    "date_from": "dm.document_date >= ?",
+    "date_to": "dm.document_date <= ?",
+}
+
+# Marqueurs de surlignage (caractères de contrôle, absents du texte extrait)
+_HIGHLIGHT_START = "\x02"
+_HIGHLIGHT_END = "\x03"
+
+# Compteurs de la table user_stats (voir migration 8)
+_USER_STAT_COUNTERS = (
+    "document_count",
+    "conversation_count",
+    "share_count",
+    "family_member_count",
+)
+
+# Bail d'un job en cours (secondes), prolongé par son worker
+JOB_LEASE_SECONDS = 60
+
+
+def _close_resources(
+    audit_sink: AuditLogSink,
+    pool: SQLiteConnectionPool,
+    shards: ShardManager | None = None,
+) -> None:
+    """Vide la file d'audit puis ferme les pools (sans référence à l'instance)"""
+    audit_sink.close()
+    if shards is not None:
+        shards.close()
+    pool.close()
+
+
+def _validate_db_path(db_path: str) -> str:
+    """
+    Valide un chemin de base (ou de répertoire de bases) et le résout
+
+    Raises:
+        ValueError: Path traversal ou chemin hors des répertoires autorisés
+    """
+    # Sécurité : Valider le chemin de la base de données
+    # Empêcher les path traversal attacks
+    db_path_obj = Path(db_path)
+
+    # Vérifier les path traversal attacks
+    if ".." in str(db_path_obj):
+        raise ValueError("Chemin de base de données invalide: path traversal détecté")
+
+    # Validation stricte des chemins autorisés
+    if db_path_obj.is_absolute():
+        temp_dir = tempfile.gettempdir()
+        current_dir = str(Path.cwd())
+        allowed_prefixes = [temp_dir, current_dir]
+        if not any(str(db_path_obj).startswith(prefix) for prefix in allowed_prefixes):
+            raise ValueError(f"Chemin de base de données non autorisé: {db_path}")
+
+    return str(db_path_obj.resolve())
+
+
+def _create_pool(db_path: str, max_size: int) -> SQLiteConnectionPool:
+    """Pool de connexions avec les pragmas de la configuration"""
+    settings = get_settings()
+    instrumented = settings.db_metrics_enabled
+    return SQLiteConnectionPool(
+        db_path,
+        max_size=max_size,
+        timeout=settings.db_pool_timeout_seconds,
+        journal_mode=settings.db_journal_mode,
+        synchronous=settings.db_synchronous,
+        cache_size_kb=settings.db_cache_size_kb,
+        mmap_size_bytes=settings.db_mmap_size_bytes,
+        busy_timeout_ms=settings.db_busy_timeout_ms,
+        connection_factory=InstrumentedConnection if instrumented else sqlite3.Connection,
+        on_wait=query_metrics.record_wait if instrumented else None,
+    )
+
+
+def _executemany_ids(
+    conn: sqlite3.Connection, sql: str, rows: list[tuple[Any, ...]]
+) -> list[int]:
+    """
+    executemany + IDs des lignes insérées
+
+    Les tables sont en AUTOINCREMENT et l'insertion se fait sous le verrou
+    d'écriture de la transaction : les IDs sont contigus et se terminent
+    par last_insert_rowid().
+    """
+    if not rows:
+        return []
+    conn.executemany(sql, rows)
+    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last_id - len(rows) + 1, last_id + 1))
+
+
+def _fts_query(query: str) -> str:
+    """
+    Convertit une saisie utilisateur en requête FTS5 sûre
+
+    Chaque mot devient un terme préfixe entre guillemets (ET implicite) :
+    aucun opérateur FTS5 de l'utilisateur n'est interprété.
+    """
+    return " ".join(f'"{token}"*' for token in re.findall(r"\w+", query))
+
+
+def _highlight_snippet(snippet: str | None) -> str | None:
+    """Échappe le snippet puis remplace les marqueurs par <mark>"""
+    if snippet is None:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(_HIGHLIGHT_START, "<mark>")
+        .replace(_HIGHLIGHT_END, "</mark>")
+    )
+
+
+def _job_from_row(row: sqlite3.Row) -> dict[str, Any]:
+    """Ligne de la table jobs, payload et résultat désérialisés"""
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def _blob_from_row(row: sqlite3.Row) -> dict[str, Any]:
+    """Ligne de la table content_blobs, info désérialisée"""
+    blob = dict(row)
+    blob["info"] = json.loads(blob["info"]) if blob["info"] else {}
+    return blob
+
+
+def _page_clauses(
+    conditions: list[str],
+    params: list[Any],
+    order_columns: tuple[str, str],
+    skip: int,
+    limit: int | None,
+    page_cursor: str | None,
+) -> tuple[str, str]:
+    """
+    Construit WHERE et ORDER BY/LIMIT pour une liste triée par (horodatage, id)
+
+    Avec ``page_cursor``, pagination keyset : la ligne de départ est trouvée
+    par l'index composite au lieu de parcourir ``skip`` lignes.
+    """
+    timestamp_col, id_col = order_columns
+    if page_cursor is not None:
+        conditions.append(f"({timestamp_col}, {id_col}) < (?, ?)")
+        params.extend(decode_cursor(page_cursor))
+        skip = 0
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    tail = f"ORDER BY {timestamp_col} DESC, {id_col} DESC"
+    if limit is not None:
+        tail += " LIMIT ? OFFSET ?"
+        params.extend([limit, skip])
+    return where_clause, tail
+
+
+@instrument_methods
 class CIADatabase:
     """Gestionnaire de base de données SQLite pour Arkalia CIA"""
 
-    def __init__(self, db_path: str = "arkalia_cia.db"):
-        # Sécurité : Valider le chemin de la base de données
-        # Empêcher les path traversal attacks
-        db_path_obj = Path(db_path)
-
-        # Vérifier les path traversal attacks
-        if ".." in str(db_path_obj):
-            raise ValueError(
-                "Chemin de base de données invalide: path traversal détecté"
+    def __init__(
+        self,
+        db_path: str = "arkalia_cia.db",
+        pool_size: int | None = None,
+        shard_dir: str | None = None,
+    ):
+        self.db_path = _validate_db_path(db_path)
+        # Recherche plein texte (désactivée si SQLite est compilé sans FTS5)
+        self.fts_enabled = False
+
+        # Pool de connexions persistantes (WAL + pragmas configurables)
+        settings = get_settings()
+        self.pool = _create_pool(self.db_path, pool_size or settings.db_pool_size)
+        # File des logs d'audit, écrite par lots en arrière-plan
+        self.audit_sink = AuditLogSink(
+            self.pool,
+            flush_interval_ms=settings.audit_flush_interval_ms,
+            batch_size=settings.audit_batch_size,
+            max_queue_size=settings.audit_queue_max_size,
+        )
+        # JTI révoqués en mémoire (évite une requête par token vérifié)
+        self.token_blacklist = TokenBlacklistCache(
+            self.pool,
+            refresh_interval=settings.token_blacklist_refresh_seconds,
+            use_bloom=settings.token_blacklist_bloom_enabled,
+        )
+        # Base principale vue comme une partition (index des noms de médecins)
+        self._main_shard = Shard(self.pool)
+        self.doctor_names = self._main_shard.doctor_names
+        # Mode optionnel : données utilisateur dans une base par utilisateur
+        self.shards: ShardManager | None = None
+        if shard_dir is not None:
+            self.shards = ShardManager(
+                _validate_db_path(shard_dir),
+                lambda path: _create_pool(path, settings.db_shard_pool_size),
+                max_open=settings.db_shard_max_open,
             )
-
-        # Validation stricte des chemins autorisés
-        if db_path_obj.is_absolute():
-            temp_dir = tempfile.gettempdir()
-            current_dir = str(Path.cwd())
-            allowed_prefixes = [temp_dir, current_dir]
-            if not any(
-                str(db_path_obj).startswith(prefix) for prefix in allowed_prefixes
-            ):
-                raise ValueError(f"Chemin de base de données non autorisé: {db_path}")
-
-        self.db_path = str(db_path_obj.resolve())
+        # Vider la file puis fermer les connexions quand l'instance est collectée
+        # (ou à la sortie de l'interpréteur)
+        weakref.finalize(
+            self, _close_resources, self.audit_sink, self.pool, self.shards
+        )
         self.init_db()
 
-    def init_db(self):
-        """Initialise la base de données avec les tables nécessaires"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            # Table des documents
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS documents (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    original_name TEXT NOT NULL,
-                    file_path TEXT NOT NULL,
-                    file_type TEXT NOT NULL,
-                    file_size INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """
-            )
-
-            # Table des rappels
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS reminders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    reminder_date TIMESTAMP NOT NULL,
-                    is_completed BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """
-            )
-
-            # Table des contacts d'urgence
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS emergency_contacts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    phone TEXT NOT NULL,
-                    relationship TEXT,
-                    is_primary BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """
-            )
-
-            # Table des portails santé
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS health_portals (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    url TEXT NOT NULL,
-                    description TEXT,
-                    category TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """
-            )
-
-            # Table des médecins (pour consultations)
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS doctors (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    specialty TEXT,
-                    phone TEXT,
-                    email TEXT,
-                    address TEXT,
-                    city TEXT,
-                    postal_code TEXT,
-                    country TEXT DEFAULT 'Belgique',
-                    notes TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """
-            )
-
-            # Table des consultations
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS consultations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    doctor_id INTEGER NOT NULL,
-                    user_id INTEGER,
-                    date TEXT NOT NULL,
-                    reason TEXT,
-                    notes TEXT,
-                    documents TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (doctor_id) REFERENCES doctors(id) ON DELETE CASCADE,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """
-            )
-
-            # Table des métadonnées documents
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS document_metadata (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    document_id INTEGER NOT NULL,
-                    doctor_name TEXT,
-                    doctor_specialty TEXT,
-                    document_date TEXT,
-                    exam_type TEXT,
-                    document_type TEXT,
-                    keywords TEXT,
-                    extracted_text TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (document_id) REFERENCES documents(id) ON DELETE CASCADE
-                )
-            """
-            )
-
-            # Table des conversations IA
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS ai_conversations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    question TEXT NOT NULL,
-                    answer TEXT NOT NULL,
-                    question_type TEXT,
-                    related_documents TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """
-            )
-
-            # Table des utilisateurs
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL UNIQUE,
-                    email TEXT,
-                    password_hash TEXT NOT NULL,
-                    role TEXT DEFAULT 'user',
-                    is_active BOOLEAN DEFAULT TRUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """
-            )
-
-            # Table pour associer les données aux utilisateurs
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS user_documents (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    document_id INTEGER NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                    FOREIGN KEY (document_id) REFERENCES documents(id)
-                        ON DELETE CASCADE,
-                    UNIQUE(user_id, document_id)
-                )
-            """
-            )
-
-            # Table pour blacklist des tokens JWT révoqués
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS token_blacklist (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    token_jti TEXT NOT NULL UNIQUE,
-                    user_id INTEGER NOT NULL,
-                    token_type TEXT NOT NULL,
-                    expires_at TIMESTAMP NOT NULL,
-                    revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    reason TEXT,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """
-            )
-
-            # Index pour recherche rapide
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_token_blacklist_jti ON token_blacklist(token_jti)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_token_blacklist_user ON token_blacklist(user_id)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_token_blacklist_expires ON token_blacklist(expires_at)"
-            )
-
-            # Table pour audit log des accès
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS audit_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    action TEXT NOT NULL,
-                    resource_type TEXT NOT NULL,
-                    resource_id TEXT,
-                    ip_address TEXT,
-                    user_agent TEXT,
-                    success BOOLEAN DEFAULT TRUE,
-                    error_message TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
-                )
-            """
-            )
-
-            # Index pour audit log
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_audit_logs_user ON audit_logs(user_id)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_audit_logs_action ON audit_logs(action)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_audit_logs_created ON audit_logs(created_at)"
-            )
-
-            # Table des membres famille
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS family_members (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    name TEXT NOT NULL,
-                    email TEXT NOT NULL,
-                    phone TEXT,
-                    relationship TEXT,
-                    is_active BOOLEAN DEFAULT TRUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """
-            )
-
-            # Table des documents partagés
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS shared_documents (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    document_id TEXT NOT NULL,
-                    member_email TEXT NOT NULL,
-                    permission_level TEXT DEFAULT 'view',
-                    is_encrypted BOOLEAN DEFAULT TRUE,
-                    shared_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """
-            )
-
-            # Index pour partage familial
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_family_members_user ON family_members(user_id)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_family_members_email ON family_members(email)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_shared_documents_user ON shared_documents(user_id)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_shared_documents_doc ON shared_documents(document_id)"
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Fournit une connexion du pool (commit en sortie, rollback sur erreur)
+
+        Les appels imbriqués dans un même thread partagent la même transaction.
+        """
+        with self.pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def _user_shard(self, user_id: int | None = None) -> Iterator[Shard]:
+        """
+        Partition des données d'un utilisateur
+
+        Utilisateur explicite, sinon celui de la requête en cours. Sans mode
+        par utilisateur (ou sans utilisateur connu) : la base principale.
+        """
+        if user_id is None:
+            user_id = current_user_id.get()
+        if self.shards is None or user_id is None:
+            yield self._main_shard
+            return
+        with self.shards.lease(user_id) as shard:
+            yield shard
+
+    @contextmanager
+    def user_connection(self, user_id: int | None = None) -> Iterator[sqlite3.Connection]:
+        """
+        Connexion vers la base qui porte les données de l'utilisateur
+
+        Documents, métadonnées, conversations IA, consultations, membres
+        famille et entrées douleur. Identique à connection() hors mode par
+        utilisateur, ou sans utilisateur connu (routes ARIA non
+        authentifiées : entrées douleur dans la base principale).
+        """
+        with self._user_shard(user_id) as shard, shard.pool.connection() as conn:
+            yield conn
+
+    def delete_user_storage(self, user_id: int) -> bool:
+        """
+        Supprime la base d'un utilisateur (mode par utilisateur, RGPD)
+
+        Les partages qu'il a émis, gardés dans la base principale, sont
+        supprimés aussi.
+
+        Returns:
+            True si une base utilisateur existait
+        """
+        if self.shards is None:
+            raise RuntimeError("Stockage par utilisateur non activé")
+        with self.user_connection(user_id) as conn:
+            refs = Counter(
+                {
+                    row[0]: row[1]
+                    for row in conn.execute(
+                        "SELECT content_sha256, COUNT(*) FROM documents "
+                        "WHERE content_sha256 IS NOT NULL GROUP BY content_sha256"
+                    )
+                }
             )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_shared_documents_member ON shared_documents(member_email)"
+        with self.connection() as conn:
+            conn.execute("DELETE FROM shared_documents WHERE user_id = ?", (user_id,))
+            if refs:
+                self._add_blob_refs(Counter({sha: -n for sha, n in refs.items()}))
+        return self.shards.delete(user_id)
+
+    def close(self) -> None:
+        """Vide la file d'audit puis ferme les pools de connexions"""
+        _close_resources(self.audit_sink, self.pool, self.shards)
+
+    def ping(self) -> bool:
+        """Vérifie que la base répond (SELECT 1)"""
+        with self.connection() as conn:
+            row = conn.execute("SELECT 1").fetchone()
+            return bool(row and row[0] == 1)
+
+    def init_db(self) -> None:
+        """
+        Met le schéma à jour (migrations numérotées, voir migrations.py)
+
+        Base déjà à jour : une seule lecture de PRAGMA user_version, aucun DDL.
+        """
+        with self.connection() as conn:
+            migrate(conn)
+            self.fts_enabled = (
+                conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'document_metadata_fts'"
+                ).fetchone()
+                is not None
             )
 
-            conn.commit()
-
     def add_document(
         self,
         name: str,
@@ -320,52 +343,104 @@ class CIADatabase:
         file_path: str,
         file_type: str,
         file_size: int,
+        content_sha256: str | None = None,
     ) -> int | None:
-        """Ajoute un document à la base de données"""
-        with sqlite3.connect(self.db_path) as conn:
+        """
+        Ajoute un document à la base de données
+
+        Avec ``content_sha256``, le document reprend la référence au fichier
+        stocké prise par add_content_blob() ou acquire_content_blob().
+        """
+        with self.user_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
                 INSERT INTO documents (
-                    name, original_name, file_path, file_type, file_size
+                    name, original_name, file_path, file_type, file_size,
+                    content_sha256
                 )
-                VALUES (?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?)
             """,
-                (name, original_name, file_path, file_type, file_size),
+                (name, original_name, file_path, file_type, file_size, content_sha256),
             )
             return cursor.lastrowid
 
+    def add_documents_bulk(self, documents: Iterable[Mapping[str, Any]]) -> list[int]:
+        """
+        Ajoute plusieurs documents en une seule transaction (executemany)
+
+        Chaque élément porte les clés de add_document (name, original_name,
+        file_path, file_type, file_size, content_sha256 optionnel : une
+        référence prise par document). Retourne les IDs dans l'ordre.
+        """
+        rows = [
+            (
+                doc["name"],
+                doc["original_name"],
+                doc["file_path"],
+                doc["file_type"],
+                doc["file_size"],
+                doc.get("content_sha256"),
+            )
+            for doc in documents
+        ]
+        with self.user_connection() as conn:
+            return _executemany_ids(
+                conn,
+                """
+                INSERT INTO documents (
+                    name, original_name, file_path, file_type, file_size,
+                    content_sha256
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+
     def get_documents(
-        self, skip: int = 0, limit: int | None = None
+        self,
+        skip: int = 0,
+        limit: int | None = None,
+        page_cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """Récupère les documents avec pagination"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        """Récupère les documents avec pagination (offset ou curseur)"""
+        params: list[Any] = []
+        where_clause, tail = _page_clauses(
+            [], params, ("created_at", "id"), skip, limit, page_cursor
+        )
+        with self.user_connection() as conn:
             cursor = conn.cursor()
-            if limit is not None:
-                cursor.execute(
-                    "SELECT * FROM documents ORDER BY created_at DESC LIMIT ? OFFSET ?",
-                    (limit, skip),
-                )
-            else:
-                cursor.execute("SELECT * FROM documents ORDER BY created_at DESC")
+            cursor.execute(
+                f"SELECT * FROM documents WHERE {where_clause} {tail}",  # nosec B608
+                params,
+            )
             return [dict(row) for row in cursor.fetchall()]
 
     def get_document(self, doc_id: int) -> dict[str, Any] | None:
         """Récupère un document par ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.user_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM documents WHERE id = ?", (doc_id,))
             row = cursor.fetchone()
             return dict(row) if row else None
 
     def delete_document(self, doc_id: int) -> bool:
-        """Supprime un document par ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
-            return cursor.rowcount > 0
+        """
+        Supprime un document par ID
+
+        Le fichier stocké par contenu perd une référence ; il n'est supprimé
+        que par collect_unreferenced_blobs().
+        """
+        with self.user_connection() as conn:
+            row = conn.execute(
+                "DELETE FROM documents WHERE id = ? RETURNING content_sha256",
+                (doc_id,),
+            ).fetchone()
+        if row is None:
+            return False
+        if row["content_sha256"]:
+            self._add_blob_refs({row["content_sha256"]: -1})
+        return True
 
     def add_document_metadata(
         self,
@@ -379,7 +454,7 @@ class CIADatabase:
         extracted_text: str | None = None,
     ) -> int | None:
         """Ajoute des métadonnées à un document"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.user_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -402,48 +477,88 @@ class CIADatabase:
             )
             return cursor.lastrowid
 
+    def add_document_metadata_bulk(
+        self, metadata_rows: Iterable[Mapping[str, Any]]
+    ) -> list[int]:
+        """
+        Ajoute les métadonnées de plusieurs documents en une seule transaction
+
+        Chaque élément porte document_id et, en option, les autres champs
+        de add_document_metadata. Retourne les IDs dans l'ordre.
+        """
+        rows = [
+            (
+                meta["document_id"],
+                meta.get("doctor_name"),
+                meta.get("doctor_specialty"),
+                meta.get("document_date"),
+                meta.get("exam_type"),
+                meta.get("document_type"),
+                meta.get("keywords"),
+                meta.get("extracted_text"),
+            )
+            for meta in metadata_rows
+        ]
+        with self.user_connection() as conn:
+            return _executemany_ids(
+                conn,
+                """
+                INSERT INTO document_metadata (
+                    document_id, doctor_name, doctor_specialty, document_date,
+                    exam_type, document_type, keywords, extracted_text
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+
     def add_ai_conversation(
         self,
         question: str,
         answer: str,
         question_type: str = "general",
         related_documents: str | None = None,
+        user_id: int | None = None,
     ) -> int | None:
-        """Ajoute une conversation IA à la base de données"""
-        with sqlite3.connect(self.db_path) as conn:
+        """
+        Ajoute une conversation IA à la base de données
+
+        Sans user_id explicite : l'utilisateur de la requête en cours.
+        """
+        if user_id is None:
+            user_id = current_user_id.get()
+        with self.user_connection(user_id) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
                 INSERT INTO ai_conversations (
-                    question, answer, question_type, related_documents
+                    question, answer, question_type, related_documents, user_id
                 )
-                VALUES (?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?)
             """,
-                (question, answer, question_type, related_documents),
+                (question, answer, question_type, related_documents, user_id),
             )
             return cursor.lastrowid
 
     def get_ai_conversations(
-        self, limit: int = 50, skip: int = 0
+        self, limit: int = 50, skip: int = 0, page_cursor: str | None = None
     ) -> list[dict[str, Any]]:
-        """Récupère les conversations IA avec pagination"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        """Récupère les conversations IA avec pagination (offset ou curseur)"""
+        params: list[Any] = []
+        where_clause, tail = _page_clauses(
+            [], params, ("created_at", "id"), skip, limit, page_cursor
+        )
+        with self.user_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                """
-                SELECT * FROM ai_conversations
-                ORDER BY created_at DESC
-                LIMIT ? OFFSET ?
-            """,
-                (limit, skip),
+                f"SELECT * FROM ai_conversations WHERE {where_clause} {tail}",  # nosec B608
+                params,
             )
             return [dict(row) for row in cursor.fetchall()]
 
     def get_document_metadata(self, document_id: int) -> dict[str, Any] | None:
         """Récupère les métadonnées d'un document"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.user_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT * FROM document_metadata WHERE document_id = ?", (document_id,)
@@ -452,30 +567,140 @@ class CIADatabase:
             return dict(row) if row else None
 
     def get_documents_by_doctor_name(self, doctor_name: str) -> list[dict[str, Any]]:
-        """Récupère les documents associés à un médecin par nom"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        """
+        Récupère les documents associés à un médecin par nom
+
+        Le nom est cherché comme sous-chaîne, sans tenir compte de la casse
+        ni des accents, dans l'index des noms ; les documents sont ensuite
+        lus par l'index document_metadata(doctor_name).
+        """
+        with self._user_shard() as shard, shard.pool.connection() as conn:
+            names = shard.doctor_names.matching(doctor_name)
+            if not names:
+                return []
+            placeholders = ", ".join("?" * len(names))
             cursor = conn.cursor()
-            # Formatage sécurisé : le pattern LIKE est construit AVANT le binding
-            # Ceci est sûr car doctor_name vient déjà de la validation Pydantic
-            search_pattern = f"%{doctor_name}%"
             cursor.execute(
-                """
+                f"""
                 SELECT d.*, dm.doctor_name, dm.doctor_specialty, dm.document_date
                 FROM documents d
                 JOIN document_metadata dm ON d.id = dm.document_id
-                WHERE dm.doctor_name LIKE ?
+                WHERE dm.doctor_name IN ({placeholders})
                 ORDER BY dm.document_date DESC
-            """,
-                (search_pattern,),
+            """,  # nosec B608
+                names,
             )
             return [dict(row) for row in cursor.fetchall()]
 
+    def search_doctor_names(
+        self, query: str, limit: int = 10, threshold: float = DEFAULT_THRESHOLD
+    ) -> list[dict[str, Any]]:
+        """
+        Recherche approximative de noms de médecins (autocomplétion)
+
+        Args:
+            query: Nom saisi (casse, accents et fautes de frappe tolérés)
+            limit: Nombre maximum de noms
+            threshold: Similarité trigrammes minimale (0 à 1)
+
+        Returns:
+            Noms (``name``) avec leur ``score`` de similarité ; ceux qui
+            contiennent la requête viennent en premier
+        """
+        with self._user_shard() as shard:
+            return shard.doctor_names.search(query, limit=limit, threshold=threshold)
+
+    def search_documents(
+        self,
+        user_id: int,
+        query: str,
+        filters: dict[str, str] | None = None,
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        """
+        Recherche plein texte dans les documents d'un utilisateur
+
+        Args:
+            user_id: Propriétaire des documents
+            query: Texte recherché (mots combinés en ET, préfixes acceptés)
+            filters: Filtres optionnels (document_type, exam_type,
+                doctor_specialty, date_from, date_to)
+            limit: Nombre maximum de résultats
+
+        Returns:
+            Documents classés par pertinence (bm25), avec ``snippet`` HTML
+            (termes trouvés entre <mark>) et ``score`` (plus petit = meilleur)
+
+        Raises:
+            ValueError: Si un filtre est inconnu
+        """
+        match = _fts_query(query)
+        if not match:
+            return []
+
+        conditions = ["ud.user_id = ?"]
+        params: list[Any] = [user_id]
+        for key, value in (filters or {}).items():
+            if key not in _SEARCH_FILTERS:
+                raise ValueError(f"Filtre de recherche inconnu: {key}")
+            conditions.append(_SEARCH_FILTERS[key])
+            params.append(value)
+        where_clause = " AND ".join(conditions)
+
+        with self.user_connection(user_id) as conn:
+            cursor = conn.cursor()
+            if self.fts_enabled:
+                cursor.execute(
+                    f"""
+                    SELECT d.*, dm.doctor_name, dm.doctor_specialty,
+                           dm.document_date, dm.exam_type, dm.document_type,
+                           snippet(document_metadata_fts, -1, ?, ?, '…', 12)
+                               AS snippet,
+                           bm25(document_metadata_fts, 5.0, 3.0, 1.0) AS score
+                    FROM document_metadata_fts
+                    JOIN document_metadata dm ON dm.id = document_metadata_fts.rowid
+                    JOIN documents d ON d.id = dm.document_id
+                    JOIN user_documents ud ON ud.document_id = d.id
+                    WHERE document_metadata_fts MATCH ? AND {where_clause}
+                    ORDER BY score
+                    LIMIT ?
+                    """,  # nosec B608
+                    [_HIGHLIGHT_START, _HIGHLIGHT_END, match, *params, limit],
+                )
+            else:
+                # Repli sans FTS5 : tous les mots doivent apparaître (LIKE)
+                for token in re.findall(r"\w+", query):
+                    conditions.append(
+                        "(dm.doctor_name LIKE ? OR dm.keywords LIKE ? "
+                        "OR dm.extracted_text LIKE ?)"
+                    )
+                    params.extend([f"%{token}%"] * 3)
+                cursor.execute(
+                    f"""
+                    SELECT d.*, dm.doctor_name, dm.doctor_specialty,
+                           dm.document_date, dm.exam_type, dm.document_type,
+                           NULL AS snippet, 0.0 AS score
+                    FROM document_metadata dm
+                    JOIN documents d ON d.id = dm.document_id
+                    JOIN user_documents ud ON ud.document_id = d.id
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY d.created_at DESC, d.id DESC
+                    LIMIT ?
+                    """,  # nosec B608
+                    [*params, limit],
+                )
+            results = []
+            for row in cursor.fetchall():
+                result = dict(row)
+                result["snippet"] = _highlight_snippet(result["snippet"])
+                results.append(result)
+            return results
+
     def add_reminder(
         self, title: str, description: str, reminder_date: str
     ) -> int | None:
         """Ajoute un rappel"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -488,8 +713,7 @@ class CIADatabase:
 
     def get_reminder(self, reminder_id: int) -> dict[str, Any] | None:
         """Récupère un rappel par ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM reminders WHERE id = ?", (reminder_id,))
             row = cursor.fetchone()
@@ -497,7 +721,7 @@ class CIADatabase:
 
     def delete_reminder(self, reminder_id: int) -> bool:
         """Supprime un rappel par ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
             return cursor.rowcount > 0
@@ -506,8 +730,7 @@ class CIADatabase:
         self, skip: int = 0, limit: int | None = None
     ) -> list[dict[str, Any]]:
         """Récupère les rappels avec pagination"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.connection() as conn:
             cursor = conn.cursor()
             if limit is not None:
                 cursor.execute(
@@ -523,7 +746,7 @@ class CIADatabase:
         self, name: str, phone: str, relationship: str, is_primary: bool = False
     ) -> int | None:
         """Ajoute un contact d'urgence"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -536,8 +759,7 @@ class CIADatabase:
 
     def get_contact(self, contact_id: int) -> dict[str, Any] | None:
         """Récupère un contact par ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT * FROM emergency_contacts WHERE id = ?", (contact_id,)
@@ -547,7 +769,7 @@ class CIADatabase:
 
     def delete_contact(self, contact_id: int) -> bool:
         """Supprime un contact par ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM emergency_contacts WHERE id = ?", (contact_id,))
             return cursor.rowcount > 0
@@ -556,8 +778,7 @@ class CIADatabase:
         self, skip: int = 0, limit: int | None = None
     ) -> list[dict[str, Any]]:
         """Récupère les contacts d'urgence avec pagination"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.connection() as conn:
             cursor = conn.cursor()
             if limit is not None:
                 cursor.execute(
@@ -576,7 +797,7 @@ class CIADatabase:
         self, name: str, url: str, description: str, category: str
     ) -> int | None:
         """Ajoute un portail santé"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -589,8 +810,7 @@ class CIADatabase:
 
     def get_portal(self, portal_id: int) -> dict[str, Any] | None:
         """Récupère un portail par ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM health_portals WHERE id = ?", (portal_id,))
             row = cursor.fetchone()
@@ -598,7 +818,7 @@ class CIADatabase:
 
     def delete_portal(self, portal_id: int) -> bool:
         """Supprime un portail par ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM health_portals WHERE id = ?", (portal_id,))
             return cursor.rowcount > 0
@@ -607,8 +827,7 @@ class CIADatabase:
         self, skip: int = 0, limit: int | None = None
     ) -> list[dict[str, Any]]:
         """Récupère les portails santé avec pagination"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.connection() as conn:
             cursor = conn.cursor()
             if limit is not None:
                 cursor.execute(
@@ -630,7 +849,7 @@ class CIADatabase:
         role: str = "user",
     ) -> int | None:
         """Crée un nouvel utilisateur"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             try:
                 cursor.execute(
@@ -646,8 +865,7 @@ class CIADatabase:
 
     def get_user_by_username(self, username: str) -> dict[str, Any] | None:
         """Récupère un utilisateur par nom d'utilisateur"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
             row = cursor.fetchone()
@@ -655,8 +873,7 @@ class CIADatabase:
 
     def get_user_by_id(self, user_id: int) -> dict[str, Any] | None:
         """Récupère un utilisateur par ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
             row = cursor.fetchone()
@@ -664,7 +881,7 @@ class CIADatabase:
 
     def associate_document_to_user(self, user_id: int, document_id: int) -> bool:
         """Associe un document à un utilisateur"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.user_connection(user_id) as conn:
             cursor = conn.cursor()
             try:
                 cursor.execute(
@@ -678,36 +895,92 @@ class CIADatabase:
             except sqlite3.IntegrityError:
                 return False
 
+    def associate_documents_to_user_bulk(
+        self, user_id: int, document_ids: Iterable[int]
+    ) -> int:
+        """
+        Associe plusieurs documents à un utilisateur en une seule transaction
+
+        Les associations déjà présentes sont ignorées. Retourne le nombre
+        d'associations créées.
+        """
+        rows = [(user_id, document_id) for document_id in document_ids]
+        if not rows:
+            return 0
+        with self.user_connection(user_id) as conn:
+            cursor = conn.executemany(
+                """
+                INSERT OR IGNORE INTO user_documents (user_id, document_id)
+                VALUES (?, ?)
+                """,
+                rows,
+            )
+            return cursor.rowcount
+
+    def user_owns_document(self, user_id: int, document_id: int) -> bool:
+        """Vrai si le document appartient à l'utilisateur (index unique)"""
+        with self.user_connection(user_id) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM user_documents WHERE user_id = ? AND document_id = ?",
+                (user_id, document_id),
+            ).fetchone()
+            return row is not None
+
     def get_user_documents(
-        self, user_id: int, skip: int = 0, limit: int | None = None
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int | None = None,
+        page_cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """Récupère les documents d'un utilisateur"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        """Récupère les documents d'un utilisateur (offset ou curseur)"""
+        params: list[Any] = [user_id]
+        where_clause, tail = _page_clauses(
+            ["ud.user_id = ?"],
+            params,
+            ("d.created_at", "d.id"),
+            skip,
+            limit,
+            page_cursor,
+        )
+        with self.user_connection(user_id) as conn:
             cursor = conn.cursor()
-            if limit is not None:
-                cursor.execute(
-                    """
-                    SELECT d.* FROM documents d
-                    INNER JOIN user_documents ud ON d.id = ud.document_id
-                    WHERE ud.user_id = ?
-                    ORDER BY d.created_at DESC
-                    LIMIT ? OFFSET ?
-                    """,
-                    (user_id, limit, skip),
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT d.* FROM documents d
-                    INNER JOIN user_documents ud ON d.id = ud.document_id
-                    WHERE ud.user_id = ?
-                    ORDER BY d.created_at DESC
-                    """,
-                    (user_id,),
-                )
+            cursor.execute(
+                f"""
+                SELECT d.* FROM documents d
+                INNER JOIN user_documents ud ON d.id = ud.document_id
+                WHERE {where_clause}
+                {tail}
+                """,  # nosec B608
+                params,
+            )
             return [dict(row) for row in cursor.fetchall()]
 
+    def iter_user_documents(
+        self, user_id: int, batch_size: int = 500
+    ) -> Generator[DocumentRecord, None, None]:
+        """
+        Parcourt les documents d'un utilisateur sans construire de liste
+
+        Lignes lues par lots de ``batch_size`` (plus récentes d'abord) sur
+        une connexion dédiée, fermée à l'épuisement ou à la fermeture de
+        l'itérateur : les écritures faites pendant le parcours ne rejoignent
+        pas sa transaction de lecture.
+        """
+        with self._user_shard(user_id) as shard, shard.pool.dedicated() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(
+                """
+                SELECT d.* FROM documents d
+                INNER JOIN user_documents ud ON d.id = ud.document_id
+                WHERE ud.user_id = ?
+                ORDER BY d.created_at DESC, d.id DESC
+                """,
+                (user_id,),
+            )
+            yield from iter_records(cursor, DocumentRecord, batch_size)
+
     # === GESTION BLACKLIST TOKENS ===
 
     def add_token_to_blacklist(
@@ -718,8 +991,8 @@ class CIADatabase:
         expires_at: datetime,
         reason: str | None = None,
     ) -> bool:
-        """Ajoute un token à la blacklist"""
-        with sqlite3.connect(self.db_path) as conn:
+        """Ajoute un token à la blacklist (base + cache mémoire)"""
+        with self.connection() as conn:
             cursor = conn.cursor()
             try:
                 cursor.execute(
@@ -729,24 +1002,15 @@ class CIADatabase:
                     """,
                     (token_jti, user_id, token_type, expires_at.isoformat(), reason),
                 )
-                return True
             except sqlite3.IntegrityError:
                 # Token déjà dans la blacklist
                 return False
+        self.token_blacklist.add(token_jti, expires_at)
+        return True
 
     def is_token_blacklisted(self, token_jti: str) -> bool:
-        """Vérifie si un token est dans la blacklist"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT COUNT(*) FROM token_blacklist
-                WHERE token_jti = ? AND expires_at > datetime('now')
-                """,
-                (token_jti,),
-            )
-            result = cursor.fetchone()
-            return bool(result[0] > 0) if result else False
+        """Vérifie si un token est dans la blacklist (cache mémoire, sans requête)"""
+        return self.token_blacklist.is_revoked(token_jti)
 
     def revoke_all_user_tokens(self, user_id: int, reason: str = "User logout") -> int:
         """Révoque tous les tokens d'un utilisateur"""
@@ -757,7 +1021,7 @@ class CIADatabase:
 
     def cleanup_expired_tokens(self) -> int:
         """Nettoie les tokens expirés de la blacklist"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "DELETE FROM token_blacklist WHERE expires_at < datetime('now')"
@@ -778,7 +1042,7 @@ class CIADatabase:
         error_message: str | None = None,
     ) -> int | None:
         """Ajoute une entrée dans l'audit log"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             try:
                 cursor.execute(
@@ -805,16 +1069,50 @@ class CIADatabase:
                 # En cas d'erreur, on ne bloque pas l'application
                 return None
 
+    def queue_audit_log(
+        self,
+        user_id: int | None,
+        action: str,
+        resource_type: str,
+        resource_id: str | None = None,
+        ip_address: str | None = None,
+        user_agent: str | None = None,
+        success: bool = True,
+        error_message: str | None = None,
+    ) -> bool:
+        """
+        Met une entrée d'audit en file (écrite par lots, non bloquant)
+
+        Returns:
+            True si l'entrée est en file, False si elle a été abandonnée
+        """
+        return self.audit_sink.submit(
+            user_id,
+            action,
+            resource_type,
+            resource_id=resource_id,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            success=success,
+            error_message=error_message,
+        )
+
+    def flush_audit_logs(self) -> int:
+        """Écrit immédiatement les entrées d'audit en attente"""
+        return self.audit_sink.flush()
+
     def get_audit_logs(
         self,
         user_id: int | None = None,
         action: str | None = None,
         limit: int = 100,
         skip: int = 0,
+        page_cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """Récupère les logs d'audit"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        """Récupère les logs d'audit (offset ou curseur)"""
+        # Lire aussi les entrées encore en file
+        self.audit_sink.flush()
+        with self.connection() as conn:
             cursor = conn.cursor()
             conditions: list[str] = []
             params: list[Any] = []
@@ -826,20 +1124,470 @@ class CIADatabase:
                 conditions.append("action = ?")
                 params.append(action)
 
-            where_clause = " AND ".join(conditions) if conditions else "1=1"
-            params.extend([limit, skip])
+            where_clause, tail = _page_clauses(
+                conditions, params, ("created_at", "id"), skip, limit, page_cursor
+            )
 
             cursor.execute(
                 f"""
                 SELECT * FROM audit_logs
                 WHERE {where_clause}
-                ORDER BY created_at DESC
-                LIMIT ? OFFSET ?
+                {tail}
                 """,
                 params,
             )
             return [dict(row) for row in cursor.fetchall()]
 
+    # === STATISTIQUES UTILISATEUR ===
+
+    def get_user_stats(self, user_id: int) -> dict[str, Any]:
+        """
+        Compteurs d'un utilisateur (table user_stats, tenue par triggers)
+
+        En mode par utilisateur, les partages sont comptés dans la base
+        principale et le reste dans la base de l'utilisateur.
+        """
+        stats: dict[str, Any] = dict.fromkeys(_USER_STAT_COUNTERS, 0)
+        stats.update(user_id=user_id, last_upload_at=None)
+        rows = []
+        with self.user_connection(user_id) as conn:
+            rows.append(
+                conn.execute(
+                    "SELECT * FROM user_stats WHERE user_id = ?", (user_id,)
+                ).fetchone()
+            )
+        if self.shards is not None:
+            with self.connection() as conn:
+                rows.append(
+                    conn.execute(
+                        "SELECT * FROM user_stats WHERE user_id = ?", (user_id,)
+                    ).fetchone()
+                )
+        for row in rows:
+            if row is None:
+                continue
+            for key in _USER_STAT_COUNTERS:
+                stats[key] += row[key]
+            if row["last_upload_at"] and (
+                stats["last_upload_at"] is None
+                or row["last_upload_at"] > stats["last_upload_at"]
+            ):
+                stats["last_upload_at"] = row["last_upload_at"]
+        return stats
+
+    # === FILE DE JOBS ===
+
+    def enqueue_job(self, user_id: int, kind: str, payload: dict[str, Any]) -> int:
+        """Ajoute un job en attente (payload sérialisé en JSON)"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO jobs (user_id, kind, payload) VALUES (?, ?, ?)",
+                (user_id, kind, json.dumps(payload)),
+            )
+            return int(cursor.lastrowid or 0)
+
+    def claim_next_job(
+        self, owner: str | None = None, lease_seconds: int = JOB_LEASE_SECONDS
+    ) -> dict[str, Any] | None:
+        """
+        Prend le plus ancien job en attente et le passe en cours
+
+        Une seule instruction UPDATE ... RETURNING : deux workers ne peuvent
+        pas prendre le même job. Le job est à ``owner`` pour
+        ``lease_seconds`` secondes (voir renew_job_lease).
+        """
+        with self.connection() as conn:
+            row = conn.execute(
+                """
+                UPDATE jobs
+                SET status = 'running', attempts = attempts + 1,
+                    started_at = CURRENT_TIMESTAMP, owner = ?,
+                    lease_expires_at = datetime('now', ?)
+                WHERE id = (
+                    SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1
+                )
+                RETURNING *
+                """,
+                (owner, f"+{int(lease_seconds)} seconds"),
+            ).fetchone()
+            return _job_from_row(row) if row else None
+
+    def renew_job_lease(
+        self, job_id: int, owner: str | None, lease_seconds: int = JOB_LEASE_SECONDS
+    ) -> bool:
+        """
+        Prolonge le bail d'un job en cours
+
+        Returns:
+            False si le job n'est plus en cours pour ``owner`` (bail expiré
+            puis job repris, ou job terminé)
+        """
+        with self.connection() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET lease_expires_at = datetime('now', ?)
+                WHERE id = ? AND status = 'running' AND owner IS ?
+                """,
+                (f"+{int(lease_seconds)} seconds", job_id, owner),
+            )
+            return cursor.rowcount > 0
+
+    def set_job_document(
+        self, job_id: int, document_id: int, result: dict[str, Any]
+    ) -> None:
+        """
+        Enregistre le document créé par un job (et le résultat à publier)
+
+        À appeler dans la transaction qui insère le document : un job repris
+        après un arrêt ne l'enregistre pas une seconde fois. La référence au
+        contenu tenue par le job passe au document.
+        """
+        with self.connection() as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET document_id = ?, result = ?, content_refs = 0
+                WHERE id = ?
+                """,
+                (document_id, json.dumps(result), job_id),
+            )
+
+    def release_job_content_refs(self, job_id: int, sha256: str, keep: int = 0) -> int:
+        """
+        Rend les références au contenu tenues par un job, sauf ``keep``
+
+        Relance après un arrêt : celles de l'essai interrompu.
+
+        Returns:
+            Nombre de références rendues
+        """
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT content_refs FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None or row[0] <= keep:
+                return 0
+            released = int(row[0]) - keep
+            self._add_blob_refs({sha256: -released})
+            conn.execute(
+                "UPDATE jobs SET content_refs = ? WHERE id = ?", (keep, job_id)
+            )
+            return released
+
+    def update_job_progress(self, job_id: int, progress: float) -> None:
+        """Met à jour l'avancement (0 à 1) d'un job en cours"""
+        with self.connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ? WHERE id = ?",
+                (min(max(progress, 0.0), 1.0), job_id),
+            )
+
+    def complete_job(self, job_id: int, result: dict[str, Any]) -> None:
+        """Marque un job terminé avec son résultat"""
+        with self.connection() as conn:
+            conn.execute(
+                """
+                UPDATE jobs
+                SET status = 'done', progress = 1, result = ?,
+                    finished_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                (json.dumps(result), job_id),
+            )
+
+    def fail_job(self, job_id: int, error: str) -> None:
+        """Marque un job en échec (message destiné à l'utilisateur)"""
+        with self.connection() as conn:
+            conn.execute(
+                """
+                UPDATE jobs
+                SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                (error, job_id),
+            )
+
+    def get_job(self, job_id: int, user_id: int | None = None) -> dict[str, Any] | None:
+        """Récupère un job (limité à un utilisateur si user_id est fourni)"""
+        sql = "SELECT * FROM jobs WHERE id = ?"
+        params: list[Any] = [job_id]
+        if user_id is not None:
+            sql += " AND user_id = ?"
+            params.append(user_id)
+        with self.connection() as conn:
+            row = conn.execute(sql, params).fetchone()
+            return _job_from_row(row) if row else None
+
+    def requeue_interrupted_jobs(self, max_attempts: int = 3) -> int:
+        """
+        Remet en attente les jobs en cours dont le bail a expiré
+
+        Worker arrêté ou processus tué : plus personne ne prolonge le bail.
+        Les jobs d'un worker vivant (d'un autre processus aussi) restent en
+        cours. Un job dont le document est déjà enregistré est terminé ; au-delà
+        de ``max_attempts`` essais, le job passe en échec et rend ses
+        références au contenu stocké.
+
+        Returns:
+            Nombre de jobs remis en attente
+        """
+        expired = """
+            status = 'running'
+            AND (lease_expires_at IS NULL OR lease_expires_at <= datetime('now'))
+        """
+        with self.connection() as conn:
+            conn.execute(
+                f"""
+                UPDATE jobs
+                SET status = 'done', progress = 1, finished_at = CURRENT_TIMESTAMP,
+                    owner = NULL
+                WHERE {expired} AND document_id IS NOT NULL
+                """  # nosec B608
+            )
+            refs: Counter[str] = Counter()
+            for row in conn.execute(
+                f"""
+                SELECT payload, content_refs FROM jobs
+                WHERE {expired} AND attempts >= ? AND content_refs > 0
+                """,  # nosec B608
+                (max_attempts,),
+            ):
+                refs[json.loads(row["payload"])["sha256"]] -= row["content_refs"]
+            if refs:
+                self._add_blob_refs(refs)
+            conn.execute(
+                f"""
+                UPDATE jobs
+                SET status = 'failed', error = 'Traitement interrompu',
+                    finished_at = CURRENT_TIMESTAMP, owner = NULL, content_refs = 0
+                WHERE {expired} AND attempts >= ?
+                """,  # nosec B608
+                (max_attempts,),
+            )
+            cursor = conn.execute(
+                f"""
+                UPDATE jobs SET status = 'queued', progress = 0, owner = NULL
+                WHERE {expired}
+                """  # nosec B608
+            )
+            return cursor.rowcount
+
+    # === STOCKAGE PAR CONTENU ===
+
+    def _add_blob_refs(self, deltas: Mapping[str, int]) -> None:
+        """
+        Ajuste les compteurs de références (base principale)
+
+        Raises:
+            RuntimeError: Si un contenu n'est pas enregistré (rien n'est modifié)
+        """
+        with self.connection() as conn:
+            cursor = conn.executemany(
+                "UPDATE content_blobs SET ref_count = ref_count + ? WHERE sha256 = ?",
+                [(delta, sha) for sha, delta in deltas.items()],
+            )
+            if cursor.rowcount != len(deltas):
+                raise RuntimeError("Contenu stocké absent du registre")
+
+    @staticmethod
+    def _hold_blob_refs(
+        conn: sqlite3.Connection, job_id: int | None, delta: int
+    ) -> None:
+        """Compte les références prises ou rendues par un job (même transaction)"""
+        if job_id is not None:
+            conn.execute(
+                "UPDATE jobs SET content_refs = content_refs + ? WHERE id = ?",
+                (delta, job_id),
+            )
+
+    def add_content_blob(
+        self,
+        sha256: str,
+        file_path: str,
+        file_size: int,
+        info: dict[str, Any],
+        job_id: int | None = None,
+    ) -> int:
+        """
+        Enregistre un fichier stocké par contenu et prend une référence
+
+        ``info`` : résultats de traitement réutilisés par les doublons. Le
+        contenu déjà enregistré (upload concurrent, fichier abîmé remplacé)
+        gagne une référence et prend ce fichier. ``job_id`` : job qui tient
+        la référence.
+
+        Returns:
+            Nombre de références après l'ajout
+        """
+        with self.connection() as conn:
+            row = conn.execute(
+                """
+                INSERT INTO content_blobs (sha256, file_path, file_size, info, ref_count)
+                VALUES (?, ?, ?, ?, 1)
+                ON CONFLICT(sha256) DO UPDATE SET
+                    ref_count = ref_count + 1, file_path = excluded.file_path,
+                    file_size = excluded.file_size, info = excluded.info
+                RETURNING ref_count
+                """,
+                (sha256, file_path, file_size, json.dumps(info)),
+            ).fetchone()
+            self._hold_blob_refs(conn, job_id, 1)
+            return int(row[0])
+
+    def acquire_content_blob(
+        self, sha256: str, job_id: int | None = None
+    ) -> dict[str, Any] | None:
+        """
+        Prend une référence sur un contenu déjà stocké (doublon)
+
+        Atomique : collect_unreferenced_blobs() ne peut plus le retirer.
+        ``job_id`` : job qui tient la référence.
+
+        Returns:
+            Le fichier stocké (info désérialisée), None si inconnu
+        """
+        with self.connection() as conn:
+            row = conn.execute(
+                """
+                UPDATE content_blobs SET ref_count = ref_count + 1
+                WHERE sha256 = ? RETURNING *
+                """,
+                (sha256,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._hold_blob_refs(conn, job_id, 1)
+            return _blob_from_row(row)
+
+    def release_content_blob(self, sha256: str, job_id: int | None = None) -> None:
+        """Rend une référence prise sans document enregistré (échec)"""
+        with self.connection() as conn:
+            self._add_blob_refs({sha256: -1})
+            self._hold_blob_refs(conn, job_id, -1)
+
+    def get_content_blob(self, sha256: str) -> dict[str, Any] | None:
+        """Fichier stocké pour un contenu (info désérialisée)"""
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM content_blobs WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+            return _blob_from_row(row) if row else None
+
+    def collect_unreferenced_blobs(
+        self, sha256s: Iterable[str] | None = None
+    ) -> list[str]:
+        """
+        Retire les fichiers que plus aucun document ne référence
+
+        Limité à ``sha256s`` si fourni. Les fichiers eux-mêmes restent à
+        supprimer par l'appelant.
+
+        Returns:
+            Chemins des fichiers retirés du registre
+        """
+        sql = "DELETE FROM content_blobs WHERE ref_count <= 0"
+        params: list[Any] = []
+        if sha256s is not None:
+            params = list(sha256s)
+            if not params:
+                return []
+            sql += f" AND sha256 IN ({', '.join('?' * len(params))})"
+        with self.connection() as conn:
+            return [
+                row[0]
+                for row in conn.execute(
+                    f"{sql} RETURNING file_path",  # nosec B608
+                    params,
+                )
+            ]
+
+    # === CACHE D'EXTRACTION ===
+
+    def get_extraction(
+        self, sha256: str, kind: str, version: str
+    ) -> dict[str, Any] | None:
+        """Résultat d'extraction en cache (marqué comme utilisé), ou None"""
+        with self.connection() as conn:
+            row = conn.execute(
+                """
+                UPDATE extraction_cache SET hits = hits + 1, last_used_at = ?
+                WHERE sha256 = ? AND kind = ? AND version = ?
+                RETURNING payload
+                """,
+                (
+                    datetime.now().isoformat(timespec="microseconds"),
+                    sha256,
+                    kind,
+                    version,
+                ),
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+
+    def put_extraction(
+        self, sha256: str, kind: str, version: str, payload: dict[str, Any]
+    ) -> int:
+        """
+        Enregistre (ou remplace) un résultat d'extraction
+
+        Returns:
+            Taille de l'entrée en octets (JSON sérialisé)
+        """
+        data = json.dumps(payload, ensure_ascii=False)
+        size = len(data.encode())
+        with self.connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO extraction_cache
+                    (sha256, kind, version, payload, size_bytes, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (sha256, kind, version) DO UPDATE SET
+                    payload = excluded.payload,
+                    size_bytes = excluded.size_bytes,
+                    last_used_at = excluded.last_used_at
+                """,
+                (
+                    sha256,
+                    kind,
+                    version,
+                    data,
+                    size,
+                    datetime.now().isoformat(timespec="microseconds"),
+                ),
+            )
+        return size
+
+    def evict_extractions(self, max_bytes: int) -> int:
+        """
+        Évince les entrées les moins récemment utilisées au-delà de max_bytes
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        with self.connection() as conn:
+            cursor = conn.execute(
+                """
+                DELETE FROM extraction_cache WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, SUM(size_bytes) OVER (
+                            ORDER BY last_used_at DESC
+                        ) AS kept
+                        FROM extraction_cache
+                    )
+                    WHERE kept > ?
+                )
+                """,
+                (max_bytes,),
+            )
+            return cursor.rowcount
+
+    def get_extraction_cache_size(self) -> dict[str, int]:
+        """Nombre d'entrées et taille totale du cache d'extraction"""
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM extraction_cache"
+            ).fetchone()
+            return {"entries": row[0], "bytes": row[1]}
+
     # === GESTION CONSULTATIONS ===
 
     def get_consultations_by_user(
@@ -850,8 +1598,7 @@ class CIADatabase:
         limit: int = 50,
     ) -> list[dict[str, Any]]:
         """Récupère les consultations d'un utilisateur"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.user_connection(user_id) as conn:
             cursor = conn.cursor()
 
             conditions: list[str] = ["user_id = ?"]
@@ -892,7 +1639,7 @@ class CIADatabase:
         is_active: bool = True,
     ) -> int | None:
         """Ajoute un membre famille"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.user_connection(user_id) as conn:
             cursor = conn.cursor()
             try:
                 cursor.execute(
@@ -912,8 +1659,7 @@ class CIADatabase:
         self, user_id: int, skip: int = 0, limit: int | None = None
     ) -> list[dict[str, Any]]:
         """Récupère les membres famille d'un utilisateur"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.user_connection(user_id) as conn:
             cursor = conn.cursor()
             if limit is not None:
                 cursor.execute(
@@ -940,8 +1686,7 @@ class CIADatabase:
         self, user_id: int, member_id: int
     ) -> dict[str, Any] | None:
         """Récupère un membre famille par ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.user_connection(user_id) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -964,7 +1709,7 @@ class CIADatabase:
         is_active: bool | None = None,
     ) -> bool:
         """Met à jour un membre famille"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.user_connection(user_id) as conn:
             cursor = conn.cursor()
             updates: list[str] = []
             params: list[Any] = []
@@ -1001,7 +1746,7 @@ class CIADatabase:
 
     def delete_family_member(self, user_id: int, member_id: int) -> bool:
         """Supprime un membre famille"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.user_connection(user_id) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
@@ -1021,7 +1766,7 @@ class CIADatabase:
         is_encrypted: bool = True,
     ) -> int | None:
         """Partage un document avec un membre famille"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             try:
                 # Vérifier si le partage existe déjà
@@ -1061,66 +1806,50 @@ class CIADatabase:
                 return None
 
     def get_shared_documents(
-        self, user_id: int, skip: int = 0, limit: int | None = None
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int | None = None,
+        page_cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """Récupère les documents partagés par un utilisateur"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        """Récupère les documents partagés par un utilisateur (offset ou curseur)"""
+        params: list[Any] = [user_id]
+        where_clause, tail = _page_clauses(
+            ["user_id = ?"], params, ("shared_at", "id"), skip, limit, page_cursor
+        )
+        with self.connection() as conn:
             cursor = conn.cursor()
-            if limit is not None:
-                cursor.execute(
-                    """
-                    SELECT * FROM shared_documents
-                    WHERE user_id = ?
-                    ORDER BY shared_at DESC
-                    LIMIT ? OFFSET ?
-                    """,
-                    (user_id, limit, skip),
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT * FROM shared_documents
-                    WHERE user_id = ?
-                    ORDER BY shared_at DESC
-                    """,
-                    (user_id,),
-                )
+            cursor.execute(
+                f"SELECT * FROM shared_documents WHERE {where_clause} {tail}",  # nosec B608
+                params,
+            )
             return [dict(row) for row in cursor.fetchall()]
 
     def get_shared_documents_for_member(
-        self, member_email: str, skip: int = 0, limit: int | None = None
+        self,
+        member_email: str,
+        skip: int = 0,
+        limit: int | None = None,
+        page_cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """Récupère les documents partagés avec un membre"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        """Récupère les documents partagés avec un membre (offset ou curseur)"""
+        params: list[Any] = [member_email]
+        where_clause, tail = _page_clauses(
+            ["member_email = ?"], params, ("shared_at", "id"), skip, limit, page_cursor
+        )
+        with self.connection() as conn:
             cursor = conn.cursor()
-            if limit is not None:
-                cursor.execute(
-                    """
-                    SELECT * FROM shared_documents
-                    WHERE member_email = ?
-                    ORDER BY shared_at DESC
-                    LIMIT ? OFFSET ?
-                    """,
-                    (member_email, limit, skip),
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT * FROM shared_documents
-                    WHERE member_email = ?
-                    ORDER BY shared_at DESC
-                    """,
-                    (member_email,),
-                )
+            cursor.execute(
+                f"SELECT * FROM shared_documents WHERE {where_clause} {tail}",  # nosec B608
+                params,
+            )
             return [dict(row) for row in cursor.fetchall()]
 
     def unshare_document(
         self, user_id: int, document_id: str, member_email: str | None = None
     ) -> bool:
         """Retire le partage d'un document"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             if member_email:
                 # Retirer le partage pour un membre spécifique
@@ -0,0 +1,229 @@
+"""
+Pool de connexions SQLite pour Arkalia CIA
+Connexions ouvertes une seule fois (WAL + pragmas réglés) puis réutilisées
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Valeurs autorisées pour les PRAGMA (non paramétrables en SQL)
+_ALLOWED_JOURNAL_MODES = {"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"}
+_ALLOWED_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Aucune connexion disponible dans le délai imparti"""
+
+
+class SQLiteConnectionPool:
+    """
+    Pool de connexions SQLite à checkout
+
+    Chaque connexion est ouverte une seule fois avec les pragmas configurés.
+    Un thread qui détient déjà une connexion la réutilise (appels imbriqués) :
+    seul le niveau le plus externe valide (commit) ou annule (rollback).
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_size: int = 8,
+        timeout: float = 10.0,
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+        cache_size_kb: int = 8192,
+        mmap_size_bytes: int = 0,
+        busy_timeout_ms: int = 5000,
+        connection_factory: type[sqlite3.Connection] = sqlite3.Connection,
+        on_wait: Callable[[float], None] | None = None,
+    ):
+        journal_mode = journal_mode.upper()
+        synchronous = synchronous.upper()
+        if journal_mode not in _ALLOWED_JOURNAL_MODES:
+            raise ValueError(f"journal_mode invalide: {journal_mode}")
+        if synchronous not in _ALLOWED_SYNCHRONOUS:
+            raise ValueError(f"synchronous invalide: {synchronous}")
+        if max_size < 1:
+            raise ValueError("max_size doit être >= 1")
+
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size_kb = int(cache_size_kb)
+        self.mmap_size_bytes = int(mmap_size_bytes)
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self.connection_factory = connection_factory
+        # Appelé (hors verrou) avec la durée d'attente d'une connexion
+        self.on_wait = on_wait
+
+        self._idle: list[sqlite3.Connection] = []
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._local = threading.local()
+
+        # Statistiques (lues par stats())
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+
+    def _open(self) -> sqlite3.Connection:
+        """Ouvre une connexion et applique les pragmas"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            factory=self.connection_factory,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        # Valeur négative = taille en KiB (indépendante de la page_size)
+        conn.execute(f"PRAGMA cache_size={-self.cache_size_kb}")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size_bytes}")
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        """Récupère une connexion libre, en ouvre une ou attend"""
+        start = time.perf_counter()
+        waited = False
+        conn: sqlite3.Connection | None = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Pool de connexions fermé")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._created < self.max_size:
+                    self._created += 1
+                    break
+                waited = True
+                remaining = self.timeout - (time.perf_counter() - start)
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    if not self._idle and self._created >= self.max_size:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            "Aucune connexion SQLite disponible (pool saturé)"
+                        )
+            self._checkouts += 1
+            wait_time = time.perf_counter() - start if waited else 0.0
+            if waited:
+                self._waits += 1
+                self._wait_time_total += wait_time
+
+        if waited and self.on_wait is not None:
+            self.on_wait(wait_time)
+
+        if conn is None:
+            try:
+                conn = self._open()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+        return conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        """Rend une connexion au pool"""
+        with self._cond:
+            if self._closed:
+                self._created -= 1
+                conn.close()
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Context manager transactionnel sur une connexion du pool
+
+        Yields:
+            Connexion SQLite (row_factory = sqlite3.Row)
+        """
+        local = self._local
+        conn: sqlite3.Connection | None = getattr(local, "conn", None)
+        if conn is not None:
+            # Appel imbriqué : même connexion, même transaction
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
+
+        conn = self._acquire()
+        local.conn = conn
+        local.depth = 1
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            try:
+                conn.rollback()
+            except sqlite3.Error as e:
+                logger.warning(f"Rollback SQLite échoué: {e}")
+            raise
+        finally:
+            local.conn = None
+            local.depth = 0
+            self._release(conn)
+
+    @contextmanager
+    def dedicated(self) -> Iterator[sqlite3.Connection]:
+        """
+        Connexion de lecture ouverte hors du pool (lectures en flux)
+
+        Ni partagée par les appels imbriqués du thread, ni comptée dans
+        max_size : les écritures faites pendant la lecture gardent leur
+        propre transaction. Fermée en sortie, sans commit.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Pool de connexions fermé")
+        conn = self._open()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        """Ferme toutes les connexions inactives (les autres au retour)"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn = self._idle.pop()
+                self._created -= 1
+                try:
+                    conn.close()
+                except sqlite3.Error:  # nosec B110
+                    pass
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, Any]:
+        """Retourne les statistiques du pool"""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "max_size": self.max_size,
+                "open": self._created,
+                "idle": idle,
+                "in_use": self._created - idle,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_time_total_seconds": round(self._wait_time_total, 6),
+            }
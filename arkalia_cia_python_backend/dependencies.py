@@ -3,17 +3,32 @@ Dépendances FastAPI pour injection de dépendances
 Remplace les instances globales par injection propre
 """
 
+from collections.abc import Callable
+from concurrent.futures import Executor
 from functools import lru_cache
+from typing import Any, TypeVar
+
+from fastapi import Depends
 
 from arkalia_cia_python_backend.ai.conversational_ai import ConversationalAI
 from arkalia_cia_python_backend.ai.pattern_analyzer import AdvancedPatternAnalyzer
+from arkalia_cia_python_backend.async_database import AsyncCIADatabase
+from arkalia_cia_python_backend.config import get_settings
+from arkalia_cia_python_backend.cpu_pool import CPUBoundPool
 from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.extraction_cache import ExtractionCache
+from arkalia_cia_python_backend.pdf_parser.ocr_engine import OCREngine
+from arkalia_cia_python_backend.pdf_parser.page_text import create_page_pool
 from arkalia_cia_python_backend.pdf_processor import PDFProcessor
 from arkalia_cia_python_backend.services.document_service import DocumentService
+from arkalia_cia_python_backend.services.ingestion_pipeline import IngestionPipeline
+from arkalia_cia_python_backend.services.job_worker import DocumentJobWorker
 from arkalia_cia_python_backend.services.medical_report_service import (
     MedicalReportService,
 )
 
+T = TypeVar("T")
+
 
 @lru_cache
 def get_database() -> CIADatabase:
@@ -21,7 +36,93 @@ def get_database() -> CIADatabase:
     Retourne une instance de CIADatabase
     Utilise lru_cache pour singleton par requête
     """
-    return CIADatabase()
+    return CIADatabase(shard_dir=get_settings().db_shard_dir)
+
+
+def get_async_database(
+    db: CIADatabase = Depends(get_database),
+) -> AsyncCIADatabase:
+    """
+    Retourne la façade asynchrone de CIADatabase
+    Dépend de get_database : les overrides de test s'appliquent aussi ici
+    """
+    return AsyncCIADatabase(db)
+
+
+def flush_database() -> None:
+    """
+    Écrit les logs d'audit en attente (arrêt de l'application)
+    Ne crée pas la base si elle n'a jamais été utilisée
+    """
+    if get_database.cache_info().currsize:
+        get_database().flush_audit_logs()
+
+
+@lru_cache
+def get_cpu_pool() -> CPUBoundPool:
+    """
+    Retourne le pool du travail CPU des endpoints
+    Utilise lru_cache pour singleton par processus
+    """
+    settings = get_settings()
+    return CPUBoundPool(
+        "cpu",
+        max_workers=settings.cpu_pool_workers,
+        max_queue=settings.cpu_pool_max_queue,
+    )
+
+
+async def run_cpu_bound(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Exécute un traitement CPU (parsing PDF, export de rapport) hors event loop
+
+    Exemple : ``result = await run_cpu_bound(parser.parse_portal_pdf, path, portal)``
+    """
+    return await get_cpu_pool().run(func, *args, **kwargs)
+
+
+@lru_cache
+def get_extraction_cache() -> ExtractionCache:
+    """
+    Retourne le cache persistant des extractions PDF
+    Utilise lru_cache pour singleton par processus
+    """
+    max_bytes = get_settings().extraction_cache_max_mb * 1024 * 1024
+    return ExtractionCache(get_database(), max_bytes=max_bytes)
+
+
+@lru_cache
+def get_page_pool() -> Executor | None:
+    """
+    Retourne le pool de processus d'extraction des pages, texte et OCR
+    (None si désactivé)
+    Utilise lru_cache pour singleton par processus
+    """
+    workers = get_settings().pdf_page_workers
+    return create_page_pool(workers) if workers > 0 else None
+
+
+def stop_page_pool() -> None:
+    """Arrête le pool d'extraction des pages s'il a été créé"""
+    if get_page_pool.cache_info().currsize:
+        pool = get_page_pool()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+@lru_cache
+def get_ocr_engine() -> OCREngine:
+    """
+    Retourne le moteur OCR en flux (pages réparties sur le pool des pages)
+    Utilise lru_cache pour singleton par processus
+    """
+    settings = get_settings()
+    return OCREngine(
+        get_page_pool(),
+        pages_in_flight=settings.ocr_pages_in_flight,
+        fast_dpi=settings.ocr_fast_dpi,
+        min_confidence=settings.ocr_min_confidence,
+    )
 
 
 @lru_cache
@@ -30,7 +131,12 @@ def get_pdf_processor() -> PDFProcessor:
     Retourne une instance de PDFProcessor
     Utilise lru_cache pour singleton par requête
     """
-    return PDFProcessor()
+    return PDFProcessor(
+        extraction_cache=get_extraction_cache(),
+        page_pool=get_page_pool(),
+        parallel_min_pages=get_settings().pdf_parallel_min_pages,
+        ocr_engine=get_ocr_engine(),
+    )
 
 
 @lru_cache
@@ -63,6 +169,42 @@ def get_document_service() -> DocumentService:
     )
 
 
+@lru_cache
+def get_ingestion_pipeline() -> IngestionPipeline:
+    """
+    Retourne le pipeline d'ingestion des uploads (PDF analysé une fois)
+    Utilise lru_cache pour singleton par processus
+    """
+    return IngestionPipeline(get_document_service())
+
+
+@lru_cache
+def get_job_worker() -> DocumentJobWorker:
+    """
+    Retourne le pool de workers des jobs de documents
+    Utilise lru_cache pour singleton par processus
+    """
+    settings = get_settings()
+    return DocumentJobWorker(
+        get_document_service(),
+        workers=settings.document_job_workers,
+        poll_interval=settings.document_job_poll_seconds,
+        pipeline=get_ingestion_pipeline(),
+        lease_seconds=settings.document_job_lease_seconds,
+    )
+
+
+def start_job_worker() -> None:
+    """Démarre les workers (reprise des jobs en attente au démarrage)"""
+    get_job_worker().start()
+
+
+def stop_job_worker() -> None:
+    """Arrête les workers s'ils ont été créés"""
+    if get_job_worker.cache_info().currsize:
+        get_job_worker().stop()
+
+
 @lru_cache
 def get_medical_report_service() -> MedicalReportService:
     """
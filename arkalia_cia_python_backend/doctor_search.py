@@ -0,0 +1,130 @@
+"""
+Recherche approximative des noms de médecins (index trigrammes en mémoire)
+Insensible à la casse, aux accents et aux fautes de frappe
+"""
+
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any
+
+from arkalia_cia_python_backend.db_pool import SQLiteConnectionPool
+
+# Similarité minimale (même seuil par défaut que pg_trgm)
+DEFAULT_THRESHOLD = 0.3
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# (noms, noms normalisés, nb de trigrammes par nom, listes inversées)
+_Snapshot = tuple[list[str], list[str], list[int], dict[str, list[int]]]
+
+
+def fold_name(name: str) -> str:
+    """Minuscules, sans accents ni ponctuation, espaces normalisés"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_name = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", ascii_name.lower()).strip()
+
+
+def trigrams(folded: str) -> set[str]:
+    """Trigrammes de chaque mot, complété par deux espaces avant et un après"""
+    grams: set[str] = set()
+    for word in folded.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class DoctorNameIndex:
+    """
+    Index trigrammes des noms distincts de la table doctor_names
+
+    doctor_names est tenue à jour par triggers (document_metadata et doctors).
+    Chaque recherche relit le compteur doctor_names_version (lecture par clé
+    primaire) ; l'index n'est reconstruit que si la liste des noms a changé.
+    """
+
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._version = -1
+        # Remplacé d'un bloc à chaque reconstruction
+        self._snapshot: _Snapshot = ([], [], [], {})
+
+    def _refresh(self) -> None:
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT version FROM doctor_names_version WHERE id = 1"
+            ).fetchone()
+            version = int(row[0]) if row else 0
+            if version == self._version:
+                return
+            with self._lock:
+                if version == self._version:
+                    return
+                names = [r[0] for r in conn.execute("SELECT name FROM doctor_names")]
+                self._rebuild(names)
+                self._version = version
+
+    def _rebuild(self, names: list[str]) -> None:
+        folded = [fold_name(name) for name in names]
+        postings: dict[str, list[int]] = {}
+        sizes = []
+        for idx, value in enumerate(folded):
+            grams = trigrams(value)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(idx)
+        self._snapshot = (names, folded, sizes, postings)
+
+    def search(
+        self, query: str, limit: int = 10, threshold: float = DEFAULT_THRESHOLD
+    ) -> list[dict[str, Any]]:
+        """
+        Noms classés par pertinence
+
+        Les noms contenant la requête passent en premier, puis par
+        similarité trigrammes décroissante (Jaccard, entre 0 et 1).
+        """
+        self._refresh()
+        folded_query = fold_name(query)
+        query_grams = trigrams(folded_query)
+        if not query_grams:
+            return []
+
+        names, folded, sizes, postings = self._snapshot
+        common: Counter[int] = Counter()
+        for gram in query_grams:
+            common.update(postings.get(gram, ()))
+
+        scored = []
+        for idx, shared in common.items():
+            score = shared / (len(query_grams) + sizes[idx] - shared)
+            contains = folded_query in folded[idx]
+            if contains or score >= threshold:
+                scored.append((not contains, -score, names[idx], score))
+        scored.sort()
+        return [
+            {"name": name, "score": round(score, 3)}
+            for _, _, name, score in scored[:limit]
+        ]
+
+    def matching(self, query: str) -> list[str]:
+        """Noms contenant la requête (sans tenir compte de la casse ni des accents)"""
+        self._refresh()
+        folded_query = fold_name(query)
+        if not folded_query:
+            return []
+        names, folded, _, postings = self._snapshot
+        grams = trigrams(folded_query)
+        # Les trigrammes internes de chaque mot (hors bordures) sont présents
+        # dans tout nom qui contient la requête : ils réduisent les candidats
+        inner = [g for g in grams if " " not in g]
+        if inner:
+            candidates: set[int] = set(postings.get(inner[0], ()))
+            for gram in inner[1:]:
+                candidates.intersection_update(postings.get(gram, ()))
+        else:
+            candidates = set(range(len(names)))
+        return sorted(names[idx] for idx in candidates if folded_query in folded[idx])
@@ -0,0 +1,124 @@
+"""
+Cache persistant des extractions PDF (texte des pages, OCR, métadonnées)
+Clé : SHA-256 du contenu, type d'extraction et version de l'extracteur
+"""
+
+import logging
+import sqlite3
+import threading
+from typing import Any
+
+from arkalia_cia_python_backend.database import CIADatabase
+
+logger = logging.getLogger(__name__)
+
+# Types d'extraction
+TEXT = "text"
+OCR = "ocr"
+METADATA = "metadata"
+
+# Une éviction redescend à 90 % de max_bytes : pas d'éviction à chaque écriture
+# une fois le cache plein
+EVICTION_LOW_WATER = 0.9
+
+
+class ExtractionCache:
+    """
+    Résultats d'extraction réutilisés d'un traitement à l'autre
+
+    Un fichier réimporté, un job relancé après échec ou un extracteur de
+    métadonnées mis à jour relisent le texte et l'OCR déjà calculés. Un
+    changement de version de l'extracteur change la clé : les anciennes
+    entrées ne sont plus lues et sortent par éviction. Au-delà de
+    ``max_bytes``, les entrées les moins récemment utilisées sont supprimées
+    jusqu'à ``EVICTION_LOW_WATER * max_bytes``.
+
+    La taille totale est suivie en mémoire (lue une fois, puis augmentée à
+    chaque écriture, relue après une éviction) : l'éviction, qui parcourt
+    toute la table, ne s'exécute qu'au-delà de la limite. Un remplacement
+    compte comme un ajout, l'estimation est donc un majorant.
+
+    Une erreur SQLite n'interrompt jamais une extraction : elle est
+    journalisée et traitée comme une absence en cache.
+    """
+
+    def __init__(self, db: CIADatabase, max_bytes: int = 256 * 1024 * 1024):
+        self.db = db
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._errors = 0
+        self._bytes: int | None = None  # Taille estimée (None : pas encore lue)
+
+    def get(self, sha256: str, kind: str, version: str) -> dict[str, Any] | None:
+        """Résultat en cache, ou None"""
+        try:
+            payload = self.db.get_extraction(sha256, kind, version)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache d'extraction illisible: {e}")
+            with self._lock:
+                self._errors += 1
+            return None
+        with self._lock:
+            if payload is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return payload
+
+    def put(
+        self, sha256: str, kind: str, version: str, payload: dict[str, Any]
+    ) -> None:
+        """Enregistre un résultat, puis évince si max_bytes est dépassé"""
+        try:
+            size = self.db.put_extraction(sha256, kind, version, payload)
+            with self._lock:
+                if self._bytes is not None:
+                    self._bytes += size
+                total = self._bytes
+            measured = total is None
+            if total is None:
+                # Première écriture : taille réelle (écriture comprise)
+                total = self.db.get_extraction_cache_size()["bytes"]
+            evicted = 0
+            if total > self.max_bytes:
+                evicted = self.db.evict_extractions(
+                    int(self.max_bytes * EVICTION_LOW_WATER)
+                )
+                total = self.db.get_extraction_cache_size()["bytes"]
+                measured = True
+        except sqlite3.Error as e:
+            logger.warning(f"Écriture du cache d'extraction impossible: {e}")
+            with self._lock:
+                self._errors += 1
+                self._bytes = None  # Relue à la prochaine écriture
+            return
+        with self._lock:
+            if measured:
+                self._bytes = total
+            self._stores += 1
+            self._evictions += evicted
+
+    def stats(self) -> dict[str, Any]:
+        """Compteurs (succès, absences, évictions) et taille du cache"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            stats: dict[str, Any] = {
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "errors": self._errors,
+            }
+        try:
+            size = self.db.get_extraction_cache_size()
+        except sqlite3.Error:
+            return stats
+        stats["entries"] = size["entries"]
+        stats["bytes"] = size["bytes"]
+        return stats
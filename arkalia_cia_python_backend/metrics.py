@@ -0,0 +1,354 @@
+"""
+Métriques Prometheus du processus (format texte 0.0.4)
+Compteurs, jauges et histogrammes minimaux, sans dépendance externe
+"""
+
+import bisect
+import math
+import threading
+from collections.abc import Iterable, Mapping
+from typing import Any, TypeVar
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bornes par défaut des histogrammes de latence HTTP (secondes)
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [
+        f'{name}="{_escape(str(value))}"'
+        for name, value in zip(names, values, strict=True)
+    ]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_family(
+    name: str,
+    kind: str,
+    help_text: str,
+    samples: Iterable[tuple[Mapping[str, Any], float]],
+) -> str:
+    """
+    Bloc texte d'une famille de métriques calculée au moment du scrape
+
+    ``samples`` : (labels, valeur) ; pour un histogramme, les noms de
+    séries (_bucket, _sum, _count) sont portés par le label ``__name__``.
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        series = labels.get("__name__", name)
+        names = [key for key in labels if key != "__name__"]
+        label_text = _format_labels(names, (labels[key] for key in names))
+        lines.append(f"{series}{label_text} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class _Metric:
+    """Base : nom, aide, labels et verrou"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, label_names: Labels = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def _check(self, labels: Labels) -> None:
+        if len(labels) != len(self.label_names):
+            raise ValueError(
+                f"{self.name}: labels attendus {self.label_names}, reçus {labels}"
+            )
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> str:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+
+M = TypeVar("M", bound=_Metric)
+
+
+class Counter(_Metric):
+    """Compteur monotone"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Labels = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        if amount < 0:
+            raise ValueError("Un compteur ne peut pas diminuer")
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> str:
+        lines = self._header()
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.label_names:
+            items = [((), 0.0)]
+        for labels, value in items:
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}{label_text} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    """Valeur instantanée (peut diminuer)"""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        self.inc(-amount, labels)
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Histogramme à bornes fixes (séries _bucket cumulatives, _sum, _count)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (compteurs par borne + dépassement, somme)
+        self._values: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        self._check(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def count(self, labels: Labels = ()) -> int:
+        with self._lock:
+            entry = self._values.get(labels)
+            return sum(entry[0]) if entry else 0
+
+    def render(self) -> str:
+        lines = self._header()
+        with self._lock:
+            items = sorted(
+                (labels, list(counts), total[0])
+                for labels, (counts, total) in self._values.items()
+            )
+        bucket_names = (*self.label_names, "le")
+        for labels, counts, total in items:
+            running = 0
+            for bound, count in zip(self.buckets, counts, strict=False):
+                running += count
+                label_text = _format_labels(
+                    bucket_names, (*labels, _format_value(bound))
+                )
+                lines.append(f"{self.name}_bucket{label_text} {running}")
+            running += counts[-1]
+            label_text = _format_labels(bucket_names, (*labels, "+Inf"))
+            lines.append(f"{self.name}_bucket{label_text} {running}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {running}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """Ensemble de métriques rendues ensemble"""
+
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self._metrics)
+
+    def reset(self) -> None:
+        for metric in self._metrics:
+            metric.reset()
+
+
+# Registre du processus
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(
+    Counter(
+        "cia_http_requests_total",
+        "Requêtes HTTP traitées",
+        ("method", "route", "status"),
+    )
+)
+http_request_duration_seconds = registry.register(
+    Histogram(
+        "cia_http_request_duration_seconds",
+        "Durée des requêtes HTTP par route et code de statut",
+        ("method", "route", "status"),
+    )
+)
+http_requests_in_flight = registry.register(
+    Gauge("cia_http_requests_in_flight", "Requêtes HTTP en cours")
+)
+rate_limit_rejections_total = registry.register(
+    Counter(
+        "cia_rate_limit_rejections_total",
+        "Requêtes refusées par le rate limiter (429)",
+        ("route",),
+    )
+)
+upload_bytes_total = registry.register(
+    Counter("cia_upload_bytes_total", "Octets reçus par upload de documents")
+)
+ocr_pages_total = registry.register(
+    Counter("cia_ocr_pages_processed_total", "Pages traitées par OCR")
+)
+ocr_pages_reprocessed_total = registry.register(
+    Counter(
+        "cia_ocr_pages_reprocessed_total",
+        "Pages refaites en pleine résolution après une passe OCR rapide",
+    )
+)
+
+
+def format_stats(prefix: str, help_text: str, stats: Mapping[str, Any]) -> str:
+    """
+    Jauges à partir d'un dict de statistiques (``stats()`` d'un composant)
+
+    Une famille par clé numérique : ``<prefix>_<clé>``.
+    """
+    return "".join(
+        format_family(f"{prefix}_{key}", "gauge", f"{help_text} ({key})", [({}, value)])
+        for key, value in stats.items()
+        if isinstance(value, int | float) and not isinstance(value, bool)
+    )
+
+
+def format_query_metrics(snapshot: Mapping[str, Any]) -> str:
+    """Mesures par méthode de CIADatabase (query_metrics.snapshot())"""
+    methods = snapshot.get("methods", {})
+    histogram: list[tuple[Mapping[str, Any], float]] = []
+    for method, stats in methods.items():
+        for bound, count in stats["histogram"].items():
+            histogram.append(
+                (
+                    {
+                        "__name__": "cia_db_method_duration_seconds_bucket",
+                        "method": method,
+                        "le": bound,
+                    },
+                    count,
+                )
+            )
+        histogram.append(
+            (
+                {"__name__": "cia_db_method_duration_seconds_sum", "method": method},
+                stats["total_seconds"],
+            )
+        )
+        histogram.append(
+            (
+                {"__name__": "cia_db_method_duration_seconds_count", "method": method},
+                stats["calls"],
+            )
+        )
+    parts = [
+        format_family(
+            "cia_db_method_duration_seconds",
+            "histogram",
+            "Durée des méthodes de CIADatabase",
+            histogram,
+        )
+    ]
+    for key, name, help_text in (
+        ("errors", "cia_db_method_errors_total", "Appels en erreur"),
+        ("statements", "cia_db_statements_total", "Requêtes SQL exécutées"),
+        ("rows_read", "cia_db_rows_read_total", "Lignes renvoyées"),
+        ("rows_written", "cia_db_rows_written_total", "Lignes modifiées"),
+        (
+            "connection_wait_seconds",
+            "cia_db_connection_wait_seconds_total",
+            "Attente d'une connexion du pool",
+        ),
+    ):
+        parts.append(
+            format_family(
+                name,
+                "counter",
+                help_text,
+                [({"method": method}, stats[key]) for method, stats in methods.items()],
+            )
+        )
+    parts.append(
+        format_family(
+            "cia_db_slow_queries_total",
+            "counter",
+            "Requêtes au-delà du seuil de lenteur",
+            [({}, snapshot.get("slow_queries", 0))],
+        )
+    )
+    return "".join(parts)
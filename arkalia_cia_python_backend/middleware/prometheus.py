@@ -0,0 +1,56 @@
+"""
+Middleware ASGI de collecte des métriques HTTP
+ASGI pur (pas de BaseHTTPMiddleware) : ni copie du corps ni tâche en plus
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from arkalia_cia_python_backend.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+)
+
+# Label des requêtes sans route : évite une série par URL inconnue
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope: Scope) -> str:
+    """Chemin déclaré de la route (``/api/v1/documents/{doc_id}``), pas l'URL"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if isinstance(path, str) else UNMATCHED_ROUTE
+
+
+class PrometheusMiddleware:
+    """Compte les requêtes HTTP et mesure leur durée par route et statut"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            labels = (scope["method"], route_template(scope), str(status_code))
+            http_requests_total.inc(labels=labels)
+            http_request_duration_seconds.observe(
+                time.perf_counter() - start, labels=labels
+            )
@@ -17,8 +17,13 @@ class RequestSizeValidatorMiddleware(BaseHTTPMiddleware):
     """Middleware pour valider la taille réelle des requêtes JSON"""
 
     async def dispatch(self, request: Request, call_next):
-        # Vérifier uniquement pour les requêtes POST/PUT/PATCH avec body
-        if request.method in ("POST", "PUT", "PATCH"):
+        # Vérifier uniquement pour les requêtes POST/PUT/PATCH avec body.
+        # Les uploads multipart ne sont pas lus ici : leur taille est contrôlée
+        # pendant la réception par morceaux (utils/upload_stream.py)
+        content_type = request.headers.get("content-type", "")
+        if request.method in ("POST", "PUT", "PATCH") and not content_type.startswith(
+            "multipart/form-data"
+        ):
             # Lire le body pour vérifier la taille réelle
             body = await request.body()
             settings = get_settings()
@@ -0,0 +1,847 @@
+"""
+Migrations du schéma SQLite d'Arkalia CIA
+Versionnées par PRAGMA user_version : chaque migration n'est appliquée qu'une fois
+"""
+
+import logging
+import sqlite3
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def _001_base_schema(cursor: sqlite3.Cursor) -> None:
+    """Tables et index initiaux (IF NOT EXISTS : adopte les bases existantes)"""
+    # Table des documents
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            original_name TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            file_type TEXT NOT NULL,
+            file_size INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+    # Table des rappels
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            reminder_date TIMESTAMP NOT NULL,
+            is_completed BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+    # Table des contacts d'urgence
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS emergency_contacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            relationship TEXT,
+            is_primary BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+    # Table des portails santé
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS health_portals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            url TEXT NOT NULL,
+            description TEXT,
+            category TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+    # Table des médecins (pour consultations)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS doctors (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            specialty TEXT,
+            phone TEXT,
+            email TEXT,
+            address TEXT,
+            city TEXT,
+            postal_code TEXT,
+            country TEXT DEFAULT 'Belgique',
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+    # Table des consultations
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS consultations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            doctor_id INTEGER NOT NULL,
+            user_id INTEGER,
+            date TEXT NOT NULL,
+            reason TEXT,
+            notes TEXT,
+            documents TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (doctor_id) REFERENCES doctors(id) ON DELETE CASCADE,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """
+    )
+
+    # Table des métadonnées documents
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS document_metadata (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            document_id INTEGER NOT NULL,
+            doctor_name TEXT,
+            doctor_specialty TEXT,
+            document_date TEXT,
+            exam_type TEXT,
+            document_type TEXT,
+            keywords TEXT,
+            extracted_text TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (document_id) REFERENCES documents(id) ON DELETE CASCADE
+        )
+    """
+    )
+
+    # Table des conversations IA
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ai_conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            question_type TEXT,
+            related_documents TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+    # Table des utilisateurs
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            email TEXT,
+            password_hash TEXT NOT NULL,
+            role TEXT DEFAULT 'user',
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+    # Table pour associer les données aux utilisateurs
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            document_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (document_id) REFERENCES documents(id)
+                ON DELETE CASCADE,
+            UNIQUE(user_id, document_id)
+        )
+    """
+    )
+
+    # Table pour blacklist des tokens JWT révoqués
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS token_blacklist (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token_jti TEXT NOT NULL UNIQUE,
+            user_id INTEGER NOT NULL,
+            token_type TEXT NOT NULL,
+            expires_at TIMESTAMP NOT NULL,
+            revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            reason TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """
+    )
+
+    # Index pour recherche rapide
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_token_blacklist_jti ON token_blacklist(token_jti)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_token_blacklist_user ON token_blacklist(user_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_token_blacklist_expires ON token_blacklist(expires_at)"
+    )
+
+    # Table pour audit log des accès
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS audit_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            action TEXT NOT NULL,
+            resource_type TEXT NOT NULL,
+            resource_id TEXT,
+            ip_address TEXT,
+            user_agent TEXT,
+            success BOOLEAN DEFAULT TRUE,
+            error_message TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+        )
+    """
+    )
+
+    # Index pour audit log
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_audit_logs_user ON audit_logs(user_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_audit_logs_action ON audit_logs(action)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_audit_logs_created ON audit_logs(created_at)"
+    )
+
+    # Table des membres famille
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS family_members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            phone TEXT,
+            relationship TEXT,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """
+    )
+
+    # Table des documents partagés
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS shared_documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            document_id TEXT NOT NULL,
+            member_email TEXT NOT NULL,
+            permission_level TEXT DEFAULT 'view',
+            is_encrypted BOOLEAN DEFAULT TRUE,
+            shared_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """
+    )
+
+    # Index pour partage familial
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_family_members_user ON family_members(user_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_family_members_email ON family_members(email)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_shared_documents_user ON shared_documents(user_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_shared_documents_doc ON shared_documents(document_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_shared_documents_member ON shared_documents(member_email)"
+    )
+
+
+def _002_keyset_indexes(cursor: sqlite3.Cursor) -> None:
+    """Index composites pour la pagination keyset (horodatage, id)"""
+    for index_sql in (
+        "CREATE INDEX IF NOT EXISTS idx_documents_created_id "
+        "ON documents(created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_ai_conversations_created_id "
+        "ON ai_conversations(created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_audit_logs_created_id "
+        "ON audit_logs(created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_audit_logs_user_created_id "
+        "ON audit_logs(user_id, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_shared_documents_user_shared_id "
+        "ON shared_documents(user_id, shared_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_shared_documents_member_shared_id "
+        "ON shared_documents(member_email, shared_at, id)",
+    ):
+        cursor.execute(index_sql)
+
+
+def _003_document_metadata_fts(cursor: sqlite3.Cursor) -> None:
+    """
+    Index plein texte FTS5 des métadonnées et ses triggers
+
+    Table à contenu externe : le texte n'est pas dupliqué, les triggers
+    tiennent l'index à jour à chaque écriture dans document_metadata.
+    """
+    try:
+        cursor.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS document_metadata_fts USING fts5(
+                doctor_name, keywords, extracted_text,
+                content='document_metadata',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """
+        )
+    except sqlite3.OperationalError as e:
+        logger.warning(f"FTS5 indisponible, recherche par LIKE: {e}")
+        return
+
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS document_metadata_fts_ai
+        AFTER INSERT ON document_metadata BEGIN
+            INSERT INTO document_metadata_fts(
+                rowid, doctor_name, keywords, extracted_text
+            )
+            VALUES (new.id, new.doctor_name, new.keywords, new.extracted_text);
+        END
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS document_metadata_fts_ad
+        AFTER DELETE ON document_metadata BEGIN
+            INSERT INTO document_metadata_fts(
+                document_metadata_fts, rowid, doctor_name, keywords, extracted_text
+            )
+            VALUES (
+                'delete', old.id, old.doctor_name, old.keywords, old.extracted_text
+            );
+        END
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS document_metadata_fts_au
+        AFTER UPDATE ON document_metadata BEGIN
+            INSERT INTO document_metadata_fts(
+                document_metadata_fts, rowid, doctor_name, keywords, extracted_text
+            )
+            VALUES (
+                'delete', old.id, old.doctor_name, old.keywords, old.extracted_text
+            );
+            INSERT INTO document_metadata_fts(
+                rowid, doctor_name, keywords, extracted_text
+            )
+            VALUES (new.id, new.doctor_name, new.keywords, new.extracted_text);
+        END
+    """
+    )
+    # Indexer les métadonnées existantes
+    cursor.execute(
+        "INSERT INTO document_metadata_fts(document_metadata_fts) VALUES ('rebuild')"
+    )
+
+
+def _004_pain_entries(cursor: sqlite3.Cursor) -> None:
+    """Table locale des entrées douleur (intégration ARIA)"""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pain_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            intensity INTEGER NOT NULL,
+            physical_trigger TEXT,
+            mental_trigger TEXT,
+            activity TEXT,
+            location TEXT,
+            action_taken TEXT,
+            effectiveness INTEGER,
+            notes TEXT,
+            who_present TEXT,
+            interactions TEXT,
+            emotions TEXT,
+            thoughts TEXT,
+            physical_symptoms TEXT,
+            timestamp TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+
+
+def _005_token_blacklist_version(cursor: sqlite3.Cursor) -> None:
+    """Compteur de version de la blacklist (invalidation des caches par worker)"""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS token_blacklist_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        """
+    )
+    cursor.execute(
+        "INSERT OR IGNORE INTO token_blacklist_version (id, version) VALUES (1, 0)"
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS token_blacklist_version_ai
+        AFTER INSERT ON token_blacklist BEGIN
+            UPDATE token_blacklist_version SET version = version + 1 WHERE id = 1;
+        END
+        """
+    )
+
+
+def _006_query_indexes(cursor: sqlite3.Cursor) -> None:
+    """
+    Index des requêtes fréquentes et des clés étrangères en cascade
+
+    Vérifiés par tests/unit/test_query_plans.py (EXPLAIN QUERY PLAN).
+    """
+    for index_sql in (
+        # Jointures et ON DELETE CASCADE depuis documents
+        "CREATE INDEX IF NOT EXISTS idx_user_documents_document "
+        "ON user_documents(document_id)",
+        "CREATE INDEX IF NOT EXISTS idx_document_metadata_document "
+        "ON document_metadata(document_id)",
+        # Consultations d'un utilisateur par date
+        "CREATE INDEX IF NOT EXISTS idx_consultations_user_date "
+        "ON consultations(user_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_consultations_doctor "
+        "ON consultations(doctor_id)",
+        # Journal douleur trié par horodatage
+        "CREATE INDEX IF NOT EXISTS idx_pain_entries_timestamp "
+        "ON pain_entries(timestamp)",
+        # Audit filtré par action, pagination keyset
+        "CREATE INDEX IF NOT EXISTS idx_audit_logs_action_created_id "
+        "ON audit_logs(action, created_at, id)",
+        # Recherche d'un partage existant
+        "CREATE INDEX IF NOT EXISTS idx_shared_documents_user_doc_member "
+        "ON shared_documents(user_id, document_id, member_email)",
+    ):
+        cursor.execute(index_sql)
+
+
+def _007_doctor_names(cursor: sqlite3.Cursor) -> None:
+    """
+    Noms de médecins distincts (document_metadata et doctors)
+
+    Alimente l'index trigrammes de doctor_search.py. Les triggers tiennent un
+    compteur de références par nom et incrémentent doctor_names_version
+    quand la liste des noms change.
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS doctor_names (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            ref_count INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS doctor_names_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        """
+    )
+    cursor.execute(
+        "INSERT OR IGNORE INTO doctor_names_version (id, version) VALUES (1, 0)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_document_metadata_doctor_name "
+        "ON document_metadata(doctor_name)"
+    )
+    for event in ("INSERT", "DELETE"):
+        cursor.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS doctor_names_version_{event[0].lower()}
+            AFTER {event} ON doctor_names BEGIN
+                UPDATE doctor_names_version SET version = version + 1 WHERE id = 1;
+            END
+            """
+        )
+
+    # (table source, expression du nom pour NEW/OLD, colonnes surveillées)
+    sources = (
+        ("document_metadata", "{row}.doctor_name", "doctor_name"),
+        (
+            "doctors",
+            "{row}.first_name || ' ' || {row}.last_name",
+            "first_name, last_name",
+        ),
+    )
+    for table, expression, columns in sources:
+        new_name = expression.format(row="new")
+        old_name = expression.format(row="old")
+        add_ref = f"""
+            INSERT INTO doctor_names (name, ref_count)
+            SELECT {new_name}, 1 WHERE trim(coalesce({new_name}, '')) != ''
+            ON CONFLICT(name) DO UPDATE SET ref_count = ref_count + 1;
+        """
+        drop_ref = f"""
+            UPDATE doctor_names SET ref_count = ref_count - 1
+            WHERE name = {old_name};
+            DELETE FROM doctor_names
+            WHERE name = {old_name} AND ref_count <= 0;
+        """
+        cursor.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_doctor_names_ai
+            AFTER INSERT ON {table} BEGIN {add_ref} END
+            """
+        )
+        cursor.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_doctor_names_ad
+            AFTER DELETE ON {table} BEGIN {drop_ref} END
+            """
+        )
+        cursor.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_doctor_names_au
+            AFTER UPDATE OF {columns} ON {table}
+            WHEN {old_name} IS NOT {new_name}
+            BEGIN {drop_ref} {add_ref} END
+            """
+        )
+
+    # Noms déjà présents
+    cursor.execute(
+        """
+        INSERT OR IGNORE INTO doctor_names (name, ref_count)
+        SELECT name, COUNT(*) FROM (
+            SELECT doctor_name AS name FROM document_metadata
+            UNION ALL
+            SELECT first_name || ' ' || last_name FROM doctors
+        )
+        WHERE trim(coalesce(name, '')) != ''
+        GROUP BY name
+        """
+    )
+
+
+def _008_user_stats(cursor: sqlite3.Cursor) -> None:
+    """
+    Compteurs par utilisateur (user_stats) tenus à jour par triggers
+
+    Les écrans de synthèse lisent une ligne au lieu d'agréger user_documents,
+    shared_documents, etc. ai_conversations reçoit une colonne user_id pour
+    pouvoir être comptée. La suppression d'un document retire aussi ses
+    associations (les clés étrangères ne sont pas appliquées).
+    """
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(ai_conversations)")}
+    if "user_id" not in columns:
+        cursor.execute("ALTER TABLE ai_conversations ADD COLUMN user_id INTEGER")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_ai_conversations_user "
+        "ON ai_conversations(user_id)"
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id INTEGER PRIMARY KEY,
+            document_count INTEGER NOT NULL DEFAULT 0,
+            last_upload_at TIMESTAMP,
+            conversation_count INTEGER NOT NULL DEFAULT 0,
+            share_count INTEGER NOT NULL DEFAULT 0,
+            family_member_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+    # Date du dernier dépôt : recalculée quand une association disparaît
+    last_upload_insert = (
+        ", last_upload_at = max(coalesce(last_upload_at, ''), new.created_at)"
+    )
+    last_upload_delete = (
+        ", last_upload_at = (SELECT MAX(created_at) FROM user_documents"
+        " WHERE user_id = old.user_id)"
+    )
+    # (table source, compteur, condition WHEN, SET en plus à l'ajout / au retrait)
+    counters = (
+        (
+            "user_documents",
+            "document_count",
+            "",
+            last_upload_insert,
+            last_upload_delete,
+        ),
+        ("ai_conversations", "conversation_count", "{row}.user_id IS NOT NULL", "", ""),
+        ("shared_documents", "share_count", "", "", ""),
+        ("family_members", "family_member_count", "", "", ""),
+    )
+    for table, counter, condition, on_insert, on_delete in counters:
+        when_new = f"WHEN {condition.format(row='new')}" if condition else ""
+        when_old = f"WHEN {condition.format(row='old')}" if condition else ""
+        cursor.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_user_stats_ai
+            AFTER INSERT ON {table} {when_new} BEGIN
+                INSERT INTO user_stats (user_id) VALUES (new.user_id)
+                ON CONFLICT(user_id) DO NOTHING;
+                UPDATE user_stats SET {counter} = {counter} + 1{on_insert},
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = new.user_id;
+            END
+            """
+        )
+        cursor.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_user_stats_ad
+            AFTER DELETE ON {table} {when_old} BEGIN
+                UPDATE user_stats SET {counter} = max({counter} - 1, 0){on_delete},
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = old.user_id;
+            END
+            """
+        )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS documents_user_documents_ad
+        AFTER DELETE ON documents BEGIN
+            DELETE FROM user_documents WHERE document_id = old.id;
+        END
+        """
+    )
+
+    # Données existantes (associations orphelines exclues)
+    cursor.execute(
+        "DELETE FROM user_documents WHERE document_id NOT IN (SELECT id FROM documents)"
+    )
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO user_stats (
+            user_id, document_count, last_upload_at, conversation_count,
+            share_count, family_member_count
+        )
+        SELECT user_id, SUM(documents), MAX(last_upload), SUM(conversations),
+               SUM(shares), SUM(members)
+        FROM (
+            SELECT user_id, COUNT(*) AS documents, MAX(created_at) AS last_upload,
+                   0 AS conversations, 0 AS shares, 0 AS members
+            FROM user_documents GROUP BY user_id
+            UNION ALL
+            SELECT user_id, 0, NULL, COUNT(*), 0, 0
+            FROM ai_conversations WHERE user_id IS NOT NULL GROUP BY user_id
+            UNION ALL
+            SELECT user_id, 0, NULL, 0, COUNT(*), 0
+            FROM shared_documents GROUP BY user_id
+            UNION ALL
+            SELECT user_id, 0, NULL, 0, 0, COUNT(*)
+            FROM family_members GROUP BY user_id
+        )
+        GROUP BY user_id
+        """
+    )
+
+
+def _009_jobs(cursor: sqlite3.Cursor) -> None:
+    """
+    File de jobs persistante (traitement des documents hors requête)
+
+    Toujours dans la base principale : les workers y prennent les jobs de
+    tous les utilisateurs.
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            progress REAL NOT NULL DEFAULT 0,
+            payload TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+        """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs(user_id, created_at)"
+    )
+
+
+def _010_content_blobs(cursor: sqlite3.Cursor) -> None:
+    """
+    Stockage des fichiers par contenu (SHA-256) avec compteur de références
+
+    content_blobs est lu dans la base principale ; documents.content_sha256
+    existe dans toutes les bases (documents en mode par utilisateur).
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS content_blobs (
+            sha256 TEXT PRIMARY KEY,
+            file_path TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            info TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    # Fichiers récupérables (plus aucun document ne les référence)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_content_blobs_unreferenced "
+        "ON content_blobs(sha256) WHERE ref_count <= 0"
+    )
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(documents)")}
+    if "content_sha256" not in columns:
+        cursor.execute("ALTER TABLE documents ADD COLUMN content_sha256 TEXT")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_documents_content_sha256 "
+        "ON documents(content_sha256) WHERE content_sha256 IS NOT NULL"
+    )
+
+
+def _011_extraction_cache(cursor: sqlite3.Cursor) -> None:
+    """
+    Cache persistant des extractions (texte, OCR, métadonnées) par contenu
+
+    Clé : SHA-256 du fichier, type d'extraction et version de l'extracteur.
+    last_used_at ordonne l'éviction (moins récemment utilisé d'abord).
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS extraction_cache (
+            sha256 TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            version TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used_at TEXT NOT NULL,
+            PRIMARY KEY (sha256, kind, version)
+        )
+        """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_extraction_cache_lru "
+        "ON extraction_cache(last_used_at, size_bytes)"
+    )
+
+
+def _012_job_leases(cursor: sqlite3.Cursor) -> None:
+    """
+    Bail des jobs en cours et document enregistré par un job
+
+    owner / lease_expires_at : worker qui traite le job et fin de son bail,
+    prolongé tant qu'il tourne ; seuls les baux expirés sont repris.
+    document_id : écrit avec le document, évite un doublon à la reprise.
+    """
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(jobs)")}
+    for column, definition in (
+        ("owner", "TEXT"),
+        ("lease_expires_at", "TIMESTAMP"),
+        ("document_id", "INTEGER"),
+    ):
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+
+
+def _013_job_content_refs(cursor: sqlite3.Cursor) -> None:
+    """
+    Références au contenu stocké tenues par un job
+
+    Prises et rendues dans la transaction de content_blobs : un job repris
+    après un arrêt rend celles de l'essai interrompu.
+    """
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(jobs)")}
+    if "content_refs" not in columns:
+        cursor.execute(
+            "ALTER TABLE jobs ADD COLUMN content_refs INTEGER NOT NULL DEFAULT 0"
+        )
+
+
+# Migrations numérotées, dans l'ordre. Ne jamais modifier une migration
+# publiée : en ajouter une nouvelle à la fin.
+MIGRATIONS: list[tuple[int, Callable[[sqlite3.Cursor], None]]] = [
+    (1, _001_base_schema),
+    (2, _002_keyset_indexes),
+    (3, _003_document_metadata_fts),
+    (4, _004_pain_entries),
+    (5, _005_token_blacklist_version),
+    (6, _006_query_indexes),
+    (7, _007_doctor_names),
+    (8, _008_user_stats),
+    (9, _009_jobs),
+    (10, _010_content_blobs),
+    (11, _011_extraction_cache),
+    (12, _012_job_leases),
+    (13, _013_job_content_refs),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Retourne la version du schéma (PRAGMA user_version)"""
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Applique les migrations en attente
+
+    Base à jour : une seule lecture de PRAGMA user_version. Sinon les
+    migrations sont appliquées sous verrou d'écriture (BEGIN IMMEDIATE) et la
+    version est relue, pour qu'un seul processus les exécute.
+
+    Returns:
+        Nombre de migrations appliquées
+    """
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return 0
+
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    current = get_schema_version(conn)
+    cursor = conn.cursor()
+    applied = 0
+    for version, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        logger.info(f"Migration du schéma SQLite vers la version {version}")
+        migration(cursor)
+        # PRAGMA non paramétrable : version entière issue de MIGRATIONS
+        cursor.execute(f"PRAGMA user_version = {int(version)}")
+        applied += 1
+    conn.commit()
+    return applied
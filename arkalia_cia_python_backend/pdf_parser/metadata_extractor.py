@@ -10,6 +10,10 @@ from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# Version des règles d'extraction (clé du cache d'extraction) : à incrémenter
+# à chaque changement de motif ou de classification
+METADATA_EXTRACTOR_VERSION = "1"
+
 
 class MetadataExtractor:
     """Extracteur métadonnées documents médicaux"""
@@ -0,0 +1,241 @@
+"""
+Moteur OCR en flux pour PDF scannés
+Les pages sont rastérisées et reconnues une à une, quelques pages en cours
+à la fois sur un pool de processus : la mémoire reste bornée à quelques
+images quel que soit le nombre de pages
+"""
+
+import logging
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future
+from typing import Any, NamedTuple
+
+from arkalia_cia_python_backend.metrics import (
+    ocr_pages_reprocessed_total,
+    ocr_pages_total,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pytesseract
+    from pdf2image import convert_from_path
+except ImportError:  # Disponibilité vérifiée par OCRIntegration
+    pass
+
+
+class PageOCR(NamedTuple):
+    """Résultat OCR d'une page"""
+
+    text: str
+    confidence: float | None  # Confiance moyenne des mots (None : aucun mot)
+    dpi: int
+
+
+def recognize_page(
+    pdf_path: str,
+    page_number: int,
+    dpi: int,
+    config: str | None,
+    tesseract_cmd: str | None = None,
+) -> tuple[str, float | None]:
+    """
+    Rastérise et reconnaît une page (exécuté dans un processus du pool)
+
+    Une seule image en mémoire, libérée avant le retour.
+
+    Returns:
+        Texte de la page et confiance moyenne des mots
+    """
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    images = convert_from_path(
+        pdf_path, dpi=dpi, first_page=page_number, last_page=page_number
+    )
+    if not images:
+        return "", None
+    image = images[0]
+    try:
+        ocr_data = pytesseract.image_to_data(
+            image, config=config, output_type=pytesseract.Output.DICT
+        )
+    finally:
+        image.close()
+
+    words = []
+    confidences = []
+    for word, conf in zip(ocr_data["text"], ocr_data["conf"], strict=False):
+        if word.strip():
+            words.append(word)
+            if float(conf) > 0:
+                confidences.append(float(conf))
+    confidence = sum(confidences) / len(confidences) if confidences else None
+    return " ".join(words).strip(), confidence
+
+
+class _PendingPage:
+    """Page en cours : passe en cours et résultat de la passe rapide"""
+
+    __slots__ = ("index", "dpi", "future", "fast")
+
+    def __init__(self, index: int, dpi: int, future: "Future[Any]"):
+        self.index = index
+        self.dpi = dpi
+        self.future = future
+        self.fast: PageOCR | None = None
+
+
+class OCREngine:
+    """
+    OCR page par page, en flux borné et à résolution adaptative
+
+    Au plus ``pages_in_flight`` pages sont rastérisées ou reconnues à la
+    fois (sur ``executor``, ou une à une dans le processus courant sans
+    pool). Chaque page passe d'abord à ``fast_dpi`` ; seules les pages sous
+    ``min_confidence`` (ou sans texte) sont refaites à la résolution
+    demandée. Les pages sont produites dans l'ordre.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        pages_in_flight: int = 4,
+        fast_dpi: int = 150,
+        min_confidence: float = 70.0,
+    ):
+        if pages_in_flight < 1:
+            raise ValueError("pages_in_flight doit être >= 1")
+        self.executor = executor
+        self.pages_in_flight = pages_in_flight
+        self.fast_dpi = fast_dpi
+        self.min_confidence = min_confidence
+
+    def version(self, dpi: int) -> str:
+        """Paramètres qui changent le résultat (clé du cache d'extraction)"""
+        if self.fast_dpi >= dpi:
+            return str(dpi)
+        return f"{self.fast_dpi}>{dpi}@{self.min_confidence:g}"
+
+    def _submit(
+        self,
+        pdf_path: str,
+        index: int,
+        dpi: int,
+        config: str | None,
+        tesseract_cmd: str | None,
+    ) -> "Future[Any]":
+        """Passe OCR d'une page sur le pool, ou ici sans pool utilisable"""
+        args = (pdf_path, index + 1, dpi, config, tesseract_cmd)
+        if self.executor is not None:
+            try:
+                return self.executor.submit(recognize_page, *args)
+            except RuntimeError as e:  # Pool arrêté ou cassé
+                logger.warning(f"Pool OCR indisponible, OCR local: {e}")
+        future: Future[Any] = Future()
+        try:
+            future.set_result(recognize_page(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _result(self, pending: _PendingPage) -> PageOCR | None:
+        """Résultat de la passe en cours (None si elle a échoué)"""
+        try:
+            text, confidence = pending.future.result()
+        except Exception as e:
+            # Erreurs pdf2image, Tesseract ou processus du pool
+            logger.warning(
+                "Erreur OCR page %d (%d dpi): %s", pending.index + 1, pending.dpi, e
+            )
+            return None
+        ocr_pages_total.inc()
+        return PageOCR(text, confidence, pending.dpi)
+
+    def _needs_full_dpi(self, result: PageOCR | None) -> bool:
+        """Passe rapide en échec, sans texte ou de confiance insuffisante"""
+        return (
+            result is None
+            or result.confidence is None
+            or result.confidence < self.min_confidence
+        )
+
+    def iter_pages(
+        self,
+        pdf_path: str,
+        page_count: int,
+        dpi: int = 300,
+        config: str | None = None,
+        tesseract_cmd: str | None = None,
+    ) -> Iterator[PageOCR]:
+        """
+        OCR des ``page_count`` premières pages, produites dans l'ordre
+
+        Une page en échec à pleine résolution est produite sans texte.
+        """
+        first_dpi = min(self.fast_dpi, dpi)
+        window: deque[_PendingPage] = deque()
+        next_index = 0
+
+        def submit(index: int, page_dpi: int) -> "Future[Any]":
+            return self._submit(pdf_path, index, page_dpi, config, tesseract_cmd)
+
+        def retry(pending: _PendingPage) -> bool:
+            """Relance une passe rapide insuffisante à pleine résolution"""
+            pending.fast = self._result(pending)
+            if not self._needs_full_dpi(pending.fast):
+                return False
+            ocr_pages_reprocessed_total.inc()
+            pending.dpi = dpi
+            pending.future = submit(pending.index, dpi)
+            return True
+
+        try:
+            while window or next_index < page_count:
+                while next_index < page_count and len(window) < self.pages_in_flight:
+                    window.append(
+                        _PendingPage(
+                            next_index, first_dpi, submit(next_index, first_dpi)
+                        )
+                    )
+                    next_index += 1
+                # Pages rapides déjà terminées : relance sans attendre leur tour
+                for pending in window:
+                    if (
+                        pending.dpi < dpi
+                        and pending.fast is None
+                        and pending.future.done()
+                    ):
+                        retry(pending)
+
+                head = window[0]
+                if head.dpi < dpi and head.fast is None and retry(head):
+                    continue
+                window.popleft()
+                if head.fast is not None and head.dpi == first_dpi:
+                    yield head.fast  # Passe rapide suffisante
+                    continue
+                result = self._result(head)
+                # Pleine résolution en échec : résultat rapide s'il existe
+                yield result or head.fast or PageOCR("", None, head.dpi)
+        finally:
+            # Consommateur arrêté avant la fin : pages restantes abandonnées
+            for pending in window:
+                pending.future.cancel()
+
+    def recognize(
+        self,
+        pdf_path: str,
+        page_count: int,
+        dpi: int = 300,
+        config: str | None = None,
+        tesseract_cmd: str | None = None,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> list[PageOCR]:
+        """OCR de toutes les pages ; ``on_progress(pages faites, total)``"""
+        pages = []
+        for page in self.iter_pages(pdf_path, page_count, dpi, config, tesseract_cmd):
+            pages.append(page)
+            if on_progress:
+                on_progress(len(pages), page_count)
+        return pages
@@ -5,15 +5,21 @@ Utilise Tesseract OCR pour extraire texte depuis images.
 
 import logging
 import time
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
+import pypdf
+from pypdf.errors import PyPdfError
+
+from arkalia_cia_python_backend.pdf_parser.ocr_engine import OCREngine
+
 logger = logging.getLogger(__name__)
 
 # Vérifier disponibilité OCR
 try:
+    import pdf2image  # noqa: F401
     import pytesseract
-    from pdf2image import convert_from_path
 
     OCR_AVAILABLE = True
 except ImportError:
@@ -24,19 +30,29 @@ except ImportError:
 # Seuil de détection PDF scanné (nombre de caractères minimum)
 MIN_TEXT_CHARS_FOR_SCANNED_DETECTION = 100
 
+# Version du traitement OCR (clé du cache d'extraction) : à incrémenter à
+# chaque changement du prétraitement ou de l'agrégation des pages
+OCR_EXTRACTION_VERSION = "2"
+
 
 class OCRIntegration:
     """Intégration OCR complète pour PDF scannés."""
 
-    def __init__(self, tesseract_cmd: str | None = None) -> None:
+    def __init__(
+        self, tesseract_cmd: str | None = None, engine: OCREngine | None = None
+    ) -> None:
         """Initialise l'intégration OCR.
 
         Args:
             tesseract_cmd: Chemin vers tesseract (optionnel, auto-détecté si None).
+            engine: Moteur OCR (pool, pages en cours, DPI adaptatif) ; par
+                défaut pages traitées une à une dans le processus courant.
 
         """
         self.ocr_available = OCR_AVAILABLE
         self.tesseract_config: str | None = None
+        self.tesseract_cmd: str | None = None
+        self.engine = engine or OCREngine()
 
         if OCR_AVAILABLE:
             if tesseract_cmd:
@@ -52,6 +68,8 @@ class OCRIntegration:
                     if Path(path).exists():
                         pytesseract.pytesseract.tesseract_cmd = path
                         break
+            # Transmis aux processus du pool, qui n'héritent pas du réglage
+            self.tesseract_cmd = pytesseract.pytesseract.tesseract_cmd
 
             # Configuration Tesseract pour français et anglais
             self.tesseract_config = "--oem 3 --psm 6 -l fra+eng"
@@ -60,18 +78,31 @@ class OCRIntegration:
         """Vérifie si OCR est disponible."""
         return self.ocr_available
 
+    def cache_version(self, dpi: int = 300, max_pages: int = 50) -> str:
+        """Version du résultat OCR pour ces paramètres (cache d'extraction)."""
+        return (
+            f"{OCR_EXTRACTION_VERSION}|{self.tesseract_config}|"
+            f"{self.engine.version(dpi)}|{max_pages}"
+        )
+
     def process_scanned_pdf(
         self,
         pdf_path: str,
         dpi: int = 300,
         max_pages: int = 50,
+        on_progress: Callable[[int, int], None] | None = None,
     ) -> dict[str, Any]:
         """Traite un PDF scanné avec OCR.
 
+        Pages rastérisées et reconnues en flux par le moteur OCR : quelques
+        images en mémoire à la fois, passe rapide puis pleine résolution
+        pour les seules pages peu fiables.
+
         Args:
             pdf_path: Chemin vers le PDF.
             dpi: Résolution DPI pour conversion (défaut: 300).
             max_pages: Nombre max de pages à traiter (défaut: 50).
+            on_progress: Appelé après chaque page (pages faites, total).
 
         Returns:
             {
@@ -80,7 +111,9 @@ class OCRIntegration:
                 'confidence': float,
                 'is_scanned': True,
                 'page_count': int,
-                'processing_time': float
+                'processing_time': float,
+                'pages_with_text': int,
+                'pages_reprocessed': int
             }.
 
         """
@@ -96,16 +129,8 @@ class OCRIntegration:
         start_time = time.time()
 
         try:
-            # Convertir PDF en images
-            logger.info("Conversion PDF en images: %s", pdf_path)
-            images = convert_from_path(
-                pdf_path,
-                dpi=dpi,
-                first_page=1,
-                last_page=max_pages,
-            )
-
-            if not images:
+            page_count = min(len(pypdf.PdfReader(pdf_path).pages), max_pages)
+            if page_count == 0:
                 return {
                     "text": "",
                     "pages": [],
@@ -114,50 +139,24 @@ class OCRIntegration:
                     "error": "Aucune page trouvée dans le PDF",
                 }
 
-            text_pages = []
-            total_confidence = 0.0
-            pages_with_text = 0
-
-            for i, image in enumerate(images):
-                try:
-                    logger.debug("Traitement OCR page %d/%d", i + 1, len(images))
-
-                    # OCR sur chaque page
-                    ocr_data = pytesseract.image_to_data(
-                        image,
-                        config=self.tesseract_config,
-                        output_type=pytesseract.Output.DICT,
-                    )
-
-                    # Extraire texte et confiance
-                    page_text = ""
-                    page_confidences = []
-
-                    for j, word in enumerate(ocr_data["text"]):
-                        if word.strip():
-                            page_text += word + " "
-                            conf = float(ocr_data["conf"][j])
-                            if conf > 0:
-                                page_confidences.append(conf)
-
-                    page_text = page_text.strip()
-
-                    if page_text:
-                        text_pages.append(page_text)
-                        if page_confidences:
-                            avg_conf = sum(page_confidences) / len(page_confidences)
-                            total_confidence += avg_conf
-                            pages_with_text += 1
-                    else:
-                        text_pages.append("")
-
-                except (ValueError, OSError, RuntimeError) as e:
-                    logger.warning("Erreur OCR page %d: %s", i + 1, e)
-                    text_pages.append("")
-
-            avg_confidence = (
-                total_confidence / pages_with_text if pages_with_text > 0 else 0.0
+            logger.info("OCR de %d pages: %s", page_count, pdf_path)
+            results = self.engine.recognize(
+                pdf_path,
+                page_count,
+                dpi=dpi,
+                config=self.tesseract_config,
+                tesseract_cmd=self.tesseract_cmd,
+                on_progress=on_progress,
             )
+
+            text_pages = [page.text for page in results]
+            # Confiance moyenne des pages reconnues avec du texte
+            confidences = [
+                page.confidence
+                for page in results
+                if page.text and page.confidence is not None
+            ]
+            avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
             processing_time = time.time() - start_time
 
             return {
@@ -165,12 +164,16 @@ class OCRIntegration:
                 "pages": text_pages,
                 "confidence": round(avg_confidence, 2),
                 "is_scanned": True,
-                "page_count": len(images),
+                "page_count": page_count,
                 "processing_time": round(processing_time, 2),
-                "pages_with_text": pages_with_text,
+                "pages_with_text": len(confidences),
+                # Pages refaites en pleine résolution après la passe rapide
+                "pages_reprocessed": sum(
+                    1 for page in results if page.dpi > self.engine.fast_dpi
+                ),
             }
 
-        except (ValueError, OSError, RuntimeError) as e:
+        except (ValueError, OSError, RuntimeError, PyPdfError) as e:
             logger.exception("Erreur OCR: %s", e)
             return {
                 "text": "",
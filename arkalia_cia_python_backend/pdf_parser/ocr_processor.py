@@ -13,6 +13,8 @@ except ImportError:
 import logging
 from typing import Any
 
+from arkalia_cia_python_backend.metrics import ocr_pages_total
+
 logger = logging.getLogger(__name__)
 
 
@@ -65,6 +67,7 @@ class OCRProcessor:
                         config=self.tesseract_config,
                         output_type=pytesseract.Output.DICT,
                     )
+                    ocr_pages_total.inc()
 
                     # Extraire texte et confiance
                     page_text = ""
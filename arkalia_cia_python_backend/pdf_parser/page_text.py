@@ -0,0 +1,42 @@
+"""
+Extraction parallèle du texte des pages PDF
+Les plages de pages sont réparties sur un pool de processus : pypdf est du
+Python pur, des threads resteraient limités par le GIL
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader
+
+# Pages par tâche : assez pour amortir la réouverture du PDF dans le
+# processus, assez peu pour répartir la charge et livrer les premières pages tôt
+PAGES_PER_CHUNK = 16
+
+
+def extract_page_range(path: str, start: int, stop: int) -> list[str]:
+    """Texte des pages [start, stop) (exécuté dans un processus du pool)"""
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+def page_ranges(
+    num_pages: int, chunk_pages: int = PAGES_PER_CHUNK
+) -> list[tuple[int, int]]:
+    """Découpe [0, num_pages) en plages consécutives de chunk_pages pages"""
+    return [
+        (start, min(start + chunk_pages, num_pages))
+        for start in range(0, num_pages, chunk_pages)
+    ]
+
+
+def create_page_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Pool de processus pour l'extraction des pages
+
+    Démarrage "spawn" : pas de fork d'un serveur multi-threadé. Les processus
+    sont créés à la première tâche (aucun coût tant qu'aucun gros PDF n'arrive).
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
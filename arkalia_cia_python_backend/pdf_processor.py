@@ -6,38 +6,294 @@ Adapté du auto_documenter.py d'Athalia
 import logging
 import os  # nosec B404
 import shutil
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from types import TracebackType
+from typing import Any, BinaryIO
 
+import pypdf
 from pypdf import PdfReader
 
+from arkalia_cia_python_backend.extraction_cache import OCR, TEXT, ExtractionCache
+from arkalia_cia_python_backend.pdf_parser.ocr_engine import OCREngine
 from arkalia_cia_python_backend.pdf_parser.ocr_integration import (
     OCR_AVAILABLE,
     OCRIntegration,
 )
+from arkalia_cia_python_backend.pdf_parser.page_text import (
+    extract_page_range,
+    page_ranges,
+)
 from arkalia_cia_python_backend.security_utils import (
     sanitize_log_message,
 )
 
 logger = logging.getLogger(__name__)
 
+# Version de l'extraction de texte (clé du cache d'extraction)
+TEXT_EXTRACTION_VERSION = f"pypdf-{pypdf.__version__}"
+
 # Limites de sécurité
 MAX_PDF_SIZE = 50 * 1024 * 1024  # 50 MB
 MAX_PDF_PAGES = 1000  # Limite raisonnable pour éviter les DoS
 
+# Au-delà, les pages sont extraites en parallèle (si un pool est fourni)
+PARALLEL_MIN_PAGES = 64
+
+
+class InvalidPDFError(ValueError):
+    """PDF refusé par les contrôles de sécurité (message affichable)"""
+
+
+def _sanitize_metadata(value: str | None) -> str:
+    """Nettoie les métadonnées pour éviter les injections"""
+    if not value:
+        return ""
+    # Limiter la longueur et supprimer les caractères dangereux
+    cleaned = str(value)[:200]  # Limiter à 200 caractères
+    # Supprimer les caractères de contrôle
+    return "".join(c for c in cleaned if ord(c) >= 32 or c in "\n\r\t")
+
+
+class ParsedPDF:
+    """
+    PDF ouvert et analysé une seule fois, au premier accès
+
+    Le lecteur pypdf, les informations du document et le texte de chaque
+    page (extrait une seule fois) sont partagés entre validation, aperçu,
+    métadonnées et parsing des portails. Avec ``sha256`` et un cache
+    d'extraction, le texte des pages est relu du cache sans ouvrir le PDF.
+    Avec ``page_pool``, un PDF d'au moins ``parallel_min_pages`` pages est
+    extrait par plages de pages réparties sur le pool.
+
+    Le fichier reste ouvert jusqu'à close() : il peut être renommé entre-temps.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        extraction_cache: ExtractionCache | None = None,
+        sha256: str | None = None,
+        page_pool: Executor | None = None,
+        parallel_min_pages: int = PARALLEL_MIN_PAGES,
+    ):
+        self.path = str(path)
+        self.extraction_cache = extraction_cache
+        self.sha256 = sha256
+        self.page_pool = page_pool
+        self.parallel_min_pages = parallel_min_pages
+        self._file: BinaryIO | None = None
+        self._reader: PdfReader | None = None
+        self._pages: dict[int, str] = {}
+        self._cached_pages: list[str] | None = None
+        self._cache_checked = False
+        self._validated = False
+
+    def __enter__(self) -> "ParsedPDF":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @property
+    def opened(self) -> bool:
+        """Vrai si le PDF a été ouvert et analysé"""
+        return self._reader is not None
+
+    @property
+    def reader(self) -> PdfReader:
+        """
+        Lecteur pypdf (fichier ouvert au premier accès)
+
+        Raises:
+            InvalidPDFError: Si l'en-tête n'est pas celui d'un PDF
+        """
+        if self._reader is None:
+            file = open(self.path, "rb")
+            try:
+                # Vérifier les premiers bytes pour confirmer que c'est un PDF
+                if file.read(4) != b"%PDF":
+                    raise InvalidPDFError("Le fichier n'est pas un PDF valide")
+                file.seek(0)
+                self._reader = PdfReader(file)
+            except BaseException:
+                file.close()
+                raise
+            self._file = file
+        return self._reader
+
+    @property
+    def num_pages(self) -> int:
+        """Nombre de pages"""
+        return len(self.reader.pages)
+
+    def validate(self) -> None:
+        """
+        Contrôles de sécurité : existence, taille, en-tête, nombre de pages
+
+        Raises:
+            InvalidPDFError: Si un contrôle échoue
+        """
+        if self._validated:
+            return
+        if not os.path.exists(self.path):
+            raise InvalidPDFError("Fichier non trouvé")
+
+        # Vérifier la taille du fichier avant traitement
+        if os.path.getsize(self.path) > MAX_PDF_SIZE:
+            max_mb = MAX_PDF_SIZE / (1024 * 1024)
+            raise InvalidPDFError(f"Fichier trop volumineux (max {max_mb:.0f} MB)")
+
+        # Vérifier que c'est bien un fichier (pas un répertoire)
+        if not os.path.isfile(self.path):
+            raise InvalidPDFError("Le chemin ne pointe pas vers un fichier")
+
+        # Vérifier le nombre de pages (protection DoS)
+        if self.num_pages > MAX_PDF_PAGES:
+            raise InvalidPDFError(f"PDF trop volumineux (max {MAX_PDF_PAGES} pages)")
+        self._validated = True
+
+    def info(self) -> dict[str, Any]:
+        """Informations du document (nombre de pages, titre, auteur, sujet)"""
+        pdf_metadata = self.reader.metadata
+        return {
+            "num_pages": self.num_pages,
+            "title": _sanitize_metadata(
+                pdf_metadata.get("/Title", "") if pdf_metadata else None
+            ),
+            "author": _sanitize_metadata(
+                pdf_metadata.get("/Author", "") if pdf_metadata else None
+            ),
+            "subject": _sanitize_metadata(
+                pdf_metadata.get("/Subject", "") if pdf_metadata else None
+            ),
+        }
+
+    def _cached(self) -> list[str] | None:
+        """Texte des pages en cache (une seule lecture du cache)"""
+        if not self._cache_checked:
+            self._cache_checked = True
+            if self.extraction_cache is not None and self.sha256 is not None:
+                cached = self.extraction_cache.get(
+                    self.sha256, TEXT, TEXT_EXTRACTION_VERSION
+                )
+                if cached is not None:
+                    self._cached_pages = list(cached["pages"])
+        return self._cached_pages
+
+    def page_text(self, index: int) -> str:
+        """Texte d'une page (extrait une seule fois)"""
+        cached = self._cached()
+        if cached is not None:
+            return cached[index]
+        if index not in self._pages:
+            self._pages[index] = self.reader.pages[index].extract_text()
+        return self._pages[index]
+
+    def iter_page_texts(self) -> Iterator[str]:
+        """
+        Texte des pages dans l'ordre, au fil de l'extraction
+
+        Le consommateur traite les premières pages pendant que les suivantes
+        sont extraites. Le texte complet est mis en cache une fois la
+        dernière page produite.
+        """
+        cached = self._cached()
+        if cached is not None:
+            yield from cached
+            return
+        num_pages = self.num_pages
+        if self.page_pool is not None and num_pages >= self.parallel_min_pages:
+            source = self._iter_parallel(self.page_pool, num_pages)
+        else:
+            source = (self.page_text(i) for i in range(num_pages))
+        pages = []
+        for text in source:
+            pages.append(text)
+            yield text
+        if self.extraction_cache is not None and self.sha256 is not None:
+            self.extraction_cache.put(
+                self.sha256, TEXT, TEXT_EXTRACTION_VERSION, {"pages": pages}
+            )
+        self._cached_pages = pages
+
+    def _iter_parallel(self, pool: Executor, num_pages: int) -> Iterator[str]:
+        """
+        Pages extraites par plages sur le pool, produites dans l'ordre
+
+        Une plage en échec (pool arrêté, processus tué) est extraite ici.
+        """
+        ranges = page_ranges(num_pages)
+        futures = [
+            pool.submit(extract_page_range, self.path, start, stop)
+            for start, stop in ranges
+        ]
+        try:
+            for (start, stop), future in zip(ranges, futures, strict=True):
+                try:
+                    texts = future.result()
+                except Exception as e:
+                    logger.warning(f"Extraction parallèle des pages impossible: {e}")
+                    texts = [self.page_text(i) for i in range(start, stop)]
+                for index, text in enumerate(texts, start=start):
+                    yield self._pages.setdefault(index, text)
+        finally:
+            # Consommateur arrêté avant la fin : plages restantes abandonnées
+            for future in futures:
+                future.cancel()
+
+    def page_texts(self) -> list[str]:
+        """Texte de toutes les pages (pypdf, sans OCR), mis en cache"""
+        return list(self.iter_page_texts())
+
+    @property
+    def text(self) -> str:
+        """Texte complet (pages concaténées)"""
+        return "".join(self.page_texts())
+
+    @property
+    def preview_text(self) -> str:
+        """Aperçu : 500 premiers caractères de la première page"""
+        cached = self._cached()
+        if cached is not None:
+            return cached[0][:500] if cached else ""
+        return self.page_text(0)[:500] if self.num_pages else ""
+
+    def close(self) -> None:
+        """Ferme le fichier (le texte déjà extrait reste disponible)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
 
 class PDFProcessor:
     """Processeur de fichiers PDF pour Arkalia CIA"""
 
-    def __init__(self, upload_dir: str = "uploads"):
+    def __init__(
+        self,
+        upload_dir: str = "uploads",
+        extraction_cache: ExtractionCache | None = None,
+        page_pool: Executor | None = None,
+        parallel_min_pages: int = PARALLEL_MIN_PAGES,
+        ocr_engine: OCREngine | None = None,
+    ):
         self.upload_dir = Path(upload_dir)
+        self.extraction_cache = extraction_cache
+        self.page_pool = page_pool
+        self.parallel_min_pages = parallel_min_pages
         self.upload_dir.mkdir(exist_ok=True)
         # Initialiser OCR si disponible
         self.ocr: OCRIntegration | None = None
         if OCR_AVAILABLE:
             try:
-                self.ocr = OCRIntegration()
+                self.ocr = OCRIntegration(engine=ocr_engine)
             except Exception as e:
                 logger.warning(f"OCR non initialisé: {e}")
                 self.ocr = None
@@ -48,25 +304,107 @@ class PDFProcessor:
         name, ext = os.path.splitext(original_name)
         return f"{name}_{timestamp}{ext}"
 
-    def extract_text_from_pdf(self, file_path: str, use_ocr: bool = False) -> str:
-        """Extrait le texte d'un PDF, avec OCR si nécessaire"""
+    def safe_unique_filename(self, original_name: str) -> str:
+        """Nom de fichier sûr et horodaté, toujours en .pdf"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        file_extension = Path(original_name).suffix
+        # S'assurer que l'extension est .pdf
+        if file_extension.lower() != ".pdf":
+            file_extension = ".pdf"
+        safe_name = self._sanitize_filename(original_name)
+        return f"{safe_name}_{timestamp}{file_extension}"
+
+    def open_pdf(self, file_path: str | Path, sha256: str | None = None) -> ParsedPDF:
+        """
+        PDF à analyser une seule fois (ouvert au premier accès)
+
+        Avec ``sha256``, le texte des pages passe par le cache d'extraction.
+        """
+        return ParsedPDF(
+            file_path,
+            self.extraction_cache,
+            sha256,
+            page_pool=self.page_pool,
+            parallel_min_pages=self.parallel_min_pages,
+        )
+
+    def iter_page_texts(
+        self, file_path: str | Path, sha256: str | None = None
+    ) -> Iterator[str]:
+        """
+        Texte des pages dans l'ordre, au fil de l'extraction (sans OCR)
+
+        Parallèle au-delà de ``parallel_min_pages`` pages si un pool est fourni.
+        """
+        with self.open_pdf(file_path, sha256) as pdf:
+            yield from pdf.iter_page_texts()
+
+    def _page_texts(
+        self, file_path: str, sha256: str | None, parsed: ParsedPDF | None = None
+    ) -> list[str]:
+        """Texte des pages, relu du cache d'extraction si possible"""
+        if parsed is not None:
+            return parsed.page_texts()
+        with self.open_pdf(file_path, sha256) as pdf:
+            return pdf.page_texts()
+
+    def _process_scanned(
+        self,
+        file_path: str,
+        sha256: str | None,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        OCR du PDF, relu du cache d'extraction si possible
+
+        Seuls les résultats sans erreur sont mis en cache (pages et confiance).
+        ``on_progress(pages faites, total)`` est appelé après chaque page OCR.
+        """
+        if self.ocr is None:
+            return {"text": "", "pages": [], "error": "OCR non disponible"}
+        cache = self.extraction_cache
+        if cache is None or sha256 is None:
+            return self.ocr.process_scanned_pdf(file_path, on_progress=on_progress)
+        version = self.ocr.cache_version()
+        cached = cache.get(sha256, OCR, version)
+        if cached is not None:
+            return {"text": "\n\n".join(cached["pages"]), **cached}
+        ocr_result = self.ocr.process_scanned_pdf(file_path, on_progress=on_progress)
+        if "error" not in ocr_result:
+            cache.put(
+                sha256,
+                OCR,
+                version,
+                {
+                    "pages": ocr_result.get("pages", []),
+                    "confidence": ocr_result.get("confidence", 0.0),
+                    "page_count": ocr_result.get("page_count", 0),
+                    "pages_with_text": ocr_result.get("pages_with_text", 0),
+                },
+            )
+        return ocr_result
+
+    def extract_text_from_pdf(
+        self,
+        file_path: str,
+        use_ocr: bool = False,
+        sha256: str | None = None,
+        parsed: ParsedPDF | None = None,
+        on_ocr_progress: Callable[[int, int], None] | None = None,
+    ) -> str:
+        """
+        Extrait le texte d'un PDF, avec OCR si nécessaire
+
+        Avec ``sha256`` (empreinte du contenu) et un cache d'extraction, le
+        texte des pages et le résultat OCR déjà calculés sont réutilisés.
+        ``parsed`` : PDF déjà ouvert dont le texte des pages est réutilisé.
+        ``on_ocr_progress(pages faites, total)`` : avancement de l'OCR.
+        """
+        if parsed is not None:
+            sha256 = parsed.sha256
         try:
             # D'abord essayer extraction texte normale
-            with open(file_path, "rb") as file:
-                reader = PdfReader(file)
-                text_parts = []
-                # Traiter page par page pour éviter de charger tout en mémoire
-                for i, page in enumerate(reader.pages):
-                    page_text = page.extract_text()
-                    text_parts.append(page_text)
-                    # Libérer la référence de la page après extraction
-                    if i % 10 == 0:  # Nettoyer périodiquement
-                        import gc
-
-                        gc.collect()
-
-                result = "".join(text_parts)
-                del text_parts
+            result = "".join(self._page_texts(file_path, sha256, parsed))
 
             # Si peu de texte et OCR disponible, utiliser OCR
             if len(result.strip()) < 100 and (
@@ -75,7 +413,9 @@ class PDFProcessor:
             ):
                 if hasattr(self, "ocr") and self.ocr and self.ocr.is_available():
                     logger.info("Utilisation OCR pour PDF scanné")
-                    ocr_result = self.ocr.process_scanned_pdf(file_path)
+                    ocr_result = self._process_scanned(
+                        file_path, sha256, on_ocr_progress
+                    )
                     text_result = ocr_result.get("text")
                     if text_result:
                         return str(text_result)
@@ -86,7 +426,9 @@ class PDFProcessor:
             # Essayer OCR en dernier recours
             if hasattr(self, "ocr") and self.ocr and self.ocr.is_available():
                 try:
-                    ocr_result = self.ocr.process_scanned_pdf(file_path)
+                    ocr_result = self._process_scanned(
+                        file_path, sha256, on_ocr_progress
+                    )
                     text_result = ocr_result.get("text")
                     return (
                         str(text_result)
@@ -111,129 +453,74 @@ class PDFProcessor:
         except Exception as e:
             raise Exception("Erreur lors de la sauvegarde du fichier.") from e
 
-    def process_pdf(self, file_path: str, original_name: str) -> dict[str, Any]:
-        """Traite un fichier PDF et le sauvegarde avec validations de sécurité"""
+    def process_pdf(
+        self,
+        file_path: str,
+        original_name: str,
+        move: bool = False,
+        destination: str | Path | None = None,
+        parsed: ParsedPDF | None = None,
+    ) -> dict[str, Any]:
+        """
+        Traite un fichier PDF et le sauvegarde avec validations de sécurité
+
+        Avec ``move``, le fichier (déjà dans upload_dir) est renommé vers sa
+        destination au lieu d'être copié. ``destination`` impose le chemin
+        (stockage par contenu, sous upload_dir) ; sinon un nom horodaté.
+        ``parsed`` : PDF ouvert par l'appelant (pipeline d'ingestion), qui le
+        réutilise ensuite pour le texte et les métadonnées.
+        """
+        pdf = parsed if parsed is not None else ParsedPDF(file_path)
         try:
-            # Vérifier que le fichier existe
-            if not os.path.exists(file_path):
-                return {"success": False, "error": "Fichier non trouvé"}
-
-            # Vérifier la taille du fichier avant traitement
-            file_size = os.path.getsize(file_path)
-            if file_size > MAX_PDF_SIZE:
-                max_mb = MAX_PDF_SIZE / (1024 * 1024)
-                return {
-                    "success": False,
-                    "error": f"Fichier trop volumineux (max {max_mb:.0f} MB)",
-                }
-
-            # Vérifier que c'est bien un fichier (pas un répertoire)
-            if not os.path.isfile(file_path):
+            pdf.validate()
+            # Informations du document et texte de la première page
+            metadata = pdf.info()
+            first_page_text = pdf.preview_text
+
+            # Générer un nom de fichier unique et sécurisé
+            new_filename = self.safe_unique_filename(original_name)
+
+            # Valider le chemin de destination (sécurité)
+            destination_path = (
+                Path(destination)
+                if destination is not None
+                else self.upload_dir / new_filename
+            )
+            # S'assurer que le chemin résolu est bien dans upload_dir
+            resolved_dest = destination_path.resolve()
+            resolved_upload = self.upload_dir.resolve()
+            if (
+                resolved_upload not in resolved_dest.parents
+                and resolved_dest.parent != resolved_upload
+            ):
                 return {
                     "success": False,
-                    "error": "Le chemin ne pointe pas vers un fichier",
+                    "error": "Chemin de destination invalide",
                 }
 
-            # Lire le PDF avec validation
-            with open(file_path, "rb") as file:
-                # Vérifier les premiers bytes pour confirmer que c'est un PDF
-                header = file.read(4)
-                if header != b"%PDF":
-                    return {
-                        "success": False,
-                        "error": "Le fichier n'est pas un PDF valide",
-                    }
-
-                file.seek(0)  # Retourner au début
-                pdf_reader = PdfReader(file)
-
-                # Vérifier le nombre de pages (protection DoS)
-                num_pages = len(pdf_reader.pages)
-                if num_pages > MAX_PDF_PAGES:
-                    return {
-                        "success": False,
-                        "error": f"PDF trop volumineux (max {MAX_PDF_PAGES} pages)",
-                    }
-
-                # Extraire les métadonnées avec sanitization
-                def sanitize_metadata(value: str | None) -> str:
-                    """Nettoie les métadonnées pour éviter les injections"""
-                    if not value:
-                        return ""
-                    # Limiter la longueur et supprimer les caractères dangereux
-                    cleaned = str(value)[:200]  # Limiter à 200 caractères
-                    # Supprimer les caractères de contrôle
-                    cleaned = "".join(
-                        c for c in cleaned if ord(c) >= 32 or c in "\n\r\t"
-                    )
-                    return cleaned
-
-                metadata = {
-                    "num_pages": num_pages,
-                    "title": sanitize_metadata(
-                        pdf_reader.metadata.get("/Title", "")
-                        if pdf_reader.metadata
-                        else None
-                    ),
-                    "author": sanitize_metadata(
-                        pdf_reader.metadata.get("/Author", "")
-                        if pdf_reader.metadata
-                        else None
-                    ),
-                    "subject": sanitize_metadata(
-                        pdf_reader.metadata.get("/Subject", "")
-                        if pdf_reader.metadata
-                        else None
-                    ),
-                }
-
-                # Extraire le texte de la première page
-                first_page_text = ""
-                if pdf_reader.pages:
-                    first_page = pdf_reader.pages[0]
-                    first_page_text = first_page.extract_text()[
-                        :500
-                    ]  # Limiter à 500 caractères
-
-                # Générer un nom de fichier unique et sécurisé
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                file_extension = Path(original_name).suffix
-                # S'assurer que l'extension est .pdf
-                if file_extension.lower() != ".pdf":
-                    file_extension = ".pdf"
-                safe_name = self._sanitize_filename(original_name)
-                new_filename = f"{safe_name}_{timestamp}{file_extension}"
-
-                # Valider le chemin de destination (sécurité)
-                destination_path = self.upload_dir / new_filename
-                # S'assurer que le chemin résolu est bien dans upload_dir
-                resolved_dest = destination_path.resolve()
-                resolved_upload = self.upload_dir.resolve()
-                if (
-                    resolved_upload not in resolved_dest.parents
-                    and resolved_dest.parent != resolved_upload
-                ):
-                    return {
-                        "success": False,
-                        "error": "Chemin de destination invalide",
-                    }
-
-                # Copier le fichier vers le dossier d'upload
+            # Renommage atomique (même répertoire) ou copie vers le dossier d'upload
+            destination_path.parent.mkdir(parents=True, exist_ok=True)
+            if move:
+                os.replace(file_path, destination_path)
+                pdf.path = str(destination_path)
+            else:
                 shutil.copy2(file_path, destination_path)
 
-                # Calculer la taille du fichier
-                file_size = os.path.getsize(destination_path)
+            # Calculer la taille du fichier
+            file_size = os.path.getsize(destination_path)
 
-                return {
-                    "success": True,
-                    "filename": new_filename,
-                    "original_name": original_name,
-                    "file_path": str(destination_path),
-                    "file_size": file_size,
-                    "metadata": metadata,
-                    "preview_text": first_page_text,
-                }
+            return {
+                "success": True,
+                "filename": new_filename,
+                "original_name": original_name,
+                "file_path": str(destination_path),
+                "file_size": file_size,
+                "metadata": metadata,
+                "preview_text": first_page_text,
+            }
 
+        except InvalidPDFError as e:
+            return {"success": False, "error": str(e)}
         except Exception as e:
             # Logger l'erreur complète mais retourner un message sécurisé
             logger.error(
@@ -241,6 +528,9 @@ class PDFProcessor:
                 exc_info=True,
             )
             return {"success": False, "error": "Erreur lors du traitement du PDF."}
+        finally:
+            if parsed is None:
+                pdf.close()
 
     def _sanitize_filename(self, filename: str) -> str:
         """Nettoie un nom de fichier pour qu'il soit sûr"""
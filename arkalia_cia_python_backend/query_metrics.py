@@ -0,0 +1,301 @@
+"""
+Instrumentation de la couche SQLite
+Latence par méthode de CIADatabase (histogramme), lignes lues/écrites,
+attente de connexion du pool et journal des requêtes lentes
+"""
+
+import bisect
+import functools
+import inspect
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from arkalia_cia_python_backend.config import get_settings
+from arkalia_cia_python_backend.security_utils import sanitize_log_message
+
+logger = logging.getLogger(__name__)
+
+C = TypeVar("C", bound=type)
+
+# Bornes des histogrammes de latence (secondes, cumulatives comme Prometheus)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_WHITESPACE = re.compile(r"\s+")
+_MAX_LOGGED_SQL = 500
+
+
+class _MethodStats:
+    """Compteurs d'une méthode"""
+
+    __slots__ = (
+        "calls",
+        "errors",
+        "total_seconds",
+        "max_seconds",
+        "buckets",
+        "statements",
+        "rows_read",
+        "rows_written",
+        "wait_seconds",
+    )
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        # Un compteur par borne + dépassement (non cumulés)
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.statements = 0
+        self.rows_read = 0
+        self.rows_written = 0
+        self.wait_seconds = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative: dict[str, int] = {}
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets, strict=False):
+            running += count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = self.calls
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_seconds": round(self.total_seconds, 6),
+            "avg_ms": round(self.total_seconds / self.calls * 1000, 3)
+            if self.calls
+            else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "statements": self.statements,
+            "rows_read": self.rows_read,
+            "rows_written": self.rows_written,
+            "connection_wait_seconds": round(self.wait_seconds, 6),
+            "histogram": cumulative,
+        }
+
+
+class _CallFrame:
+    """Appel de méthode en cours dans un thread"""
+
+    __slots__ = ("statements", "rows_written", "wait_seconds")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.rows_written = 0
+        self.wait_seconds = 0.0
+
+
+class QueryMetrics:
+    """
+    Registre des mesures de la couche SQLite (partagé par le processus)
+
+    Les requêtes plus longues que ``slow_query_ms`` sont journalisées avec la
+    forme de leurs paramètres (types, jamais les valeurs).
+    """
+
+    def __init__(self, slow_query_ms: float = 200.0):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self._lock = threading.Lock()
+        self._methods: dict[str, _MethodStats] = {}
+        self._slow_queries = 0
+        self._local = threading.local()
+
+    def _stack(self) -> list[_CallFrame]:
+        stack: list[_CallFrame] | None = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _current(self) -> _CallFrame | None:
+        stack: list[_CallFrame] | None = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def record_call(
+        self,
+        method: str,
+        elapsed: float,
+        rows_read: int,
+        frame: _CallFrame,
+        error: bool,
+    ) -> None:
+        """Ajoute un appel de méthode aux compteurs"""
+        index = bisect.bisect_left(LATENCY_BUCKETS, elapsed)
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                stats = self._methods[method] = _MethodStats()
+            stats.calls += 1
+            stats.errors += error
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+            stats.buckets[index] += 1
+            stats.statements += frame.statements
+            stats.rows_read += rows_read
+            stats.rows_written += frame.rows_written
+            stats.wait_seconds += frame.wait_seconds
+
+    def record_statement(
+        self, sql: str, params: Any, elapsed: float, rowcount: int, many: bool
+    ) -> None:
+        """Rattache une requête à l'appel en cours ; journalise si elle est lente"""
+        frame = self._current()
+        if frame is not None:
+            frame.statements += 1
+            if rowcount > 0:
+                frame.rows_written += rowcount
+        if elapsed < self.slow_query_seconds:
+            return
+        with self._lock:
+            self._slow_queries += 1
+        statement = _WHITESPACE.sub(" ", sql).strip()[:_MAX_LOGGED_SQL]
+        shape = "executemany" if many else param_shape(params)
+        logger.warning(
+            "Requête SQLite lente (%.1f ms): %s | paramètres: %s",
+            elapsed * 1000,
+            sanitize_log_message(statement),
+            shape,
+        )
+
+    def record_wait(self, seconds: float) -> None:
+        """Attente d'une connexion du pool (rattachée à l'appel en cours)"""
+        frame = self._current()
+        if frame is not None:
+            frame.wait_seconds += seconds
+
+    def snapshot(self) -> dict[str, Any]:
+        """Compteurs par méthode (pour /metrics)"""
+        with self._lock:
+            return {
+                "slow_query_ms": round(self.slow_query_seconds * 1000, 3),
+                "slow_queries": self._slow_queries,
+                "methods": {
+                    name: stats.snapshot()
+                    for name, stats in sorted(self._methods.items())
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+            self._slow_queries = 0
+
+    def timed(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Enveloppe une méthode : durée, lignes et attente de connexion"""
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            stack = self._stack()
+            frame = _CallFrame()
+            stack.append(frame)
+            start = time.perf_counter()
+            result: Any = None
+            error = True
+            try:
+                result = func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                if stack:
+                    # Appel imbriqué : compté aussi dans l'appel englobant
+                    parent = stack[-1]
+                    parent.statements += frame.statements
+                    parent.rows_written += frame.rows_written
+                    parent.wait_seconds += frame.wait_seconds
+                self.record_call(name, elapsed, _rows_read(result), frame, error)
+
+        return wrapper
+
+
+def _rows_read(result: Any) -> int:
+    """Nombre de lignes renvoyées par une méthode (liste, ligne seule ou rien)"""
+    if isinstance(result, list | tuple):
+        return len(result)
+    if isinstance(result, dict):
+        return 1
+    return 0
+
+
+def param_shape(params: Any) -> str:
+    """
+    Forme des paramètres liés : leurs types, sans leurs valeurs
+
+    Exemple : ``(int, str, NoneType)`` ou ``(int x 120)`` pour une liste IN.
+    """
+    if isinstance(params, dict):
+        inner = ", ".join(
+            f"{key}: {type(value).__name__}" for key, value in params.items()
+        )
+        return "{" + inner + "}"
+    try:
+        types = [type(value).__name__ for value in params]
+    except TypeError:
+        return type(params).__name__
+    if len(types) > 8 and len(set(types)) == 1:
+        return f"({types[0]} x {len(types)})"
+    return "(" + ", ".join(types) + ")"
+
+
+# Registre du processus
+query_metrics = QueryMetrics(get_settings().db_slow_query_ms)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Curseur qui chronomètre chaque requête"""
+
+    def execute(self, sql: str, parameters: Any = (), /) -> "InstrumentedCursor":
+        start = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+            return self
+        finally:
+            query_metrics.record_statement(
+                sql, parameters, time.perf_counter() - start, self.rowcount, False
+            )
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> "InstrumentedCursor":
+        start = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+            return self
+        finally:
+            query_metrics.record_statement(
+                sql, (), time.perf_counter() - start, self.rowcount, True
+            )
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connexion dont les curseurs sont chronométrés (factory de sqlite3.connect)"""
+
+    def cursor(self, factory: Any = InstrumentedCursor) -> Any:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = (), /) -> Any:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> Any:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def instrument_methods(cls: C) -> C:
+    """
+    Décorateur de classe : chronomètre toutes les méthodes publiques
+
+    Les générateurs et context managers sont laissés tels quels (leur durée
+    dépend de l'appelant).
+    """
+    if not get_settings().db_metrics_enabled:
+        return cls
+    for name, func in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(func):
+            continue
+        if inspect.isgeneratorfunction(inspect.unwrap(func)):
+            continue
+        setattr(cls, name, query_metrics.timed(name, func))
+    return cls
@@ -0,0 +1,47 @@
+"""
+Lignes typées légères pour les lectures en masse
+NamedTuple : pas de __dict__ par ligne, contrairement à dict(row)
+"""
+
+import sqlite3
+from collections.abc import Iterator
+from typing import NamedTuple, TypeVar
+
+R = TypeVar("R", bound=tuple)
+
+
+class DocumentRecord(NamedTuple):
+    """Ligne de la table documents"""
+
+    id: int
+    name: str
+    original_name: str
+    file_path: str
+    file_type: str
+    file_size: int | None
+    created_at: str
+    updated_at: str
+    content_sha256: str | None = None
+
+
+def iter_records(
+    cursor: sqlite3.Cursor, record_type: type[R], batch_size: int = 500
+) -> Iterator[R]:
+    """
+    Convertit les lignes d'un curseur exécuté, par lots de ``batch_size``
+
+    Les colonnes sont associées aux champs par nom (une seule fois) ; les
+    colonnes en trop sont ignorées.
+    """
+    columns = [description[0] for description in cursor.description]
+    fields = record_type._fields  # type: ignore[attr-defined]
+    make = record_type._make  # type: ignore[attr-defined]
+    indexes = [columns.index(field) for field in fields]
+    direct = indexes == list(range(len(columns)))
+    while rows := cursor.fetchmany(batch_size):
+        if direct:
+            for row in rows:
+                yield make(row)
+        else:
+            for row in rows:
+                yield make([row[i] for i in indexes])
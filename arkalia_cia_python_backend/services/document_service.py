@@ -6,9 +6,11 @@ Extrait la logique métier des endpoints API
 import logging
 import os  # nosec B404
 import tempfile
+from collections.abc import Callable, Iterable
 from contextlib import contextmanager
 from datetime import datetime
-from typing import cast
+from functools import cached_property
+from typing import Any, cast
 
 from arkalia_cia_python_backend.app_types import (
     DocumentMetadataDict,
@@ -16,16 +18,59 @@ from arkalia_cia_python_backend.app_types import (
 )
 from arkalia_cia_python_backend.config import get_settings
 from arkalia_cia_python_backend.database import CIADatabase
-from arkalia_cia_python_backend.pdf_parser.metadata_extractor import MetadataExtractor
-from arkalia_cia_python_backend.pdf_processor import PDFProcessor
+from arkalia_cia_python_backend.extraction_cache import METADATA
+from arkalia_cia_python_backend.pdf_parser.metadata_extractor import (
+    METADATA_EXTRACTOR_VERSION,
+    MetadataExtractor,
+)
+from arkalia_cia_python_backend.pdf_processor import (
+    TEXT_EXTRACTION_VERSION,
+    ParsedPDF,
+    PDFProcessor,
+)
 from arkalia_cia_python_backend.security_utils import sanitize_log_message
+from arkalia_cia_python_backend.sharding import user_scope
+from arkalia_cia_python_backend.utils.content_store import ContentStore
 from arkalia_cia_python_backend.utils.filename_validator import (
     get_filename_validator,
 )
+from arkalia_cia_python_backend.utils.upload_stream import (
+    AsyncReadable,
+    StoredUpload,
+    discard,
+    stream_upload,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def to_document_metadata(
+    raw_metadata: dict[str, Any], extracted_text: str = ""
+) -> DocumentMetadataDict:
+    """Métadonnées brutes (MetadataExtractor) vers DocumentMetadataDict"""
+    # Convertir datetime en string ISO si présent
+    doc_date = raw_metadata.get("date")
+    return {
+        "doctor_name": raw_metadata.get("doctor_name"),
+        "doctor_specialty": raw_metadata.get("doctor_specialty"),
+        "document_date": (
+            doc_date.isoformat() if isinstance(doc_date, datetime) else doc_date
+        ),
+        "exam_type": raw_metadata.get("exam_type"),
+        "document_type": raw_metadata.get("document_type"),
+        "keywords": raw_metadata.get("keywords", []),
+        "extracted_text": extracted_text,
+    }
+
+
+def _stored_file_intact(blob: dict[str, Any]) -> bool:
+    """Fichier stocké présent et de la taille enregistrée dans content_blobs"""
+    try:
+        return os.path.getsize(blob["file_path"]) == int(blob["file_size"])
+    except OSError:
+        return False
+
+
 class DocumentService:
     """Service pour la gestion des documents"""
 
@@ -39,6 +84,11 @@ class DocumentService:
         self.settings = get_settings()
         self.filename_validator = get_filename_validator()
 
+    @cached_property
+    def content_store(self) -> ContentStore:
+        """Stockage par contenu, dans le dossier d'upload"""
+        return ContentStore(self.pdf_processor.upload_dir)
+
     def validate_filename(self, filename: str | None) -> str:
         """
         Valide et nettoie un nom de fichier PDF
@@ -173,55 +223,236 @@ class DocumentService:
                         f"{tmp_file_path}: {e}"
                     )
 
-    def extract_metadata(self, file_path: str) -> DocumentMetadataDict | None:
+    async def receive_upload(
+        self, upload: AsyncReadable, original_filename: str
+    ) -> tuple[StoredUpload, str]:
+        """
+        Reçoit un upload par morceaux dans le dossier d'upload
+
+        Nom validé avant toute lecture, taille limitée au fil de la lecture,
+        SHA-256 calculé pendant l'écriture. Aucune copie complète du fichier
+        en mémoire.
+
+        Returns:
+            Tuple (fichier reçu sous un nom temporaire, nom de fichier validé)
+
+        Raises:
+            UploadTooLargeError: Si le fichier dépasse max_file_size_mb
+            ValueError: Si le nom de fichier est invalide
+        """
+        safe_filename = self.validate_filename(original_filename)
+        stored = await stream_upload(
+            upload,
+            self.pdf_processor.upload_dir,
+            max_size=self.settings.max_file_size_bytes,
+            chunk_size=self.settings.chunk_size_bytes,
+        )
+        return stored, safe_filename
+
+    def finalize_upload(
+        self,
+        stored: StoredUpload,
+        safe_filename: str,
+        parsed: ParsedPDF | None = None,
+        job_id: int | None = None,
+    ) -> DocumentResultDict:
+        """
+        Valide le PDF reçu puis le range dans le stockage par contenu
+
+        Contenu déjà stocké (fichier présent, de la taille enregistrée) : le
+        fichier reçu est supprimé et les résultats du premier traitement sont
+        réutilisés (``deduplicated``). Sinon le PDF est validé puis renommé
+        (atomique) vers ``ab/cd/<sha256>.pdf``, ce qui remplace un fichier
+        stocké absent ou tronqué. En cas d'échec le fichier reçu est supprimé.
+
+        Le contenu stocké gagne une référence, reprise par le document
+        enregistré ; sans document, la rendre avec release_upload().
+        ``job_id`` : job qui tient la référence (comptée sur le job).
+
+        ``parsed`` : PDF reçu ouvert par l'appelant (pipeline d'ingestion),
+        analysé une seule fois ; il n'est pas ouvert pour un doublon.
+
+        Raises:
+            ValueError: Si le PDF est invalide
+        """
+        blob = self.db.acquire_content_blob(stored.sha256, job_id)
+        if blob is not None:
+            if _stored_file_intact(blob):
+                discard(stored.path)
+                return {
+                    "filename": self.pdf_processor.safe_unique_filename(safe_filename),
+                    "original_name": safe_filename,
+                    "file_path": blob["file_path"],
+                    "file_size": blob["file_size"],
+                    "text_content": blob["info"].get("preview_text") or "",
+                    "sha256": stored.sha256,
+                    "deduplicated": True,
+                }
+            logger.warning(
+                f"Fichier stocké absent ou tronqué, remplacé par l'upload: "
+                f"{stored.sha256}"
+            )
+
+        try:
+            return self._store_content(stored, safe_filename, parsed, job_id)
+        finally:
+            # Fichier abîmé : référence gardée jusqu'au remplacement (ou échec)
+            if blob is not None:
+                self.db.release_content_blob(stored.sha256, job_id)
+
+    def _store_content(
+        self,
+        stored: StoredUpload,
+        safe_filename: str,
+        parsed: ParsedPDF | None,
+        job_id: int | None,
+    ) -> DocumentResultDict:
+        """Valide le PDF reçu, le range et l'enregistre (une référence)"""
+        try:
+            result = self.pdf_processor.process_pdf(
+                stored.path,
+                safe_filename,
+                move=True,
+                destination=self.content_store.path_for(stored.sha256),
+                parsed=parsed,
+            )
+        finally:
+            # Renommé en cas de succès ; sinon le fichier partiel est retiré
+            discard(stored.path)
+
+        if not result.get("success", False):
+            raise ValueError(result.get("error", "Erreur traitement PDF"))
+
+        self.db.add_content_blob(
+            stored.sha256,
+            result["file_path"],
+            result["file_size"],
+            {"metadata": result["metadata"], "preview_text": result["preview_text"]},
+            job_id=job_id,
+        )
+        return {
+            "filename": result["filename"],
+            "original_name": result["original_name"],
+            "file_path": result["file_path"],
+            "file_size": result["file_size"],
+            "text_content": result.get("preview_text") or "",
+            "sha256": stored.sha256,
+            "deduplicated": False,
+        }
+
+    def release_upload(self, sha256: str, job_id: int | None = None) -> int:
+        """
+        Rend la référence prise par finalize_upload (document non enregistré)
+
+        Returns:
+            Nombre de fichiers supprimés (0 si le contenu reste référencé)
+        """
+        self.db.release_content_blob(sha256, job_id)
+        return self.release_content([sha256])
+
+    def release_content(self, sha256s: Iterable[str]) -> int:
+        """
+        Supprime les fichiers stockés que plus aucun document ne référence
+
+        Returns:
+            Nombre de fichiers supprimés
+        """
+        paths = self.db.collect_unreferenced_blobs(sha256s)
+        for path in paths:
+            self.content_store.remove(path)
+        return len(paths)
+
+    async def ingest_upload(
+        self, upload: AsyncReadable, original_filename: str
+    ) -> DocumentResultDict:
+        """
+        Reçoit puis valide un upload (receive_upload + finalize_upload)
+
+        Returns:
+            Dictionnaire avec résultat du traitement (dont ``sha256``)
+        """
+        stored, safe_filename = await self.receive_upload(upload, original_filename)
+        return self.finalize_upload(stored, safe_filename)
+
+    def extract_text(
+        self,
+        file_path: str,
+        sha256: str | None = None,
+        parsed: ParsedPDF | None = None,
+        on_ocr_progress: Callable[[int, int], None] | None = None,
+    ) -> str:
+        """
+        Texte complet d'un PDF, avec OCR si le texte extrait est trop court
+
+        Args:
+            file_path: Chemin vers le fichier PDF
+            sha256: Empreinte du contenu ; active le cache d'extraction
+            parsed: PDF déjà ouvert dont le texte des pages est réutilisé
+            on_ocr_progress: Appelé après chaque page OCR (pages faites, total)
+        """
+        # Extraire texte (avec OCR si nécessaire)
+        text_content = self.pdf_processor.extract_text_from_pdf(
+            file_path, use_ocr=False, sha256=sha256, parsed=parsed
+        )
+
+        # Si peu de texte, essayer OCR
+        min_length = self.settings.min_text_length_for_ocr
+        use_ocr = len(text_content.strip()) < min_length
+        if use_ocr:
+            text_content = self.pdf_processor.extract_text_from_pdf(
+                file_path,
+                use_ocr=True,
+                sha256=sha256,
+                parsed=parsed,
+                on_ocr_progress=on_ocr_progress,
+            )
+        return text_content
+
+    def extract_metadata(
+        self,
+        file_path: str,
+        sha256: str | None = None,
+        parsed: ParsedPDF | None = None,
+        text: str | None = None,
+        on_ocr_progress: Callable[[int, int], None] | None = None,
+    ) -> DocumentMetadataDict | None:
         """
         Extrait les métadonnées d'un fichier PDF
 
         Args:
             file_path: Chemin vers le fichier PDF
+            sha256: Empreinte du contenu ; active le cache d'extraction
+                (métadonnées, texte des pages et OCR déjà calculés)
+            parsed: PDF déjà ouvert (pipeline d'ingestion)
+            text: Texte déjà extrait (sinon extrait ici)
+            on_ocr_progress: Appelé après chaque page OCR (pages faites, total)
 
         Returns:
             Métadonnées extraites ou None en cas d'erreur
         """
+        if parsed is not None:
+            sha256 = parsed.sha256
+        cache = self.pdf_processor.extraction_cache if sha256 else None
+        # Les métadonnées dépendent aussi du texte extrait
+        version = f"{METADATA_EXTRACTOR_VERSION}|{TEXT_EXTRACTION_VERSION}"
         try:
-            # Extraire texte (avec OCR si nécessaire)
-            text_content = self.pdf_processor.extract_text_from_pdf(
-                file_path, use_ocr=False
-            )
+            if cache and sha256:
+                cached = cache.get(sha256, METADATA, version)
+                if cached is not None:
+                    return cast(DocumentMetadataDict, cached)
 
-            # Si peu de texte, essayer OCR
-            min_length = self.settings.min_text_length_for_ocr
-            use_ocr = len(text_content.strip()) < min_length
-            if use_ocr:
-                text_content = self.pdf_processor.extract_text_from_pdf(
-                    file_path, use_ocr=True
-                )
+            if text is None:
+                text = self.extract_text(file_path, sha256, parsed, on_ocr_progress)
 
             # Extraire métadonnées
             metadata_extractor = MetadataExtractor()
-            raw_metadata = metadata_extractor.extract_metadata(text_content)
-
-            # Convertir en DocumentMetadataDict (type-safe)
-            # Convertir datetime en string ISO si présent
-            doc_date = raw_metadata.get("date")
-            document_date_str: str | None = None
-            if isinstance(doc_date, datetime):
-                document_date_str = doc_date.isoformat()
-            elif doc_date is None:
-                document_date_str = None
-
-            return cast(
-                DocumentMetadataDict,
-                {
-                    "doctor_name": raw_metadata.get("doctor_name"),
-                    "doctor_specialty": raw_metadata.get("doctor_specialty"),
-                    "document_date": document_date_str,
-                    "exam_type": raw_metadata.get("exam_type"),
-                    "document_type": raw_metadata.get("document_type"),
-                    "keywords": raw_metadata.get("keywords", []),
-                    "extracted_text": raw_metadata.get("extracted_text", ""),
-                },
+            raw_metadata = metadata_extractor.extract_metadata(text)
+            metadata = to_document_metadata(
+                raw_metadata, raw_metadata.get("extracted_text", "")
             )
+            if cache and sha256:
+                cache.put(sha256, METADATA, version, dict(metadata))
+            return metadata
         except (ValueError, FileNotFoundError, OSError) as e:
             logger.warning(
                 f"Erreur extraction métadonnées: {sanitize_log_message(str(e))}"
@@ -252,45 +483,84 @@ class DocumentService:
         Returns:
             ID du document créé
         """
-        # Sauvegarder en base de données
-        doc_id = self.db.add_document(
-            name=result["filename"],
-            original_name=result["original_name"],
-            file_path=result["file_path"],
-            file_type="pdf",
-            file_size=result["file_size"],
-        )
+        # Une seule transaction : document, association et métadonnées, dans
+        # la base de ``user_id`` (pas celle de la requête en cours)
+        with user_scope(user_id), self.db.user_connection(user_id):
+            doc_id = self.db.add_document(
+                name=result["filename"],
+                original_name=result["original_name"],
+                file_path=result["file_path"],
+                file_type="pdf",
+                file_size=result["file_size"],
+                content_sha256=result.get("sha256"),
+            )
 
-        if not doc_id:
-            raise ValueError("Erreur lors de la sauvegarde du document")
+            if not doc_id:
+                raise ValueError("Erreur lors de la sauvegarde du document")
 
-        # Associer le document à l'utilisateur
-        self.db.associate_document_to_user(user_id, doc_id)
+            # Associer le document à l'utilisateur
+            self.db.associate_document_to_user(user_id, doc_id)
 
-        # Sauvegarder métadonnées si disponibles
-        if metadata and doc_id:
-            self._save_document_metadata(doc_id, metadata)
+            # Sauvegarder métadonnées si disponibles
+            if metadata and doc_id:
+                self._save_document_metadata(doc_id, metadata)
 
         return doc_id
 
-    def _save_document_metadata(
-        self, doc_id: int, metadata: DocumentMetadataDict
-    ) -> None:
-        """Sauvegarde les métadonnées d'un document"""
+    def save_documents_with_metadata_bulk(
+        self,
+        items: list[tuple[DocumentResultDict, DocumentMetadataDict | None]],
+        user_id: int,
+    ) -> list[int]:
+        """
+        Sauvegarde plusieurs documents (imports en masse) en une transaction
+
+        Args:
+            items: Couples (résultat du traitement PDF, métadonnées optionnelles)
+            user_id: ID de l'utilisateur
+
+        Returns:
+            IDs des documents créés, dans l'ordre de ``items``
+        """
+        with user_scope(user_id), self.db.user_connection(user_id):
+            doc_ids = self.db.add_documents_bulk(
+                {
+                    "name": result["filename"],
+                    "original_name": result["original_name"],
+                    "file_path": result["file_path"],
+                    "file_type": "pdf",
+                    "file_size": result["file_size"],
+                    "content_sha256": result.get("sha256"),
+                }
+                for result, _ in items
+            )
+            self.db.associate_documents_to_user_bulk(user_id, doc_ids)
+            self.db.add_document_metadata_bulk(
+                {"document_id": doc_id, **self._metadata_fields(metadata)}
+                for doc_id, (_, metadata) in zip(doc_ids, items, strict=True)
+                if metadata
+            )
+        return doc_ids
+
+    def _metadata_fields(self, metadata: DocumentMetadataDict) -> dict[str, str | None]:
+        """Colonnes document_metadata à partir des métadonnées extraites"""
         # document_date est déjà une string ISO dans DocumentMetadataDict
-        document_date_str = metadata.get("document_date")
-        doctor_name = metadata.get("doctor_name")
-        doctor_specialty = metadata.get("doctor_specialty")
         keywords_list = metadata.get("keywords", [])
         extracted_text = metadata.get("extracted_text", "")
+        return {
+            "doctor_name": metadata.get("doctor_name"),
+            "doctor_specialty": metadata.get("doctor_specialty"),
+            "document_date": metadata.get("document_date"),
+            "exam_type": metadata.get("exam_type"),
+            "document_type": metadata.get("document_type"),
+            "keywords": ",".join(keywords_list) if keywords_list else "",
+            "extracted_text": extracted_text[: self.settings.max_extracted_text_length],
+        }
 
+    def _save_document_metadata(
+        self, doc_id: int, metadata: DocumentMetadataDict
+    ) -> None:
+        """Sauvegarde les métadonnées d'un document"""
         self.db.add_document_metadata(
-            document_id=doc_id,
-            doctor_name=doctor_name,
-            doctor_specialty=doctor_specialty,
-            document_date=document_date_str,
-            exam_type=metadata.get("exam_type"),
-            document_type=metadata.get("document_type"),
-            keywords=",".join(keywords_list) if keywords_list else "",
-            extracted_text=extracted_text[: self.settings.max_extracted_text_length],
+            document_id=doc_id, **self._metadata_fields(metadata)
         )
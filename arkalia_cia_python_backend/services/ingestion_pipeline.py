@@ -0,0 +1,152 @@
+"""
+Ingestion d'un upload en une seule passe
+Le PDF reçu est ouvert et analysé une fois : validation, aperçu, texte,
+métadonnées et parsing portail partagent le même lecteur et le même texte
+"""
+
+import logging
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from arkalia_cia_python_backend.app_types import (
+    DocumentMetadataDict,
+    DocumentResultDict,
+)
+from arkalia_cia_python_backend.pdf_processor import ParsedPDF
+from arkalia_cia_python_backend.services.document_service import (
+    DocumentService,
+    to_document_metadata,
+)
+from arkalia_cia_python_backend.services.health_portal_parsers import (
+    HealthPortalParser,
+    get_health_portal_parser,
+)
+from arkalia_cia_python_backend.utils.upload_stream import StoredUpload
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionResult(NamedTuple):
+    """Résultat d'une ingestion, prêt à être enregistré"""
+
+    document: DocumentResultDict
+    metadata: DocumentMetadataDict | None
+    portal: dict[str, Any] | None = None  # Résultat du parser portail
+
+
+class IngestionPipeline:
+    """
+    Validation, stockage, texte et métadonnées d'un upload reçu
+
+    Un seul ``PdfReader`` par upload : le texte de la première page sert à
+    l'aperçu puis au texte complet, lui-même partagé entre métadonnées et
+    parsing portail. Un doublon n'est pas ouvert du tout (texte relu du
+    cache d'extraction).
+    """
+
+    def __init__(
+        self,
+        service: DocumentService,
+        portal_parser: HealthPortalParser | None = None,
+    ):
+        self.service = service
+        self._portal_parser = portal_parser
+
+    @property
+    def portal_parser(self) -> HealthPortalParser:
+        """Parser des portails santé (singleton partagé par défaut)"""
+        if self._portal_parser is None:
+            self._portal_parser = get_health_portal_parser()
+        return self._portal_parser
+
+    def run(
+        self,
+        stored: StoredUpload,
+        safe_filename: str,
+        portal: str | None = None,
+        on_progress: Callable[[float], None] | None = None,
+        job_id: int | None = None,
+    ) -> IngestionResult:
+        """
+        Ingère un upload reçu (receive_upload)
+
+        Args:
+            stored: Fichier reçu, encore sous son nom temporaire
+            safe_filename: Nom de fichier validé
+            portal: Portail santé ('andaman7', 'masante') : parsing portail
+                à la place de l'extraction de métadonnées
+            on_progress: Appelé avec l'avancement (0.4 stocké, 0.8 analysé ;
+                entre les deux, page par page pendant l'OCR)
+            job_id: Job qui tient la référence au contenu stocké
+
+        Le document retourné tient une référence sur le contenu stocké
+        (finalize_upload) : l'enregistrer, ou la rendre avec release_upload().
+        En cas d'échec après le stockage, elle est rendue ici.
+
+        Raises:
+            ValueError: Si le PDF est invalide (fichier reçu supprimé)
+        """
+        service = self.service
+        with service.pdf_processor.open_pdf(stored.path, stored.sha256) as parsed:
+            document = service.finalize_upload(
+                stored, safe_filename, parsed=parsed, job_id=job_id
+            )
+            try:
+                metadata, portal_result = self._analyze(
+                    document, stored, parsed, portal, on_progress
+                )
+            except BaseException:
+                service.release_upload(stored.sha256, job_id)
+                raise
+        return IngestionResult(document, metadata, portal_result)
+
+    def _analyze(
+        self,
+        document: DocumentResultDict,
+        stored: StoredUpload,
+        parsed: ParsedPDF,
+        portal: str | None,
+        on_progress: Callable[[float], None] | None,
+    ) -> tuple[DocumentMetadataDict | None, dict[str, Any] | None]:
+        """Métadonnées ou parsing portail du document stocké"""
+        service = self.service
+        if on_progress:
+            on_progress(0.4)
+
+        # Doublon : rien n'a été ouvert, le fichier stocké est relu
+        shared = parsed if parsed.opened else None
+        file_path = document["file_path"]
+        ocr_progress = _ocr_progress(on_progress) if on_progress else None
+        portal_result: dict[str, Any] | None = None
+        if portal is None:
+            metadata = service.extract_metadata(
+                file_path, stored.sha256, shared, on_ocr_progress=ocr_progress
+            )
+        else:
+            text = service.extract_text(
+                file_path, stored.sha256, shared, on_ocr_progress=ocr_progress
+            )
+            portal_result = self.portal_parser.parse_portal_pdf(
+                file_path, portal, text=text
+            )
+            metadata = _portal_metadata(portal_result)
+        if on_progress:
+            on_progress(0.8)
+        return metadata, portal_result
+
+
+def _ocr_progress(on_progress: Callable[[float], None]) -> Callable[[int, int], None]:
+    """Avancement de l'OCR (pages faites sur total) ramené entre 0.4 et 0.8"""
+
+    def report(done: int, total: int) -> None:
+        on_progress(round(0.4 + 0.4 * done / total, 3))
+
+    return report
+
+
+def _portal_metadata(result: dict[str, Any]) -> DocumentMetadataDict:
+    """Métadonnées du document principal à partir du parsing portail"""
+    documents = result.get("documents") or []
+    # Texte extrait : description du premier document trouvé
+    extracted_text = str(documents[0].get("description", ""))[:500] if documents else ""
+    return to_document_metadata(result.get("metadata", {}), extracted_text)
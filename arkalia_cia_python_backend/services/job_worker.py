@@ -0,0 +1,249 @@
+"""
+Traitement des documents hors requête
+Des threads d'arrière-plan prennent les jobs de la table jobs (base
+principale) : la file survit à un redémarrage du processus
+"""
+
+import logging
+import os
+import threading
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from arkalia_cia_python_backend.database import JOB_LEASE_SECONDS
+from arkalia_cia_python_backend.security_utils import sanitize_log_message
+from arkalia_cia_python_backend.services.document_service import DocumentService
+from arkalia_cia_python_backend.services.ingestion_pipeline import IngestionPipeline
+from arkalia_cia_python_backend.sharding import user_scope
+from arkalia_cia_python_backend.utils.upload_stream import StoredUpload, discard
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_UPLOAD = "document_upload"
+
+# Messages enregistrés dans le job (lus par le client)
+_INVALID_DOCUMENT = "Document PDF invalide"
+_INTERNAL_ERROR = "Erreur interne lors du traitement du document"
+
+
+class DocumentJobWorker:
+    """
+    Pool de ``workers`` threads qui exécutent les jobs en attente
+
+    Les threads dorment ``poll_interval`` secondes quand la file est vide ;
+    ``notify()`` les réveille dès qu'un job est ajouté. Chaque job pris a un
+    bail de ``lease_seconds`` secondes, prolongé par un thread dédié tant
+    qu'il tourne ; les jobs dont le bail a expiré (worker arrêté, processus
+    tué) sont remis en attente au démarrage puis périodiquement.
+    """
+
+    def __init__(
+        self,
+        service: DocumentService,
+        workers: int = 2,
+        poll_interval: float = 2.0,
+        max_attempts: int = 3,
+        pipeline: IngestionPipeline | None = None,
+        lease_seconds: int = JOB_LEASE_SECONDS,
+    ):
+        if workers < 1:
+            raise ValueError("workers doit être >= 1")
+        if lease_seconds < 1:
+            raise ValueError("lease_seconds doit être >= 1")
+        self.service = service
+        self.pipeline = pipeline or IngestionPipeline(service)
+        self.db = service.db
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        # Propriétaire des baux : ce pool, dans ce processus
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        self._handlers: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+            DOCUMENT_UPLOAD: self._process_upload,
+        }
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._lease_thread: threading.Thread | None = None
+        self._active: set[int] = set()  # Jobs en cours (baux à prolonger)
+
+        # Statistiques (lues par stats())
+        self._completed = 0
+        self._failed = 0
+
+    def start(self) -> None:
+        """Reprend les jobs interrompus puis démarre les threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            requeued = self.db.requeue_interrupted_jobs(self.max_attempts)
+            if requeued:
+                logger.info(f"{requeued} job(s) interrompu(s) remis en attente")
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run, name=f"cia-job-worker-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            self._lease_thread = threading.Thread(
+                target=self._keep_leases, name="cia-job-leases", daemon=True
+            )
+            self._lease_thread.start()
+
+    def notify(self) -> None:
+        """Signale un nouveau job aux threads en attente"""
+        self._wakeup.set()
+
+    def run_next(self) -> bool:
+        """
+        Exécute le plus ancien job en attente dans le thread appelant
+
+        Returns:
+            True si un job a été traité, False si la file est vide
+        """
+        job = self.db.claim_next_job(self.owner, self.lease_seconds)
+        if job is None:
+            return False
+        with self._lock:
+            self._active.add(job["id"])
+        try:
+            self._execute(job)
+        finally:
+            with self._lock:
+                self._active.discard(job["id"])
+        return True
+
+    def _run(self) -> None:
+        """Boucle d'un thread : vide la file puis attend un signal"""
+        while not self._stop.is_set():
+            try:
+                if self.run_next():
+                    continue
+            except Exception as e:
+                logger.error(
+                    f"Erreur de la file de jobs: {sanitize_log_message(str(e))}"
+                )
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _keep_leases(self) -> None:
+        """Prolonge les baux des jobs en cours, reprend les baux expirés"""
+        while not self._stop.wait(self.lease_seconds / 3):
+            with self._lock:
+                active = list(self._active)
+            try:
+                for job_id in active:
+                    if not self.db.renew_job_lease(
+                        job_id, self.owner, self.lease_seconds
+                    ):
+                        logger.warning(f"Bail du job {job_id} perdu")
+                if self.db.requeue_interrupted_jobs(self.max_attempts):
+                    self.notify()
+            except Exception as e:
+                logger.error(f"Erreur des baux de jobs: {sanitize_log_message(str(e))}")
+
+    def _execute(self, job: dict[str, Any]) -> None:
+        """Exécute un job et enregistre son résultat ou son échec"""
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            self.db.fail_job(job["id"], f"Type de job inconnu: {job['kind']}")
+            with self._lock:
+                self._failed += 1
+            return
+        try:
+            # Les écritures du job vont dans la base de son utilisateur
+            with user_scope(job["user_id"]):
+                result = handler(job)
+        except ValueError as e:
+            logger.warning(f"Job {job['id']} refusé: {sanitize_log_message(str(e))}")
+            self._fail(job, _INVALID_DOCUMENT)
+        except Exception as e:
+            logger.error(
+                f"Job {job['id']} en échec: {sanitize_log_message(str(e))}",
+                exc_info=True,
+            )
+            self._fail(job, _INTERNAL_ERROR)
+        else:
+            self.db.complete_job(job["id"], result)
+            with self._lock:
+                self._completed += 1
+
+    def _fail(self, job: dict[str, Any], error: str) -> None:
+        if job["kind"] == DOCUMENT_UPLOAD:
+            # Références encore tenues par le job (essais interrompus) rendues
+            sha256 = job["payload"].get("sha256")
+            if sha256:
+                self.db.release_job_content_refs(job["id"], sha256)
+                self.service.release_content([sha256])
+            discard(job["payload"]["path"])
+        self.db.fail_job(job["id"], error)
+        with self._lock:
+            self._failed += 1
+
+    def _process_upload(self, job: dict[str, Any]) -> dict[str, Any]:
+        """Ingestion en une passe (validation, métadonnées) puis enregistrement"""
+        if job.get("document_id") is not None:
+            # Document enregistré par un essai précédent : rien à refaire
+            return dict(job["result"] or {"document_id": job["document_id"]})
+        payload = job["payload"]
+        stored = StoredUpload(payload["path"], payload["size"], payload["sha256"])
+        # Relance après échec : texte et OCR relus du cache d'extraction
+        result, metadata, _ = self.pipeline.run(
+            stored,
+            payload["filename"],
+            on_progress=lambda progress: self.db.update_job_progress(
+                job["id"], progress
+            ),
+            job_id=job["id"],
+        )
+        if job.get("content_refs"):
+            # Essai précédent interrompu avant l'enregistrement : seule la
+            # référence prise par cet essai est gardée
+            self.db.release_job_content_refs(job["id"], stored.sha256, keep=1)
+
+        try:
+            # Document et job dans une transaction : un job repris après un
+            # arrêt ne crée pas de doublon. En mode par utilisateur le
+            # document est validé dans sa base juste avant le job.
+            with self.db.connection():
+                doc_id = self.service.save_document_with_metadata(
+                    result, job["user_id"], metadata
+                )
+                job_result = {
+                    "document_id": doc_id,
+                    "filename": result["original_name"],
+                    "sha256": result.get("sha256"),
+                    "deduplicated": result.get("deduplicated", False),
+                }
+                self.db.set_job_document(job["id"], doc_id, job_result)
+        except BaseException:
+            # Document non enregistré : référence au contenu rendue
+            self.service.release_upload(stored.sha256, job["id"])
+            raise
+        return job_result
+
+    def stop(self) -> None:
+        """Arrête les threads (le job en cours se termine)"""
+        self._stop.set()
+        self._wakeup.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+            if self._lease_thread is not None:
+                threads.append(self._lease_thread)
+                self._lease_thread = None
+        for thread in threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=5)
+
+    def stats(self) -> dict[str, Any]:
+        """Retourne les compteurs du pool de workers"""
+        with self._lock:
+            return {
+                "workers": len(self._threads),
+                "completed": self._completed,
+                "failed": self._failed,
+            }
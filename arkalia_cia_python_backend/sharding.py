@@ -0,0 +1,210 @@
+"""
+Stockage SQLite par utilisateur (mode optionnel)
+Une base par utilisateur : les écritures de deux utilisateurs ne se
+disputent plus le même verrou d'écriture SQLite
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from arkalia_cia_python_backend.db_pool import SQLiteConnectionPool
+from arkalia_cia_python_backend.doctor_search import DoctorNameIndex
+from arkalia_cia_python_backend.migrations import migrate
+
+logger = logging.getLogger(__name__)
+
+# Utilisateur de la requête en cours (positionné à l'authentification)
+current_user_id: ContextVar[int | None] = ContextVar("current_user_id", default=None)
+
+
+@contextmanager
+def user_scope(user_id: int | None) -> Iterator[None]:
+    """Fixe l'utilisateur courant le temps d'un bloc"""
+    token = current_user_id.set(user_id)
+    try:
+        yield
+    finally:
+        current_user_id.reset(token)
+
+
+class Shard:
+    """Base d'un utilisateur : pool de connexions et index des médecins"""
+
+    __slots__ = ("pool", "doctor_names", "leases")
+
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
+        self.doctor_names = DoctorNameIndex(pool)
+        self.leases = 0
+
+
+class ShardManager:
+    """
+    Bases par utilisateur (``user_<id>.db``) sous un répertoire
+
+    Chaque base est créée et migrée à sa première utilisation, hors du
+    verrou global : seul l'utilisateur concerné attend (verrou d'ouverture
+    par utilisateur). Au plus ``max_open`` bases restent ouvertes : la moins
+    récemment utilisée est fermée, jamais pendant qu'une opération la
+    détient (bail en cours).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        pool_factory: Callable[[str], SQLiteConnectionPool],
+        max_open: int = 128,
+    ):
+        if max_open < 1:
+            raise ValueError("max_open doit être >= 1")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.pool_factory = pool_factory
+        self.max_open = max_open
+        self._lock = threading.Lock()
+        self._shards: OrderedDict[int, Shard] = OrderedDict()
+        # Verrous d'ouverture (ou de suppression) par utilisateur
+        self._openers: dict[int, threading.Lock] = {}
+        self._closed = False
+
+    def path_for(self, user_id: int) -> str:
+        """Chemin de la base d'un utilisateur"""
+        user_id = int(user_id)
+        if user_id < 1:
+            raise ValueError(f"ID utilisateur invalide: {user_id}")
+        return str(self.directory / f"user_{user_id}.db")
+
+    def _open(self, user_id: int) -> Shard:
+        pool = self.pool_factory(self.path_for(user_id))
+        try:
+            with pool.connection() as conn:
+                migrate(conn)
+        except Exception:
+            pool.close()
+            raise
+        return Shard(pool)
+
+    def _evict(self) -> None:
+        """Ferme les bases les moins récemment utilisées au-delà de max_open"""
+        excess = len(self._shards) - self.max_open
+        for user_id in list(self._shards):
+            if excess <= 0:
+                break
+            shard = self._shards[user_id]
+            if shard.leases == 0:
+                del self._shards[user_id]
+                shard.pool.close()
+                excess -= 1
+
+    def _take(self, user_id: int) -> Shard | None:
+        """Bail sur une base déjà ouverte, ou None (appelant sous _lock)"""
+        if self._closed:
+            raise RuntimeError("Stockage par utilisateur fermé")
+        shard = self._shards.get(user_id)
+        if shard is not None:
+            self._shards.move_to_end(user_id)
+            shard.leases += 1
+            self._evict()
+        return shard
+
+    @contextmanager
+    def _opener(self, user_id: int) -> Iterator[None]:
+        """Verrou d'ouverture d'un utilisateur (les autres ne sont pas bloqués)"""
+        with self._lock:
+            opener = self._openers.setdefault(user_id, threading.Lock())
+        try:
+            with opener:
+                yield
+        finally:
+            with self._lock:
+                if self._openers.get(user_id) is opener and not opener.locked():
+                    del self._openers[user_id]
+
+    def _lease_shard(self, user_id: int) -> Shard:
+        """Prend un bail, en ouvrant et migrant la base si besoin"""
+        with self._lock:
+            shard = self._take(user_id)
+        if shard is not None:
+            return shard
+        with self._opener(user_id):
+            # Ouverte entre-temps par un autre thread du même utilisateur ?
+            with self._lock:
+                shard = self._take(user_id)
+            if shard is not None:
+                return shard
+            opened = self._open(user_id)  # Migration hors du verrou global
+            with self._lock:
+                shard = None if self._closed else self._take(user_id)
+                if shard is None and not self._closed:
+                    self._shards[user_id] = opened
+                    shard = self._take(user_id)
+            if shard is not opened:
+                # Stockage fermé, ou base publiée par un autre thread
+                opened.pool.close()
+            if shard is None:
+                raise RuntimeError("Stockage par utilisateur fermé")
+            return shard
+
+    @contextmanager
+    def lease(self, user_id: int) -> Iterator[Shard]:
+        """Base d'un utilisateur, gardée ouverte pendant le bloc"""
+        shard = self._lease_shard(user_id)
+        try:
+            yield shard
+        finally:
+            with self._lock:
+                shard.leases -= 1
+                self._evict()
+
+    def delete(self, user_id: int) -> bool:
+        """
+        Supprime la base d'un utilisateur (fichiers WAL compris)
+
+        Returns:
+            True si une base existait
+
+        Raises:
+            RuntimeError: Si la base est en cours d'utilisation
+        """
+        path = self.path_for(user_id)
+        # Pas d'ouverture concurrente de cette base pendant la suppression
+        with self._opener(user_id), self._lock:
+            shard = self._shards.get(user_id)
+            if shard is not None:
+                if shard.leases:
+                    raise RuntimeError("Base utilisateur en cours d'utilisation")
+                del self._shards[user_id]
+                shard.pool.close()
+            existed = os.path.exists(path)
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.unlink(path + suffix)
+                except FileNotFoundError:
+                    pass
+        if existed:
+            logger.info(f"Base utilisateur {user_id} supprimée")
+        return existed
+
+    def close(self) -> None:
+        """Ferme toutes les bases ouvertes"""
+        with self._lock:
+            self._closed = True
+            shards = list(self._shards.values())
+            self._shards.clear()
+        for shard in shards:
+            shard.pool.close()
+
+    def stats(self) -> dict[str, int]:
+        """Nombre de bases ouvertes et en cours d'utilisation"""
+        with self._lock:
+            return {
+                "open": len(self._shards),
+                "leased": sum(1 for s in self._shards.values() if s.leases),
+                "max_open": self.max_open,
+            }
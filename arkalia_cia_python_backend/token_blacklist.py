@@ -0,0 +1,172 @@
+"""
+Cache mémoire de la blacklist des tokens JWT
+Évite un aller-retour SQLite par requête authentifiée
+"""
+
+import hashlib
+import heapq
+import logging
+import math
+import threading
+import time
+from datetime import datetime
+
+from arkalia_cia_python_backend.db_pool import SQLiteConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+def _to_timestamp(expires_at: str | datetime) -> float:
+    """Convertit une expiration (ISO ou datetime) en timestamp epoch"""
+    if isinstance(expires_at, str):
+        expires_at = datetime.fromisoformat(expires_at)
+    return expires_at.timestamp()
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom minimal (bytearray + blake2b)
+
+    Réponse négative certaine (« jamais révoqué »), positive probable.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key)
+        )
+
+
+class TokenBlacklistCache:
+    """
+    JTI révoqués non expirés, gardés en mémoire
+
+    Chargé au premier usage, mis à jour par add() et purgé à l'expiration
+    de chaque token. Les révocations faites par d'autres workers sont
+    détectées via le compteur token_blacklist_version (incrémenté par trigger
+    SQLite), relu au plus toutes les ``refresh_interval`` secondes : seules
+    les nouvelles lignes (id > dernier id connu) sont alors chargées.
+    """
+
+    def __init__(
+        self,
+        pool: SQLiteConnectionPool,
+        refresh_interval: float = 1.0,
+        use_bloom: bool = False,
+        bloom_error_rate: float = 0.001,
+    ):
+        self.pool = pool
+        self.refresh_interval = refresh_interval
+        self.use_bloom = use_bloom
+        self.bloom_error_rate = bloom_error_rate
+        self._lock = threading.Lock()
+        self._entries: dict[str, float] = {}
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._bloom: BloomFilter | None = None
+        self._loaded = False
+        self._last_id = 0
+        self._version = -1
+        self._next_check = 0.0
+
+    def _read_version(self) -> int:
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT version FROM token_blacklist_version WHERE id = 1"
+            ).fetchone()
+            return int(row[0]) if row else 0
+
+    def _load_new_rows(self) -> None:
+        """Charge les révocations ajoutées depuis le dernier chargement"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT id, token_jti, expires_at FROM token_blacklist "
+                "WHERE id > ? ORDER BY id",
+                (self._last_id,),
+            ).fetchall()
+        now = time.time()
+        for row_id, jti, expires_at in rows:
+            self._last_id = max(self._last_id, row_id)
+            try:
+                expires_ts = _to_timestamp(expires_at)
+            except (TypeError, ValueError):
+                logger.warning(f"Expiration illisible pour le token révoqué {row_id}")
+                continue
+            if expires_ts > now:
+                self._store(jti, expires_ts)
+
+    def _store(self, jti: str, expires_ts: float) -> None:
+        self._entries[jti] = expires_ts
+        heapq.heappush(self._expiry_heap, (expires_ts, jti))
+        if self.use_bloom:
+            if self._bloom is None or self._bloom.count >= self._bloom.capacity:
+                self._rebuild_bloom()
+            else:
+                self._bloom.add(jti)
+
+    def _rebuild_bloom(self) -> None:
+        """Reconstruit le filtre (taille double des entrées actuelles)"""
+        bloom = BloomFilter(max(1024, 2 * len(self._entries)), self.bloom_error_rate)
+        for jti in self._entries:
+            bloom.add(jti)
+        self._bloom = bloom
+
+    def _evict_expired(self, now: float) -> None:
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_ts, jti = heapq.heappop(heap)
+            if self._entries.get(jti) == expires_ts:
+                del self._entries[jti]
+
+    def _refresh(self, now: float) -> None:
+        """Relit le compteur de version si l'intervalle est écoulé"""
+        if self._loaded and now < self._next_check:
+            return
+        with self._lock:
+            if self._loaded and now < self._next_check:
+                return
+            version = self._read_version()
+            if version != self._version:
+                self._load_new_rows()
+                self._version = version
+            self._loaded = True
+            self._next_check = now + self.refresh_interval
+            self._evict_expired(time.time())
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        """Enregistre une révocation faite par ce processus"""
+        expires_ts = _to_timestamp(expires_at)
+        if expires_ts <= time.time():
+            return
+        with self._lock:
+            self._store(jti, expires_ts)
+
+    def is_revoked(self, jti: str) -> bool:
+        """Indique si le token est révoqué et pas encore expiré"""
+        now = time.time()
+        self._refresh(now)
+        bloom = self._bloom
+        if bloom is not None and jti not in bloom:
+            return False
+        expires_ts = self._entries.get(jti)
+        return expires_ts is not None and expires_ts > now
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,50 @@
+"""
+Stockage des fichiers par contenu
+Un fichier par SHA-256 sous ``<racine>/ab/cd/<sha256>.pdf`` : deux niveaux de
+sous-répertoires (65 536 feuilles) pour garder des répertoires petits
+"""
+
+import re
+from pathlib import Path
+
+from arkalia_cia_python_backend.utils.upload_stream import discard
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ContentStore:
+    """
+    Fichiers adressés par leur SHA-256, partagés par les documents identiques
+
+    Le registre (références, résultats de traitement) est dans la table
+    content_blobs ; cette classe ne gère que les fichiers.
+    """
+
+    def __init__(self, root: str | Path, suffix: str = ".pdf", fan_out: int = 2):
+        self.root = Path(root)
+        self.suffix = suffix
+        self.fan_out = fan_out
+
+    def path_for(self, sha256: str) -> Path:
+        """Chemin d'un contenu (``ab/cd/<sha256>.pdf`` pour fan_out=2)"""
+        if not _SHA256.match(sha256):
+            raise ValueError("Empreinte SHA-256 invalide")
+        parts = [sha256[2 * i : 2 * i + 2] for i in range(self.fan_out)]
+        return self.root.joinpath(*parts, f"{sha256}{self.suffix}")
+
+    def contains(self, path: str | Path) -> bool:
+        """Vrai si ``path`` est un fichier du stockage par contenu"""
+        resolved = Path(path).resolve()
+        return (
+            _SHA256.match(resolved.stem) is not None
+            and resolved == self.path_for(resolved.stem).resolve()
+        )
+
+    def remove(self, path: str | Path) -> None:
+        """
+        Supprime un fichier du stockage (ignoré s'il n'en fait pas partie)
+
+        Les sous-répertoires sont gardés : un upload concurrent peut y écrire.
+        """
+        if self.contains(path):
+            discard(str(path))
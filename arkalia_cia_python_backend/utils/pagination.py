@@ -0,0 +1,56 @@
+"""
+Pagination par curseur (keyset) sur (horodatage, id)
+Les pages profondes coûtent autant que la première, contrairement à OFFSET
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from typing import Any
+
+# En-tête HTTP portant le curseur de la page suivante
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    """Curseur de pagination illisible ou falsifié"""
+
+
+def encode_cursor(timestamp: str, row_id: int) -> str:
+    """Encode la position (horodatage, id) en curseur opaque"""
+    payload = json.dumps([timestamp, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """
+    Décode un curseur opaque
+
+    Raises:
+        InvalidCursorError: Si le curseur est invalide
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursorError("Curseur de pagination invalide") from e
+    if not isinstance(timestamp, str) or type(row_id) is not int:
+        raise InvalidCursorError("Curseur de pagination invalide")
+    return timestamp, row_id
+
+
+def next_cursor(
+    rows: Sequence[dict[str, Any]],
+    limit: int | None,
+    timestamp_key: str = "created_at",
+) -> str | None:
+    """
+    Curseur de la page suivante, ou None si la page est la dernière
+
+    Une page incomplète (moins de ``limit`` lignes) est forcément la dernière.
+    """
+    if not rows or limit is None or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(str(last[timestamp_key]), int(last["id"]))
@@ -0,0 +1,85 @@
+"""
+Réception des uploads par morceaux
+Taille vérifiée au fil de l'eau et SHA-256 calculé pendant l'écriture :
+jamais plus d'un morceau du fichier en mémoire
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import NamedTuple, Protocol
+
+logger = logging.getLogger(__name__)
+
+# Préfixe des fichiers en cours de réception (ignorés tant qu'ils ne sont pas renommés)
+PARTIAL_PREFIX = ".upload-"
+PARTIAL_SUFFIX = ".part"
+
+
+class AsyncReadable(Protocol):
+    """Source lisible par morceaux (UploadFile de Starlette)"""
+
+    async def read(self, size: int = -1) -> bytes: ...
+
+
+class UploadTooLargeError(ValueError):
+    """Le fichier dépasse la taille maximale autorisée"""
+
+
+class StoredUpload(NamedTuple):
+    """Fichier reçu, encore sous son nom temporaire"""
+
+    path: str
+    size: int
+    sha256: str
+
+
+def discard(path: str) -> None:
+    """Supprime un fichier reçu (erreur ignorée s'il n'existe plus)"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Suppression de l'upload {path} impossible: {e}")
+
+
+async def stream_upload(
+    source: AsyncReadable,
+    directory: str | Path,
+    max_size: int,
+    chunk_size: int,
+) -> StoredUpload:
+    """
+    Copie un upload dans ``directory`` par morceaux de ``chunk_size`` octets
+
+    Le fichier est créé dans le répertoire de destination : l'appelant le
+    met en place par un simple renommage atomique (os.replace).
+
+    Raises:
+        UploadTooLargeError: Dès que ``max_size`` est dépassé (fichier supprimé)
+    """
+    fd, path = tempfile.mkstemp(
+        dir=str(directory), prefix=PARTIAL_PREFIX, suffix=PARTIAL_SUFFIX
+    )
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await source.read(chunk_size):
+                size += len(chunk)
+                if size > max_size:
+                    max_mb = max_size // (1024 * 1024)
+                    raise UploadTooLargeError(
+                        f"Le fichier est trop volumineux (max {max_mb} MB)"
+                    )
+                digest.update(chunk)
+                # Écriture disque hors de l'event loop
+                await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        discard(path)
+        raise
+    return StoredUpload(path, size, digest.hexdigest())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark : latence p50/p99 sous charge concurrente, CIADatabase vs AsyncCIADatabase
+
+Simule un worker uvicorn : une requête lente sur 20 (scan coûteux) arrive au
+milieu de requêtes rapides (get_document). On mesure la latence des requêtes
+rapides depuis leur arrivée : elle explose si l'event loop est bloqué.
+
+Usage : python scripts/benchmarks/bench_async_database.py [--requests 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from arkalia_cia_python_backend.async_database import (  # noqa: E402
+    AsyncCIADatabase,
+)
+from arkalia_cia_python_backend.database import CIADatabase  # noqa: E402
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _seed(db: CIADatabase) -> int:
+    doc_id = db.add_document("bench.pdf", "bench.pdf", "/tmp/bench", "pdf", 1)
+    assert doc_id is not None
+    return doc_id
+
+
+def _slow_query(db: CIADatabase, rows: int) -> int:
+    """Requête coûteuse (scan de ~rows lignes générées)"""
+    with db.connection() as conn:
+        cursor = conn.execute(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n "
+            "WHERE x < ?) SELECT SUM(x % 7) FROM n",
+            (rows,),
+        )
+        return int(cursor.fetchone()[0])
+
+
+async def _run(
+    db: CIADatabase, doc_id: int, requests: int, rows: int, use_async: bool
+) -> tuple[list[float], float]:
+    adb = AsyncCIADatabase(db)
+    latencies: list[float] = []
+    loop = asyncio.get_running_loop()
+    origin = loop.time()
+
+    async def request(index: int) -> None:
+        # Arrivées régulières (1 requête / ms) ; latence mesurée depuis l'arrivée
+        arrival = origin + index / 1000
+        await asyncio.sleep(max(0.0, arrival - loop.time()))
+        if index % 20 == 0:
+            if use_async:
+                await adb.run(_slow_query, db, rows)
+            else:
+                _slow_query(db, rows)
+            return
+        if use_async:
+            await adb.get_document(doc_id)
+        else:
+            db.get_document(doc_id)
+        latencies.append((loop.time() - arrival) * 1000)
+
+    await asyncio.gather(*(request(i) for i in range(requests)))
+    return latencies, loop.time() - origin
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = CIADatabase(os.path.join(tmp, "bench.db"))
+        doc_id = _seed(db)
+        for label, use_async in (("sync (event loop)", False), ("async facade", True)):
+            latencies, wall = asyncio.run(
+                _run(db, doc_id, args.requests, args.rows, use_async)
+            )
+            print(
+                f"{label:<18} requêtes rapides: p50={statistics.median(latencies):7.2f} ms"
+                f"  p99={_percentile(latencies, 99):7.2f} ms  total={wall:5.2f} s"
+            )
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark : latence de requêtes légères pendant une extraction PDF lourde
+
+Simule un worker uvicorn : une extraction de texte pypdf (travail CPU) est
+lancée pendant que des requêtes légères (type /health) arrivent toutes les
+5 ms. Sur l'event loop, l'extraction les bloque ; via run_cpu_bound, leur
+latence reste celle d'un changement de thread.
+
+Usage : python scripts/benchmarks/bench_cpu_offload.py [--pages 200]
+"""
+
+import argparse
+import asyncio
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from pypdf import PdfReader, PdfWriter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from arkalia_cia_python_backend.dependencies import run_cpu_bound  # noqa: E402
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _pdf_bytes(pages: int) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _extract(content: bytes, rounds: int) -> int:
+    """Extraction de texte de toutes les pages (répétée ``rounds`` fois)"""
+    total = 0
+    for _ in range(rounds):
+        reader = PdfReader(io.BytesIO(content))
+        total += sum(len(page.extract_text() or "") for page in reader.pages)
+    return total
+
+
+async def _run(content: bytes, rounds: int, offload: bool) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    loop = asyncio.get_running_loop()
+
+    async def light_requests(stop: asyncio.Event) -> None:
+        # Arrivées régulières ; latence mesurée depuis l'arrivée prévue
+        arrival = loop.time()
+        while not stop.is_set():
+            arrival += 0.005
+            await asyncio.sleep(max(0.0, arrival - loop.time()))
+            latencies.append((loop.time() - arrival) * 1000)
+
+    stop = asyncio.Event()
+    probe = asyncio.ensure_future(light_requests(stop))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    if offload:
+        await run_cpu_bound(_extract, content, rounds)
+    else:
+        _extract(content, rounds)
+    elapsed = time.perf_counter() - start
+    # Laisse la sonde mesurer le retard accumulé pendant le blocage
+    await asyncio.sleep(0.02)
+    stop.set()
+    await probe
+    return latencies, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    content = _pdf_bytes(args.pages)
+    for label, offload in (("event loop", False), ("run_cpu_bound", True)):
+        latencies, elapsed = asyncio.run(_run(content, args.rounds, offload))
+        print(
+            f"{label:<14} extraction={elapsed:5.2f} s  requêtes légères: "
+            f"n={len(latencies):4d}  p50={statistics.median(latencies):7.2f} ms  "
+            f"max={max(latencies):8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
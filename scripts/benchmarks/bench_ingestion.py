@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark : temps CPU par upload, ingestion en plusieurs passes vs une passe
+
+Avant : finalize_upload (validation, aperçu), puis extract_metadata et
+parse_portal_pdf qui rouvrent et réanalysent chacun le PDF ; un PDF presque
+sans texte (scan) est même analysé une troisième fois avant l'OCR. Après :
+IngestionPipeline.run, un seul PdfReader partagé par toutes les étapes.
+Cache d'extraction désactivé et contenu différent à chaque upload : seul le
+partage de l'analyse est mesuré. Les deux variantes sont alternées.
+
+Usage : python scripts/benchmarks/bench_ingestion.py [--pages 60] [--sparse]
+"""
+
+import argparse
+import gc
+import hashlib
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from arkalia_cia_python_backend import pdf_processor as pdf_module  # noqa: E402
+from arkalia_cia_python_backend.database import CIADatabase  # noqa: E402
+from arkalia_cia_python_backend.pdf_processor import PDFProcessor  # noqa: E402
+from arkalia_cia_python_backend.services.document_service import (  # noqa: E402
+    DocumentService,
+)
+from arkalia_cia_python_backend.services.health_portal_parsers import (  # noqa: E402
+    HealthPortalParser,
+)
+from arkalia_cia_python_backend.services.ingestion_pipeline import (  # noqa: E402
+    IngestionPipeline,
+)
+from arkalia_cia_python_backend.utils.upload_stream import StoredUpload  # noqa: E402
+
+LINES = [
+    "Consultation du 12/03/2024 Dr Martin cardiologue",
+    "Ordonnance du 12/03/2024 Dr Martin paracetamol 1g matin et soir",
+    "Resultats analyse sanguine hemoglobine 13.5 g/dL cholesterol 1.9 g/L",
+    "Examen radiographie thoracique sans anomalie notable",
+]
+
+
+def _text_pdf(pages: int, nonce: int, sparse: bool = False) -> bytes:
+    """
+    PDF de ``pages`` pages de texte (contenu unique par ``nonce``)
+
+    ``sparse`` : pages de tracés sans texte, comme un scan
+    """
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(pages))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(pages):
+        if sparse:
+            marks = " ".join(f"{x % 500} {x % 700} 4 4 re f" for x in range(300))
+            label = f"BT /F1 10 Tf 72 760 Td ({nonce}) Tj ET " if i == 0 else ""
+            stream = f"{label}{marks}".encode()
+        else:
+            lines = [f"Upload {nonce} page {i + 1}"] + LINES * 5
+            body = " ".join(f"({line}) Tj 0 -14 Td" for line in lines)
+            stream = f"BT /F1 10 Tf 72 760 Td {body} ET".encode()
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+def _received(upload_dir: Path, content: bytes) -> StoredUpload:
+    path = upload_dir / ".upload-bench.part"
+    path.write_bytes(content)
+    return StoredUpload(str(path), len(content), hashlib.sha256(content).hexdigest())
+
+
+def _multi_pass(
+    service: DocumentService,
+    parser: HealthPortalParser,
+    stored: StoredUpload,
+    portal: str | None,
+) -> None:
+    """Enchaînement avant le pipeline : chaque étape rouvre le PDF"""
+    result = service.finalize_upload(stored, "bench.pdf")
+    if portal is None:
+        service.extract_metadata(result["file_path"])
+    else:
+        parser.parse_portal_pdf(result["file_path"], portal)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--uploads", type=int, default=10)
+    parser.add_argument("--portal", default=None, help="andaman7, masante")
+    parser.add_argument("--sparse", action="store_true", help="PDF sans texte")
+    args = parser.parse_args()
+
+    # Compte les PdfReader construits (un par analyse du PDF)
+    readers = [0]
+    real_reader = pdf_module.PdfReader
+
+    def counting_reader(*a, **k):  # type: ignore[no-untyped-def]
+        readers[0] += 1
+        return real_reader(*a, **k)
+
+    pdf_module.PdfReader = counting_reader  # type: ignore[misc]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = CIADatabase(db_path=str(Path(tmp) / "bench.db"))
+        processor = PDFProcessor(str(Path(tmp) / "uploads"))
+        processor.ocr = None  # L'OCR lui-même n'est pas mesuré
+        service = DocumentService(db=db, pdf_processor=processor)
+        portal_parser = HealthPortalParser()
+        portal_parser.pdf_processor = processor
+        pipeline = IngestionPipeline(service, portal_parser)
+
+        labels = ("plusieurs passes", "une passe")
+        timings: dict[str, list[float]] = {label: [] for label in labels}
+        opened = dict.fromkeys(labels, 0)
+        nonce = 0
+        for _ in range(args.uploads):
+            for label in labels:
+                nonce += 1
+                content = _text_pdf(args.pages, nonce, args.sparse)
+                stored = _received(processor.upload_dir, content)
+                gc.collect()
+                readers[0] = 0
+                start = time.process_time()
+                if label == "une passe":
+                    pipeline.run(stored, "bench.pdf", portal=args.portal)
+                else:
+                    _multi_pass(service, portal_parser, stored, args.portal)
+                timings[label].append((time.process_time() - start) * 1000)
+                opened[label] += readers[0]
+        for label in labels:
+            print(
+                f"{label:<17} CPU par upload ({args.pages} pages): "
+                f"médiane={statistics.median(timings[label]):8.1f} ms  "
+                f"min={min(timings[label]):8.1f} ms  "
+                f"PdfReader/upload={opened[label] / args.uploads:.0f}"
+            )
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark : OCR d'un PDF scanné, tout en mémoire vs en flux sur un pool
+
+Avant : convert_from_path rastérise toutes les pages à 300 DPI d'un coup
+(toutes les images en mémoire), puis Tesseract les reconnaît une à une.
+Après : OCREngine, quelques pages en cours à la fois sur un pool de
+processus, passe rapide à 150 DPI et 300 DPI pour les pages peu fiables.
+Chaque variante tourne dans son propre processus : mémoire maximale
+(RSS, processus et enfants) et durée mesurées séparément.
+
+Nécessite pytesseract, pdf2image, Tesseract et poppler.
+
+Usage : python scripts/benchmarks/bench_ocr.py [--pages 30] [--workers 4]
+"""
+
+import argparse
+import os
+import resource
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from arkalia_cia_python_backend.pdf_parser.ocr_engine import OCREngine  # noqa: E402
+from arkalia_cia_python_backend.pdf_parser.ocr_integration import (  # noqa: E402
+    OCR_AVAILABLE,
+    OCRIntegration,
+)
+from arkalia_cia_python_backend.pdf_parser.page_text import (  # noqa: E402
+    create_page_pool,
+)
+
+LINES = [
+    "Consultation du 12/03/2024 Dr Martin cardiologue",
+    "Ordonnance du 12/03/2024 Dr Martin paracetamol 1g matin et soir",
+    "Resultats analyse sanguine hemoglobine 13.5 g/dL cholesterol 1.9 g/L",
+    "Examen radiographie thoracique sans anomalie notable",
+]
+
+
+def _scanned_pdf(path: str, pages: int) -> None:
+    """PDF d'images de texte (comme un scan), une image A4 à 150 DPI par page"""
+    from PIL import Image, ImageDraw
+
+    images = []
+    for i in range(pages):
+        image = Image.new("L", (1240, 1754), 255)
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate([f"Page {i + 1}"] + LINES * 8):
+            draw.text((80, 80 + 36 * row), line, fill=0)
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=150)
+
+
+def _before(path: str, pages: int, config: str | None) -> int:
+    """OCR avant : toutes les pages rastérisées puis reconnues à la suite"""
+    import pytesseract
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(path, dpi=300, first_page=1, last_page=pages)
+    chars = 0
+    for image in images:
+        data = pytesseract.image_to_data(
+            image, config=config, output_type=pytesseract.Output.DICT
+        )
+        page_text = ""
+        for word in data["text"]:
+            if word.strip():
+                page_text += word + " "
+        chars += len(page_text.strip())
+    return chars
+
+
+def _after(path: str, pages: int, workers: int) -> int:
+    """OCR après : moteur en flux sur un pool de processus"""
+    pool = create_page_pool(workers)
+    try:
+        ocr = OCRIntegration(engine=OCREngine(pool, pages_in_flight=workers))
+        result = ocr.process_scanned_pdf(path, max_pages=pages)
+    finally:
+        pool.shutdown()
+    print(f"  pages refaites à 300 DPI : {result.get('pages_reprocessed', 0)}")
+    return len(result["text"])
+
+
+def _run_variant(args: argparse.Namespace) -> None:
+    """Une variante, dans ce processus : durée, caractères, RSS maximale"""
+    start = time.perf_counter()
+    if args.mode == "avant":
+        chars = _before(args.pdf, args.pages, OCRIntegration().tesseract_config)
+    else:
+        chars = _after(args.pdf, args.pages, args.workers)
+    elapsed = time.perf_counter() - start
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    print(
+        f"{args.mode:<6} durée={elapsed:7.1f} s  caractères={chars:7d}  "
+        f"RSS max processus={own / 1024:7.0f} Mo  enfant={children / 1024:7.0f} Mo"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=("avant", "après"), help=argparse.SUPPRESS)
+    parser.add_argument("--pdf", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not OCR_AVAILABLE:
+        sys.exit("OCR non disponible : installez pytesseract et pdf2image")
+    if args.mode:
+        _run_variant(args)
+        return
+
+    print(f"{os.cpu_count()} CPU, {args.workers} processus, {args.pages} pages")
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = os.path.join(tmp, "scan.pdf")
+        _scanned_pdf(pdf, args.pages)
+        for mode in ("avant", "après"):
+            subprocess.run(  # nosec B603
+                [
+                    sys.executable,
+                    __file__,
+                    "--mode",
+                    mode,
+                    "--pdf",
+                    pdf,
+                    "--pages",
+                    str(args.pages),
+                    "--workers",
+                    str(args.workers),
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark : extraction du texte d'un gros PDF, séquentielle vs parallèle
+
+Avant : une boucle sur les pages dans le processus courant (avec
+gc.collect() toutes les 10 pages). Après : plages de pages réparties sur un
+pool de processus, pages produites dans l'ordre par iter_page_texts().
+Mesure le temps total et le délai avant la première page. Le gain dépend
+du nombre de coeurs disponibles.
+
+Usage : python scripts/benchmarks/bench_page_extraction.py [--pages 300] [--workers 4]
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from pypdf import PdfReader  # noqa: E402
+
+from arkalia_cia_python_backend.pdf_parser.page_text import (  # noqa: E402
+    create_page_pool,
+)
+from arkalia_cia_python_backend.pdf_processor import PDFProcessor  # noqa: E402
+
+LINES = [
+    "Consultation du 12/03/2024 Dr Martin cardiologue",
+    "Ordonnance du 12/03/2024 Dr Martin paracetamol 1g matin et soir",
+    "Resultats analyse sanguine hemoglobine 13.5 g/dL cholesterol 1.9 g/L",
+    "Examen radiographie thoracique sans anomalie notable",
+]
+
+
+def _text_pdf(pages: int) -> bytes:
+    """PDF de ``pages`` pages de texte"""
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(pages))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(pages):
+        lines = [f"Page {i + 1}"] + LINES * 10
+        body = " ".join(f"({line}) Tj 0 -14 Td" for line in lines)
+        stream = f"BT /F1 10 Tf 72 760 Td {body} ET".encode()
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+def _sequential_before(path: str) -> list[str]:
+    """Extraction avant : boucle sur les pages et gc.collect() périodique"""
+    reader = PdfReader(path)
+    pages = []
+    for i in range(len(reader.pages)):
+        pages.append(reader.pages[i].extract_text())
+        if i % 10 == 0:
+            gc.collect()
+    return pages
+
+
+def _timed(run: Callable[[], Iterable[str]]) -> tuple[float, float, list[str]]:
+    """Délai avant la première page et temps total (ms)"""
+    start = time.perf_counter()
+    iterator = iter(run())
+    first = next(iterator)
+    first_ms = (time.perf_counter() - start) * 1000
+    texts = [first, *iterator]
+    return first_ms, (time.perf_counter() - start) * 1000, texts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    pool = create_page_pool(args.workers)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.pdf")
+        Path(path).write_bytes(_text_pdf(args.pages))
+        processor = PDFProcessor(
+            os.path.join(tmp, "uploads"), page_pool=pool, parallel_min_pages=1
+        )
+        processor.ocr = None
+        # Démarrage des processus du pool hors mesure
+        list(processor.iter_page_texts(path))
+
+        variants = {
+            "séquentiel": lambda: _sequential_before(path),
+            "parallèle": lambda: processor.iter_page_texts(path),
+        }
+        timings: dict[str, list[tuple[float, float]]] = {v: [] for v in variants}
+        reference: list[str] | None = None
+        for _ in range(args.runs):
+            for label, run in variants.items():
+                gc.collect()
+                first_ms, total_ms, texts = _timed(run)
+                timings[label].append((first_ms, total_ms))
+                if reference is None:
+                    reference = texts
+                assert texts == reference, "texte différent selon la variante"
+    pool.shutdown()
+
+    print(f"{os.cpu_count()} CPU, {args.workers} processus, {args.pages} pages")
+    for label, values in timings.items():
+        print(
+            f"{label:<11} total médian={statistics.median(v[1] for v in values):8.1f} ms"
+            f"  première page={statistics.median(v[0] for v in values):8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark : lecture des documents d'un utilisateur (10k lignes par défaut)
+
+Compare get_user_documents (liste de dict), la même requête convertie en
+DocumentRecord, et iter_user_documents (flux par lots). Mesure le temps
+moyen et le pic mémoire Python (tracemalloc) pendant la lecture.
+
+Usage : python scripts/benchmarks/bench_row_records.py [--rows 10000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from arkalia_cia_python_backend.database import CIADatabase  # noqa: E402
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> tuple[float, float]:
+    """(temps moyen en ms, pic mémoire en Mo)"""
+    func()  # échauffement (cache de pages SQLite)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = CIADatabase(os.path.join(tmp, "bench.db"))
+        user_id = db.create_user("bench", "hash") or 1
+        doc_ids = db.add_documents_bulk(
+            {
+                "name": f"document_{i}.pdf",
+                "original_name": f"Compte rendu {i}.pdf",
+                "file_path": f"/data/uploads/{user_id}/document_{i}.pdf",
+                "file_type": "pdf",
+                "file_size": 1024 + i,
+            }
+            for i in range(args.rows)
+        )
+        db.associate_documents_to_user_bulk(user_id, doc_ids)
+
+        def dict_list() -> int:
+            return len(db.get_user_documents(user_id))
+
+        def record_list() -> int:
+            return len(list(db.iter_user_documents(user_id)))
+
+        def record_stream() -> int:
+            # Agrégat sans garder les lignes (cas export / contrôle)
+            return sum(doc.file_size or 0 for doc in db.iter_user_documents(user_id))
+
+        print(f"{args.rows} lignes, moyenne sur {args.repeat} lectures")
+        for label, func in (
+            ("liste de dict   ", dict_list),
+            ("liste de records", record_list),
+            ("flux de records ", record_stream),
+        ):
+            elapsed, peak = _measure(func, args.repeat)
+            print(f"{label}: {elapsed:8.2f} ms  pic mémoire {peak:7.2f} Mo")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
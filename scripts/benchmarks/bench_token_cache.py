@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark : coût d'authentification par requête, avec et sans cache de tokens
+
+Mesure verify_token (avec vérification blacklist) pour un client qui renvoie
+le même access token à chaque requête.
+
+Usage : python scripts/benchmarks/bench_token_cache.py [--iterations 20000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from arkalia_cia_python_backend import auth  # noqa: E402
+from arkalia_cia_python_backend.database import CIADatabase  # noqa: E402
+
+
+def _measure(token: str, db: CIADatabase, iterations: int) -> float:
+    """Temps moyen par appel en microsecondes"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        auth.verify_token(token, "access", db)  # nosec B106
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = auth.create_access_token({"sub": "1", "username": "bench", "role": "user"})
+    with tempfile.TemporaryDirectory() as tmp:
+        db = CIADatabase(os.path.join(tmp, "bench.db"))
+        original_cache = auth.token_cache
+
+        auth.token_cache = auth.VerifiedTokenCache(max_size=0)
+        without_cache = _measure(token, db, args.iterations)
+
+        auth.token_cache = auth.VerifiedTokenCache(max_size=4096)
+        with_cache = _measure(token, db, args.iterations)
+        stats = auth.token_cache.stats()
+
+        auth.token_cache = original_cache
+        db.close()
+
+    print(f"sans cache : {without_cache:8.2f} µs / requête")
+    print(
+        f"avec cache : {with_cache:8.2f} µs / requête  (x{without_cache / with_cache:.1f})"
+    )
+    print(f"hits={stats['hits']} misses={stats['misses']}")
+
+
+if __name__ == "__main__":
+    main()
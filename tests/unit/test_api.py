@@ -90,6 +90,46 @@ class TestAPIEndpoints:
         assert response.status_code == 200
         assert isinstance(response.json(), list)
 
+    def test_get_documents_cursor_pagination(self, client, temp_db, auth_headers):
+        """Pagination par curseur : X-Next-Cursor mène à la page suivante"""
+        _, db = temp_db
+        user_id = db.get_user_by_username("testuser")["id"]
+        for i in range(5):
+            doc_id = db.add_document(f"d{i}.pdf", "o.pdf", "/tmp/x", "pdf", 1)
+            db.associate_document_to_user(user_id, doc_id)
+
+        first = client.get(f"{API_PREFIX}/documents?limit=3", headers=auth_headers)
+        cursor = first.headers["X-Next-Cursor"]
+        second = client.get(
+            f"{API_PREFIX}/documents?limit=3&cursor={cursor}", headers=auth_headers
+        )
+        ids = [d["id"] for d in first.json()] + [d["id"] for d in second.json()]
+        assert ids == [5, 4, 3, 2, 1]
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_get_documents_invalid_cursor(self, client, temp_db, auth_headers):
+        """Un curseur invalide renvoie 400"""
+        response = client.get(
+            f"{API_PREFIX}/documents?cursor=pas-un-curseur", headers=auth_headers
+        )
+        assert response.status_code == 400
+
+    def test_search_documents(self, client, temp_db, auth_headers):
+        """Recherche plein texte avec extraits surlignés"""
+        _, db = temp_db
+        user_id = db.get_user_by_username("testuser")["id"]
+        doc_id = db.add_document("r.pdf", "r.pdf", "/tmp/x", "pdf", 1)
+        db.associate_document_to_user(user_id, doc_id)
+        db.add_document_metadata(doc_id, extracted_text="Radiographie thoracique")
+
+        response = client.get(
+            f"{API_PREFIX}/documents/search?q=thoracique", headers=auth_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 1
+        assert "<mark>thoracique</mark>" in data["results"][0]["snippet"]
+
     def test_get_document_not_found(self, client, temp_db, auth_headers):
         """Test de récupération d'un document inexistant"""
         response = client.get(f"{API_PREFIX}/documents/999", headers=auth_headers)
@@ -100,6 +140,18 @@ class TestAPIEndpoints:
         response = client.delete(f"{API_PREFIX}/documents/999", headers=auth_headers)
         assert response.status_code == 404
 
+    def test_get_my_stats(self, client, temp_db, auth_headers):
+        """Compteurs de l'utilisateur connecté"""
+        _, db = temp_db
+        user_id = db.get_user_by_username("testuser")["id"]
+        doc_id = db.add_document("d.pdf", "o.pdf", "/tmp/x", "pdf", 1)
+        db.associate_document_to_user(user_id, doc_id)
+        response = client.get(f"{API_PREFIX}/users/me/stats", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["document_count"] == 1
+        assert data["share_count"] == 0
+
     def test_get_reminders_empty(self, client, temp_db, auth_headers):
         """Test de récupération des rappels (vide)"""
         response = client.get(f"{API_PREFIX}/reminders", headers=auth_headers)
@@ -0,0 +1,86 @@
+"""
+Tests unitaires pour la façade asynchrone AsyncCIADatabase
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from arkalia_cia_python_backend.async_database import AsyncCIADatabase
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.dependencies import get_async_database
+
+
+@pytest.fixture
+def db():
+    """Base temporaire pour les tests"""
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        db_path = tmp.name
+    database = CIADatabase(db_path=db_path)
+    yield database
+    database.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+
+class TestAsyncCIADatabase:
+    """Tests pour AsyncCIADatabase"""
+
+    def test_same_methods_as_sync(self, db):
+        """Les méthodes publiques de CIADatabase sont exposées en async"""
+        adb = AsyncCIADatabase(db)
+
+        async def scenario():
+            doc_id = await adb.add_document("a.pdf", "a.pdf", "/tmp/a", "pdf", 10)
+            document = await adb.get_document(doc_id)
+            return doc_id, document
+
+        doc_id, document = asyncio.run(scenario())
+        assert document["id"] == doc_id
+        assert adb.db_path == db.db_path
+
+    def test_runs_off_event_loop_thread(self, db):
+        """Les appels s'exécutent sur l'executor, pas sur le thread de l'event loop"""
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="test-db")
+        adb = AsyncCIADatabase(db, executor=executor)
+
+        async def scenario():
+            return await adb.run(lambda: threading.current_thread().name)
+
+        thread_name = asyncio.run(scenario())
+        assert thread_name.startswith("test-db")
+        executor.shutdown()
+
+    def test_slow_query_does_not_block_loop(self, db):
+        """Une requête lente ne bloque pas les autres coroutines"""
+        adb = AsyncCIADatabase(db)
+        release = threading.Event()
+
+        async def scenario():
+            slow = asyncio.ensure_future(adb.run(release.wait, 2))
+            # L'event loop reste disponible pendant la requête lente
+            await asyncio.sleep(0.01)
+            assert not slow.done()
+            fast = await adb.get_documents()
+            release.set()
+            await slow
+            return fast
+
+        assert asyncio.run(scenario()) == []
+
+    def test_connection_not_exposed(self, db):
+        """Le context manager de connexion reste réservé au code synchrone"""
+        adb = AsyncCIADatabase(db)
+        with pytest.raises(AttributeError):
+            adb.connection  # noqa: B018
+
+    def test_get_async_database_wraps_dependency(self, db):
+        """get_async_database enveloppe la base fournie par get_database"""
+        adb = get_async_database(db)
+        assert isinstance(adb, AsyncCIADatabase)
+        assert adb.sync is db
@@ -0,0 +1,103 @@
+"""
+Tests unitaires pour l'écriture groupée des logs d'audit
+"""
+
+import os
+import tempfile
+import time
+
+import pytest
+
+from arkalia_cia_python_backend.audit_sink import AuditLogSink
+from arkalia_cia_python_backend.database import CIADatabase
+
+
+@pytest.fixture
+def db():
+    """Base temporaire pour les tests"""
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        db_path = tmp.name
+    database = CIADatabase(db_path=db_path)
+    yield database
+    database.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+
+def _count_audit_rows(db: CIADatabase) -> int:
+    with db.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM audit_logs").fetchone()[0]
+
+
+class TestAuditLogSink:
+    """Tests pour AuditLogSink"""
+
+    def test_flush_writes_batches(self, db):
+        """flush() écrit les entrées en attente par lots"""
+        sink = AuditLogSink(db.pool, flush_interval_ms=60000, batch_size=10)
+        for i in range(25):
+            assert sink.submit(i, "login", "auth")
+        assert sink.flush() == 25
+        assert _count_audit_rows(db) == 25
+        stats = sink.stats()
+        assert stats["queued"] == 25
+        assert stats["flushed"] == 25
+        assert stats["batches"] == 3
+        assert stats["pending"] == 0
+        sink.close()
+
+    def test_background_flush_on_interval(self, db):
+        """Le thread d'arrière-plan écrit les entrées après l'intervalle"""
+        sink = AuditLogSink(db.pool, flush_interval_ms=20, batch_size=100)
+        sink.submit(1, "upload", "document", resource_id="42")
+        deadline = time.monotonic() + 2
+        while sink.stats()["flushed"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _count_audit_rows(db) == 1
+        sink.close()
+
+    def test_drops_when_queue_full(self, db):
+        """Les entrées sont abandonnées (et comptées) si la file est pleine"""
+        sink = AuditLogSink(
+            db.pool, flush_interval_ms=60000, batch_size=100, max_queue_size=2
+        )
+        results = [sink.submit(1, "login", "auth") for _ in range(3)]
+        assert results == [True, True, False]
+        assert sink.stats()["dropped"] == 1
+        sink.close()
+
+    def test_close_flushes_pending(self, db):
+        """close() écrit les entrées restantes avant l'arrêt"""
+        sink = AuditLogSink(db.pool, flush_interval_ms=60000, batch_size=100)
+        for _ in range(5):
+            sink.submit(None, "logout", "auth")
+        sink.close()
+        assert _count_audit_rows(db) == 5
+        assert not sink.submit(None, "logout", "auth")
+
+
+class TestCIADatabaseAuditQueue:
+    """Tests de l'intégration dans CIADatabase"""
+
+    def test_queued_entries_visible_in_get_audit_logs(self, db):
+        """get_audit_logs voit les entrées encore en file"""
+        assert db.queue_audit_log(7, "share", "document", success=False)
+        logs = db.get_audit_logs(user_id=7)
+        assert len(logs) == 1
+        assert logs[0]["action"] == "share"
+        assert not logs[0]["success"]
+
+    def test_close_flushes_queue(self):
+        """Fermer la base écrit les entrées en attente"""
+        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+            db_path = tmp.name
+        database = CIADatabase(db_path=db_path)
+        database.queue_audit_log(1, "login", "auth")
+        database.close()
+        reopened = CIADatabase(db_path=db_path)
+        assert len(reopened.get_audit_logs()) == 1
+        reopened.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
@@ -7,13 +7,16 @@ from datetime import timedelta
 import pytest
 
 from arkalia_cia_python_backend.auth import (
+    PasswordHasherPool,
     TokenData,
     UserCreate,
     UserLogin,
     UserResponse,
+    VerifiedTokenCache,
     create_access_token,
     create_refresh_token,
     get_password_hash,
+    token_cache,
     verify_password,
     verify_token,
 )
@@ -149,6 +152,158 @@ class TestTokenVerification:
             verify_token(access_token, token_type="refresh")
 
 
+class TestPasswordHasherPool:
+    """Tests pour le pool bcrypt"""
+
+    def test_hash_and_verify_off_loop(self):
+        """Hash et vérification passent par le pool sans bloquer l'event loop"""
+        import asyncio
+        import time
+        from unittest.mock import patch
+
+        pool = PasswordHasherPool(max_workers=1)
+        ticks = 0
+
+        # bcrypt simulé (~50 ms, GIL relâché) pour éviter passlib/bcrypt
+        def slow_hash(password):
+            time.sleep(0.05)
+            return f"hash:{password}"
+
+        def slow_verify(plain, hashed):
+            time.sleep(0.05)
+            return hashed == f"hash:{plain}"
+
+        async def ticker(stop: asyncio.Event):
+            nonlocal ticks
+            while not stop.is_set():
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        async def scenario():
+            stop = asyncio.Event()
+            task = asyncio.create_task(ticker(stop))
+            hashed = await pool.hash("motdepasse123")
+            ok = await pool.verify("motdepasse123", hashed)
+            ko = await pool.verify("mauvais", hashed)
+            stop.set()
+            await task
+            return ok, ko
+
+        with (
+            patch("arkalia_cia_python_backend.auth.get_password_hash", slow_hash),
+            patch("arkalia_cia_python_backend.auth.verify_password", slow_verify),
+        ):
+            ok, ko = asyncio.run(scenario())
+        assert ok and not ko
+        # L'event loop a continué de tourner pendant bcrypt
+        assert ticks > 5
+        stats = pool.stats()
+        assert stats["completed"] == 3
+        assert stats["queued"] == 0 and stats["running"] == 0
+
+    def test_rejects_when_queue_full(self):
+        """Au-delà de max_queue appels en attente, le pool répond 503"""
+        import asyncio
+
+        from fastapi import HTTPException
+
+        pool = PasswordHasherPool(max_workers=1, max_queue=0)
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(pool.hash("motdepasse123"))
+        assert exc_info.value.status_code == 503
+        assert pool.stats()["rejected"] == 1
+
+    def test_cancelled_queued_call_leaves_queue(self):
+        """Appel annulé avant le démarrage (client parti) : la file se vide"""
+        import asyncio
+        import threading
+        from unittest.mock import patch
+
+        pool = PasswordHasherPool(max_workers=1, max_queue=1)
+        release = threading.Event()
+
+        def blocking_hash(password):
+            release.wait(2)
+            return f"hash:{password}"
+
+        async def scenario():
+            busy = asyncio.ensure_future(pool.hash("occupe"))
+            await asyncio.sleep(0.05)
+            waiting = asyncio.ensure_future(pool.hash("annule"))
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            await asyncio.sleep(0.01)
+            queued = pool.stats()["queued"]
+            release.set()
+            await busy
+            # File libérée : un nouvel appel est accepté
+            return queued, await pool.hash("suivant")
+
+        with patch("arkalia_cia_python_backend.auth.get_password_hash", blocking_hash):
+            queued, hashed = asyncio.run(scenario())
+        assert queued == 0
+        assert hashed == "hash:suivant"
+        assert pool.stats()["queued"] == 0
+
+
+class TestVerifiedTokenCache:
+    """Tests pour le cache des tokens validés"""
+
+    def test_second_verification_is_cache_hit(self):
+        """Le même token n'est décodé qu'une fois"""
+        token = create_access_token({"sub": "1", "username": "test", "role": "user"})
+        hits = token_cache.hits
+        first = verify_token(token, token_type="access")
+        second = verify_token(token, token_type="access")
+        assert second == first
+        assert token_cache.hits == hits + 1
+
+    def test_cached_token_respects_revocation(self):
+        """Un token en cache révoqué ensuite est refusé"""
+        from unittest.mock import Mock
+
+        from fastapi import HTTPException
+
+        token = create_access_token({"sub": "1", "username": "test", "role": "user"})
+        db = Mock()
+        db.is_token_blacklisted.return_value = False
+        verify_token(token, token_type="access", db=db)
+        db.is_token_blacklisted.return_value = True
+        with pytest.raises(HTTPException) as exc_info:
+            verify_token(token, token_type="access", db=db)
+        assert exc_info.value.detail == "Token révoqué"
+
+    def test_cached_token_wrong_type_rejected(self):
+        """Le cache ne contourne pas la vérification du type de token"""
+        from fastapi import HTTPException
+
+        token = create_access_token({"sub": "1", "username": "test", "role": "user"})
+        verify_token(token, token_type="access")
+        with pytest.raises(HTTPException):
+            verify_token(token, token_type="refresh")
+
+    def test_expired_entry_not_served(self):
+        """Une entrée expirée n'est pas servie"""
+        cache = VerifiedTokenCache(max_size=10)
+        cache.put("tok", "access", 0, "jti", TokenData(user_id="1"))
+        assert cache.get("tok", "access") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_bounded(self):
+        """Le cache évince les entrées les moins récemment utilisées"""
+        import time
+
+        cache = VerifiedTokenCache(max_size=2)
+        exp = time.time() + 60
+        for name in ("a", "b"):
+            cache.put(name, "access", exp, None, TokenData(user_id=name))
+        cache.get("a", "access")
+        cache.put("c", "access", exp, None, TokenData(user_id="c"))
+        assert cache.get("b", "access") is None
+        assert cache.get("a", "access") is not None
+        assert cache.stats()["size"] == 2
+
+
 class TestPydanticModels:
     """Tests pour les modèles Pydantic"""
 
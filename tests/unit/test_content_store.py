@@ -0,0 +1,227 @@
+"""
+Tests unitaires pour le stockage par contenu (déduplication des uploads)
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+from pypdf import PdfWriter
+
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.pdf_processor import PDFProcessor
+from arkalia_cia_python_backend.services.document_service import DocumentService
+from arkalia_cia_python_backend.sharding import user_scope
+from arkalia_cia_python_backend.utils.content_store import ContentStore
+
+SHA = "0123456789abcdef" * 4
+
+
+class FakeUpload:
+    """Source asynchrone en mémoire"""
+
+    def __init__(self, content: bytes):
+        self._buffer = io.BytesIO(content)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._buffer.read(size)
+
+
+def _pdf_bytes(pages: int = 1) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class TestContentStore:
+    """Tests des chemins du stockage"""
+
+    def test_fan_out_path(self, tmp_path):
+        """Deux niveaux de sous-répertoires tirés de l'empreinte"""
+        store = ContentStore(tmp_path)
+        assert store.path_for(SHA) == tmp_path / "01" / "23" / f"{SHA}.pdf"
+
+    def test_invalid_digest_rejected(self, tmp_path):
+        """Une empreinte qui n'est pas un SHA-256 hexadécimal est refusée"""
+        store = ContentStore(tmp_path)
+        for digest in ("../../etc/passwd", SHA.upper(), SHA[:-1]):
+            with pytest.raises(ValueError):
+                store.path_for(digest)
+
+    def test_remove_only_store_files(self, tmp_path):
+        """remove() ignore les fichiers hors du stockage"""
+        store = ContentStore(tmp_path)
+        outside = tmp_path / "legacy.pdf"
+        outside.write_bytes(b"x")
+        store.remove(outside)
+        assert outside.exists()
+
+        inside = store.path_for(SHA)
+        inside.parent.mkdir(parents=True)
+        inside.write_bytes(b"x")
+        store.remove(inside)
+        assert not inside.exists()
+
+
+@pytest.fixture
+def tmp_dir():
+    """Répertoire temporaire (bases et uploads)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        yield tmp
+
+
+@pytest.fixture
+def db(tmp_dir):
+    """Base temporaire"""
+    database = CIADatabase(db_path=os.path.join(tmp_dir, "content.db"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def service(db, tmp_dir):
+    """Service documents avec un dossier d'upload temporaire"""
+    return DocumentService(
+        db=db, pdf_processor=PDFProcessor(os.path.join(tmp_dir, "uploads"))
+    )
+
+
+def _upload(service: DocumentService, content: bytes, user_id: int = 1) -> int:
+    result = asyncio.run(service.ingest_upload(FakeUpload(content), "bilan.pdf"))
+    return service.save_document_with_metadata(result, user_id)
+
+
+class TestDeduplication:
+    """Tests de la déduplication et du compteur de références"""
+
+    def test_duplicate_reuses_stored_file(self, db, service, tmp_dir):
+        """Un contenu déjà stocké n'est ni recopié ni retraité"""
+        content = _pdf_bytes()
+        first = asyncio.run(service.ingest_upload(FakeUpload(content), "a.pdf"))
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(
+                service.pdf_processor,
+                "process_pdf",
+                lambda *a, **k: pytest.fail("contenu retraité"),
+            )
+            second = asyncio.run(service.ingest_upload(FakeUpload(content), "b.pdf"))
+
+        assert first["deduplicated"] is False
+        assert second["deduplicated"] is True
+        assert second["file_path"] == first["file_path"]
+        assert second["original_name"] == "b.pdf"
+        assert second["text_content"] == first["text_content"]
+        digest = hashlib.sha256(content).hexdigest()
+        assert db.get_content_blob(digest)["file_size"] == len(content)
+        # Un seul fichier stocké, aucun fichier partiel laissé
+        files = [p for p in Path(tmp_dir, "uploads").rglob("*") if p.is_file()]
+        assert files == [Path(first["file_path"])]
+
+    @pytest.mark.parametrize("damage", ["truncated", "missing"])
+    def test_damaged_stored_file_replaced(self, db, service, damage):
+        """Fichier stocké tronqué ou absent : l'upload le remplace"""
+        content = _pdf_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        first = _upload(service, content)
+        path = Path(db.get_document(first)["file_path"])
+        if damage == "truncated":
+            path.write_bytes(content[:10])
+        else:
+            path.unlink()
+
+        result = asyncio.run(service.ingest_upload(FakeUpload(content), "b.pdf"))
+
+        assert result["deduplicated"] is False
+        assert result["file_path"] == str(path)
+        assert path.read_bytes() == content
+        blob = db.get_content_blob(digest)
+        assert blob["file_size"] == len(content)
+        assert blob["ref_count"] == 2
+
+    def test_file_kept_until_last_reference(self, db, service):
+        """Le fichier partagé n'est supprimé qu'avec son dernier document"""
+        content = _pdf_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        first = _upload(service, content)
+        second = _upload(service, content)
+        path = db.get_document(first)["file_path"]
+        assert db.get_content_blob(digest)["ref_count"] == 2
+
+        db.delete_document(first)
+        assert service.release_content([digest]) == 0
+        assert os.path.exists(path)
+
+        db.delete_document(second)
+        assert service.release_content([digest]) == 1
+        assert not os.path.exists(path)
+        assert db.get_content_blob(digest) is None
+
+    def test_reference_taken_when_stored(self, db, service):
+        """Contenu stocké ou réutilisé : référencé avant l'enregistrement"""
+        content = _pdf_bytes(pages=2)
+        first = asyncio.run(service.ingest_upload(FakeUpload(content), "c.pdf"))
+        assert db.get_content_blob(first["sha256"])["ref_count"] == 1
+        asyncio.run(service.ingest_upload(FakeUpload(content), "c.pdf"))
+        assert db.get_content_blob(first["sha256"])["ref_count"] == 2
+
+        # Collecte concurrente : rien à retirer tant qu'un upload le tient
+        assert db.collect_unreferenced_blobs() == []
+        assert os.path.exists(first["file_path"])
+
+    def test_released_upload_removes_file(self, db, service):
+        """Document non enregistré : référence rendue, fichier supprimé"""
+        content = _pdf_bytes(pages=2)
+        result = asyncio.run(service.ingest_upload(FakeUpload(content), "c.pdf"))
+        assert service.release_upload(result["sha256"]) == 1
+        assert not os.path.exists(result["file_path"])
+        assert db.get_content_blob(result["sha256"]) is None
+
+    def test_unknown_blob_reference_raises(self, db):
+        """Ajuster les références d'un contenu non enregistré est une erreur"""
+        db.add_content_blob(SHA, "/tmp/blob", 1, {})
+        with pytest.raises(RuntimeError):
+            db._add_blob_refs({SHA: 1, "f" * 64: 1})
+        assert db.get_content_blob(SHA)["ref_count"] == 1
+
+    def test_bulk_insert_keeps_references(self, db, service):
+        """L'insertion en masse reprend la référence de chaque upload"""
+        content = _pdf_bytes()
+        items = [
+            (asyncio.run(service.ingest_upload(FakeUpload(content), name)), None)
+            for name in ("d.pdf", "e.pdf")
+        ]
+        service.save_documents_with_metadata_bulk(items, 1)
+        assert db.get_content_blob(items[0][0]["sha256"])["ref_count"] == 2
+
+
+class TestShardedReferences:
+    """Tests des références en mode par utilisateur"""
+
+    def test_user_storage_deletion_releases_references(self, tmp_dir):
+        """Supprimer la base d'un utilisateur libère ses références"""
+        database = CIADatabase(
+            db_path=os.path.join(tmp_dir, "main.db"),
+            shard_dir=os.path.join(tmp_dir, "users"),
+        )
+        service = DocumentService(
+            db=database, pdf_processor=PDFProcessor(os.path.join(tmp_dir, "uploads"))
+        )
+        content = _pdf_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        alice = database.create_user("alice", "hash")
+        bob = database.create_user("bob", "hash")
+        for user_id in (alice, bob):
+            with user_scope(user_id):
+                _upload(service, content, user_id)
+        assert database.get_content_blob(digest)["ref_count"] == 2
+
+        database.delete_user_storage(alice)
+        assert database.get_content_blob(digest)["ref_count"] == 1
+        database.close()
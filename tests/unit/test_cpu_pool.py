@@ -0,0 +1,222 @@
+"""
+Tests unitaires pour le pool du travail CPU (run_cpu_bound)
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from arkalia_cia_python_backend import api
+from arkalia_cia_python_backend.api import API_PREFIX
+from arkalia_cia_python_backend.auth import create_access_token
+from arkalia_cia_python_backend.cpu_pool import CPUBoundPool
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.dependencies import (
+    get_database,
+    get_medical_report_service,
+    run_cpu_bound,
+)
+from arkalia_cia_python_backend.pdf_processor import PDFProcessor
+from arkalia_cia_python_backend.services.document_service import DocumentService
+from arkalia_cia_python_backend.sharding import current_user_id, user_scope
+
+
+class TestCPUBoundPool:
+    """Tests du pool borné"""
+
+    def test_runs_off_event_loop_with_context(self):
+        """L'appel s'exécute dans un thread du pool avec le contexte de l'appelant"""
+        pool = CPUBoundPool("test", max_workers=1)
+
+        def work(value: int) -> tuple[str, int | None, int]:
+            return threading.current_thread().name, current_user_id.get(), value * 2
+
+        async def scenario():
+            with user_scope(7):
+                return await pool.run(work, value=21)
+
+        thread_name, user_id, result = asyncio.run(scenario())
+        assert thread_name.startswith("cia-test")
+        assert (user_id, result) == (7, 42)
+        stats = pool.stats()
+        assert stats["completed"] == 1
+        assert stats["running"] == 0
+        pool.shutdown()
+
+    def test_full_queue_rejects_with_503(self):
+        """Au-delà de max_queue appels en attente : 503"""
+        pool = CPUBoundPool("test", max_workers=1, max_queue=1)
+        release = threading.Event()
+
+        async def scenario():
+            busy = asyncio.ensure_future(pool.run(release.wait, 2))
+            await asyncio.sleep(0.05)
+            waiting = asyncio.ensure_future(pool.run(time.sleep, 0))
+            await asyncio.sleep(0.01)
+            with pytest.raises(HTTPException) as exc:
+                await pool.run(time.sleep, 0)
+            release.set()
+            await asyncio.gather(busy, waiting)
+            return exc.value.status_code
+
+        assert asyncio.run(scenario()) == 503
+        stats = pool.stats()
+        assert stats["rejected"] == 1
+        assert stats["max_queued"] == 1
+        pool.shutdown()
+
+    def test_cancelled_queued_call_leaves_queue(self):
+        """Appelant annulé avant le démarrage : l'appel quitte la file"""
+        pool = CPUBoundPool("test", max_workers=1, max_queue=1)
+        release = threading.Event()
+        ran = []
+
+        async def scenario():
+            busy = asyncio.ensure_future(pool.run(release.wait, 2))
+            await asyncio.sleep(0.05)
+            waiting = asyncio.ensure_future(pool.run(ran.append, 1))
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            await asyncio.sleep(0.01)
+            queued = pool.stats()["queued"]
+            # File libérée : un nouvel appel est accepté
+            release.set()
+            await busy
+            await pool.run(ran.append, 2)
+            return queued
+
+        assert asyncio.run(scenario()) == 0
+        assert ran == [2]
+        assert pool.stats()["queued"] == 0
+        pool.shutdown()
+
+    def test_errors_are_counted_and_raised(self):
+        """Une exception est propagée à l'appelant et comptée"""
+        pool = CPUBoundPool("test", max_workers=1)
+
+        def fail() -> None:
+            raise ValueError("PDF invalide")
+
+        with pytest.raises(ValueError):
+            asyncio.run(pool.run(fail))
+        assert pool.stats()["failed"] == 1
+        pool.shutdown()
+
+    def test_run_cpu_bound_uses_shared_pool(self):
+        """run_cpu_bound délègue au pool partagé"""
+        assert asyncio.run(run_cpu_bound(sum, [1, 2, 3])) == 6
+
+
+class SlowReportService:
+    """Génération de rapport qui occupe le CPU (boucle Python, GIL tenu)"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def generate_pre_consultation_report(self, **kwargs):
+        deadline = time.perf_counter() + self.seconds
+        while time.perf_counter() < deadline:
+            sum(i * i for i in range(1000))
+        return {
+            "report_date": "2025-01-01",
+            "generated_at": "2025-01-01T00:00:00",
+            "days_range": kwargs["days_range"],
+            "sections": {},
+            "formatted_text": "",
+        }
+
+
+class TestEventLoopStaysResponsive:
+    """Le travail CPU d'un endpoint ne bloque pas les autres requêtes"""
+
+    @pytest.fixture
+    def db(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            database = CIADatabase(db_path=os.path.join(tmp, "cpu.db"))
+            yield database
+            database.close()
+
+    def test_health_latency_flat_during_heavy_report(self, db):
+        """/health répond vite pendant la génération d'un rapport de 0,5 s"""
+        user_id = db.create_user("alice", "hash")
+        token = create_access_token(
+            data={"sub": str(user_id), "username": "alice", "role": "user"}
+        )
+        api.app.dependency_overrides[get_database] = lambda: db
+        api.app.dependency_overrides[get_medical_report_service] = lambda: (
+            SlowReportService(0.5)
+        )
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                heavy = asyncio.ensure_future(
+                    client.post(
+                        f"{API_PREFIX}/medical-reports/generate",
+                        json={"days_range": 30, "include_aria": False},
+                        headers={"Authorization": f"Bearer {token}"},
+                    )
+                )
+                await asyncio.sleep(0.05)
+                latencies = []
+                while not heavy.done():
+                    start = time.perf_counter()
+                    response = await client.get("/health")
+                    latencies.append(time.perf_counter() - start)
+                    assert response.status_code == 200
+                    await asyncio.sleep(0.02)
+                return (await heavy).status_code, latencies
+
+        try:
+            status_code, latencies = asyncio.run(scenario())
+        finally:
+            api.app.dependency_overrides.clear()
+        assert status_code == 200
+        assert len(latencies) >= 3
+        assert max(latencies) < 0.25
+
+
+class TestSaturatedPoolUpload:
+    """Upload refusé par le pool saturé"""
+
+    def test_portal_import_503_discards_received_file(self, monkeypatch):
+        """503 du pool : le fichier reçu est supprimé"""
+        with tempfile.TemporaryDirectory() as tmp:
+            db = CIADatabase(db_path=os.path.join(tmp, "cpu.db"))
+            service = DocumentService(
+                db=db, pdf_processor=PDFProcessor(os.path.join(tmp, "uploads"))
+            )
+            user_id = db.create_user("alice", "hash")
+            token = create_access_token(
+                data={"sub": str(user_id), "username": "alice", "role": "user"}
+            )
+
+            async def saturated(*args, **kwargs):
+                raise HTTPException(status_code=503, detail="Serveur occupé")
+
+            monkeypatch.setattr(api, "get_document_service", lambda: service)
+            monkeypatch.setattr(api, "run_cpu_bound", saturated)
+            api.app.dependency_overrides[get_database] = lambda: db
+            try:
+                response = TestClient(api.app).post(
+                    f"{API_PREFIX}/health-portals/import/manual",
+                    files={"file": ("export.pdf", b"%PDF-1.4", "application/pdf")},
+                    data={"portal": "andaman7"},
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+            finally:
+                api.app.dependency_overrides.clear()
+                db.close()
+
+            assert response.status_code == 503
+            assert [p for p in Path(tmp, "uploads").rglob("*") if p.is_file()] == []
@@ -3,6 +3,7 @@ Tests pour le module database d'Arkalia-CIA
 """
 
 import os
+import sqlite3
 import tempfile
 
 import pytest
@@ -123,6 +124,17 @@ class TestDatabaseManager:
         document = db_manager.get_document(doc_id)
         assert document is None
 
+    def test_user_owns_document(self, db_manager):
+        """Appartenance d'un document vérifiée par une requête ponctuelle"""
+        alice = db_manager.create_user("alice", "hash")
+        bob = db_manager.create_user("bob", "hash")
+        doc_id = db_manager.add_document("a.pdf", "a.pdf", "/tmp/a.pdf", "pdf", 1)
+        db_manager.associate_document_to_user(alice, doc_id)
+
+        assert db_manager.user_owns_document(alice, doc_id) is True
+        assert db_manager.user_owns_document(bob, doc_id) is False
+        assert db_manager.user_owns_document(alice, doc_id + 1) is False
+
     def test_add_reminder(self, db_manager):
         """Test d'ajout d'un rappel"""
         # La DB est déjà initialisée par la fixture
@@ -382,3 +394,135 @@ class TestDatabaseManager:
         )
 
         assert portal_id is not None
+
+
+class TestDocumentSearch:
+    """Tests pour la recherche plein texte (FTS5)"""
+
+    @pytest.fixture
+    def db(self):
+        """Base temporaire avec deux utilisateurs et des documents indexés"""
+        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+            db_path = tmp.name
+        db = CIADatabase(db_path=db_path)
+        owner = db.create_user("alice", "hash")
+        db.create_user("bob", "hash")
+        documents = [
+            ("Dr Martin", "cardiologie", "Électrocardiogramme normal", "compte_rendu"),
+            ("Dr Dupont", "radiologie", "Radiographie thoracique", "ordonnance"),
+            ("Dr Martin", "bilan", "Cholestérol <b>élevé</b>", "ordonnance"),
+        ]
+        for i, (doctor, keywords, text, doc_type) in enumerate(documents):
+            doc_id = db.add_document(f"d{i}.pdf", "o.pdf", "/tmp/x", "pdf", 1)
+            db.associate_document_to_user(owner, doc_id)
+            db.add_document_metadata(
+                doc_id,
+                doctor_name=doctor,
+                keywords=keywords,
+                extracted_text=text,
+                document_type=doc_type,
+            )
+        yield db
+        db.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+
+    def test_search_ranked_with_snippet(self, db):
+        """Les résultats contiennent un extrait surligné"""
+        results = db.search_documents(1, "martin")
+        assert {r["id"] for r in results} == {1, 3}
+        assert "<mark>Martin</mark>" in results[0]["snippet"]
+
+    def test_search_accents_and_prefix(self, db):
+        """La recherche ignore les accents et accepte les préfixes"""
+        results = db.search_documents(1, "electrocardio")
+        assert [r["id"] for r in results] == [1]
+
+    def test_snippet_is_escaped(self, db):
+        """Le texte extrait est échappé dans l'extrait HTML"""
+        results = db.search_documents(1, "cholesterol")
+        assert "&lt;b&gt;" in results[0]["snippet"]
+
+    def test_search_scoped_to_user(self, db):
+        """Un utilisateur ne voit pas les documents des autres"""
+        assert db.search_documents(2, "martin") == []
+
+    def test_search_filters(self, db):
+        """Les filtres restreignent les résultats"""
+        results = db.search_documents(1, "martin", {"document_type": "ordonnance"})
+        assert [r["id"] for r in results] == [3]
+        with pytest.raises(ValueError):
+            db.search_documents(1, "martin", {"inconnu": "x"})
+
+    def test_fts_syntax_is_neutralized(self, db):
+        """Les opérateurs FTS5 saisis par l'utilisateur ne provoquent pas d'erreur"""
+        assert db.search_documents(1, '" OR NEAR( *') == []
+        assert db.search_documents(1, "") == []
+
+    def test_index_follows_updates_and_deletes(self, db):
+        """Les triggers tiennent l'index à jour"""
+        with db.connection() as conn:
+            conn.execute("UPDATE document_metadata SET keywords = 'xyzzy' WHERE id = 2")
+            conn.execute("DELETE FROM document_metadata WHERE id = 1")
+        assert [r["id"] for r in db.search_documents(1, "xyzzy")] == [2]
+        assert db.search_documents(1, "electrocardiogramme") == []
+
+
+class TestBulkInserts:
+    """Tests pour les insertions groupées"""
+
+    @pytest.fixture
+    def db(self):
+        """Base temporaire avec un utilisateur"""
+        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+            db_path = tmp.name
+        db = CIADatabase(db_path=db_path)
+        db.create_user("alice", "hash")
+        yield db
+        db.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+
+    @staticmethod
+    def _documents(count):
+        return [
+            {
+                "name": f"d{i}.pdf",
+                "original_name": f"o{i}.pdf",
+                "file_path": f"/tmp/d{i}.pdf",
+                "file_type": "pdf",
+                "file_size": i,
+            }
+            for i in range(count)
+        ]
+
+    def test_add_documents_bulk_returns_ids_in_order(self, db):
+        """Les IDs retournés correspondent aux lignes insérées, dans l'ordre"""
+        db.add_document("seul.pdf", "seul.pdf", "/tmp/seul.pdf", "pdf", 1)
+        doc_ids = db.add_documents_bulk(self._documents(5))
+        assert len(doc_ids) == 5
+        for i, doc_id in enumerate(doc_ids):
+            assert db.get_document(doc_id)["name"] == f"d{i}.pdf"
+        assert db.add_documents_bulk([]) == []
+
+    def test_bulk_metadata_and_associations(self, db):
+        """Métadonnées et associations groupées, doublons ignorés"""
+        doc_ids = db.add_documents_bulk(self._documents(3))
+        assert db.associate_documents_to_user_bulk(1, doc_ids) == 3
+        assert db.associate_documents_to_user_bulk(1, doc_ids[:2]) == 0
+        meta_ids = db.add_document_metadata_bulk(
+            {"document_id": doc_id, "doctor_name": "Dr Martin"} for doc_id in doc_ids
+        )
+        assert len(meta_ids) == 3
+        assert len(db.get_user_documents(1)) == 3
+        assert db.get_document_metadata(doc_ids[2])["doctor_name"] == "Dr Martin"
+
+    def test_bulk_is_atomic(self, db):
+        """Une ligne invalide annule tout le lot"""
+        documents = self._documents(3)
+        documents[2]["name"] = None
+        with pytest.raises(sqlite3.IntegrityError):
+            db.add_documents_bulk(documents)
+        assert db.get_documents() == []
@@ -0,0 +1,120 @@
+"""
+Tests unitaires pour le pool de connexions SQLite
+"""
+
+import os
+import tempfile
+import threading
+
+import pytest
+
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.db_pool import PoolTimeoutError, SQLiteConnectionPool
+
+
+@pytest.fixture
+def temp_db_path():
+    """Chemin de base temporaire (nettoyé avec fichiers WAL/SHM)"""
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        db_path = tmp.name
+    yield db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+
+class TestSQLiteConnectionPool:
+    """Tests pour SQLiteConnectionPool"""
+
+    def test_pragmas_applied(self, temp_db_path):
+        """Les pragmas configurés sont appliqués à l'ouverture"""
+        pool = SQLiteConnectionPool(
+            temp_db_path, synchronous="NORMAL", cache_size_kb=4096, busy_timeout_ms=1234
+        )
+        with pool.connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -4096
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+        pool.close()
+
+    def test_invalid_pragma_rejected(self, temp_db_path):
+        """Les valeurs de pragma non autorisées sont refusées"""
+        with pytest.raises(ValueError):
+            SQLiteConnectionPool(temp_db_path, synchronous="NORMAL; DROP TABLE x")
+
+    def test_connection_reused(self, temp_db_path):
+        """Une connexion rendue est réutilisée au checkout suivant"""
+        pool = SQLiteConnectionPool(temp_db_path)
+        with pool.connection() as conn1:
+            pass
+        with pool.connection() as conn2:
+            pass
+        assert conn1 is conn2
+        assert pool.stats()["open"] == 1
+        pool.close()
+
+    def test_nested_calls_share_transaction(self, temp_db_path):
+        """Les appels imbriqués partagent la connexion et la transaction"""
+        pool = SQLiteConnectionPool(temp_db_path, max_size=1)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (v INTEGER)")
+        with pytest.raises(RuntimeError):
+            with pool.connection() as outer:
+                outer.execute("INSERT INTO t VALUES (1)")
+                with pool.connection() as inner:
+                    assert inner is outer
+                    inner.execute("INSERT INTO t VALUES (2)")
+                raise RuntimeError("annulation")
+        with pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+        pool.close()
+
+    def test_timeout_when_exhausted(self, temp_db_path):
+        """Un checkout lève PoolTimeoutError si le pool est saturé"""
+        pool = SQLiteConnectionPool(temp_db_path, max_size=1, timeout=0.05)
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def holder():
+            with pool.connection():
+                acquired.set()
+                release.wait(2)
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+        acquired.wait(2)
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+        release.set()
+        thread.join()
+        assert pool.stats()["timeouts"] == 1
+        pool.close()
+
+
+class TestCIADatabasePool:
+    """Tests d'intégration du pool dans CIADatabase"""
+
+    def test_concurrent_writers(self, temp_db_path):
+        """Des écritures concurrentes ne lèvent pas 'database is locked'"""
+        db = CIADatabase(db_path=temp_db_path, pool_size=4)
+        errors: list[Exception] = []
+
+        def writer(n: int):
+            try:
+                for i in range(25):
+                    db.add_document(f"d{n}_{i}.pdf", "o.pdf", "/tmp/x", "pdf", 1)
+            except Exception as e:  # pragma: no cover - échec du test
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        assert len(db.get_documents()) == 100
+        assert db.pool.stats()["open"] <= 4
+        db.close()
@@ -0,0 +1,102 @@
+"""
+Tests unitaires pour la recherche approximative des noms de médecins
+"""
+
+import os
+import tempfile
+
+import pytest
+
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.doctor_search import fold_name, trigrams
+
+
+@pytest.fixture
+def db():
+    """Base temporaire avec quelques médecins"""
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        db_path = tmp.name
+    database = CIADatabase(db_path=db_path)
+    for name in ("Dr Martin", "Dr Lefèvre", "Dr Dupont", "Dr Martin"):
+        doc_id = database.add_document("d.pdf", "d.pdf", "/tmp/d", "pdf", 1)
+        database.add_document_metadata(doc_id, doctor_name=name)
+    yield database
+    database.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+
+def _names(db: CIADatabase) -> dict[str, int]:
+    with db.connection() as conn:
+        return dict(conn.execute("SELECT name, ref_count FROM doctor_names"))
+
+
+class TestFoldName:
+    """Tests pour la normalisation et les trigrammes"""
+
+    def test_fold_name(self):
+        """Casse, accents et ponctuation sont neutralisés"""
+        assert fold_name("  Dr. LEFÈVRE-Noël ") == "dr lefevre noel"
+
+    def test_trigrams(self):
+        """Trigrammes complétés par des espaces, comme pg_trgm"""
+        assert trigrams("ab") == {"  a", " ab", "ab "}
+        assert trigrams("") == set()
+
+
+class TestDoctorNames:
+    """Tests de la table doctor_names (triggers)"""
+
+    def test_names_are_reference_counted(self, db):
+        """Un nom disparaît quand plus aucune ligne ne le référence"""
+        assert _names(db) == {"Dr Martin": 2, "Dr Lefèvre": 1, "Dr Dupont": 1}
+        with db.connection() as conn:
+            conn.execute(
+                "DELETE FROM document_metadata WHERE doctor_name = 'Dr Dupont'"
+            )
+            conn.execute(
+                "UPDATE document_metadata SET doctor_name = 'Dr Durand' WHERE id = 1"
+            )
+        assert _names(db) == {"Dr Martin": 1, "Dr Lefèvre": 1, "Dr Durand": 1}
+
+    def test_doctors_table_is_indexed(self, db):
+        """Les médecins de la table doctors sont aussi proposés"""
+        with db.connection() as conn:
+            conn.execute(
+                "INSERT INTO doctors (first_name, last_name) VALUES ('Anne', 'Rémy')"
+            )
+        assert db.search_doctor_names("remy")[0]["name"] == "Anne Rémy"
+
+
+class TestSearchDoctorNames:
+    """Tests pour CIADatabase.search_doctor_names"""
+
+    def test_accents_and_case(self, db):
+        """La recherche ignore la casse et les accents"""
+        results = db.search_doctor_names("LEFEVRE")
+        assert results[0]["name"] == "Dr Lefèvre"
+
+    def test_typo_tolerance(self, db):
+        """Une faute de frappe retrouve le bon nom"""
+        results = db.search_doctor_names("Martn")
+        assert results[0]["name"] == "Dr Martin"
+        assert 0 < results[0]["score"] < 1
+
+    def test_substring_ranked_first(self, db):
+        """Les noms contenant la requête passent en premier"""
+        results = db.search_doctor_names("dup", threshold=0.0)
+        assert results[0]["name"] == "Dr Dupont"
+
+    def test_index_follows_writes(self, db):
+        """Un nouveau nom est trouvé dès la recherche suivante"""
+        assert db.search_doctor_names("Moreau") == []
+        doc_id = db.add_document("e.pdf", "e.pdf", "/tmp/e", "pdf", 1)
+        db.add_document_metadata(doc_id, doctor_name="Dr Moreau")
+        assert db.search_doctor_names("Moreau")[0]["name"] == "Dr Moreau"
+
+    def test_get_documents_by_doctor_name(self, db):
+        """Sous-chaîne sans accent ni casse, via l'index des noms"""
+        assert len(db.get_documents_by_doctor_name("MART")) == 2
+        assert len(db.get_documents_by_doctor_name("lefev")) == 1
+        assert db.get_documents_by_doctor_name("inconnu") == []
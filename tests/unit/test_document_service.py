@@ -196,3 +196,38 @@ class TestDocumentService:
             pass
         # Même après erreur, le fichier devrait être supprimé
         # Note: tmp_path n'est plus accessible après le context manager
+
+    def test_save_document_single_transaction(self, document_service, mock_db):
+        """Document, association et métadonnées partagent une transaction"""
+        result = {
+            "filename": "test.pdf",
+            "original_name": "test.pdf",
+            "file_path": "/tmp/test.pdf",
+            "file_size": 1024,
+        }
+        document_service.save_document_with_metadata(
+            result, user_id=1, metadata={"keywords": ["ecg", "coeur"]}
+        )
+        mock_db.user_connection.assert_called_once_with(1)
+        mock_db.user_connection.return_value.__enter__.assert_called_once()
+        kwargs = mock_db.add_document_metadata.call_args.kwargs
+        assert kwargs["document_id"] == 1
+        assert kwargs["keywords"] == "ecg,coeur"
+
+    def test_save_documents_bulk(self, document_service, mock_db):
+        """L'import en masse passe par les méthodes groupées"""
+        mock_db.add_documents_bulk.return_value = [10, 11]
+        result = {
+            "filename": "test.pdf",
+            "original_name": "test.pdf",
+            "file_path": "/tmp/test.pdf",
+            "file_size": 1024,
+        }
+        doc_ids = document_service.save_documents_with_metadata_bulk(
+            [(result, {"doctor_name": "Dr. Test"}), (result, None)], user_id=1
+        )
+        assert doc_ids == [10, 11]
+        mock_db.associate_documents_to_user_bulk.assert_called_once_with(1, [10, 11])
+        metadata_rows = list(mock_db.add_document_metadata_bulk.call_args.args[0])
+        assert [row["document_id"] for row in metadata_rows] == [10]
+        assert metadata_rows[0]["doctor_name"] == "Dr. Test"
@@ -0,0 +1,215 @@
+"""
+Tests unitaires pour le cache persistant des extractions PDF
+"""
+
+import io
+import os
+import sqlite3
+import tempfile
+from unittest.mock import MagicMock
+
+import pytest
+from pypdf import PdfWriter
+
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.extraction_cache import OCR, TEXT, ExtractionCache
+from arkalia_cia_python_backend.pdf_processor import (
+    TEXT_EXTRACTION_VERSION,
+    ParsedPDF,
+    PDFProcessor,
+)
+from arkalia_cia_python_backend.services import document_service as ds_module
+from arkalia_cia_python_backend.services.document_service import DocumentService
+
+SHA = "cd" * 32
+SCANNED_TEXT = "Dr Martin cardiologue " * 10
+
+
+class FakeOCR:
+    """OCR simulé qui compte ses passages"""
+
+    def __init__(self, error: bool = False):
+        self.calls = 0
+        self.error = error
+
+    def is_available(self) -> bool:
+        return True
+
+    def cache_version(self, dpi: int = 300, max_pages: int = 50) -> str:
+        return f"fake|{dpi}|{max_pages}"
+
+    def process_scanned_pdf(self, pdf_path: str, on_progress=None) -> dict:
+        self.calls += 1
+        if self.error:
+            return {"text": "", "pages": [], "confidence": 0.0, "error": "Erreur OCR."}
+        return {
+            "text": SCANNED_TEXT,
+            "pages": [SCANNED_TEXT],
+            "confidence": 87.5,
+            "page_count": 1,
+            "pages_with_text": 1,
+            "processing_time": 1.2,
+        }
+
+
+@pytest.fixture
+def tmp_dir():
+    """Répertoire temporaire (base et PDF)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        yield tmp
+
+
+@pytest.fixture
+def db(tmp_dir):
+    """Base temporaire"""
+    database = CIADatabase(db_path=os.path.join(tmp_dir, "cache.db"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def scanned_pdf(tmp_dir):
+    """PDF sans couche texte (page blanche, comme un scan)"""
+    writer = PdfWriter()
+    writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    path = os.path.join(tmp_dir, "scan.pdf")
+    with open(path, "wb") as f:
+        f.write(buffer.getvalue())
+    return path
+
+
+@pytest.fixture
+def processor(db, tmp_dir):
+    """Processeur PDF avec cache d'extraction et OCR simulé"""
+    pdf_processor = PDFProcessor(
+        os.path.join(tmp_dir, "uploads"), extraction_cache=ExtractionCache(db)
+    )
+    pdf_processor.ocr = FakeOCR()  # type: ignore[assignment]
+    return pdf_processor
+
+
+class TestExtractionCache:
+    """Tests du stockage et de l'éviction"""
+
+    def test_roundtrip_and_version_key(self, db):
+        """Une entrée n'est relue qu'avec la même version d'extracteur"""
+        cache = ExtractionCache(db)
+        cache.put(SHA, TEXT, "v1", {"pages": ["page 1", "page 2"]})
+        assert cache.get(SHA, TEXT, "v1") == {"pages": ["page 1", "page 2"]}
+        assert cache.get(SHA, TEXT, "v2") is None
+        assert cache.get(SHA, OCR, "v1") is None
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+    def test_least_recently_used_evicted(self, db):
+        """Au-delà de max_bytes, l'entrée la moins récemment lue part"""
+        size = db.put_extraction("a" * 64, TEXT, "v1", {"pages": ["x" * 100]})
+        # Éviction jusqu'à 90 % de max_bytes : deux entrées restent
+        cache = ExtractionCache(db, max_bytes=int(2.5 * size))
+        cache.put("b" * 64, TEXT, "v1", {"pages": ["x" * 100]})
+        # "a" relu : "b" devient la moins récemment utilisée
+        assert cache.get("a" * 64, TEXT, "v1") is not None
+        cache.put("c" * 64, TEXT, "v1", {"pages": ["x" * 100]})
+
+        assert cache.get("b" * 64, TEXT, "v1") is None
+        assert cache.get("a" * 64, TEXT, "v1") is not None
+        assert cache.get("c" * 64, TEXT, "v1") is not None
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= cache.max_bytes
+
+    def test_no_eviction_below_limit(self, db, monkeypatch):
+        """Sous max_bytes, ni éviction ni recalcul de la taille par écriture"""
+        evictions = []
+        size_reads = []
+        real_size = db.get_extraction_cache_size
+        monkeypatch.setattr(db, "evict_extractions", evictions.append)
+        monkeypatch.setattr(
+            db,
+            "get_extraction_cache_size",
+            lambda: size_reads.append(1) or real_size(),
+        )
+        cache = ExtractionCache(db, max_bytes=1024 * 1024)
+        for i in range(20):
+            cache.put(f"{i:064x}", TEXT, "v1", {"pages": ["x" * 100]})
+
+        assert evictions == []
+        assert len(size_reads) == 1  # Taille lue à la première écriture
+        assert cache.stats()["entries"] == 20
+
+    def test_sqlite_error_is_a_miss(self):
+        """Une base indisponible n'interrompt pas l'extraction"""
+        failing_db = MagicMock()
+        failing_db.get_extraction.side_effect = sqlite3.OperationalError("locked")
+        failing_db.put_extraction.side_effect = sqlite3.OperationalError("locked")
+        cache = ExtractionCache(failing_db)
+        assert cache.get(SHA, TEXT, "v1") is None
+        cache.put(SHA, TEXT, "v1", {"pages": []})
+        assert cache.stats()["errors"] == 2
+
+
+class TestPDFProcessorCache:
+    """Tests de la réutilisation du texte et de l'OCR"""
+
+    def test_ocr_reused_for_same_content(self, processor, scanned_pdf, monkeypatch):
+        """Deuxième extraction : ni pypdf ni OCR"""
+        first = processor.extract_text_from_pdf(scanned_pdf, sha256=SHA)
+        monkeypatch.setattr(
+            ParsedPDF, "page_text", lambda self, index: pytest.fail("pages relues")
+        )
+        second = processor.extract_text_from_pdf(scanned_pdf, sha256=SHA)
+
+        assert first == second == SCANNED_TEXT
+        assert processor.ocr.calls == 1
+        cached = processor.extraction_cache.get(SHA, OCR, processor.ocr.cache_version())
+        assert cached["confidence"] == 87.5
+        assert "processing_time" not in cached
+
+    def test_without_hash_nothing_cached(self, processor, scanned_pdf):
+        """Sans empreinte du contenu, le cache n'est pas utilisé"""
+        processor.extract_text_from_pdf(scanned_pdf)
+        processor.extract_text_from_pdf(scanned_pdf)
+        assert processor.ocr.calls == 2
+        assert processor.extraction_cache.stats()["entries"] == 0
+
+    def test_ocr_error_not_cached(self, processor, scanned_pdf):
+        """Un échec OCR est retenté au traitement suivant"""
+        processor.ocr = FakeOCR(error=True)
+        processor.extract_text_from_pdf(scanned_pdf, sha256=SHA)
+        processor.extract_text_from_pdf(scanned_pdf, sha256=SHA)
+        assert processor.ocr.calls == 2
+        # Le texte pypdf (vide) reste en cache
+        cache = processor.extraction_cache
+        assert cache.get(SHA, TEXT, TEXT_EXTRACTION_VERSION) == {"pages": [""]}
+
+
+class TestMetadataCache:
+    """Tests du cache des métadonnées (DocumentService)"""
+
+    def test_metadata_reused(self, db, processor, scanned_pdf, monkeypatch):
+        """Retraitement du même contenu : métadonnées relues du cache"""
+        service = DocumentService(db=db, pdf_processor=processor)
+        first = service.extract_metadata(scanned_pdf, sha256=SHA)
+        monkeypatch.setattr(
+            processor,
+            "extract_text_from_pdf",
+            lambda *a, **k: pytest.fail("texte réextrait"),
+        )
+        second = service.extract_metadata(scanned_pdf, sha256=SHA)
+        assert first == second
+        assert first["doctor_specialty"] is not None
+
+    def test_extractor_upgrade_reuses_ocr(
+        self, db, processor, scanned_pdf, monkeypatch
+    ):
+        """Nouvelle version de l'extracteur de métadonnées : OCR non relancé"""
+        service = DocumentService(db=db, pdf_processor=processor)
+        service.extract_metadata(scanned_pdf, sha256=SHA)
+        monkeypatch.setattr(ds_module, "METADATA_EXTRACTOR_VERSION", "2")
+        metadata = service.extract_metadata(scanned_pdf, sha256=SHA)
+
+        assert metadata is not None
+        assert processor.ocr.calls == 1
+        assert db.get_extraction_cache_size()["entries"] == 4
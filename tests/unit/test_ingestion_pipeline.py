@@ -0,0 +1,194 @@
+"""
+Tests unitaires pour le pipeline d'ingestion en une passe
+"""
+
+import hashlib
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from arkalia_cia_python_backend import pdf_processor as pdf_module
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.extraction_cache import ExtractionCache
+from arkalia_cia_python_backend.pdf_processor import PDFProcessor
+from arkalia_cia_python_backend.services.document_service import DocumentService
+from arkalia_cia_python_backend.services.ingestion_pipeline import IngestionPipeline
+from arkalia_cia_python_backend.utils.upload_stream import StoredUpload
+
+PAGES = [
+    "Consultation du 12/03/2024 Dr Martin cardiologue",
+    "Ordonnance du 12/03/2024 Dr Martin paracetamol 1g",
+]
+
+
+def _text_pdf(pages: list[str]) -> bytes:
+    """PDF minimal avec une ligne de texte (Helvetica) par page"""
+    count = len(pages)
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(count))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {count} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, line in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({line}) Tj ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+@pytest.fixture
+def tmp_dir():
+    """Répertoire temporaire (base et uploads)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        yield tmp
+
+
+@pytest.fixture
+def db(tmp_dir):
+    """Base temporaire"""
+    database = CIADatabase(db_path=os.path.join(tmp_dir, "ingest.db"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def pipeline(db, tmp_dir):
+    """Pipeline avec cache d'extraction, sans OCR"""
+    processor = PDFProcessor(
+        os.path.join(tmp_dir, "uploads"), extraction_cache=ExtractionCache(db)
+    )
+    processor.ocr = None
+    return IngestionPipeline(DocumentService(db=db, pdf_processor=processor))
+
+
+@pytest.fixture
+def reader_count(monkeypatch):
+    """Compte les PdfReader construits"""
+    calls = []
+    real_reader = pdf_module.PdfReader
+
+    def counting_reader(*args, **kwargs):
+        calls.append(args)
+        return real_reader(*args, **kwargs)
+
+    monkeypatch.setattr(pdf_module, "PdfReader", counting_reader)
+    return calls
+
+
+def _received(pipeline: IngestionPipeline, content: bytes) -> StoredUpload:
+    """Fichier reçu sous un nom temporaire dans le dossier d'upload"""
+    path = pipeline.service.pdf_processor.upload_dir / ".upload-test.part"
+    path.write_bytes(content)
+    return StoredUpload(str(path), len(content), hashlib.sha256(content).hexdigest())
+
+
+class TestSinglePass:
+    """Un upload : un seul PdfReader pour toutes les étapes"""
+
+    def test_parsed_once(self, pipeline, reader_count):
+        """Validation, aperçu, texte et métadonnées sur le même lecteur"""
+        progress = []
+        document, metadata, portal = pipeline.run(
+            _received(pipeline, _text_pdf(PAGES)),
+            "bilan.pdf",
+            on_progress=progress.append,
+        )
+
+        assert len(reader_count) == 1
+        assert document["text_content"].startswith("Consultation du 12/03/2024")
+        assert document["deduplicated"] is False
+        assert metadata["doctor_specialty"] == "Cardiologue"
+        assert metadata["document_date"].startswith("2024-03-12")
+        assert portal is None
+        assert progress == [0.4, 0.8]
+
+    def test_portal_parsing_shares_text(self, pipeline, reader_count):
+        """Parsing portail sur le texte déjà extrait"""
+        document, metadata, portal = pipeline.run(
+            _received(pipeline, _text_pdf(PAGES)), "export.pdf", portal="andaman7"
+        )
+
+        assert len(reader_count) == 1
+        assert portal["portal"] == "andaman7"
+        assert portal["total_documents"] >= 1
+        assert metadata["doctor_specialty"] == "Cardiologue"
+        assert os.path.exists(document["file_path"])
+
+    def test_duplicate_not_reopened(self, pipeline, reader_count):
+        """Doublon : texte et métadonnées relus du cache, PDF jamais ouvert"""
+        content = _text_pdf(PAGES)
+        _, first, _ = pipeline.run(_received(pipeline, content), "a.pdf")
+        reader_count.clear()
+        document, second, _ = pipeline.run(_received(pipeline, content), "b.pdf")
+
+        assert reader_count == []
+        assert document["deduplicated"] is True
+        assert second == first
+
+    def test_ocr_progress_per_page(self, pipeline):
+        """PDF scanné : avancement page par page entre 0.4 et 0.8"""
+
+        class PagedOCR:
+            def is_available(self) -> bool:
+                return True
+
+            def cache_version(self) -> str:
+                return "paged"
+
+            def process_scanned_pdf(self, pdf_path, on_progress=None):
+                for done in (1, 2):
+                    on_progress(done, 2)
+                return {"text": "Dr Martin cardiologue " * 10, "pages": []}
+
+        pipeline.service.pdf_processor.ocr = PagedOCR()
+        progress = []
+        _, metadata, _ = pipeline.run(
+            _received(pipeline, _text_pdf(["", ""])),
+            "scan.pdf",
+            on_progress=progress.append,
+        )
+
+        assert progress == [0.4, 0.6, 0.8, 0.8]
+        assert metadata["doctor_specialty"] == "Cardiologue"
+
+    def test_invalid_pdf_rejected(self, pipeline):
+        """Fichier non PDF : ValueError et fichier reçu supprimé"""
+        stored = _received(pipeline, b"pas un PDF")
+        with pytest.raises(ValueError, match="PDF valide"):
+            pipeline.run(stored, "faux.pdf")
+        assert not os.path.exists(stored.path)
+
+    def test_failure_after_storage_releases_content(self, pipeline):
+        """Échec après le stockage : référence rendue, fichier supprimé"""
+        stored = _received(pipeline, _text_pdf(PAGES))
+        with (
+            patch.object(
+                pipeline.service, "extract_metadata", side_effect=OSError("disque")
+            ),
+            pytest.raises(OSError),
+        ):
+            pipeline.run(stored, "bilan.pdf")
+
+        db = pipeline.service.db
+        assert db.get_content_blob(stored.sha256) is None
+        assert not any(pipeline.service.pdf_processor.upload_dir.rglob("*.pdf"))
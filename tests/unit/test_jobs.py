@@ -0,0 +1,377 @@
+"""
+Tests unitaires pour la file de jobs et les workers de documents
+"""
+
+import asyncio
+import io
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from pypdf import PdfWriter
+
+from arkalia_cia_python_backend import api
+from arkalia_cia_python_backend.api import API_PREFIX
+from arkalia_cia_python_backend.auth import create_access_token
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.dependencies import (
+    get_database,
+    get_document_service,
+    get_job_worker,
+)
+from arkalia_cia_python_backend.pdf_processor import PDFProcessor
+from arkalia_cia_python_backend.services.document_service import DocumentService
+from arkalia_cia_python_backend.services.job_worker import (
+    DOCUMENT_UPLOAD,
+    DocumentJobWorker,
+)
+from arkalia_cia_python_backend.utils.upload_stream import StoredUpload
+
+
+class FakeUpload:
+    """Source asynchrone en mémoire"""
+
+    def __init__(self, content: bytes):
+        self._buffer = io.BytesIO(content)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._buffer.read(size)
+
+
+def _pdf_bytes() -> bytes:
+    writer = PdfWriter()
+    writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def tmp_dir():
+    """Répertoire temporaire (base et uploads)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        yield tmp
+
+
+@pytest.fixture
+def db(tmp_dir):
+    """Base temporaire"""
+    database = CIADatabase(db_path=os.path.join(tmp_dir, "jobs.db"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def service(db, tmp_dir):
+    """Service documents avec un dossier d'upload temporaire"""
+    return DocumentService(
+        db=db, pdf_processor=PDFProcessor(os.path.join(tmp_dir, "uploads"))
+    )
+
+
+@pytest.fixture
+def worker(service):
+    """Workers non démarrés (jobs exécutés via run_next)"""
+    pool = DocumentJobWorker(service, workers=1, poll_interval=0.05)
+    yield pool
+    pool.stop()
+
+
+def _enqueue_upload(db, service, user_id: int, content: bytes) -> int:
+    stored, filename = asyncio.run(
+        service.receive_upload(FakeUpload(content), "compte-rendu.pdf")
+    )
+    return db.enqueue_job(
+        user_id,
+        DOCUMENT_UPLOAD,
+        {
+            "path": stored.path,
+            "filename": filename,
+            "size": stored.size,
+            "sha256": stored.sha256,
+        },
+    )
+
+
+def _expire_leases(db) -> None:
+    """Baux des jobs en cours expirés (worker arrêté)"""
+    with db.connection() as conn:
+        conn.execute(
+            "UPDATE jobs SET lease_expires_at = datetime('now', '-1 seconds') "
+            "WHERE status = 'running'"
+        )
+
+
+class TestJobQueue:
+    """Tests de la file de jobs en base"""
+
+    def test_claim_in_order_once(self, db):
+        """Les jobs sont pris dans l'ordre d'arrivée, une seule fois"""
+        first = db.enqueue_job(1, "kind", {"n": 1})
+        second = db.enqueue_job(1, "kind", {"n": 2})
+
+        job = db.claim_next_job()
+        assert job["id"] == first
+        assert job["status"] == "running"
+        assert job["attempts"] == 1
+        assert job["payload"] == {"n": 1}
+        assert db.claim_next_job()["id"] == second
+        assert db.claim_next_job() is None
+
+    def test_complete_and_fail(self, db):
+        """Résultat et erreur sont enregistrés avec la date de fin"""
+        done = db.enqueue_job(1, "kind", {})
+        failed = db.enqueue_job(1, "kind", {})
+        db.claim_next_job()
+        db.update_job_progress(done, 0.5)
+        assert db.get_job(done)["progress"] == 0.5
+        db.complete_job(done, {"document_id": 7})
+        db.fail_job(failed, "Document PDF invalide")
+
+        job = db.get_job(done)
+        assert job["status"] == "done"
+        assert job["progress"] == 1
+        assert job["result"] == {"document_id": 7}
+        assert job["finished_at"] is not None
+        assert db.get_job(failed)["error"] == "Document PDF invalide"
+
+    def test_get_job_scoped_to_user(self, db):
+        """Un utilisateur ne voit pas les jobs d'un autre"""
+        job_id = db.enqueue_job(1, "kind", {})
+        assert db.get_job(job_id, user_id=1) is not None
+        assert db.get_job(job_id, user_id=2) is None
+
+    def test_requeue_interrupted(self, db):
+        """Baux expirés : jobs remis en attente, sauf après trop d'essais"""
+        retried = db.enqueue_job(1, "kind", {})
+        exhausted = db.enqueue_job(1, "kind", {})
+        saved = db.enqueue_job(1, "kind", {})
+        for _ in range(3):
+            db.claim_next_job("mort")
+        db.set_job_document(saved, 7, {"document_id": 7})
+        _expire_leases(db)
+        with db.connection() as conn:
+            conn.execute("UPDATE jobs SET attempts = 3 WHERE id = ?", (exhausted,))
+
+        assert db.requeue_interrupted_jobs(max_attempts=3) == 1
+        assert db.get_job(retried)["status"] == "queued"
+        assert db.get_job(retried)["owner"] is None
+        assert db.get_job(exhausted)["status"] == "failed"
+        # Document déjà enregistré : job terminé avec son résultat
+        assert db.get_job(saved)["status"] == "done"
+        assert db.get_job(saved)["result"] == {"document_id": 7}
+
+    def test_live_lease_not_requeued(self, db):
+        """Un job dont le bail court (autre worker vivant) reste en cours"""
+        job_id = db.enqueue_job(1, "kind", {})
+        job = db.claim_next_job("worker-a", lease_seconds=60)
+        assert job["owner"] == "worker-a"
+        assert job["lease_expires_at"] is not None
+
+        assert db.requeue_interrupted_jobs() == 0
+        assert db.get_job(job_id)["status"] == "running"
+
+    def test_renew_lease_by_owner_only(self, db):
+        """Seul le propriétaire d'un job en cours prolonge son bail"""
+        job_id = db.enqueue_job(1, "kind", {})
+        db.claim_next_job("worker-a")
+        _expire_leases(db)
+
+        assert db.renew_job_lease(job_id, "worker-b") is False
+        assert db.renew_job_lease(job_id, "worker-a") is True
+        assert db.requeue_interrupted_jobs() == 0
+        db.complete_job(job_id, {})
+        assert db.renew_job_lease(job_id, "worker-a") is False
+
+
+class TestDocumentJobWorker:
+    """Tests de l'exécution des jobs d'upload"""
+
+    def test_upload_processed(self, db, service, worker, tmp_dir):
+        """Le job valide le PDF, enregistre le document et publie le résultat"""
+        user_id = db.create_user("alice", "hash")
+        job_id = _enqueue_upload(db, service, user_id, _pdf_bytes())
+
+        assert worker.run_next() is True
+        job = db.get_job(job_id)
+        assert job["status"] == "done", job["error"]
+        document_id = job["result"]["document_id"]
+        assert job["result"]["filename"] == "compte-rendu.pdf"
+        assert len(job["result"]["sha256"]) == 64
+        assert [d["id"] for d in db.get_user_documents(user_id)] == [document_id]
+        assert os.path.exists(db.get_document(document_id)["file_path"])
+        assert worker.stats()["completed"] == 1
+        assert worker.run_next() is False
+
+    def test_invalid_pdf_fails_job(self, db, service, worker, tmp_dir):
+        """Un fichier non PDF fait échouer le job et le fichier reçu est supprimé"""
+        job_id = _enqueue_upload(db, service, 1, b"not a pdf")
+        worker.run_next()
+
+        job = db.get_job(job_id)
+        assert job["status"] == "failed"
+        assert job["error"] == "Document PDF invalide"
+        assert os.listdir(os.path.join(tmp_dir, "uploads")) == []
+
+    def test_unexpected_error_message_is_generic(self, db, service, worker):
+        """Une erreur interne n'est pas exposée dans le job"""
+        job_id = _enqueue_upload(db, service, 1, _pdf_bytes())
+        with patch.object(service, "finalize_upload", side_effect=OSError("/secret")):
+            worker.run_next()
+        assert "/secret" not in db.get_job(job_id)["error"]
+
+    def test_document_recorded_on_job(self, db, service, worker):
+        """Le job garde le document créé ; une reprise n'en crée pas d'autre"""
+        user_id = db.create_user("alice", "hash")
+        job_id = _enqueue_upload(db, service, user_id, _pdf_bytes())
+        worker.run_next()
+        job = db.get_job(job_id)
+        assert job["document_id"] == job["result"]["document_id"]
+        assert job["owner"] == worker.owner
+
+        # Arrêt après l'enregistrement, avant la fin du job : job repris
+        with db.connection() as conn:
+            conn.execute("UPDATE jobs SET status = 'queued' WHERE id = ?", (job_id,))
+        worker.run_next()
+
+        assert db.get_job(job_id)["status"] == "done"
+        assert db.get_job(job_id)["result"] == job["result"]
+        assert len(db.get_user_documents(user_id)) == 1
+
+    def test_job_and_document_in_one_transaction(self, db, service, worker):
+        """Job non mis à jour : le document n'est pas enregistré"""
+        user_id = db.create_user("alice", "hash")
+        job_id = _enqueue_upload(db, service, user_id, _pdf_bytes())
+        with patch.object(db, "set_job_document", side_effect=OSError("disque")):
+            worker.run_next()
+
+        assert db.get_job(job_id)["status"] == "failed"
+        assert db.get_user_documents(user_id) == []
+        assert db.get_job(job_id)["document_id"] is None
+
+    def test_save_failure_releases_content(self, db, service, worker):
+        """Document non enregistré : le contenu stocké n'est plus référencé"""
+        job_id = _enqueue_upload(db, service, 1, _pdf_bytes())
+        sha256 = db.get_job(job_id)["payload"]["sha256"]
+        with patch.object(
+            service, "save_document_with_metadata", side_effect=OSError("disque")
+        ):
+            worker.run_next()
+
+        assert db.get_job(job_id)["status"] == "failed"
+        assert db.get_content_blob(sha256) is None
+
+    def test_retry_after_crash_releases_first_reference(self, db, service, worker):
+        """Arrêt entre la prise de référence et l'enregistrement : pas de fuite"""
+        user_id = db.create_user("alice", "hash")
+        job_id = _enqueue_upload(db, service, user_id, _pdf_bytes())
+        job = db.claim_next_job(worker.owner)
+        payload = job["payload"]
+        stored = StoredUpload(payload["path"], payload["size"], payload["sha256"])
+        # Premier essai interrompu juste avant set_job_document
+        worker.pipeline.run(stored, payload["filename"], job_id=job_id)
+        assert db.get_job(job_id)["content_refs"] == 1
+
+        with db.connection() as conn:
+            conn.execute("UPDATE jobs SET status = 'queued' WHERE id = ?", (job_id,))
+        worker.run_next()
+
+        job = db.get_job(job_id)
+        assert job["status"] == "done"
+        assert job["content_refs"] == 0
+        assert db.get_content_blob(payload["sha256"])["ref_count"] == 1
+        assert len(db.get_user_documents(user_id)) == 1
+
+    def test_exhausted_job_releases_references(self, db, service, worker):
+        """Job en échec après trop d'essais : contenu stocké retiré"""
+        job_id = _enqueue_upload(db, service, 1, _pdf_bytes())
+        job = db.claim_next_job("mort")
+        payload = job["payload"]
+        stored = StoredUpload(payload["path"], payload["size"], payload["sha256"])
+        worker.pipeline.run(stored, payload["filename"], job_id=job_id)
+        _expire_leases(db)
+
+        assert db.requeue_interrupted_jobs(max_attempts=1) == 0
+        assert db.get_job(job_id)["status"] == "failed"
+        assert db.get_job(job_id)["content_refs"] == 0
+        assert db.get_content_blob(payload["sha256"])["ref_count"] == 0
+
+    def test_threads_pick_up_queued_jobs(self, db, service, worker):
+        """Après start(), les threads traitent les jobs en attente"""
+        job_id = _enqueue_upload(db, service, 1, _pdf_bytes())
+        worker.start()
+        worker.notify()
+        deadline = time.monotonic() + 10
+        while db.get_job(job_id)["status"] != "done":
+            assert time.monotonic() < deadline, db.get_job(job_id)
+            time.sleep(0.02)
+
+    def test_expired_lease_picked_up_while_running(self, db, service):
+        """Job d'un worker disparu : repris sans redémarrage"""
+        job_id = _enqueue_upload(db, service, 1, _pdf_bytes())
+        db.claim_next_job("mort")
+        _expire_leases(db)
+        worker = DocumentJobWorker(service, workers=1, lease_seconds=1)
+        with patch.object(db, "requeue_interrupted_jobs", return_value=0) as requeue:
+            worker.start()
+        try:
+            # Pas de reprise au démarrage : seule la boucle des baux reprend
+            requeue.assert_called_once()
+            deadline = time.monotonic() + 10
+            while db.get_job(job_id)["status"] != "done":
+                assert time.monotonic() < deadline, db.get_job(job_id)
+                time.sleep(0.05)
+        finally:
+            worker.stop()
+        assert db.get_job(job_id)["attempts"] == 2
+
+
+class TestJobEndpoints:
+    """Tests de l'upload asynchrone et de /jobs/{id}"""
+
+    @pytest.fixture
+    def client(self, db, service, worker):
+        api.app.dependency_overrides[get_database] = lambda: db
+        api.app.dependency_overrides[get_document_service] = lambda: service
+        api.app.dependency_overrides[get_job_worker] = lambda: worker
+        yield TestClient(api.app)
+        api.app.dependency_overrides.clear()
+
+    def _headers(self, db, username: str) -> dict[str, str]:
+        user_id = db.create_user(username, "hash")
+        token = create_access_token(
+            data={"sub": str(user_id), "username": username, "role": "user"}
+        )
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_upload_returns_202_then_job_done(self, client, db, worker):
+        """L'upload répond 202 avec un job, consultable jusqu'au résultat"""
+        headers = self._headers(db, "alice")
+        response = client.post(
+            f"{API_PREFIX}/documents/upload",
+            files={"file": ("cr.pdf", _pdf_bytes(), "application/pdf")},
+            headers=headers,
+        )
+        assert response.status_code == 202
+        data = response.json()
+        assert data["status"] == "queued"
+        assert data["status_url"] == f"{API_PREFIX}/jobs/{data['job_id']}"
+
+        assert client.get(data["status_url"], headers=headers).json()["status"] == (
+            "queued"
+        )
+        worker.run_next()
+        job = client.get(data["status_url"], headers=headers).json()
+        assert job["status"] == "done"
+        assert job["result"]["document_id"] > 0
+
+    def test_job_of_other_user_is_hidden(self, client, db):
+        """Le job d'un autre utilisateur renvoie 404"""
+        job_id = db.enqueue_job(999, DOCUMENT_UPLOAD, {})
+        response = client.get(
+            f"{API_PREFIX}/jobs/{job_id}", headers=self._headers(db, "bob")
+        )
+        assert response.status_code == 404
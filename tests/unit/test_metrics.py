@@ -0,0 +1,103 @@
+"""
+Tests unitaires pour l'exposition Prometheus (/metrics)
+"""
+
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from arkalia_cia_python_backend import api
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.dependencies import get_database
+from arkalia_cia_python_backend.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    format_family,
+    http_requests_total,
+    registry,
+)
+
+
+@pytest.fixture
+def client():
+    """Client de test sur une base temporaire, métriques remises à zéro"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = CIADatabase(db_path=os.path.join(tmp, "metrics.db"))
+        api.app.dependency_overrides[get_database] = lambda: db
+        registry.reset()
+        yield TestClient(api.app)
+        api.app.dependency_overrides.clear()
+        db.close()
+
+
+class TestMetricTypes:
+    """Tests du rendu texte des métriques"""
+
+    def test_counter_with_labels(self):
+        """Une ligne par combinaison de labels, valeurs échappées"""
+        counter = Counter("c_total", "Aide", ("route",))
+        counter.inc(labels=('/a"b',))
+        counter.inc(2, labels=("/x",))
+        text = counter.render()
+        assert "# TYPE c_total counter" in text
+        assert 'c_total{route="/a\\"b"} 1' in text
+        assert 'c_total{route="/x"} 2' in text
+        with pytest.raises(ValueError):
+            counter.inc(-1, labels=("/x",))
+        with pytest.raises(ValueError):
+            counter.inc()
+
+    def test_gauge(self):
+        """Une jauge monte et descend"""
+        gauge = Gauge("g", "Aide")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        assert gauge.value() == 1
+
+    def test_histogram_is_cumulative(self):
+        """Séries _bucket cumulatives, _sum et _count"""
+        histogram = Histogram("h_seconds", "Aide", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(3)
+        text = histogram.render()
+        assert 'h_seconds_bucket{le="0.1"} 1' in text
+        assert 'h_seconds_bucket{le="1"} 2' in text
+        assert 'h_seconds_bucket{le="+Inf"} 3' in text
+        assert "h_seconds_sum 3.55" in text
+        assert "h_seconds_count 3" in text
+
+    def test_format_family(self):
+        """Famille calculée au scrape"""
+        text = format_family("x", "gauge", "Aide", [({"pool": "main"}, 2.5)])
+        assert text == '# HELP x Aide\n# TYPE x gauge\nx{pool="main"} 2.5\n'
+
+
+class TestMetricsEndpoint:
+    """Tests de /metrics et du middleware"""
+
+    def test_prometheus_text(self, client):
+        """Format texte Prometheus, avec pool SQLite et méthodes de la base"""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert "# TYPE cia_http_request_duration_seconds histogram" in text
+        assert "cia_db_pool_max_size" in text
+        assert "cia_http_requests_in_flight 1" in text
+        assert "cia_uptime_seconds" in text
+
+    def test_route_template_label(self, client):
+        """Les requêtes sont étiquetées par route déclarée, pas par URL"""
+        client.get("/api/v1/documents/123")
+        client.get("/chemin/inconnu")
+        labels = {labels[1] for labels in http_requests_total._values}
+        assert "/api/v1/documents/{doc_id}" in labels
+        assert "unmatched" in labels
+        assert "/api/v1/documents/123" not in labels
+        text = client.get("/metrics").text
+        assert 'route="/api/v1/documents/{doc_id}",status="401"' in text
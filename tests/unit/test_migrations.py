@@ -0,0 +1,92 @@
+"""
+Tests unitaires pour les migrations du schéma SQLite
+"""
+
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.migrations import (
+    LATEST_VERSION,
+    MIGRATIONS,
+    get_schema_version,
+    migrate,
+)
+
+
+@pytest.fixture
+def temp_db_path():
+    """Chemin de base temporaire (nettoyé avec fichiers WAL/SHM)"""
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        db_path = tmp.name
+    yield db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+
+class TestMigrations:
+    """Tests pour le runner de migrations"""
+
+    def test_versions_are_sequential(self):
+        """Les migrations sont numérotées 1..N sans trou"""
+        assert [v for v, _ in MIGRATIONS] == list(range(1, LATEST_VERSION + 1))
+
+    def test_fresh_database_migrated(self, temp_db_path):
+        """Une base neuve reçoit toutes les migrations"""
+        conn = sqlite3.connect(temp_db_path)
+        assert migrate(conn) == LATEST_VERSION
+        assert get_schema_version(conn) == LATEST_VERSION
+        tables = {
+            row[0]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        }
+        assert {"documents", "audit_logs", "pain_entries"} <= tables
+        conn.close()
+
+    def test_up_to_date_database_runs_no_ddl(self, temp_db_path):
+        """Base à jour : seule la lecture de user_version est exécutée"""
+        conn = sqlite3.connect(temp_db_path)
+        migrate(conn)
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+        assert migrate(conn) == 0
+        assert statements == ["PRAGMA user_version"]
+        conn.close()
+
+    def test_legacy_database_adopted(self, temp_db_path):
+        """Une base antérieure aux migrations (user_version 0) est adoptée"""
+        conn = sqlite3.connect(temp_db_path)
+        conn.execute(
+            "CREATE TABLE document_metadata (id INTEGER PRIMARY KEY, "
+            "document_id INTEGER NOT NULL, doctor_name TEXT, doctor_specialty TEXT, "
+            "document_date TEXT, exam_type TEXT, document_type TEXT, keywords TEXT, "
+            "extracted_text TEXT, created_at TIMESTAMP)"
+        )
+        conn.execute(
+            "INSERT INTO document_metadata (document_id, extracted_text) "
+            "VALUES (1, 'scanner abdominal')"
+        )
+        conn.commit()
+        migrate(conn)
+        # Les données existantes sont indexées par la migration FTS5
+        hits = conn.execute(
+            "SELECT rowid FROM document_metadata_fts WHERE document_metadata_fts "
+            "MATCH 'abdominal'"
+        ).fetchall()
+        assert hits == [(1,)]
+        conn.close()
+
+    def test_database_handle_reuses_schema(self, temp_db_path):
+        """Une seconde instance de CIADatabase ne rejoue pas les migrations"""
+        first = CIADatabase(db_path=temp_db_path)
+        first.close()
+        second = CIADatabase(db_path=temp_db_path)
+        with second.connection() as conn:
+            assert get_schema_version(conn) == LATEST_VERSION
+            assert migrate(conn) == 0
+        assert second.fts_enabled
+        second.close()
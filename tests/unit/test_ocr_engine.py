@@ -0,0 +1,164 @@
+"""
+Tests unitaires pour le moteur OCR en flux (pages en cours, DPI adaptatif)
+"""
+
+import io
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pypdf import PdfWriter
+
+from arkalia_cia_python_backend.pdf_parser import ocr_engine
+from arkalia_cia_python_backend.pdf_parser.ocr_engine import OCREngine, PageOCR
+from arkalia_cia_python_backend.pdf_parser.ocr_integration import OCRIntegration
+
+
+class FakeRecognizer:
+    """
+    recognize_page simulé : confiance par page et par DPI
+
+    Compte les passes et le nombre maximal de pages traitées en même temps.
+    """
+
+    def __init__(self, low_pages=(), failing=(), delay: float = 0.0):
+        self.low_pages = set(low_pages)  # Pages peu lisibles à basse résolution
+        self.failing = set(failing)  # (page, dpi) en échec
+        self.delay = delay
+        self.calls: list[tuple[int, int]] = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, pdf_path, page_number, dpi, config, tesseract_cmd=None):
+        with self._lock:
+            self.calls.append((page_number, dpi))
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(self.delay)
+            if (page_number, dpi) in self.failing:
+                raise RuntimeError("pdftoppm en échec")
+            low = page_number in self.low_pages and dpi < 300
+            return f"page {page_number} {dpi}dpi", 40.0 if low else 90.0
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def recognizer(monkeypatch):
+    """OCR d'une page simulé (ni pdf2image ni Tesseract)"""
+    fake = FakeRecognizer()
+    monkeypatch.setattr(ocr_engine, "recognize_page", fake)
+    return fake
+
+
+@pytest.fixture
+def pool():
+    """Pool de threads (mêmes appels que le pool de processus)"""
+    executor = ThreadPoolExecutor(max_workers=8)
+    yield executor
+    executor.shutdown()
+
+
+class TestOCREngine:
+    """Tests du pipeline borné et de la résolution adaptative"""
+
+    def test_pages_in_order_and_bounded(self, recognizer, pool):
+        """Pages produites dans l'ordre, au plus pages_in_flight à la fois"""
+        recognizer.delay = 0.01
+        engine = OCREngine(pool, pages_in_flight=3)
+        pages = list(engine.iter_pages("scan.pdf", 10))
+
+        assert [page.text for page in pages] == [
+            f"page {i} 150dpi" for i in range(1, 11)
+        ]
+        assert 1 < recognizer.max_running <= 3
+
+    def test_low_confidence_pages_redone(self, recognizer):
+        """Seules les pages peu fiables repassent en pleine résolution"""
+        recognizer.low_pages = {2, 5}
+        engine = OCREngine(fast_dpi=150, min_confidence=70.0)
+        pages = engine.recognize("scan.pdf", 6, dpi=300)
+
+        assert sorted(call for call in recognizer.calls if call[1] == 300) == [
+            (2, 300),
+            (5, 300),
+        ]
+        assert pages[1] == PageOCR("page 2 300dpi", 90.0, 300)
+        assert pages[2].dpi == 150
+
+    def test_failures(self, recognizer, pool):
+        """Passe rapide en échec refaite ; pleine résolution en échec : rapide"""
+        recognizer.low_pages = {2}
+        recognizer.failing = {(1, 150), (2, 300), (3, 150), (3, 300)}
+        engine = OCREngine(pool, pages_in_flight=2)
+        pages = list(engine.iter_pages("scan.pdf", 3))
+
+        assert pages[0] == PageOCR("page 1 300dpi", 90.0, 300)
+        assert pages[1] == PageOCR("page 2 150dpi", 40.0, 150)
+        assert pages[2] == PageOCR("", None, 300)
+
+    def test_single_pass_when_fast_dpi_not_lower(self, recognizer):
+        """Passe rapide désactivée : une seule passe à la résolution demandée"""
+        recognizer.low_pages = {1}
+        engine = OCREngine(fast_dpi=300)
+        engine.recognize("scan.pdf", 2, dpi=200)
+        assert recognizer.calls == [(1, 200), (2, 200)]
+        assert engine.version(200) == "200"
+
+    def test_progress_per_page(self, recognizer, pool):
+        """Avancement signalé après chaque page"""
+        progress = []
+        OCREngine(pool).recognize(
+            "scan.pdf",
+            4,
+            on_progress=lambda done, total: progress.append((done, total)),
+        )
+        assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+    def test_shutdown_pool_falls_back_locally(self, recognizer):
+        """Pool arrêté : OCR dans le processus courant"""
+        executor = ThreadPoolExecutor(max_workers=2)
+        executor.shutdown()
+        pages = OCREngine(executor).recognize("scan.pdf", 2)
+        assert [page.text for page in pages] == ["page 1 150dpi", "page 2 150dpi"]
+
+
+class TestOCRIntegrationEngine:
+    """Tests de process_scanned_pdf sur le moteur"""
+
+    def test_result_and_cache_version(self, recognizer, pool):
+        """Texte joint, confiance moyenne, pages refaites comptées"""
+        recognizer.low_pages = {1}
+        writer = PdfWriter()
+        for _ in range(3):
+            writer.add_blank_page(width=200, height=200)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "scan.pdf")
+            with open(path, "wb") as f:
+                f.write(buffer.getvalue())
+
+            integration = OCRIntegration(engine=OCREngine(pool))
+            integration.ocr_available = True
+            progress = []
+            result = integration.process_scanned_pdf(
+                path, max_pages=2, on_progress=lambda *p: progress.append(p)
+            )
+
+        assert result["text"] == "page 1 300dpi\n\npage 2 150dpi"
+        assert result["page_count"] == 2
+        assert result["pages_with_text"] == 2
+        assert result["pages_reprocessed"] == 1
+        assert result["confidence"] == 90.0
+        assert progress == [(1, 2), (2, 2)]
+        assert (
+            integration.cache_version()
+            != OCRIntegration(engine=OCREngine(fast_dpi=300)).cache_version()
+        )
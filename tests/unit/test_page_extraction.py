@@ -0,0 +1,210 @@
+"""
+Tests unitaires pour l'extraction des pages PDF (parallèle et en flux)
+"""
+
+import os
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.extraction_cache import TEXT, ExtractionCache
+from arkalia_cia_python_backend.pdf_parser.page_text import (
+    PAGES_PER_CHUNK,
+    create_page_pool,
+    page_ranges,
+)
+from arkalia_cia_python_backend.pdf_processor import (
+    TEXT_EXTRACTION_VERSION,
+    PDFProcessor,
+)
+
+PAGE_COUNT = 40
+SHA = "ef" * 32
+
+
+def _text_pdf(pages: list[str]) -> bytes:
+    """PDF minimal avec une ligne de texte (Helvetica) par page"""
+    count = len(pages)
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(count))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {count} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, line in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({line}) Tj ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+class RecordingPool(ThreadPoolExecutor):
+    """Pool de threads qui compte les plages soumises"""
+
+    def __init__(self) -> None:
+        super().__init__(max_workers=2)
+        self.submitted: list[tuple[int, int]] = []
+
+    def submit(self, fn, /, *args, **kwargs):  # type: ignore[no-untyped-def]
+        self.submitted.append(args[1:3])
+        return super().submit(fn, *args, **kwargs)
+
+
+class FailingPool(RecordingPool):
+    """Pool dont chaque tâche échoue (processus tué, pool arrêté)"""
+
+    def submit(self, fn, /, *args, **kwargs):  # type: ignore[no-untyped-def]
+        self.submitted.append(args[1:3])
+        future: Future[list[str]] = Future()
+        future.set_exception(RuntimeError("pool arrêté"))
+        return future
+
+
+@pytest.fixture
+def tmp_dir():
+    """Répertoire temporaire (base, uploads et PDF)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        yield tmp
+
+
+@pytest.fixture
+def large_pdf(tmp_dir):
+    """PDF de PAGE_COUNT pages, une ligne numérotée par page"""
+    path = os.path.join(tmp_dir, "export.pdf")
+    with open(path, "wb") as f:
+        f.write(_text_pdf([f"Page {i + 1} compte rendu" for i in range(PAGE_COUNT)]))
+    return path
+
+
+@pytest.fixture
+def pool():
+    """Pool de threads (mêmes appels que le pool de processus)"""
+    executor = RecordingPool()
+    yield executor
+    executor.shutdown()
+
+
+def _processor(tmp_dir, **kwargs) -> PDFProcessor:
+    processor = PDFProcessor(os.path.join(tmp_dir, "uploads"), **kwargs)
+    processor.ocr = None
+    return processor
+
+
+class TestPageRanges:
+    """Tests du découpage en plages"""
+
+    def test_ranges_cover_all_pages(self):
+        """Plages consécutives, la dernière tronquée"""
+        assert page_ranges(40, 16) == [(0, 16), (16, 32), (32, 40)]
+        assert page_ranges(0) == []
+
+
+class TestParallelExtraction:
+    """Tests de l'extraction parallèle au-delà du seuil"""
+
+    def test_same_text_in_order(self, tmp_dir, large_pdf, pool):
+        """Texte identique à l'extraction séquentielle, pages dans l'ordre"""
+        sequential = _processor(tmp_dir).extract_text_from_pdf(large_pdf)
+        processor = _processor(tmp_dir, page_pool=pool, parallel_min_pages=10)
+        parallel = processor.extract_text_from_pdf(large_pdf)
+
+        assert parallel == sequential
+        assert parallel.index("Page 2 ") < parallel.index("Page 39 ")
+        assert pool.submitted == page_ranges(PAGE_COUNT)
+
+    def test_below_threshold_sequential(self, tmp_dir, large_pdf, pool):
+        """Sous le seuil, rien n'est soumis au pool"""
+        processor = _processor(tmp_dir, page_pool=pool, parallel_min_pages=100)
+        assert "Page 40 " in processor.extract_text_from_pdf(large_pdf)
+        assert pool.submitted == []
+
+    def test_failed_range_extracted_locally(self, tmp_dir, large_pdf):
+        """Pool en échec : les pages sont extraites dans le processus courant"""
+        failing = FailingPool()
+        processor = _processor(tmp_dir, page_pool=failing, parallel_min_pages=10)
+        pages = list(processor.iter_page_texts(large_pdf))
+        failing.shutdown()
+
+        assert len(pages) == PAGE_COUNT
+        assert pages[-1].startswith("Page 40 ")
+        assert len(failing.submitted) == len(page_ranges(PAGE_COUNT))
+
+    def test_process_pool(self, tmp_dir, large_pdf):
+        """Pool de processus réel (spawn)"""
+        process_pool = create_page_pool(2)
+        try:
+            processor = _processor(
+                tmp_dir, page_pool=process_pool, parallel_min_pages=10
+            )
+            pages = list(processor.iter_page_texts(large_pdf))
+        finally:
+            process_pool.shutdown()
+        assert [page.split()[1] for page in pages] == [
+            str(i + 1) for i in range(PAGE_COUNT)
+        ]
+
+
+class TestIterPageTexts:
+    """Tests du générateur de pages"""
+
+    def test_stream_then_cache(self, tmp_dir, large_pdf, pool):
+        """Pages produites une à une, texte complet en cache à la fin"""
+        db = CIADatabase(db_path=os.path.join(tmp_dir, "pages.db"))
+        try:
+            cache = ExtractionCache(db)
+            processor = _processor(
+                tmp_dir,
+                extraction_cache=cache,
+                page_pool=pool,
+                parallel_min_pages=10,
+            )
+            stream = processor.iter_page_texts(large_pdf, sha256=SHA)
+            assert next(stream).startswith("Page 1 ")
+            assert cache.get(SHA, TEXT, TEXT_EXTRACTION_VERSION) is None
+            rest = list(stream)
+
+            assert len(rest) == PAGE_COUNT - 1
+            cached = cache.get(SHA, TEXT, TEXT_EXTRACTION_VERSION)
+            assert cached["pages"][0].startswith("Page 1 ")
+            assert len(cached["pages"]) == PAGE_COUNT
+        finally:
+            db.close()
+
+    def test_abandoned_stream_not_cached(self, tmp_dir, large_pdf, pool):
+        """Flux interrompu : plages restantes annulées, rien en cache"""
+        db = CIADatabase(db_path=os.path.join(tmp_dir, "pages.db"))
+        try:
+            cache = ExtractionCache(db)
+            processor = _processor(
+                tmp_dir,
+                extraction_cache=cache,
+                page_pool=pool,
+                parallel_min_pages=10,
+            )
+            stream = processor.iter_page_texts(large_pdf, sha256=SHA)
+            first = [next(stream) for _ in range(PAGES_PER_CHUNK + 1)]
+            stream.close()
+
+            assert first[-1].startswith(f"Page {PAGES_PER_CHUNK + 1} ")
+            assert cache.stats()["entries"] == 0
+        finally:
+            db.close()
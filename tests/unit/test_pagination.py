@@ -0,0 +1,118 @@
+"""
+Tests unitaires pour la pagination par curseur (keyset)
+"""
+
+import os
+import tempfile
+
+import pytest
+
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.utils.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    next_cursor,
+)
+
+
+@pytest.fixture
+def db():
+    """Base temporaire pour les tests"""
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        db_path = tmp.name
+    database = CIADatabase(db_path=db_path)
+    yield database
+    database.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+
+def _walk(fetch, limit: int, timestamp_key: str = "created_at") -> list[int]:
+    """Parcourt toutes les pages et retourne les ids dans l'ordre"""
+    ids: list[int] = []
+    cursor = None
+    while True:
+        rows = fetch(limit=limit, page_cursor=cursor)
+        ids.extend(row["id"] for row in rows)
+        cursor = next_cursor(rows, limit, timestamp_key)
+        if cursor is None:
+            return ids
+
+
+class TestCursorEncoding:
+    """Tests pour l'encodage des curseurs"""
+
+    def test_roundtrip(self):
+        """Un curseur encodé se décode à l'identique"""
+        cursor = encode_cursor("2024-01-02 03:04:05", 42)
+        assert decode_cursor(cursor) == ("2024-01-02 03:04:05", 42)
+
+    @pytest.mark.parametrize(
+        "cursor", ["", "pas-un-curseur", encode_cursor("x", 1)[:-2]]
+    )
+    def test_invalid_cursor(self, cursor):
+        """Les curseurs illisibles lèvent InvalidCursorError"""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor)
+
+    def test_no_next_cursor_on_last_page(self):
+        """Pas de curseur suivant pour une page incomplète"""
+        assert next_cursor([{"id": 1, "created_at": "t"}], limit=2) is None
+        assert next_cursor([], limit=2) is None
+
+
+class TestKeysetPagination:
+    """Tests de la pagination keyset de CIADatabase"""
+
+    def test_documents_pages_cover_all_rows(self, db):
+        """Les pages successives couvrent tous les documents sans doublon"""
+        for i in range(7):
+            db.add_document(f"d{i}.pdf", "o.pdf", "/tmp/x", "pdf", 1)
+        assert _walk(db.get_documents, limit=3) == [7, 6, 5, 4, 3, 2, 1]
+
+    def test_user_documents_and_conversations(self, db):
+        """Documents utilisateur et conversations IA paginent par curseur"""
+        user_id = db.create_user("alice", "hash")
+        for i in range(4):
+            doc_id = db.add_document(f"d{i}.pdf", "o.pdf", "/tmp/x", "pdf", 1)
+            db.associate_document_to_user(user_id, doc_id)
+            db.add_ai_conversation(f"q{i}", "r")
+        assert _walk(lambda **kw: db.get_user_documents(user_id, **kw), limit=3) == [
+            4,
+            3,
+            2,
+            1,
+        ]
+        assert _walk(db.get_ai_conversations, limit=2) == [4, 3, 2, 1]
+
+    def test_audit_logs_and_shared_documents(self, db):
+        """Logs d'audit et partages paginent par curseur"""
+        user_id = db.create_user("bob", "hash")
+        for i in range(5):
+            db.add_audit_log(user_id, "login", "auth")
+            db.share_document_with_member(user_id, str(i), f"m{i}@example.com")
+        assert _walk(
+            lambda **kw: db.get_audit_logs(user_id=user_id, **kw), limit=2
+        ) == [5, 4, 3, 2, 1]
+        assert _walk(
+            lambda **kw: db.get_shared_documents(user_id, **kw),
+            limit=2,
+            timestamp_key="shared_at",
+        ) == [5, 4, 3, 2, 1]
+
+    def test_cursor_query_uses_composite_index(self, db):
+        """La requête keyset s'appuie sur l'index composite (pas de tri temporaire)"""
+        with db.connection() as conn:
+            plan = " ".join(
+                row[3]
+                for row in conn.execute(
+                    "EXPLAIN QUERY PLAN SELECT * FROM documents "
+                    "WHERE (created_at, id) < (?, ?) "
+                    "ORDER BY created_at DESC, id DESC LIMIT 10",
+                    ("2030-01-01", 1),
+                )
+            )
+        assert "idx_documents_created_id" in plan
+        assert "TEMP B-TREE" not in plan
@@ -0,0 +1,147 @@
+"""
+Tests unitaires pour l'instrumentation de la couche SQLite
+"""
+
+import logging
+import os
+import tempfile
+import threading
+
+import pytest
+
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.db_pool import SQLiteConnectionPool
+from arkalia_cia_python_backend.query_metrics import (
+    InstrumentedConnection,
+    QueryMetrics,
+    param_shape,
+    query_metrics,
+)
+
+
+@pytest.fixture
+def db():
+    """Base temporaire, compteurs remis à zéro"""
+    with tempfile.TemporaryDirectory() as tmp:
+        database = CIADatabase(db_path=os.path.join(tmp, "metrics.db"))
+        query_metrics.reset()
+        yield database
+        database.close()
+        query_metrics.reset()
+
+
+class TestParamShape:
+    """Tests pour param_shape"""
+
+    def test_types_not_values(self):
+        """Seuls les types apparaissent, jamais les valeurs"""
+        assert param_shape((1, "secret", None)) == "(int, str, NoneType)"
+        assert param_shape({"email": "a@b.fr"}) == "{email: str}"
+
+    def test_long_homogeneous_list(self):
+        """Une longue liste IN est résumée"""
+        assert param_shape(list(range(50))) == "(int x 50)"
+
+
+class TestMethodMetrics:
+    """Tests des compteurs par méthode de CIADatabase"""
+
+    def test_calls_rows_and_histogram(self, db):
+        """Appels, lignes lues/écrites et histogramme cumulatif"""
+        user_id = db.create_user("alice", "hash")
+        doc_ids = db.add_documents_bulk(
+            {
+                "name": f"{i}.pdf",
+                "original_name": "o",
+                "file_path": "/tmp/x",
+                "file_type": "pdf",
+                "file_size": 1,
+            }
+            for i in range(3)
+        )
+        db.associate_documents_to_user_bulk(user_id, doc_ids)
+        db.get_user_documents(user_id)
+
+        methods = query_metrics.snapshot()["methods"]
+        read = methods["get_user_documents"]
+        assert read["calls"] == 1
+        assert read["rows_read"] == 3
+        assert read["statements"] >= 1
+        assert read["histogram"]["+Inf"] == 1
+        assert methods["add_documents_bulk"]["rows_written"] == 3
+
+    def test_errors_counted(self, db):
+        """Une exception est comptée puis propagée"""
+        with pytest.raises(ValueError):
+            db.get_user_documents(1, page_cursor="invalide")
+        assert query_metrics.snapshot()["methods"]["get_user_documents"]["errors"] == 1
+
+    def test_generators_not_wrapped(self, db):
+        """Context managers et générateurs ne sont pas chronométrés"""
+        with db.connection() as conn:
+            conn.execute("SELECT 1")
+        list(db.iter_user_documents(1))
+        methods = query_metrics.snapshot()["methods"]
+        assert "connection" not in methods
+        assert "iter_user_documents" not in methods
+
+
+class TestSlowQueryLog:
+    """Tests du journal des requêtes lentes"""
+
+    def test_slow_query_logged_without_values(self, caplog):
+        """La requête lente est journalisée avec la forme des paramètres"""
+        metrics = QueryMetrics(slow_query_ms=0)
+        with caplog.at_level(logging.WARNING, logger="arkalia_cia_python_backend"):
+            metrics.record_statement(
+                "SELECT *\n  FROM users WHERE email = ?", ("zoe@x.fr",), 0.5, -1, False
+            )
+        assert "SELECT * FROM users WHERE email = ?" in caplog.text
+        assert "(str)" in caplog.text
+        assert "zoe@x.fr" not in caplog.text
+        assert metrics.snapshot()["slow_queries"] == 1
+
+    def test_fast_query_not_logged(self, caplog):
+        """Sous le seuil, rien n'est journalisé"""
+        metrics = QueryMetrics(slow_query_ms=1000)
+        with caplog.at_level(logging.WARNING):
+            metrics.record_statement("SELECT 1", (), 0.001, -1, False)
+        assert caplog.text == ""
+
+
+class TestConnectionWait:
+    """Tests de l'attente de connexion rattachée à la méthode"""
+
+    def test_wait_reported(self, db):
+        """L'attente d'une connexion du pool est attribuée à l'appel en cours"""
+        metrics = query_metrics
+        with tempfile.TemporaryDirectory() as tmp:
+            pool = SQLiteConnectionPool(
+                os.path.join(tmp, "wait.db"),
+                max_size=1,
+                connection_factory=InstrumentedConnection,
+                on_wait=metrics.record_wait,
+            )
+            held = threading.Event()
+            release = threading.Event()
+
+            def hold() -> None:
+                with pool.connection():
+                    held.set()
+                    release.wait(5)
+
+            def query() -> None:
+                with pool.connection() as conn:
+                    conn.execute("SELECT 1")
+
+            thread = threading.Thread(target=hold)
+            thread.start()
+            held.wait(5)
+            threading.Timer(0.05, release.set).start()
+            metrics.timed("query", query)()
+            thread.join()
+            pool.close()
+
+        stats = metrics.snapshot()["methods"]["query"]
+        assert stats["connection_wait_seconds"] >= 0.04
+        assert stats["statements"] == 1
@@ -0,0 +1,348 @@
+"""
+Régression des plans de requête (EXPLAIN QUERY PLAN)
+
+Chaque méthode de CIADatabase et chaque requête de aria_integration/api.py
+est exécutée sur une base de test ; toutes les requêtes SQL émises sont
+capturées puis expliquées. Un parcours complet (SCAN sans index) d'une
+grande table fait échouer le test.
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from arkalia_cia_python_backend.aria_integration import api as aria_api
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.utils.pagination import encode_cursor
+
+# Tables qui grossissent avec l'usage (les autres restent petites)
+LARGE_TABLES = {
+    "ai_conversations",
+    "audit_logs",
+    "consultations",
+    "content_blobs",
+    "document_metadata",
+    "documents",
+    "extraction_cache",
+    "family_members",
+    "jobs",
+    "pain_entries",
+    "shared_documents",
+    "token_blacklist",
+    "user_documents",
+    "users",
+}
+
+# Parcours complets assumés : (méthode, table) -> raison
+ALLOWED_SCANS: dict[tuple[str, str], str] = {}
+
+# Méthodes sans requête SQL propre, ou propres au mode par utilisateur
+NOT_QUERIES = {
+    "connection",
+    "user_connection",
+    "close",
+    "init_db",
+    "delete_user_storage",
+}
+
+_SQL_KEYWORDS = {"on", "where", "join", "inner", "left", "order", "group", "limit"}
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN|INTO|UPDATE)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.I
+)
+_BARE_SCAN = re.compile(r"^SCAN (\w+)$")
+
+_CURSOR = encode_cursor("2100-01-01 00:00:00", 1_000_000)
+_EXPIRES = datetime.now() + timedelta(hours=1)
+_SHA = "ab" * 32
+
+# Scénarios : nom (méthode[variante]) -> appel
+SCENARIOS = {
+    "ping": lambda db: db.ping(),
+    "add_document": lambda db: db.add_document("n.pdf", "o.pdf", "/tmp/n", "pdf", 1),
+    "add_document[content]": lambda db: db.add_document(
+        "n.pdf", "o.pdf", "/tmp/blob", "pdf", 1, content_sha256=_SHA
+    ),
+    "add_documents_bulk": lambda db: db.add_documents_bulk(
+        [
+            {
+                "name": "b.pdf",
+                "original_name": "b.pdf",
+                "file_path": "/tmp/b",
+                "file_type": "pdf",
+                "file_size": 1,
+            }
+        ]
+    ),
+    "get_documents": lambda db: db.get_documents(),
+    "get_documents[page]": lambda db: db.get_documents(skip=1, limit=10),
+    "get_documents[cursor]": lambda db: db.get_documents(limit=10, page_cursor=_CURSOR),
+    "get_document": lambda db: db.get_document(1),
+    "delete_document": lambda db: db.delete_document(3),
+    "delete_document[content]": lambda db: db.delete_document(4),
+    "add_document_metadata": lambda db: db.add_document_metadata(1, doctor_name="X"),
+    "add_document_metadata_bulk": lambda db: db.add_document_metadata_bulk(
+        [{"document_id": 1, "doctor_name": "Y"}]
+    ),
+    "add_ai_conversation": lambda db: db.add_ai_conversation("q", "r"),
+    "get_ai_conversations": lambda db: db.get_ai_conversations(limit=10),
+    "get_ai_conversations[cursor]": lambda db: db.get_ai_conversations(
+        limit=10, page_cursor=_CURSOR
+    ),
+    "get_document_metadata": lambda db: db.get_document_metadata(1),
+    "get_documents_by_doctor_name": lambda db: db.get_documents_by_doctor_name("mar"),
+    "search_doctor_names": lambda db: db.search_doctor_names("martn"),
+    "search_documents": lambda db: db.search_documents(1, "martin"),
+    "search_documents[filters]": lambda db: db.search_documents(
+        1, "martin", {"document_type": "ordonnance", "date_from": "2020-01-01"}
+    ),
+    "search_documents[like]": lambda db: _without_fts(
+        db, db.search_documents, 1, "ecg"
+    ),
+    "add_reminder": lambda db: db.add_reminder("t", "d", "2030-01-01"),
+    "get_reminder": lambda db: db.get_reminder(1),
+    "delete_reminder": lambda db: db.delete_reminder(1),
+    "get_reminders": lambda db: db.get_reminders(limit=10),
+    "add_emergency_contact": lambda db: db.add_emergency_contact("a", "1", "frère"),
+    "get_contact": lambda db: db.get_contact(1),
+    "delete_contact": lambda db: db.delete_contact(1),
+    "get_emergency_contacts": lambda db: db.get_emergency_contacts(limit=10),
+    "add_health_portal": lambda db: db.add_health_portal("p", "u", "d", "c"),
+    "get_portal": lambda db: db.get_portal(1),
+    "delete_portal": lambda db: db.delete_portal(1),
+    "get_health_portals": lambda db: db.get_health_portals(limit=10),
+    "create_user": lambda db: db.create_user("carol", "hash"),
+    "get_user_by_username": lambda db: db.get_user_by_username("alice"),
+    "get_user_by_id": lambda db: db.get_user_by_id(1),
+    "associate_document_to_user": lambda db: db.associate_document_to_user(2, 1),
+    "associate_documents_to_user_bulk": lambda db: db.associate_documents_to_user_bulk(
+        2, [1, 2]
+    ),
+    "get_user_documents": lambda db: db.get_user_documents(1),
+    "get_user_documents[cursor]": lambda db: db.get_user_documents(
+        1, limit=10, page_cursor=_CURSOR
+    ),
+    "iter_user_documents": lambda db: list(db.iter_user_documents(1)),
+    "user_owns_document": lambda db: db.user_owns_document(1, 2),
+    "add_token_to_blacklist": lambda db: db.add_token_to_blacklist(
+        "jti-2", 1, "access", _EXPIRES
+    ),
+    "is_token_blacklisted": lambda db: db.is_token_blacklisted("jti-1"),
+    "revoke_all_user_tokens": lambda db: db.revoke_all_user_tokens(1),
+    "cleanup_expired_tokens": lambda db: db.cleanup_expired_tokens(),
+    "add_audit_log": lambda db: db.add_audit_log(1, "login", "auth"),
+    "queue_audit_log": lambda db: db.queue_audit_log(1, "login", "auth"),
+    "flush_audit_logs": lambda db: (
+        db.queue_audit_log(1, "login", "auth"),
+        db.flush_audit_logs(),
+    ),
+    "get_audit_logs": lambda db: db.get_audit_logs(),
+    "get_audit_logs[user]": lambda db: db.get_audit_logs(user_id=1, limit=10),
+    "get_audit_logs[action]": lambda db: db.get_audit_logs(action="login", limit=10),
+    "get_audit_logs[cursor]": lambda db: db.get_audit_logs(
+        user_id=1, action="login", page_cursor=_CURSOR
+    ),
+    "get_consultations_by_user": lambda db: db.get_consultations_by_user(1),
+    "get_consultations_by_user[dates]": lambda db: db.get_consultations_by_user(
+        1, start_date=datetime(2020, 1, 1), end_date=datetime(2030, 1, 1)
+    ),
+    "add_family_member": lambda db: db.add_family_member(1, "Léa", "lea@x.fr"),
+    "get_family_members": lambda db: db.get_family_members(1, limit=10),
+    "get_family_member": lambda db: db.get_family_member(1, 1),
+    "update_family_member": lambda db: db.update_family_member(1, 1, name="Zoé"),
+    "delete_family_member": lambda db: db.delete_family_member(1, 1),
+    "share_document_with_member": lambda db: db.share_document_with_member(
+        1, "1", "zoe@x.fr"
+    ),
+    "get_shared_documents": lambda db: db.get_shared_documents(1, limit=10),
+    "get_shared_documents_for_member": lambda db: db.get_shared_documents_for_member(
+        "zoe@x.fr", page_cursor=_CURSOR, limit=10
+    ),
+    "unshare_document": lambda db: db.unshare_document(1, "1", "zoe@x.fr"),
+    "unshare_document[all]": lambda db: db.unshare_document(1, "1"),
+    "get_user_stats": lambda db: db.get_user_stats(1),
+    "enqueue_job": lambda db: db.enqueue_job(1, "document_upload", {}),
+    "claim_next_job": lambda db: db.claim_next_job(),
+    "renew_job_lease": lambda db: db.renew_job_lease(1, "worker"),
+    "set_job_document": lambda db: db.set_job_document(1, 1, {"document_id": 1}),
+    "update_job_progress": lambda db: db.update_job_progress(1, 0.5),
+    "complete_job": lambda db: db.complete_job(1, {"document_id": 1}),
+    "fail_job": lambda db: db.fail_job(1, "erreur"),
+    "get_job": lambda db: db.get_job(1),
+    "get_job[user]": lambda db: db.get_job(1, user_id=1),
+    "requeue_interrupted_jobs": lambda db: db.requeue_interrupted_jobs(),
+    "release_job_content_refs": lambda db: db.release_job_content_refs(1, _SHA),
+    "add_content_blob": lambda db: db.add_content_blob(_SHA, "/tmp/blob", 1, {}),
+    "acquire_content_blob": lambda db: db.acquire_content_blob(_SHA),
+    "release_content_blob": lambda db: db.release_content_blob(_SHA),
+    "release_content_blob[job]": lambda db: db.release_content_blob(_SHA, job_id=1),
+    "get_content_blob": lambda db: db.get_content_blob(_SHA),
+    "collect_unreferenced_blobs": lambda db: db.collect_unreferenced_blobs(),
+    "collect_unreferenced_blobs[sha]": lambda db: db.collect_unreferenced_blobs([_SHA]),
+    "get_extraction": lambda db: db.get_extraction(_SHA, "text", "v1"),
+    "put_extraction": lambda db: db.put_extraction(_SHA, "text", "v1", {"pages": []}),
+    "evict_extractions": lambda db: db.evict_extractions(1024),
+    "get_extraction_cache_size": lambda db: db.get_extraction_cache_size(),
+    "aria:_save_local_pain_entry": lambda db: aria_api._save_local_pain_entry(
+        {"intensity": 4}
+    ),
+    "aria:_fetch_local_pain_entries": lambda db: aria_api._fetch_local_pain_entries(),
+    "aria:_fetch_local_pain_entries[limit]": lambda db: (
+        aria_api._fetch_local_pain_entries(limit=20)
+    ),
+}
+
+
+def _without_fts(db, method, *args):
+    """Exécute une méthode avec le repli LIKE (sans FTS5)"""
+    db.fts_enabled = False
+    try:
+        return method(*args)
+    finally:
+        db.fts_enabled = True
+
+
+def _seed(db: CIADatabase) -> None:
+    """Quelques lignes dans chaque table interrogée"""
+    alice = db.create_user("alice", "hash")
+    db.create_user("bob", "hash")
+    for i in range(3):
+        doc_id = db.add_document(f"d{i}.pdf", "o.pdf", f"/tmp/d{i}", "pdf", 1)
+        db.associate_document_to_user(alice, doc_id)
+        db.add_document_metadata(
+            doc_id, doctor_name="Dr Martin", keywords="ecg", document_type="ordonnance"
+        )
+    db.add_family_member(alice, "Zoé", "zoe@x.fr")
+    db.share_document_with_member(alice, "1", "zoe@x.fr")
+    db.add_token_to_blacklist("jti-1", alice, "access", _EXPIRES)
+    db.add_audit_log(alice, "login", "auth")
+    db.add_ai_conversation("q", "r")
+    db.enqueue_job(alice, "document_upload", {"path": "/tmp/x"})
+    db.add_content_blob(_SHA, "/tmp/blob", 1, {})
+    db.put_extraction(_SHA, "text", "v1", {"pages": ["texte"]})
+    db.add_document("c.pdf", "c.pdf", "/tmp/blob", "pdf", 1, content_sha256=_SHA)
+    with db.connection() as conn:
+        conn.execute(
+            "INSERT INTO doctors (first_name, last_name) VALUES ('Jean', 'Martin')"
+        )
+        conn.execute(
+            "INSERT INTO consultations (doctor_id, user_id, date) "
+            "VALUES (1, ?, '2025-01-01')",
+            (alice,),
+        )
+    aria_api._save_local_pain_entry({"intensity": 3})
+
+
+@pytest.fixture
+def traced_db(monkeypatch):
+    """Base de test dont toutes les requêtes SQL sont capturées"""
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        db_path = tmp.name
+    db = CIADatabase(db_path=db_path)
+    monkeypatch.setattr(aria_api, "get_database", lambda: db)
+    _seed(db)
+    db.flush_audit_logs()
+
+    statements: list[str] = []
+    pool_connection = db.pool.connection
+
+    @contextmanager
+    def traced_connection():
+        with pool_connection() as conn:
+            conn.set_trace_callback(statements.append)
+            yield conn
+
+    monkeypatch.setattr(db.pool, "connection", traced_connection)
+    pool_dedicated = db.pool.dedicated
+
+    @contextmanager
+    def traced_dedicated():
+        with pool_dedicated() as conn:
+            conn.set_trace_callback(statements.append)
+            yield conn
+
+    monkeypatch.setattr(db.pool, "dedicated", traced_dedicated)
+    yield db, statements
+    db.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+
+def _tables_by_alias(sql: str) -> dict[str, str]:
+    """Alias (ou nom) -> table, d'après les clauses FROM/JOIN/INTO/UPDATE"""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias and alias.lower() not in _SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def _full_scans(conn: sqlite3.Connection, sql: str) -> list[str]:
+    """Grandes tables parcourues sans index par la requête"""
+    aliases = _tables_by_alias(sql)
+    scans = []
+    for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+        match = _BARE_SCAN.match(row[3])
+        if match:
+            table = aliases.get(match.group(1), match.group(1))
+            if table in LARGE_TABLES:
+                scans.append(table)
+    return scans
+
+
+def _is_query(sql: str) -> bool:
+    keyword = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    return keyword in {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+class TestQueryPlans:
+    """Aucun parcours complet de grande table"""
+
+    def test_every_method_has_a_scenario(self):
+        """Toute méthode publique de CIADatabase est couverte par un scénario"""
+        methods = {
+            name
+            for name in dir(CIADatabase)
+            if not name.startswith("_") and callable(getattr(CIADatabase, name))
+        }
+        covered = {name.split("[")[0] for name in SCENARIOS}
+        assert methods - NOT_QUERIES - covered == set()
+
+    @pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+    def test_no_full_table_scan(self, traced_db, scenario):
+        """Les requêtes émises utilisent un index sur les grandes tables"""
+        db, statements = traced_db
+        statements.clear()
+        SCENARIOS[scenario](db)
+        queries = [sql for sql in statements if _is_query(sql)]
+        method = scenario.split("[")[0]
+        if method not in {"revoke_all_user_tokens", "queue_audit_log"}:
+            assert queries, f"Aucune requête capturée pour {scenario}"
+
+        with sqlite3.connect(db.db_path) as conn:
+            for sql in queries:
+                for table in _full_scans(conn, sql):
+                    if (method, table) in ALLOWED_SCANS:
+                        continue
+                    pytest.fail(f"{scenario}: parcours complet de {table}\n{sql}")
+
+    def test_foreign_keys_are_indexed(self, traced_db):
+        """Les clés étrangères des grandes tables sont indexées (ON DELETE CASCADE)"""
+        db, _ = traced_db
+        missing = []
+        with sqlite3.connect(db.db_path) as conn:
+            for table in sorted(LARGE_TABLES):
+                leading = {
+                    conn.execute(f"PRAGMA index_info({index[1]})").fetchone()[2]
+                    for index in conn.execute(f"PRAGMA index_list({table})")
+                }
+                for fk in conn.execute(f"PRAGMA foreign_key_list({table})"):
+                    if fk[3] not in leading:
+                        missing.append(f"{table}.{fk[3]}")
+        assert missing == []
@@ -0,0 +1,85 @@
+"""
+Tests unitaires pour les lignes typées (records)
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pytest
+
+from arkalia_cia_python_backend.async_database import AsyncCIADatabase
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.records import DocumentRecord, iter_records
+
+
+@pytest.fixture
+def db():
+    """Base temporaire avec un utilisateur et cinq documents"""
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        db_path = tmp.name
+    database = CIADatabase(db_path=db_path)
+    user_id = database.create_user("alice", "hash")
+    for i in range(5):
+        doc_id = database.add_document(f"d{i}.pdf", "o.pdf", "/tmp/d", "pdf", i)
+        database.associate_document_to_user(user_id, doc_id)
+    yield database
+    database.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+
+class TestIterRecords:
+    """Tests pour iter_records"""
+
+    def test_maps_columns_by_name(self):
+        """Les colonnes sont associées aux champs par nom, quel que soit l'ordre"""
+        conn = sqlite3.connect(":memory:")
+        cursor = conn.execute(
+            "SELECT 'now' AS updated_at, 1 AS id, 'n' AS name, 'o' AS original_name,"
+            " '/p' AS file_path, 'pdf' AS file_type, 3 AS file_size,"
+            " 'then' AS created_at, NULL AS content_sha256, 'extra' AS ignored"
+        )
+        (record,) = iter_records(cursor, DocumentRecord)
+        assert record.id == 1
+        assert record.updated_at == "now"
+        assert record._asdict()["file_size"] == 3
+        conn.close()
+
+    def test_records_are_lighter_than_dicts(self):
+        """Un record pèse moins qu'un dict équivalent"""
+        record = DocumentRecord(1, "n", "o", "/p", "pdf", 3, "c", "u")
+        assert sys.getsizeof(record) < sys.getsizeof(record._asdict())
+        assert not hasattr(record, "__dict__")
+
+
+class TestIterUserDocuments:
+    """Tests pour CIADatabase.iter_user_documents"""
+
+    def test_same_rows_as_get_user_documents(self, db):
+        """Mêmes lignes, dans le même ordre, que la variante liste"""
+        records = list(db.iter_user_documents(1, batch_size=2))
+        assert [r._asdict() for r in records] == db.get_user_documents(1)
+
+    def test_early_close_releases_connection(self, db):
+        """Fermer l'itérateur avant la fin ferme sa connexion, hors du pool"""
+        documents = db.iter_user_documents(1, batch_size=2)
+        assert next(documents).name == "d4.pdf"
+        assert db.pool.stats()["in_use"] == 0
+        documents.close()
+        assert db.pool.stats()["in_use"] == 0
+
+    def test_writes_during_iteration_kept_after_break(self, db):
+        """Écritures faites pendant le parcours : validées malgré un break"""
+        for document in db.iter_user_documents(1, batch_size=2):
+            db.add_reminder(f"Relire {document.name}", "", "2030-01-01")
+            break
+        with db.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0] == 1
+
+    def test_not_exposed_by_async_facade(self, db):
+        """La façade asynchrone n'expose pas l'itérateur (lié au thread)"""
+        with pytest.raises(AttributeError):
+            AsyncCIADatabase(db).iter_user_documents  # noqa: B018
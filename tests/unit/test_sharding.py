@@ -0,0 +1,194 @@
+"""
+Tests unitaires pour le stockage par utilisateur (une base par utilisateur)
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from arkalia_cia_python_backend.async_database import AsyncCIADatabase
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.db_pool import SQLiteConnectionPool
+from arkalia_cia_python_backend.pdf_processor import PDFProcessor
+from arkalia_cia_python_backend.services.document_service import DocumentService
+from arkalia_cia_python_backend.sharding import ShardManager, user_scope
+
+
+@pytest.fixture
+def shard_dir():
+    """Répertoire temporaire des bases utilisateur"""
+    with tempfile.TemporaryDirectory() as tmp:
+        yield tmp
+
+
+@pytest.fixture
+def db(shard_dir):
+    """Base principale + bases par utilisateur"""
+    db_path = os.path.join(shard_dir, "main.db")
+    database = CIADatabase(db_path=db_path, shard_dir=os.path.join(shard_dir, "users"))
+    yield database
+    database.close()
+
+
+def _count(conn, table: str) -> int:
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]  # nosec B608
+
+
+class TestShardManager:
+    """Tests pour ShardManager"""
+
+    def test_lease_creates_migrated_database(self, shard_dir):
+        """La base d'un utilisateur est créée et migrée au premier bail"""
+        manager = ShardManager(shard_dir, SQLiteConnectionPool)
+        with manager.lease(7) as shard, shard.pool.connection() as conn:
+            assert _count(conn, "documents") == 0
+        assert Path(shard_dir, "user_7.db").exists()
+        manager.close()
+
+    def test_eviction_skips_leased_shards(self, shard_dir):
+        """Au-delà de max_open, seules les bases sans bail sont fermées"""
+        manager = ShardManager(shard_dir, SQLiteConnectionPool, max_open=1)
+        with manager.lease(1):
+            with manager.lease(2):
+                assert manager.stats()["open"] == 2
+            with manager.lease(3):
+                pass
+            assert manager.stats()["open"] == 1
+        manager.close()
+
+    def test_delete(self, shard_dir):
+        """delete() supprime les fichiers, sauf si la base est utilisée"""
+        manager = ShardManager(shard_dir, SQLiteConnectionPool)
+        with manager.lease(4):
+            with pytest.raises(RuntimeError):
+                manager.delete(4)
+        assert manager.delete(4)
+        assert not Path(shard_dir, "user_4.db").exists()
+        assert not manager.delete(4)
+        manager.close()
+
+    def test_slow_open_does_not_block_other_users(self, shard_dir):
+        """Ouverture lente d'une base : les autres utilisateurs continuent"""
+        opening = threading.Event()
+        release = threading.Event()
+        opened_pools = []
+
+        def pool_factory(path: str) -> SQLiteConnectionPool:
+            if path.endswith("user_1.db"):
+                opening.set()
+                assert release.wait(5)
+            pool = SQLiteConnectionPool(path)
+            opened_pools.append(path)
+            return pool
+
+        manager = ShardManager(shard_dir, pool_factory)
+        held = [manager.lease(1) for _ in range(2)]  # Baux gardés jusqu'à la fin
+        leases = [threading.Thread(target=lease.__enter__) for lease in held]
+        for thread in leases:
+            thread.start()
+        assert opening.wait(5)
+        # Base 1 en cours d'ouverture : la base 2 s'ouvre sans attendre
+        with manager.lease(2):
+            pass
+        release.set()
+        for thread in leases:
+            thread.join(5)
+
+        assert manager.stats()["leased"] == 1
+        assert sum(path.endswith("user_1.db") for path in opened_pools) == 1
+        for lease in held:
+            lease.__exit__(None, None, None)
+        assert manager.stats()["leased"] == 0
+        manager.close()
+
+    def test_invalid_user_id(self, shard_dir):
+        """Les identifiants non positifs sont refusés"""
+        manager = ShardManager(shard_dir, SQLiteConnectionPool)
+        with pytest.raises(ValueError):
+            manager.path_for(0)
+        manager.close()
+
+
+class TestShardedDatabase:
+    """Tests du routage de CIADatabase en mode par utilisateur"""
+
+    def test_user_data_routed_to_user_database(self, db):
+        """Documents dans la base de l'utilisateur, comptes dans la principale"""
+        alice = db.create_user("alice", "hash")
+        bob = db.create_user("bob", "hash")
+        with user_scope(alice):
+            doc_id = db.add_document("a.pdf", "a.pdf", "/tmp/a", "pdf", 1)
+            db.associate_document_to_user(alice, doc_id)
+        assert [d["name"] for d in db.get_user_documents(alice)] == ["a.pdf"]
+        assert db.get_user_documents(bob) == []
+        with db.connection() as conn:
+            assert _count(conn, "documents") == 0
+            assert _count(conn, "users") == 2
+        with db.user_connection(alice) as conn:
+            assert _count(conn, "documents") == 1
+
+    def test_service_save_without_user_scope(self, db, shard_dir):
+        """Le service enregistre dans la base de user_id, sans scope ambiant"""
+        service = DocumentService(
+            db=db, pdf_processor=PDFProcessor(os.path.join(shard_dir, "uploads"))
+        )
+        alice = db.create_user("alice", "hash")
+        result = {
+            "filename": "a.pdf",
+            "original_name": "a.pdf",
+            "file_path": "/tmp/a",
+            "file_size": 1,
+        }
+        doc_id = service.save_document_with_metadata(
+            result, alice, {"doctor_name": "Dr Martin", "keywords": []}
+        )
+        service.save_documents_with_metadata_bulk([(result, None)], alice)
+
+        documents = db.get_user_documents(alice)
+        assert len(documents) == 2
+        assert doc_id in [d["id"] for d in documents]
+        with db.user_connection(alice) as conn:
+            assert _count(conn, "document_metadata") == 1
+        with db.connection() as conn:
+            assert _count(conn, "documents") == 0
+            assert _count(conn, "document_metadata") == 0
+
+    def test_no_user_scope_uses_main_database(self, db):
+        """Sans utilisateur courant, les données restent dans la base principale"""
+        db.add_ai_conversation("question", "réponse")
+        with db.connection() as conn:
+            assert _count(conn, "ai_conversations") == 1
+
+    def test_async_facade_propagates_user_scope(self, db):
+        """L'utilisateur courant suit l'appel jusqu'au thread de l'executor"""
+        adb = AsyncCIADatabase(db)
+
+        async def scenario():
+            with user_scope(3):
+                return await adb.add_ai_conversation("q", "r")
+
+        asyncio.run(scenario())
+        with db.user_connection(3) as conn:
+            assert _count(conn, "ai_conversations") == 1
+
+    def test_delete_user_storage(self, db, shard_dir):
+        """La suppression RGPD retire la base et les partages émis"""
+        alice = db.create_user("alice", "hash")
+        with user_scope(alice):
+            db.add_document("a.pdf", "a.pdf", "/tmp/a", "pdf", 1)
+        db.share_document_with_member(alice, "1", "zoe@x.fr")
+        assert db.delete_user_storage(alice)
+        assert not Path(shard_dir, "users", f"user_{alice}.db").exists()
+        assert db.get_shared_documents(alice) == []
+
+    def test_delete_user_storage_requires_shard_mode(self):
+        """Hors mode par utilisateur, delete_user_storage est refusé"""
+        with tempfile.TemporaryDirectory() as tmp:
+            database = CIADatabase(db_path=os.path.join(tmp, "main.db"))
+            with pytest.raises(RuntimeError):
+                database.delete_user_storage(1)
+            database.close()
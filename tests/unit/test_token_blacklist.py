@@ -0,0 +1,107 @@
+"""
+Tests unitaires pour le cache mémoire de la blacklist des tokens
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.token_blacklist import BloomFilter, TokenBlacklistCache
+
+
+@pytest.fixture
+def temp_db_path():
+    """Chemin de base temporaire (nettoyé avec fichiers WAL/SHM)"""
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        db_path = tmp.name
+    yield db_path
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+
+def _in(minutes: float) -> datetime:
+    return datetime.now() + timedelta(minutes=minutes)
+
+
+class TestBloomFilter:
+    """Tests pour BloomFilter"""
+
+    def test_no_false_negatives(self):
+        """Toute clé ajoutée est reconnue"""
+        bloom = BloomFilter(capacity=1000)
+        keys = [f"jti-{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        assert all(key in bloom for key in keys)
+
+    def test_false_positive_rate(self):
+        """Le taux de faux positifs reste proche du taux visé"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+        false_positives = sum(f"autre-{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+
+
+class TestTokenBlacklistCache:
+    """Tests pour TokenBlacklistCache"""
+
+    def test_revocation_without_query(self, temp_db_path):
+        """Un token révoqué est vu sans requête SQL supplémentaire"""
+        db = CIADatabase(db_path=temp_db_path)
+        user_id = db.create_user("alice", "hash")
+        assert db.add_token_to_blacklist("jti-1", user_id, "access", _in(10))
+        assert db.is_token_blacklisted("jti-1")
+        assert not db.is_token_blacklisted("jti-2")
+        checkouts = db.pool.stats()["checkouts"]
+        for _ in range(100):
+            db.is_token_blacklisted("jti-1")
+        assert db.pool.stats()["checkouts"] == checkouts
+        db.close()
+
+    def test_loaded_from_database(self, temp_db_path):
+        """Les révocations existantes sont chargées, les expirées ignorées"""
+        db = CIADatabase(db_path=temp_db_path)
+        user_id = db.create_user("alice", "hash")
+        db.add_token_to_blacklist("actif", user_id, "access", _in(10))
+        db.add_token_to_blacklist("expire", user_id, "access", _in(-10))
+        db.close()
+
+        reopened = CIADatabase(db_path=temp_db_path)
+        assert reopened.is_token_blacklisted("actif")
+        assert not reopened.is_token_blacklisted("expire")
+        assert len(reopened.token_blacklist) == 1
+        reopened.close()
+
+    def test_entries_evicted_at_expiry(self, temp_db_path):
+        """Les entrées sortent du cache à leur expiration"""
+        db = CIADatabase(db_path=temp_db_path)
+        cache = TokenBlacklistCache(db.pool, refresh_interval=0)
+        cache.add("court", datetime.now() + timedelta(milliseconds=50))
+        assert cache.is_revoked("court")
+        deadline = datetime.now() + timedelta(seconds=2)
+        while cache.is_revoked("court") and datetime.now() < deadline:
+            pass
+        assert not cache.is_revoked("court")
+        assert len(cache) == 0
+        db.close()
+
+    @pytest.mark.parametrize("use_bloom", [False, True])
+    def test_cross_worker_invalidation(self, temp_db_path, use_bloom):
+        """Une révocation faite par un autre worker est vue après relecture"""
+        worker_a = CIADatabase(db_path=temp_db_path)
+        worker_b = CIADatabase(db_path=temp_db_path)
+        worker_b.token_blacklist = TokenBlacklistCache(
+            worker_b.pool, refresh_interval=0, use_bloom=use_bloom
+        )
+        user_id = worker_a.create_user("alice", "hash")
+        assert not worker_b.is_token_blacklisted("jti-x")
+
+        worker_a.add_token_to_blacklist("jti-x", user_id, "refresh", _in(60))
+        assert worker_b.is_token_blacklisted("jti-x")
+        worker_a.close()
+        worker_b.close()
@@ -0,0 +1,105 @@
+"""
+Tests unitaires pour la réception des uploads par morceaux
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+
+import pytest
+from pypdf import PdfWriter
+
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.pdf_processor import PDFProcessor
+from arkalia_cia_python_backend.services.document_service import DocumentService
+from arkalia_cia_python_backend.utils.upload_stream import (
+    UploadTooLargeError,
+    stream_upload,
+)
+
+
+class FakeUpload:
+    """Source asynchrone qui enregistre la taille des lectures demandées"""
+
+    def __init__(self, content: bytes):
+        self._buffer = io.BytesIO(content)
+        self.read_sizes: list[int] = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.read_sizes.append(size)
+        return self._buffer.read(size)
+
+
+def _pdf_bytes() -> bytes:
+    writer = PdfWriter()
+    writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def upload_dir():
+    """Dossier d'upload temporaire"""
+    with tempfile.TemporaryDirectory() as tmp:
+        yield tmp
+
+
+class TestStreamUpload:
+    """Tests pour stream_upload"""
+
+    def test_chunks_size_and_digest(self, upload_dir):
+        """Lecture par morceaux, taille et SHA-256 calculés au passage"""
+        content = os.urandom(10_000)
+        source = FakeUpload(content)
+        stored = asyncio.run(stream_upload(source, upload_dir, 1_000_000, 4096))
+        assert set(source.read_sizes) == {4096}
+        assert stored.size == len(content)
+        assert stored.sha256 == hashlib.sha256(content).hexdigest()
+        with open(stored.path, "rb") as f:
+            assert f.read() == content
+        assert os.path.dirname(stored.path) == upload_dir
+
+    def test_too_large_stops_early(self, upload_dir):
+        """La limite est appliquée pendant la lecture, fichier partiel supprimé"""
+        source = FakeUpload(b"x" * 100_000)
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(stream_upload(source, upload_dir, 10_000, 4096))
+        assert len(source.read_sizes) < 5
+        assert os.listdir(upload_dir) == []
+
+
+class TestIngestUpload:
+    """Tests pour DocumentService.ingest_upload"""
+
+    @pytest.fixture
+    def service(self, upload_dir):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = CIADatabase(db_path=os.path.join(tmp, "upload.db"))
+            yield DocumentService(db=db, pdf_processor=PDFProcessor(upload_dir))
+            db.close()
+
+    def test_pdf_renamed_into_place(self, service, upload_dir):
+        """Le PDF valide est renommé vers son emplacement définitif (pas de copie)"""
+        content = _pdf_bytes()
+        result = asyncio.run(service.ingest_upload(FakeUpload(content), "cr.pdf"))
+        digest = hashlib.sha256(content).hexdigest()
+        assert result["sha256"] == digest
+        assert result["file_size"] == len(content)
+        assert result["file_path"] == str(service.content_store.path_for(digest))
+        assert os.listdir(upload_dir) == [digest[:2]]
+
+    def test_invalid_pdf_removed(self, service, upload_dir):
+        """Un fichier qui n'est pas un PDF est refusé et supprimé"""
+        with pytest.raises(ValueError):
+            asyncio.run(service.ingest_upload(FakeUpload(b"pas un pdf"), "cr.pdf"))
+        assert os.listdir(upload_dir) == []
+
+    def test_invalid_name_rejected_before_reading(self, service):
+        """Le nom est validé avant toute lecture"""
+        source = FakeUpload(_pdf_bytes())
+        with pytest.raises(ValueError):
+            asyncio.run(service.ingest_upload(source, "../cr.pdf"))
+        assert source.read_sizes == []
@@ -0,0 +1,143 @@
+"""
+Tests unitaires pour les compteurs par utilisateur (table user_stats)
+"""
+
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+from arkalia_cia_python_backend.database import CIADatabase
+from arkalia_cia_python_backend.migrations import MIGRATIONS
+from arkalia_cia_python_backend.sharding import user_scope
+
+
+@pytest.fixture
+def tmp_dir():
+    """Répertoire temporaire des bases"""
+    with tempfile.TemporaryDirectory() as tmp:
+        yield tmp
+
+
+@pytest.fixture
+def db(tmp_dir):
+    """Base temporaire avec un utilisateur"""
+    database = CIADatabase(db_path=os.path.join(tmp_dir, "stats.db"))
+    yield database
+    database.close()
+
+
+def _upload(db: CIADatabase, user_id: int, name: str = "a.pdf") -> int:
+    doc_id = db.add_document(name, name, f"/tmp/{name}", "pdf", 1)
+    db.associate_document_to_user(user_id, doc_id)
+    return doc_id
+
+
+class TestUserStatsTriggers:
+    """Tests des triggers qui tiennent user_stats à jour"""
+
+    def test_unknown_user_has_zero_counts(self, db):
+        """Sans activité, tous les compteurs valent zéro"""
+        stats = db.get_user_stats(42)
+        assert stats == {
+            "user_id": 42,
+            "document_count": 0,
+            "last_upload_at": None,
+            "conversation_count": 0,
+            "share_count": 0,
+            "family_member_count": 0,
+        }
+
+    def test_counts_follow_writes(self, db):
+        """Ajouts et suppressions mettent les compteurs à jour"""
+        user_id = db.create_user("alice", "hash")
+        first = _upload(db, user_id, "a.pdf")
+        _upload(db, user_id, "b.pdf")
+        db.add_ai_conversation("q", "r", user_id=user_id)
+        db.add_ai_conversation("q", "r")  # conversation anonyme : non comptée
+        db.share_document_with_member(user_id, str(first), "zoe@x.fr")
+        member_id = db.add_family_member(user_id, "Zoé", "zoe@x.fr")
+
+        stats = db.get_user_stats(user_id)
+        assert stats["document_count"] == 2
+        assert stats["conversation_count"] == 1
+        assert stats["share_count"] == 1
+        assert stats["family_member_count"] == 1
+        assert stats["last_upload_at"] is not None
+
+        db.delete_document(first)
+        db.unshare_document(user_id, str(first))
+        db.delete_family_member(user_id, member_id)
+        stats = db.get_user_stats(user_id)
+        assert stats["document_count"] == 1
+        assert stats["share_count"] == 0
+        assert stats["family_member_count"] == 0
+
+    def test_delete_document_removes_associations(self, db):
+        """Supprimer un document retire ses associations utilisateur"""
+        user_id = db.create_user("alice", "hash")
+        doc_id = _upload(db, user_id)
+        db.delete_document(doc_id)
+        assert db.get_user_documents(user_id) == []
+        assert db.get_user_stats(user_id)["last_upload_at"] is None
+
+    def test_conversation_uses_current_user(self, db):
+        """Sans user_id explicite, la conversation revient à l'utilisateur courant"""
+        with user_scope(5):
+            db.add_ai_conversation("q", "r")
+        assert db.get_user_stats(5)["conversation_count"] == 1
+
+
+class TestUserStatsMigration:
+    """Tests du calcul initial de user_stats sur une base existante"""
+
+    def test_backfill_existing_rows(self, tmp_dir):
+        """Les données antérieures à la migration sont comptées"""
+        path = os.path.join(tmp_dir, "legacy.db")
+        conn = sqlite3.connect(path)
+        cursor = conn.cursor()
+        for version, migration in MIGRATIONS:
+            if version < 8:
+                migration(cursor)
+        conn.execute("PRAGMA user_version = 7")
+        conn.execute(
+            "INSERT INTO documents (name, original_name, file_path, file_type) "
+            "VALUES ('a', 'a', '/tmp/a', 'pdf')"
+        )
+        conn.executemany(
+            "INSERT INTO user_documents (user_id, document_id) VALUES (?, ?)",
+            [(1, 1), (1, 99)],  # 99 : association orpheline
+        )
+        conn.execute(
+            "INSERT INTO shared_documents (user_id, document_id, member_email) "
+            "VALUES (1, '1', 'zoe@x.fr')"
+        )
+        conn.commit()
+        conn.close()
+
+        database = CIADatabase(db_path=path)
+        stats = database.get_user_stats(1)
+        assert stats["document_count"] == 1
+        assert stats["share_count"] == 1
+        assert stats["conversation_count"] == 0
+        database.close()
+
+
+class TestShardedUserStats:
+    """Tests de get_user_stats en mode par utilisateur"""
+
+    def test_counts_merged_across_databases(self, tmp_dir):
+        """Partages (base principale) et documents (base utilisateur) réunis"""
+        database = CIADatabase(
+            db_path=os.path.join(tmp_dir, "main.db"),
+            shard_dir=os.path.join(tmp_dir, "users"),
+        )
+        user_id = database.create_user("alice", "hash")
+        with user_scope(user_id):
+            doc_id = _upload(database, user_id)
+        database.share_document_with_member(user_id, str(doc_id), "zoe@x.fr")
+        stats = database.get_user_stats(user_id)
+        assert stats["document_count"] == 1
+        assert stats["share_count"] == 1
+        database.close()